@@ -1,8 +1,11 @@
 from PySide6.QtCore import QObject, Slot, Signal, Property, QTimer
 from PySide6.QtQml import QmlElement
+from pymavlink import mavutil
 import math
 import time
 
+from .command_manager import result_name
+
 QML_IMPORT_NAME = "RZGCS"
 QML_IMPORT_MAJOR_VERSION = 1
 
@@ -32,6 +35,9 @@ class CalibrationViewController(QObject):
         self._rc_channels = [1500] * 8  # 8 Standard-RC-Kanäle mit Mittelstellung (1500 µs)
         self._accel_step = 0
         self._message_handler = None
+        self._start_future = None  # Startbefehl, dessen COMMAND_ACK noch aussteht
+        self._start_command = None
+        self._start_instruction = ""
     
     @Slot(object)
     def initialize(self, message_handler):
@@ -44,24 +50,21 @@ class CalibrationViewController(QObject):
         print("Initialisiere CalibrationViewController")
         self._message_handler = message_handler
         
-        # Verbinde MAVLink-Signale für Kalibrierungsfeedback
+        # MAVLink-Nachrichten für Kalibrierungsfeedback direkt abonnieren
         if self._message_handler:
-            # Verbinde die Signale für Sensordaten
-            if hasattr(self._message_handler, 'raw_imu_received'):
-                self._message_handler.raw_imu_received.connect(self._handle_raw_imu)
-                print("RAW_IMU Signal verbunden")
-                
-            if hasattr(self._message_handler, 'scaled_imu_received'):
-                self._message_handler.scaled_imu_received.connect(self._handle_scaled_imu)
-                print("SCALED_IMU Signal verbunden")
-                
-            if hasattr(self._message_handler, 'mag_cal_progress_received'):
-                self._message_handler.mag_cal_progress_received.connect(self._handle_mag_cal_progress)
-                print("MAG_CAL_PROGRESS Signal verbunden")
-                
-            if hasattr(self._message_handler, 'mag_cal_report_received'):
-                self._message_handler.mag_cal_report_received.connect(self._handle_mag_cal_report)
-                print("MAG_CAL_REPORT Signal verbunden")
+            if hasattr(self._message_handler, 'get_dispatcher'):
+                self._message_handler.get_dispatcher().subscribe_many({
+                    'RAW_IMU': self._on_raw_imu,
+                    'SCALED_IMU': self._on_scaled_imu,
+                    'MAG_CAL_PROGRESS': self._on_mag_cal_progress,
+                    'MAG_CAL_REPORT': self._on_mag_cal_report,
+                })
+                print("Kalibrierungs-Nachrichten abonniert")
+
+            # IN_PROGRESS-Acks: die Kalibrierung läuft, die Abschlussmeldung kommt später
+            if hasattr(self._message_handler, 'get_command_manager'):
+                self._message_handler.get_command_manager().commandProgress.connect(
+                    self._on_command_progress)
                 
             # Timer für simulierte Daten starten (falls keine echten Daten empfangen werden)
             self._simulation_timer = QTimer(self)
@@ -70,6 +73,26 @@ class CalibrationViewController(QObject):
             
         return True
         
+    def _on_raw_imu(self, msg):
+        """Dispatcher-Handler für RAW_IMU"""
+        self._handle_raw_imu(msg.xacc, msg.yacc, msg.zacc,
+                             msg.xgyro, msg.ygyro, msg.zgyro,
+                             msg.xmag, msg.ymag, msg.zmag)
+
+    def _on_scaled_imu(self, msg):
+        """Dispatcher-Handler für SCALED_IMU"""
+        self._handle_scaled_imu(msg.xacc, msg.yacc, msg.zacc,
+                                msg.xgyro, msg.ygyro, msg.zgyro,
+                                msg.xmag, msg.ymag, msg.zmag)
+
+    def _on_mag_cal_progress(self, msg):
+        """Dispatcher-Handler für MAG_CAL_PROGRESS"""
+        self._handle_mag_cal_progress(msg.compass_id, msg.completion_pct, msg.completion_mask)
+
+    def _on_mag_cal_report(self, msg):
+        """Dispatcher-Handler für MAG_CAL_REPORT"""
+        self._handle_mag_cal_report(msg.compass_id, msg.cal_status, msg.autosaved)
+
     def _handle_raw_imu(self, xacc, yacc, zacc, xgyro, ygyro, zgyro, xmag, ymag, zmag):
         """Verarbeitet RAW_IMU-Nachrichten"""
         # Kompasswerte aktualisieren
@@ -178,19 +201,14 @@ class CalibrationViewController(QObject):
             self.calibrationFinished.emit(False, "Fehler: Keine Verbindung zum Flugcontroller")
             return
             
-        self._calibration_in_progress = True
-        self._current_calibration_type = "compass"
-        self._progress = 0.0
-        
-        # Sende MAVLink-Befehl zur Kompass-Kalibrierung
-        result = self._message_handler.start_compass_calibration()
-        
-        if result:
-            self.calibrationProgressChanged.emit(self._progress, "Rotieren Sie die Drohne in alle Richtungen")
-            print("Kompass-Kalibrierung gestartet")
-        else:
-            self._calibration_in_progress = False
-            self.calibrationFinished.emit(False, "Fehler beim Starten der Kompass-Kalibrierung")
+        # Sende MAVLink-Befehl zur Kompass-Kalibrierung; Anleitung erst nach dem Ack
+        self._await_start(
+            "compass",
+            mavutil.mavlink.MAV_CMD_DO_START_MAG_CAL,
+            self._message_handler.start_compass_calibration(),
+            "Rotieren Sie die Drohne in alle Richtungen",
+            "Fehler beim Starten der Kompass-Kalibrierung",
+        )
     
     # Beschleunigungssensor-Kalibrierung
     @Slot()
@@ -203,20 +221,69 @@ class CalibrationViewController(QObject):
             self.calibrationFinished.emit(False, "Fehler: Keine Verbindung zum Flugcontroller")
             return
             
-        self._calibration_in_progress = True
-        self._current_calibration_type = "accel"
-        self._progress = 0.0
         self._accel_step = 0
         
-        # Sende MAVLink-Befehl zur Accelerometer-Kalibrierung
-        result = self._message_handler.start_accel_calibration()
-        
-        if result:
-            self.calibrationProgressChanged.emit(self._progress, "Platzieren Sie die Drohne horizontal")
-            print("Accelerometer-Kalibrierung gestartet")
+        # Sende MAVLink-Befehl zur Accelerometer-Kalibrierung; Anleitung erst nach dem Ack
+        self._await_start(
+            "accel",
+            mavutil.mavlink.MAV_CMD_PREFLIGHT_CALIBRATION,
+            self._message_handler.start_accel_calibration(),
+            "Platzieren Sie die Drohne horizontal",
+            "Fehler beim Starten der Accelerometer-Kalibrierung",
+        )
+
+    def _await_start(self, calibration_type, command, future, instruction, error_text):
+        """
+        Wartet auf das COMMAND_ACK des Startbefehls.
+
+        ACCEPTED oder IN_PROGRESS startet die Kalibrierung und zeigt die
+        Anleitung; jedes andere Ergebnis und ein Timeout beenden sie mit
+        calibrationFinished(False, ...).
+        """
+        self._calibration_in_progress = False
+        self._current_calibration_type = calibration_type
+        self._progress = 0.0
+        if future is None:
+            self._current_calibration_type = None
+            self.calibrationFinished.emit(False, error_text)
+            return
+        self._start_future = future
+        self._start_command = command
+        self._start_instruction = instruction
+        future.add_done_callback(lambda f: self._on_start_result(f, error_text))
+
+    def _begin_calibration(self):
+        if self._calibration_in_progress:
+            return
+        self._calibration_in_progress = True
+        self.calibrationProgressChanged.emit(self._progress, self._start_instruction)
+        print(f"Kalibrierung gestartet: {self._current_calibration_type}")
+
+    def _on_command_progress(self, command, progress):
+        """IN_PROGRESS-Ack des CommandManagers"""
+        if self._start_future is not None and command == self._start_command:
+            self._begin_calibration()
+
+    def _on_start_result(self, future, error_text):
+        """Done-Callback des Startbefehls (Qt-Thread)"""
+        if future is not self._start_future:
+            return  # Abgebrochen oder durch einen neuen Start ersetzt
+        self._start_future = None
+        self._start_command = None
+        if future.cancelled():
+            reason = f"{error_text}: Verbindung getrennt"
+        elif future.exception() is not None:
+            reason = f"{error_text}: {future.exception()}"
+        elif future.result() in (mavutil.mavlink.MAV_RESULT_ACCEPTED,
+                                 mavutil.mavlink.MAV_RESULT_IN_PROGRESS):
+            self._begin_calibration()
+            return
         else:
-            self._calibration_in_progress = False
-            self.calibrationFinished.emit(False, "Fehler beim Starten der Accelerometer-Kalibrierung")
+            reason = f"{error_text} ({result_name(future.result())})"
+        self._calibration_in_progress = False
+        self._current_calibration_type = None
+        self._progress = 0.0
+        self.calibrationFinished.emit(False, reason)
     
     @Slot()
     def nextCalibrationStep(self):
@@ -329,7 +396,10 @@ class CalibrationViewController(QObject):
         """
         Bricht die laufende Kalibrierung ab.
         """
-        if self._calibration_in_progress:
+        if self._calibration_in_progress or self._start_future is not None:
+            # Ein spätes Ack des Startbefehls wird danach ignoriert
+            self._start_future = None
+            self._start_command = None
             self._calibration_in_progress = False
             print(f"Kalibrierung abgebrochen: {self._current_calibration_type}")
             self.calibrationFinished.emit(False, f"{self._current_calibration_type}-Kalibrierung abgebrochen")
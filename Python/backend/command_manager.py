@@ -0,0 +1,316 @@
+"""
+COMMAND_LONG with acknowledgement, retransmission and round-trip statistics.
+
+A command is only done when the vehicle answers with a COMMAND_ACK for the
+same command id. The CommandManager gives every command a
+``concurrent.futures.Future`` that resolves to the MAV_RESULT of that ack,
+re-sends unanswered commands with an incremented confirmation field (as the
+MAVLink command protocol prescribes) and fails the future with
+``CommandTimeoutError`` once the retries are used up. Several commands can
+be outstanding at once; a second command with the same id for the same
+target waits until the first one is answered, because acks only carry the
+command id. Like the ParameterWriter it never blocks the Qt thread: acks
+come from the MessageDispatcher, timeouts from a periodic timer.
+"""
+
+import time
+from collections import deque
+from concurrent.futures import Future
+
+from PySide6.QtCore import QObject, Signal, Slot, Property, QTimer
+from pymavlink import mavutil
+
+from backend.exceptions import CommandTimeoutError, ConnectionError
+from backend.latency_tracer import LatencyHistogram
+
+MAV = mavutil.mavlink
+
+
+def command_name(command):
+    """MAV_CMD name of a command id (the number if unknown)"""
+    entry = MAV.enums["MAV_CMD"].get(command)
+    return entry.name if entry is not None else str(command)
+
+
+def result_name(result):
+    """MAV_RESULT name of an ack result"""
+    entry = MAV.enums["MAV_RESULT"].get(result)
+    return entry.name if entry is not None else str(result)
+
+
+class PendingCommand:
+    """One COMMAND_LONG on its way to the vehicle"""
+
+    def __init__(self, command, params, target_system, target_component, timeout, retries):
+        self.command = command
+        self.params = params
+        self.target_system = target_system
+        self.target_component = target_component
+        self.timeout = timeout
+        self.retries = retries
+        self.future = Future()
+        self.attempts = 0
+        self.first_sent = 0.0
+        self.deadline = 0.0
+        self.in_progress = False
+
+    @property
+    def key(self):
+        return (self.target_system, self.target_component, self.command)
+
+
+class CommandManager(QObject):
+    """
+    Tracks COMMAND_LONGs until their COMMAND_ACK.
+
+    The future of ``send_command`` resolves to the MAV_RESULT of the ack
+    (check for ``MAV_RESULT_ACCEPTED``), fails with ``CommandTimeoutError``
+    when no ack arrives after all retries, or is cancelled when the
+    connection changes. Done callbacks run on the Qt thread.
+
+    An ack with MAV_RESULT_IN_PROGRESS stops the retransmission and extends
+    the deadline to IN_PROGRESS_TIMEOUT; the final ack resolves the future.
+
+    Round-trip latency is recorded per command, from the send to the first
+    ack, only for commands answered on the first attempt (an ack to a
+    retransmitted command cannot be attributed to one send).
+
+    Signals:
+        commandFinished(int, int): Command id and MAV_RESULT (TIMEOUT_RESULT without ack)
+        commandProgress(int, int): Command id and progress (0-100) of an IN_PROGRESS ack
+        inFlightChanged(int): Number of commands waiting for an ack
+        statsChanged: Latency or counters changed
+    """
+
+    commandFinished = Signal(int, int)
+    commandProgress = Signal(int, int)
+    inFlightChanged = Signal(int)
+    statsChanged = Signal()
+
+    TIMEOUT_RESULT = -1
+
+    TICK_MS = 50
+    DEFAULT_TIMEOUT = 1.5  # Sekunden bis zur erneuten Übertragung
+    DEFAULT_RETRIES = 3  # Übertragungen insgesamt
+    IN_PROGRESS_TIMEOUT = 10.0  # Sekunden bis zur Abschlussmeldung nach IN_PROGRESS
+
+    # Befehl -> (Timeout, Übertragungen)
+    COMMAND_SETTINGS = {
+        MAV.MAV_CMD_PREFLIGHT_CALIBRATION: (10.0, 1),  # Kalibrierung nicht doppelt starten
+        MAV.MAV_CMD_COMPONENT_ARM_DISARM: (3.0, 2),  # Arming-Checks brauchen Zeit
+        MAV.MAV_CMD_DO_START_MAG_CAL: (3.0, 2),
+    }
+
+    def __init__(self, clock=time.monotonic, parent=None):
+        super().__init__(parent)
+        self._clock = clock
+        self._connection = None
+        self._in_flight = {}  # (System, Komponente, Befehl) -> PendingCommand
+        self._waiting = {}  # gleicher Schlüssel -> deque wartender PendingCommand
+        self._latency = {}  # Befehlsname -> LatencyHistogram
+        self._counters = {"sent": 0, "retransmitted": 0, "acked": 0, "timeouts": 0}
+
+        self._timer = QTimer(self)
+        self._timer.setInterval(self.TICK_MS)
+        self._timer.timeout.connect(self.poll)
+
+    # --- Verbindung ------------------------------------------------------
+
+    def set_connection(self, connection):
+        """Use another connection; outstanding commands are cancelled"""
+        if connection is not self._connection:
+            self.cancel_all()
+        self._connection = connection
+
+    @Slot()
+    def cancel_all(self):
+        """Cancel all outstanding and waiting commands"""
+        pending = list(self._in_flight.values())
+        for queue in self._waiting.values():
+            pending.extend(queue)
+        self._in_flight = {}
+        self._waiting = {}
+        self._timer.stop()
+        for command in pending:
+            command.future.cancel()
+        if pending:
+            self.inFlightChanged.emit(0)
+
+    # --- Senden ----------------------------------------------------------
+
+    def send_command(self, command, *params, target_system=None, target_component=None,
+                     timeout=None, retries=None):
+        """
+        Send a COMMAND_LONG (up to seven params) and return its Future.
+
+        Timeout and retries default to COMMAND_SETTINGS for the command,
+        otherwise DEFAULT_TIMEOUT and DEFAULT_RETRIES.
+        """
+        connection = self._connection
+        default_timeout, default_retries = self.COMMAND_SETTINGS.get(
+            command, (self.DEFAULT_TIMEOUT, self.DEFAULT_RETRIES))
+        if len(params) > 7:
+            raise ValueError(f"COMMAND_LONG has 7 params, got {len(params)}")
+        if target_system is None:
+            target_system = connection.target_system if connection is not None else 0
+        if target_component is None:
+            target_component = connection.target_component if connection is not None else 0
+        pending = PendingCommand(
+            command,
+            tuple(float(p) for p in params) + (0.0,) * (7 - len(params)),
+            target_system,
+            target_component,
+            default_timeout if timeout is None else timeout,
+            max(1, default_retries if retries is None else retries),
+        )
+        if connection is None:
+            pending.future.set_exception(ConnectionError("No MAVLink connection available"))
+            return pending.future
+
+        key = pending.key
+        if key in self._in_flight:
+            # Acks tragen nur die Befehls-ID: hinter dem laufenden Befehl einreihen
+            self._waiting.setdefault(key, deque()).append(pending)
+        else:
+            self._start(pending)
+        return pending.future
+
+    def _start(self, pending):
+        self._in_flight[pending.key] = pending
+        pending.first_sent = self._clock()
+        self._transmit(pending, pending.first_sent)
+        if self._in_flight.get(pending.key) is pending:
+            self._timer.start()
+            self.inFlightChanged.emit(len(self._in_flight))
+
+    def _transmit(self, pending, now):
+        confirmation = pending.attempts  # 0 beim ersten Senden, dann hochgezählt
+        pending.attempts += 1
+        pending.deadline = now + pending.timeout
+        try:
+            self._connection.mav.command_long_send(
+                pending.target_system, pending.target_component, pending.command,
+                confirmation, *pending.params)
+        except Exception as e:
+            self._complete(pending, error=e)
+            return
+        self._counters["sent"] += 1
+        if confirmation:
+            self._counters["retransmitted"] += 1
+
+    # --- Nachrichten -----------------------------------------------------
+
+    def handle_command_ack(self, msg):
+        """
+        Feed a COMMAND_ACK message.
+
+        Returns the PendingCommand it answered, otherwise None.
+        """
+        pending = self._match(msg)
+        if pending is None:
+            return None
+        now = self._clock()
+        if msg.result == MAV.MAV_RESULT_IN_PROGRESS:
+            pending.in_progress = True
+            pending.deadline = now + max(pending.timeout, self.IN_PROGRESS_TIMEOUT)
+            self.commandProgress.emit(pending.command, int(getattr(msg, "progress", 0) or 0))
+            return pending
+        if pending.attempts == 1 and not pending.in_progress:
+            self._record_latency(pending.command, now - pending.first_sent)
+        self._counters["acked"] += 1
+        self._complete(pending, result=msg.result)
+        return pending
+
+    def _match(self, msg):
+        candidates = [p for p in self._in_flight.values() if p.command == msg.command]
+        if len(candidates) > 1:
+            # Mehrere Ziele mit demselben Befehl: nach Absender unterscheiden
+            get_source = getattr(msg, "get_srcSystem", None)
+            source = get_source() if get_source is not None else None
+            candidates = [p for p in candidates if p.target_system == source] or candidates
+        return candidates[0] if candidates else None
+
+    @Slot()
+    def poll(self, now=None):
+        """Timer tick: re-send unanswered commands, time out exhausted ones"""
+        if not self._in_flight:
+            self._timer.stop()
+            return
+        now = self._clock() if now is None else now
+        for pending in list(self._in_flight.values()):
+            if pending.future.cancelled():
+                self._complete(pending)
+            elif now >= pending.deadline:
+                if pending.in_progress or pending.attempts >= pending.retries:
+                    self._counters["timeouts"] += 1
+                    self._complete(pending, error=CommandTimeoutError(
+                        f"No COMMAND_ACK for {command_name(pending.command)} "
+                        f"after {pending.attempts} attempt(s)"))
+                else:
+                    self._transmit(pending, now)
+
+    def _complete(self, pending, result=None, error=None):
+        key = pending.key
+        if self._in_flight.get(key) is pending:
+            del self._in_flight[key]
+        future = pending.future
+        if not future.done():
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+        if result is not None:
+            self.commandFinished.emit(pending.command, result)
+        elif isinstance(error, CommandTimeoutError):
+            self.commandFinished.emit(pending.command, self.TIMEOUT_RESULT)
+        self.statsChanged.emit()
+
+        # Nächsten Befehl mit gleichem Schlüssel senden
+        queue = self._waiting.get(key)
+        while queue:
+            following = queue.popleft()
+            if not following.future.cancelled():
+                self._start(following)
+                break
+        if queue is not None and not queue:
+            self._waiting.pop(key, None)
+
+        if not self._in_flight:
+            self._timer.stop()
+        self.inFlightChanged.emit(len(self._in_flight))
+
+    # --- Statistik -------------------------------------------------------
+
+    def _record_latency(self, command, seconds):
+        for name in (command_name(command), "all"):
+            histogram = self._latency.get(name)
+            if histogram is None:
+                histogram = self._latency[name] = LatencyHistogram()
+            histogram.add(seconds)
+
+    def latency_stats(self):
+        """{command name: summary dict}, "all" over every command"""
+        return {name: histogram.summary() for name, histogram in sorted(self._latency.items())}
+
+    def counters(self):
+        """Sent, retransmitted, acked and timed out commands"""
+        return dict(self._counters)
+
+    @Slot()
+    def resetStats(self):
+        self._latency = {}
+        self._counters = dict.fromkeys(self._counters, 0)
+        self.statsChanged.emit()
+
+    @Property(int, notify=inFlightChanged)
+    def inFlight(self):
+        """Commands waiting for an ack"""
+        return len(self._in_flight)
+
+    @Property('QVariantMap', notify=statsChanged)
+    def latencyStats(self):
+        return self.latency_stats()
+
+    @Property('QVariantMap', notify=statsChanged)
+    def commandCounters(self):
+        return self.counters()
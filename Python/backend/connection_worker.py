@@ -0,0 +1,227 @@
+"""
+Opening MAVLink links off the Qt thread.
+
+Opening a port and waiting for the first HEARTBEAT takes up to several
+seconds, which used to freeze the UI (``wait_heartbeat(timeout=10)`` on the
+Qt thread). The ``ConnectionWorker`` runs these attempts on a thread pool.
+Every attempt returns a ``concurrent.futures.Future`` that can be cancelled,
+reports progress through signals (queued to the Qt thread) and closes the
+connection again unless it is handed over in ``linkOpened``.
+
+``probe_ports`` looks for the vehicle on several ports at once: every port
+is probed on its own thread, the baud rates of one port one after the other
+(a serial port can only be opened once). The first valid heartbeat wins and
+cancels the other probes.
+"""
+
+import threading
+import time
+from concurrent.futures import Future, InvalidStateError, ThreadPoolExecutor
+
+from PySide6.QtCore import QObject, Signal, Slot
+from pymavlink import mavutil
+
+from backend.exceptions import ConnectionTimeoutError
+
+
+def default_connect(port, baud):
+    """Open a pymavlink connection (serial device, or udp:/tcp: URL)"""
+    return mavutil.mavlink_connection(port, baud)
+
+
+def is_vehicle_heartbeat(msg):
+    """True for a HEARTBEAT of a vehicle (not another GCS or a bare component)"""
+    mav = mavutil.mavlink
+    return (getattr(msg, "type", None) != mav.MAV_TYPE_GCS
+            and getattr(msg, "autopilot", None) != mav.MAV_AUTOPILOT_INVALID)
+
+
+class LinkResult:
+    """An opened link: the connection plus where and whom it reached"""
+
+    def __init__(self, connection, port, baud, system_id, component_id):
+        self.connection = connection
+        self.port = port
+        self.baud = baud
+        self.system_id = system_id
+        self.component_id = component_id
+
+    def __repr__(self):
+        return (f"LinkResult(port={self.port!r}, baud={self.baud}, "
+                f"system={self.system_id}, component={self.component_id})")
+
+
+class ConnectionWorker(QObject):
+    """
+    Opens links on worker threads; only one attempt (open or probe) at a time.
+
+    Starting a new attempt cancels the previous one. The future of an
+    attempt resolves to a ``LinkResult``, fails with
+    ``ConnectionTimeoutError`` (no heartbeat) or the error of opening the
+    port, or is cancelled by ``cancel()``.
+
+    Signals (emitted from the worker threads, delivered queued):
+        progress(str): Human readable progress of the attempt
+        linkOpened(object): LinkResult of a successful attempt
+        failed(str): The attempt ended without a link (not emitted on cancel)
+    """
+
+    progress = Signal(str)
+    linkOpened = Signal(object)
+    failed = Signal(str)
+
+    COMMON_BAUD_RATES = (57600, 115200, 921600, 460800, 230400)
+    HEARTBEAT_TIMEOUT = 10.0  # Sekunden beim Verbinden mit bekanntem Port
+    PROBE_TIMEOUT = 2.5  # Sekunden pro Port und Baudrate (Heartbeat kommt mit 1 Hz)
+    WAIT_SLICE = 0.1  # Abbruch wird spätestens nach dieser Zeit bemerkt
+    MAX_WORKERS = 8
+
+    def __init__(self, connect=default_connect, clock=time.monotonic, parent=None):
+        super().__init__(parent)
+        self._connect = connect
+        self._clock = clock
+        self._executor = ThreadPoolExecutor(max_workers=self.MAX_WORKERS,
+                                            thread_name_prefix="ConnectionWorker")
+        self._lock = threading.Lock()
+        self._future = None
+        self._cancel_event = None
+
+    def is_busy(self):
+        """True while an attempt is running"""
+        future = self._future
+        return future is not None and not future.done()
+
+    # --- Versuche ---------------------------------------------------------
+
+    def open_link(self, port, baud, heartbeat_timeout=None):
+        """Open one port at one baud rate and wait for a vehicle heartbeat"""
+        future, cancel_event = self._begin()
+        timeout = self.HEARTBEAT_TIMEOUT if heartbeat_timeout is None else heartbeat_timeout
+
+        def run():
+            try:
+                link = self._open(port, baud, timeout, cancel_event)
+            except Exception as e:
+                self._fail(future, e)
+                return
+            if link is not None:
+                self._succeed(future, link)
+
+        self._executor.submit(run)
+        return future
+
+    def probe_ports(self, ports, baud_rates=None, timeout=None):
+        """Probe all ports in parallel and keep the first one with a vehicle heartbeat"""
+        future, cancel_event = self._begin()
+        ports = list(ports)
+        baud_rates = list(self.COMMON_BAUD_RATES if baud_rates is None else baud_rates)
+        timeout = self.PROBE_TIMEOUT if timeout is None else timeout
+        if not ports:
+            self._fail(future, ConnectionTimeoutError("No ports to probe"))
+            return future
+
+        remaining = [len(ports)]
+        errors = []
+
+        def probe(port):
+            try:
+                for baud in baud_rates:
+                    if cancel_event.is_set():
+                        return
+                    try:
+                        link = self._open(port, baud, timeout, cancel_event)
+                    except Exception as e:
+                        errors.append(f"{port}: {str(e)}")
+                        if not isinstance(e, ConnectionTimeoutError):
+                            return  # Port lässt sich nicht öffnen - andere Baudraten helfen nicht
+                        continue
+                    if link is not None:
+                        # Die übrigen Ports aufgeben
+                        cancel_event.set()
+                        self._succeed(future, link)
+                        return
+            finally:
+                with self._lock:
+                    remaining[0] -= 1
+                    last = remaining[0] == 0
+                if last and not future.done():
+                    self._fail(future, ConnectionTimeoutError(
+                        "No vehicle heartbeat on any port" + (f" ({'; '.join(errors)})" if errors else "")))
+
+        for port in ports:
+            self._executor.submit(probe, port)
+        return future
+
+    @Slot()
+    def cancel(self):
+        """Cancel the running attempt; its connections are closed"""
+        with self._lock:
+            future, cancel_event = self._future, self._cancel_event
+        if cancel_event is not None:
+            cancel_event.set()
+        if future is not None and future.cancel():
+            self.progress.emit("Connection attempt cancelled")
+
+    def shutdown(self):
+        """Cancel and release the worker threads"""
+        self.cancel()
+        self._executor.shutdown(wait=False)
+
+    # --- Intern -----------------------------------------------------------
+
+    def _begin(self):
+        self.cancel()
+        future = Future()
+        cancel_event = threading.Event()
+        # Abbrechen über die Future beendet auch das Warten auf den Heartbeat
+        future.add_done_callback(lambda f: f.cancelled() and cancel_event.set())
+        with self._lock:
+            self._future = future
+            self._cancel_event = cancel_event
+        return future, cancel_event
+
+    def _open(self, port, baud, timeout, cancel_event):
+        """Open a connection and wait for a heartbeat; None when cancelled"""
+        self.progress.emit(f"⌛ Opening {port} at {baud} baud...")
+        connection = self._connect(port, baud)
+        try:
+            deadline = self._clock() + timeout
+            while not cancel_event.is_set():
+                left = deadline - self._clock()
+                if left <= 0:
+                    raise ConnectionTimeoutError(f"No heartbeat on {port} at {baud} baud")
+                msg = connection.recv_match(type='HEARTBEAT', blocking=True,
+                                            timeout=min(self.WAIT_SLICE, left))
+                if msg is not None and is_vehicle_heartbeat(msg):
+                    link = LinkResult(connection, port, baud, msg.get_srcSystem(), msg.get_srcComponent())
+                    self.progress.emit(f"💓 Heartbeat from system {link.system_id} on {port} at {baud} baud")
+                    connection = None  # Gehört jetzt dem Empfänger des Ergebnisses
+                    return link
+            return None
+        finally:
+            if connection is not None:
+                self._close(connection)
+
+    def _succeed(self, future, link):
+        try:
+            future.set_result(link)
+        except InvalidStateError:
+            # Abgebrochen, während der Heartbeat ankam
+            self._close(link.connection)
+            return False
+        self.linkOpened.emit(link)
+        return True
+
+    def _fail(self, future, error):
+        try:
+            future.set_exception(error)
+        except InvalidStateError:
+            return
+        self.failed.emit(str(error))
+
+    @staticmethod
+    def _close(connection):
+        try:
+            connection.close()
+        except Exception:
+            pass
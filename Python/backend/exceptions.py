@@ -29,4 +29,8 @@ class ConnectionTimeoutError(Exception):
 
 class ConnectionError(Exception):
     """Raised when a connection attempt fails."""
-    pass 
\ No newline at end of file
+    pass 
+
+class CommandTimeoutError(Exception):
+    """Raised when a command is not acknowledged in time."""
+    pass
@@ -0,0 +1,201 @@
+"""
+Optional latency instrumentation of the telemetry hot path.
+
+The reader thread stamps every message with the time it was read. Later
+stages record the age of the message when they touch it:
+
+    queue     read -> taken from the ring buffer by process_messages
+    dispatch  read -> all dispatcher handlers finished
+    model     read -> SensorViewModel.update_sensor (includes coalescing delay)
+    signal    read -> attitude/GPS signal emitted to QML
+
+In addition ``logger.addLog`` records the duration of each log call. All
+values go into log-scaled histograms. When the tracer is disabled every
+instrumented call site costs a single attribute check.
+"""
+
+import math
+import time
+
+from PySide6.QtCore import QObject, Signal, Slot, Property, QTimer
+
+
+class LatencyHistogram:
+    """
+    Log-scaled histogram of durations in microseconds.
+
+    Four buckets per power of two (about 19% bucket width) from 1 µs up,
+    which is precise enough for percentiles and needs no preallocation.
+    """
+
+    BUCKETS_PER_OCTAVE = 4
+
+    def __init__(self):
+        self._buckets = {}
+        self._count = 0
+        self._sum = 0.0
+        self._max = 0.0
+
+    @property
+    def count(self):
+        return self._count
+
+    def add(self, seconds):
+        micros = seconds * 1e6
+        index = int(math.log2(micros) * self.BUCKETS_PER_OCTAVE) if micros > 1.0 else 0
+        self._buckets[index] = self._buckets.get(index, 0) + 1
+        self._count += 1
+        self._sum += micros
+        if micros > self._max:
+            self._max = micros
+
+    def _upper_bound(self, index):
+        return 2.0 ** ((index + 1) / self.BUCKETS_PER_OCTAVE)
+
+    def percentile(self, fraction):
+        """Upper bound in µs of the bucket containing the given percentile"""
+        if not self._count:
+            return 0.0
+        rank = fraction * self._count
+        seen = 0
+        for index in sorted(self._buckets):
+            seen += self._buckets[index]
+            if seen >= rank:
+                return min(self._upper_bound(index), self._max)
+        return self._max
+
+    def summary(self):
+        """Dict with count, mean, p50, p90, p99 and max in milliseconds"""
+        if not self._count:
+            return {"count": 0, "mean_ms": 0.0, "p50_ms": 0.0, "p90_ms": 0.0,
+                    "p99_ms": 0.0, "max_ms": 0.0}
+        return {
+            "count": self._count,
+            "mean_ms": round(self._sum / self._count / 1000.0, 3),
+            "p50_ms": round(self.percentile(0.50) / 1000.0, 3),
+            "p90_ms": round(self.percentile(0.90) / 1000.0, 3),
+            "p99_ms": round(self.percentile(0.99) / 1000.0, 3),
+            "max_ms": round(self._max / 1000.0, 3),
+        }
+
+
+class LatencyTracer(QObject):
+    """
+    Collects per-stage latency histograms.
+
+    ``enabled`` is a plain attribute so hot paths can test it cheaply:
+    ``if tracer is not None and tracer.enabled: ...``. Apart from ``stamp``
+    (reader thread, only writes an attribute on the message) all methods are
+    called on the UI thread.
+
+    Signals:
+        statsChanged: The aggregated statistics were updated (at most once per second)
+        enabledChanged: Tracing was switched on or off
+    """
+
+    statsChanged = Signal()
+    enabledChanged = Signal(bool)
+
+    STAGES = ("queue", "dispatch", "model", "signal")
+    STAMP_ATTR = "_rz_read_time"
+    STATS_INTERVAL_MS = 1000
+
+    def __init__(self, enabled=False, parent=None):
+        super().__init__(parent)
+        self.enabled = enabled
+        self._histograms = {}
+        self._current = None  # Lesezeitpunkt der gerade verarbeiteten Nachricht
+        self._dirty = False
+
+        self._stats_timer = QTimer(self)
+        self._stats_timer.setInterval(self.STATS_INTERVAL_MS)
+        self._stats_timer.timeout.connect(self._emit_stats)
+        if enabled:
+            self._stats_timer.start()
+
+    def stamp(self, msg):
+        """Store the read time on the message (reader thread)"""
+        setattr(msg, self.STAMP_ATTR, time.perf_counter())
+
+    @property
+    def current(self):
+        """Read time of the message whose effects are being processed, or None"""
+        return self._current
+
+    def set_current(self, read_time):
+        self._current = read_time
+
+    def begin(self, msg):
+        """A message leaves the ring buffer and is about to be dispatched"""
+        self._current = getattr(msg, self.STAMP_ATTR, None)
+        self.mark("queue")
+
+    def end(self):
+        """All handlers of the current message have run"""
+        self.mark("dispatch")
+        self._current = None
+
+    def mark(self, stage):
+        """Record the age of the current message for a stage"""
+        if self._current is not None:
+            self.record(stage, time.perf_counter() - self._current)
+
+    def record(self, stage, seconds):
+        """Add a duration in seconds to a stage histogram"""
+        histogram = self._histograms.get(stage)
+        if histogram is None:
+            histogram = self._histograms[stage] = LatencyHistogram()
+        histogram.add(seconds)
+        self._dirty = True
+
+    def histogram(self, stage):
+        return self._histograms.get(stage)
+
+    def snapshot(self):
+        """{stage: summary dict}, pipeline stages first"""
+        ordered = [s for s in self.STAGES if s in self._histograms]
+        ordered += sorted(s for s in self._histograms if s not in self.STAGES)
+        return {stage: self._histograms[stage].summary() for stage in ordered}
+
+    def _emit_stats(self):
+        if self._dirty:
+            self._dirty = False
+            self.statsChanged.emit()
+
+    @Slot(bool)
+    def setEnabled(self, enabled):
+        """Switch tracing on or off"""
+        enabled = bool(enabled)
+        if enabled == self.enabled:
+            return
+        self.enabled = enabled
+        self._current = None
+        if enabled:
+            self._stats_timer.start()
+        else:
+            self._stats_timer.stop()
+        self.enabledChanged.emit(enabled)
+
+    @Slot()
+    def reset(self):
+        """Clear all histograms"""
+        self._histograms = {}
+        self._dirty = False
+        self.statsChanged.emit()
+
+    @Slot(result=str)
+    def dump(self):
+        """Human-readable table of all stages"""
+        lines = [f"{'stage':<16}{'count':>8}{'mean':>10}{'p50':>10}{'p90':>10}{'p99':>10}{'max':>10}  (ms)"]
+        for stage, s in self.snapshot().items():
+            lines.append(f"{stage:<16}{s['count']:>8}{s['mean_ms']:>10.3f}{s['p50_ms']:>10.3f}"
+                         f"{s['p90_ms']:>10.3f}{s['p99_ms']:>10.3f}{s['max_ms']:>10.3f}")
+        return "\n".join(lines)
+
+    @Property(bool, notify=enabledChanged)
+    def tracingEnabled(self):
+        return self.enabled
+
+    @Property('QVariantMap', notify=statsChanged)
+    def stats(self):
+        return self.snapshot()
@@ -0,0 +1,343 @@
+"""
+Link health statistics: message rates, bytes per second and packet loss.
+
+The heartbeat timeout only tells whether a link is alive. ``LinkStatistics``
+counts every received frame per msgid and per sender (sysid, compid) and
+derives packet loss from gaps in the 8-bit MAVLink sequence numbers. It is
+fed on the reader thread: by the ``LazyFrameParser`` for every valid frame
+(also the ones that are not decoded) and every frame it rejects, or with
+each message ``recv_match`` returns. An update is a few dict operations, no locking and no Qt call.
+
+``LinkStatsModel`` samples the counters once per second on the Qt thread,
+turns them into rates and exposes them to QML, one row per msgid.
+"""
+
+import bisect
+import time
+
+from PySide6.QtCore import QAbstractListModel, QModelIndex, Qt, QTimer, Signal, Slot, Property
+from pymavlink import mavutil
+
+
+class LinkStatistics:
+    """
+    Receive counters of one link.
+
+    Written by a single thread (the reader); other threads only take
+    copies with ``messages()`` and ``sources()``. A repeated sequence number
+    counts as a duplicate, not as 255 lost packets. Rejected frames (bad CRC,
+    unknown msgid, impossible length) only count in ``bad_frames``; their
+    header fields are garbage.
+    """
+
+    def __init__(self):
+        self._messages = {}  # msgid -> [Anzahl, Bytes]
+        self._sources = {}  # (sysid, compid) -> [empfangen, verloren, letzte seq]
+        self._bad_frames = 0
+
+    @property
+    def bad_frames(self):
+        """Frames the lazy parser rejected"""
+        return self._bad_frames
+
+    def observe_bad_frame(self):
+        self._bad_frames += 1
+
+    def observe_frame(self, msgid, sysid, compid, seq, length):
+        """Count one valid frame of ``length`` bytes"""
+        entry = self._messages.get(msgid)
+        if entry is None:
+            self._messages[msgid] = [1, length]
+        else:
+            entry[0] += 1
+            entry[1] += length
+        key = (sysid, compid)
+        source = self._sources.get(key)
+        if source is None:
+            self._sources[key] = [1, 0, seq]
+            return
+        source[0] += 1
+        gap = (seq - source[2] - 1) & 0xFF
+        if gap != 0xFF:
+            source[1] += gap
+        source[2] = seq
+
+    def observe_message(self, msg):
+        """Count a decoded pymavlink message"""
+        msgid = msg.get_msgId()
+        header = getattr(msg, "_header", None)
+        if msgid < 0 or header is None:
+            # BAD_DATA zählt pymavlink selbst als Empfangsfehler
+            return
+        self.observe_frame(msgid, header.srcSystem, header.srcComponent, header.seq,
+                           len(msg.get_msgbuf()))
+
+    def messages(self):
+        """Copy of {msgid: (frames, bytes)}"""
+        return {msgid: (entry[0], entry[1]) for msgid, entry in dict(self._messages).items()}
+
+    def sources(self):
+        """Copy of {(sysid, compid): (received, lost)}"""
+        return {key: (source[0], source[1]) for key, source in dict(self._sources).items()}
+
+
+class LinkStatsModel(QAbstractListModel):
+    """
+    Per-msgid receive statistics of the current link for QML.
+
+    Rows are sorted by msgid. ``rate`` and ``bytesPerSecond`` cover the last
+    update interval, ``count`` everything since ``attach``. The properties
+    hold the link totals; ``linkUsage`` compares the busier direction with
+    what the baud rate can carry (0 when the link has no baud rate).
+
+    Signals:
+        statsChanged: The statistics were updated
+    """
+
+    MsgIdRole = Qt.UserRole + 1
+    NameRole = Qt.UserRole + 2
+    CountRole = Qt.UserRole + 3
+    RateRole = Qt.UserRole + 4
+    BytesPerSecondRole = Qt.UserRole + 5
+    ShareRole = Qt.UserRole + 6
+
+    statsChanged = Signal()
+
+    UPDATE_INTERVAL_MS = 1000
+    BITS_PER_BYTE = 10  # 8N1: Start- und Stoppbit
+
+    def __init__(self, clock=time.monotonic, parent=None):
+        super().__init__(parent)
+        self._clock = clock
+        self._stats = LinkStatistics()
+        self._transport = None
+        self._mav = None
+        self._baud_rate = None
+        self._msgids = []  # Zeilen, sortiert
+        self._rows = {}  # msgid -> [Anzahl, Bytes, Rate, Bytes/s]
+        self._sources = []
+        self._last_update = clock()
+        self._reset_totals()
+
+        self._timer = QTimer(self)
+        self._timer.setInterval(self.UPDATE_INTERVAL_MS)
+        self._timer.timeout.connect(self.update)
+
+    def _reset_totals(self):
+        self._rx_bytes = 0
+        self._rx_frames = 0
+        self._rx_rate = 0.0
+        self._rx_byte_rate = 0.0
+        self._tx_byte_rate = 0.0
+        self._tx_bytes = self._counter("total_bytes_sent")
+        self._error_base = self._receive_errors()
+        self._crc_errors = 0
+        self._received = 0
+        self._lost = 0
+        self._packet_loss = 0.0
+
+    # --- Modell ----------------------------------------------------------
+
+    def roleNames(self):
+        return {
+            Qt.DisplayRole: b"display",
+            self.MsgIdRole: b"msgid",
+            self.NameRole: b"name",
+            self.CountRole: b"count",
+            self.RateRole: b"rate",
+            self.BytesPerSecondRole: b"bytesPerSecond",
+            self.ShareRole: b"share",
+        }
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._msgids)
+
+    def data(self, index, role=Qt.DisplayRole):
+        row = index.row()
+        if not index.isValid() or row < 0 or row >= len(self._msgids):
+            return None
+        msgid = self._msgids[row]
+        count, _, rate, byte_rate = self._rows[msgid]
+        if role in (Qt.DisplayRole, self.NameRole):
+            return self.message_name(msgid)
+        if role == self.MsgIdRole:
+            return msgid
+        if role == self.CountRole:
+            return count
+        if role == self.RateRole:
+            return rate
+        if role == self.BytesPerSecondRole:
+            return byte_rate
+        if role == self.ShareRole:
+            return byte_rate / self._rx_byte_rate if self._rx_byte_rate else 0.0
+        return None
+
+    def message_name(self, msgid):
+        msgtype = mavutil.mavlink.mavlink_map.get(msgid)
+        return msgtype.msgname if msgtype is not None else f"MSG_{msgid}"
+
+    # --- Verbindung ------------------------------------------------------
+
+    @property
+    def statistics(self):
+        """LinkStatistics of the current link"""
+        return self._stats
+
+    def attach(self, transport, baud_rate=None):
+        """Count the frames of a MAVLinkTransport; starts from zero"""
+        self.detach()
+        self._transport = transport
+        self._mav = getattr(transport.connection, "mav", None)
+        self._baud_rate = baud_rate
+        self._stats = LinkStatistics()
+        transport.set_link_stats(self._stats)
+        self.beginResetModel()
+        self._msgids = []
+        self._rows = {}
+        self.endResetModel()
+        self._sources = []
+        self._reset_totals()
+        self._last_update = self._clock()
+        self._timer.start()
+        self.statsChanged.emit()
+
+    def detach(self):
+        """Stop counting; the last values stay visible with zero rates"""
+        if self._transport is None:
+            return
+        self.update()
+        self._transport.set_link_stats(None)
+        self._transport = None
+        self._timer.stop()
+        for entry in self._rows.values():
+            entry[2] = entry[3] = 0.0
+        if self._msgids:
+            self.dataChanged.emit(self.index(0), self.index(len(self._msgids) - 1))
+        self._rx_rate = self._rx_byte_rate = self._tx_byte_rate = 0.0
+        self._mav = None
+        self.statsChanged.emit()
+
+    def set_baud_rate(self, baud_rate):
+        self._baud_rate = baud_rate
+
+    def _counter(self, name):
+        value = getattr(self._mav, name, None)
+        return value if isinstance(value, int) else 0
+
+    def _receive_errors(self):
+        # recv_match: CRC-Fehler zählt pymavlink, Lazy-Modus: die vom Parser verworfenen Frames
+        return self._counter("total_receive_errors") + self._stats.bad_frames
+
+    # --- Aktualisierung ----------------------------------------------------
+
+    @Slot()
+    def update(self):
+        """Turn the counters into rates (called by the timer)"""
+        now = self._clock()
+        elapsed = now - self._last_update
+        if elapsed <= 0:
+            return
+        self._last_update = now
+
+        rx_frames = rx_bytes = 0
+        for msgid, (count, nbytes) in sorted(self._stats.messages().items()):
+            rx_frames += count
+            rx_bytes += nbytes
+            entry = self._rows.get(msgid)
+            if entry is None:
+                row = bisect.bisect_left(self._msgids, msgid)
+                self.beginInsertRows(QModelIndex(), row, row)
+                self._msgids.insert(row, msgid)
+                self._rows[msgid] = [count, nbytes, count / elapsed, nbytes / elapsed]
+                self.endInsertRows()
+            else:
+                entry[2] = (count - entry[0]) / elapsed
+                entry[3] = (nbytes - entry[1]) / elapsed
+                entry[0] = count
+                entry[1] = nbytes
+        if self._msgids:
+            self.dataChanged.emit(self.index(0), self.index(len(self._msgids) - 1))
+
+        self._rx_rate = (rx_frames - self._rx_frames) / elapsed
+        self._rx_byte_rate = (rx_bytes - self._rx_bytes) / elapsed
+        self._rx_frames = rx_frames
+        self._rx_bytes = rx_bytes
+        tx_bytes = self._counter("total_bytes_sent")
+        self._tx_byte_rate = max(0, tx_bytes - self._tx_bytes) / elapsed
+        self._tx_bytes = tx_bytes
+        self._crc_errors = self._receive_errors() - self._error_base
+
+        received = lost = 0
+        sources = []
+        for (sysid, compid), (src_received, src_lost) in sorted(self._stats.sources().items()):
+            received += src_received
+            lost += src_lost
+            sources.append({"sysid": sysid, "compid": compid, "received": src_received,
+                            "lost": src_lost, "loss": self._percent(src_lost, src_received)})
+        self._sources = sources
+        # Verlust im letzten Intervall, über alle Sender
+        self._packet_loss = self._percent(lost - self._lost, received - self._received)
+        self._received = received
+        self._lost = lost
+        self.statsChanged.emit()
+
+    @staticmethod
+    def _percent(lost, received):
+        total = lost + received
+        return 100.0 * lost / total if total else 0.0
+
+    @Slot()
+    def reset(self):
+        """Restart all counters of the current link"""
+        if self._transport is not None:
+            self.attach(self._transport, self._baud_rate)
+
+    # --- Eigenschaften -------------------------------------------------------
+
+    def link_usage(self):
+        """Share of the baud rate used by the busier direction"""
+        if not self._baud_rate:
+            return 0.0
+        capacity = self._baud_rate / self.BITS_PER_BYTE
+        return max(self._rx_byte_rate, self._tx_byte_rate) / capacity
+
+    @Property(float, notify=statsChanged)
+    def rxMessagesPerSecond(self):
+        return self._rx_rate
+
+    @Property(float, notify=statsChanged)
+    def rxBytesPerSecond(self):
+        return self._rx_byte_rate
+
+    @Property(float, notify=statsChanged)
+    def txBytesPerSecond(self):
+        return self._tx_byte_rate
+
+    @Property(int, notify=statsChanged)
+    def framesReceived(self):
+        return self._rx_frames
+
+    @Property(int, notify=statsChanged)
+    def crcErrors(self):
+        """Frames dropped because of CRC or length errors"""
+        return self._crc_errors
+
+    @Property(int, notify=statsChanged)
+    def packetsLost(self):
+        return self._lost
+
+    @Property(float, notify=statsChanged)
+    def packetLoss(self):
+        """Lost packets in percent over the last update interval"""
+        return self._packet_loss
+
+    @Property(float, notify=statsChanged)
+    def linkUsage(self):
+        return self.link_usage()
+
+    @Property('QVariantList', notify=statsChanged)
+    def sources(self):
+        """Per sender: sysid, compid, received, lost and loss (percent) since attach"""
+        return self._sources
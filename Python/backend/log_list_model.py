@@ -0,0 +1,123 @@
+from PySide6.QtCore import QAbstractListModel, QModelIndex, Qt, Signal, Slot, Property
+
+
+class LogListModel(QAbstractListModel):
+    """
+    Bounded log list exposed incrementally to QML.
+
+    Entries live in a fixed-size circular buffer: appending is O(1), dropping
+    the oldest entries is O(1) per entry and ``data()`` is O(1) for any row.
+    Views are only told about the rows that were actually inserted or
+    removed, so a ListView never re-imports the whole log.
+    """
+
+    EntryRole = Qt.UserRole + 1
+    SystemInfoRole = Qt.UserRole + 2
+
+    countChanged = Signal()
+
+    DEFAULT_CAPACITY = 100000
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, parent=None):
+        super().__init__(parent)
+        if capacity < 1:
+            raise ValueError(f"Invalid log capacity: {capacity}")
+        self._capacity = capacity
+        self._buffer = [None] * capacity  # (entry, is_system_info)
+        self._start = 0
+        self._count = 0
+
+    def roleNames(self):
+        return {
+            Qt.DisplayRole: b"display",
+            self.EntryRole: b"entry",
+            self.SystemInfoRole: b"systemInfo",
+        }
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return self._count
+
+    def data(self, index, role=Qt.DisplayRole):
+        row = index.row()
+        if not index.isValid() or row < 0 or row >= self._count:
+            return None
+        entry, is_system_info = self._buffer[(self._start + row) % self._capacity]
+        if role in (Qt.DisplayRole, self.EntryRole):
+            return entry
+        if role == self.SystemInfoRole:
+            return is_system_info
+        return None
+
+    @property
+    def capacity(self):
+        return self._capacity
+
+    def __len__(self):
+        return self._count
+
+    def entry(self, row):
+        """Text of a row (negative rows count from the end)"""
+        if row < 0:
+            row += self._count
+        if row < 0 or row >= self._count:
+            raise IndexError(row)
+        return self._buffer[(self._start + row) % self._capacity][0]
+
+    def entries(self, last=None):
+        """List of entry texts, oldest first (only the newest ``last`` if given)"""
+        count = self._count if last is None else min(last, self._count)
+        first = self._count - count
+        buffer = self._buffer
+        capacity = self._capacity
+        start = self._start
+        return [buffer[(start + row) % capacity][0] for row in range(first, self._count)]
+
+    def append(self, entry, is_system_info=False):
+        self.append_entries([(entry, is_system_info)])
+
+    def append_entries(self, items):
+        """
+        Append (entry, is_system_info) tuples.
+
+        Signals one rowsRemoved for the evicted oldest rows and one
+        rowsInserted for the new rows.
+        """
+        items = list(items)
+        if not items:
+            return
+        if len(items) > self._capacity:
+            items = items[-self._capacity:]
+
+        overflow = self._count + len(items) - self._capacity
+        if overflow > 0:
+            self.beginRemoveRows(QModelIndex(), 0, overflow - 1)
+            for i in range(overflow):
+                self._buffer[(self._start + i) % self._capacity] = None
+            self._start = (self._start + overflow) % self._capacity
+            self._count -= overflow
+            self.endRemoveRows()
+
+        first = self._count
+        self.beginInsertRows(QModelIndex(), first, first + len(items) - 1)
+        for item in items:
+            self._buffer[(self._start + self._count) % self._capacity] = item
+            self._count += 1
+        self.endInsertRows()
+        self.countChanged.emit()
+
+    @Slot()
+    def clear(self):
+        if not self._count:
+            return
+        self.beginResetModel()
+        self._buffer = [None] * self._capacity
+        self._start = 0
+        self._count = 0
+        self.endResetModel()
+        self.countChanged.emit()
+
+    @Property(int, notify=countChanged)
+    def count(self):
+        return self._count
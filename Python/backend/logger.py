@@ -1,31 +1,179 @@
 import logging
-from PySide6.QtCore import QObject, Signal, Slot, Property
+import os
+import queue
+import sys
+import threading
+from PySide6.QtCore import QObject, Signal, Slot, Property, QTimer
+from collections import deque
 from datetime import datetime
-import re
+import time
+
+from .log_list_model import LogListModel
+from .system_info_classifier import SystemInfoClassifier
+
+
+class LogFileWriter:
+    """
+    Background sink for formatted log lines.
+
+    Lines are handed over in batches and written by a daemon thread, so the
+    UI thread never blocks on disk or console I/O. The file is rotated when it
+    exceeds ``max_bytes``; ``backup_count`` old files are kept (.1, .2, ...).
+    """
+
+    def __init__(self, path=None, max_bytes=5 * 1024 * 1024, backup_count=3, console=True):
+        self._path = path
+        self._max_bytes = max_bytes
+        self._backup_count = backup_count
+        self.console = console
+        self._queue = queue.SimpleQueue()
+        self._stream = None
+        self._lines_written = 0
+        self._thread = None
+        self._thread_lock = threading.Lock()
+
+    @property
+    def path(self):
+        return self._path
+
+    @property
+    def lines_written(self):
+        return self._lines_written
+
+    def write(self, lines):
+        """Queue a batch of lines (any thread)"""
+        if lines:
+            self._ensure_thread()
+            self._queue.put(lines)
+
+    def _ensure_thread(self):
+        # Thread erst beim ersten Schreiben starten
+        if self._thread is None:
+            with self._thread_lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="LogFileWriter", daemon=True)
+                    self._thread.start()
+
+    def flush(self, timeout=2.0):
+        """Wait until everything queued so far has been written"""
+        if self._thread is None or not self._thread.is_alive():
+            return
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait(timeout)
+
+    def close(self, timeout=2.0):
+        """Write the remaining lines and stop the thread"""
+        if self._thread is None or not self._thread.is_alive():
+            return
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            batch = []
+            stop = False
+            events = []
+            # Alles einsammeln, was bereits wartet - ein Schreibvorgang pro Batch
+            while True:
+                if item is None:
+                    stop = True
+                elif isinstance(item, threading.Event):
+                    events.append(item)
+                else:
+                    batch.extend(item)
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            if batch:
+                self._write_batch(batch)
+            for event in events:
+                event.set()
+            if stop:
+                break
+        if self._stream is not None:
+            self._stream.close()
+            self._stream = None
+
+    def _write_batch(self, batch):
+        text = "\n".join(batch) + "\n"
+        if self.console:
+            try:
+                sys.stdout.write(text)
+                sys.stdout.flush()
+            except (OSError, ValueError):
+                pass
+        if self._path:
+            try:
+                if self._stream is None:
+                    directory = os.path.dirname(self._path)
+                    if directory:
+                        os.makedirs(directory, exist_ok=True)
+                    self._stream = open(self._path, "a", encoding="utf-8")
+                self._stream.write(text)
+                self._stream.flush()
+                if self._stream.tell() >= self._max_bytes:
+                    self._rotate()
+            except OSError as e:
+                sys.stderr.write(f"Log file error: {str(e)}\n")
+        self._lines_written += len(batch)
+
+    def _rotate(self):
+        self._stream.close()
+        self._stream = None
+        for i in range(self._backup_count - 1, 0, -1):
+            source = f"{self._path}.{i}"
+            if os.path.exists(source):
+                os.replace(source, f"{self._path}.{i + 1}")
+        if self._backup_count > 0:
+            os.replace(self._path, f"{self._path}.1")
+        else:
+            os.remove(self._path)
+
 
 class Logger(QObject):
-    logAdded = Signal(str)
+    """
+    Application log with QML bindings.
+
+    ``addLog`` only enqueues the message with its time. Formatting, system
+    info matching and list updates happen in batches on the UI thread (a few
+    times per second, or on demand when the logs are read); console and file
+    output is done by a ``LogFileWriter`` thread.
+
+    The entries are kept in two ``LogListModel`` ring buffers (all logs and
+    system info logs) that QML views use directly.
+    """
+
+    logAdded = Signal(str)  # Neuester Eintrag jedes Batches
+    logsAdded = Signal(list)  # Alle Einträge eines Batches
     logsChanged = Signal()
     systemInfoLogsChanged = Signal()
 
-    def __init__(self):
+    FLUSH_INTERVAL_MS = 250  # UI-Benachrichtigungen höchstens 4x pro Sekunde
+
+    def __init__(self, log_file=None, console=True, max_bytes=5 * 1024 * 1024, backup_count=3,
+                 max_logs=LogListModel.DEFAULT_CAPACITY, classifier=None):
         super().__init__()
-        self._logs = []
-        self._system_info_logs = []
-        self._max_logs = 1000  # Maximum number of logs to keep
-        
-        # Patterns für wichtige Systeminformationen
-        self._system_info_patterns = [
-            r"Frame:", 
-            r"RCOut:", 
-            r"MicoAir", 
-            r"ChibiOS:", 
-            r"ArduCopter", 
-            r"PreArm:"
-        ]
-        
+        self._max_logs = max_logs  # Maximum number of logs to keep
+        self._log_model = LogListModel(max_logs, parent=self)
+        self._system_info_model = LogListModel(max_logs, parent=self)
+        self._tracer = None
+        self._pending = deque()  # (time, message) - von beliebigen Threads befüllt
+        self._logs_dirty = False
+        self._system_info_dirty = False
+        self._last_second = None
+        self._last_timestamp = ""
+
+        # Patterns für wichtige Systeminformationen (eine kompilierte Alternation)
+        self._classifier = classifier if classifier is not None else SystemInfoClassifier()
+
+        # Datei- und Konsolenausgabe im Hintergrund
+        self._writer = LogFileWriter(log_file, max_bytes, backup_count, console)
+
         # Debug-Log für Systeminfo-Anzeige
-        self._system_info_logs.append("[SYSTEMINFO] Waiting for FC system information...")
+        self._system_info_model.append("[SYSTEMINFO] Waiting for FC system information...", True)
         print("Logger initialized with system info filter")
 
         # Configure logging
@@ -35,75 +183,165 @@ class Logger(QObject):
             datefmt='%Y-%m-%d %H:%M:%S'
         )
         self.logger = logging.getLogger(__name__)
+
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setInterval(self.FLUSH_INTERVAL_MS)
+        self._flush_timer.timeout.connect(self.flush)
+        self._flush_timer.start()
+
         self.addLog("Logger initialized")
 
     @Property('QVariantList', notify=logsChanged)
     def logs(self):
-        return self._logs
-        
+        """Copy of all entries (prefer logModel in QML)"""
+        self._drain_pending()
+        return self._log_model.entries()
+
     @Property('QVariantList', notify=systemInfoLogsChanged)
     def system_info_logs(self):
-        return self._system_info_logs
+        """Copy of the system info entries (prefer systemInfoModel in QML)"""
+        self._drain_pending()
+        return self._system_info_model.entries()
+
+    @Property(QObject, constant=True)
+    def logModel(self):
+        """Incremental list model of all log entries"""
+        self._drain_pending()
+        return self._log_model
+
+    @Property(QObject, constant=True)
+    def systemInfoModel(self):
+        """Incremental list model of the system info entries"""
+        self._drain_pending()
+        return self._system_info_model
+
+    @property
+    def writer(self):
+        return self._writer
+
+    @property
+    def classifier(self):
+        return self._classifier
+
+    @Slot('QVariantMap')
+    def setSystemInfoPatterns(self, categories):
+        """Replace the system info patterns: {category: [substring, ...]}"""
+        try:
+            self._classifier.set_categories(categories)
+        except (ValueError, TypeError) as e:
+            self.addLog(f"❌ Invalid system info patterns: {str(e)}")
+
+    def set_latency_tracer(self, tracer):
+        """Record the duration of addLog calls in a LatencyTracer (None disables)"""
+        self._tracer = tracer
+
+    @Slot(bool)
+    def setConsoleOutput(self, enabled):
+        """Switch printing of log entries to the console on or off"""
+        self._writer.console = bool(enabled)
 
     @Slot(str)
     def addLog(self, message):
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        log_entry = f"[{timestamp}] {message}"
-        print(log_entry)  # Print to console
-        
-        # Add to logs list
-        self._logs.append(log_entry)
-        
-        # Check if this is a system info log we're interested in
-        is_system_info = False
-        for pattern in self._system_info_patterns:
-            if re.search(pattern, message):
-                is_system_info = True
-                print(f"SYSTEMINFO LOG MATCHED: {pattern} in {message}")
-                break
-                
-        if is_system_info:
-            self._system_info_logs.append(log_entry)
-            print(f"Added system info log, count: {len(self._system_info_logs)}")
+        """Enqueue a log message (cheap, callable from any thread)"""
+        tracer = self._tracer
+        if tracer is not None and tracer.enabled:
+            started = time.perf_counter()
+            self._pending.append((time.time(), message))
+            tracer.record("logger.addLog", time.perf_counter() - started)
+        else:
+            self._pending.append((time.time(), message))
+
+    def _format_time(self, timestamp):
+        # strftime nur einmal pro Sekunde
+        second = int(timestamp)
+        if second != self._last_second:
+            self._last_second = second
+            self._last_timestamp = datetime.fromtimestamp(second).strftime("%Y-%m-%d %H:%M:%S")
+        return self._last_timestamp
+
+    def _drain_pending(self):
+        """Move queued messages into the log lists. Returns the new entries."""
+        pending = self._pending
+        if not pending:
+            return []
+        entries = []
+        items = []
+        system_info = []
+        popleft = pending.popleft
+        classify = self._classifier.classify
+        for _ in range(len(pending)):
+            timestamp, message = popleft()
+            log_entry = f"[{self._format_time(timestamp)}] {message}"
+            entries.append(log_entry)
+            # Check if this is a system info log we're interested in
+            is_system_info = classify(message) is not None
+            items.append((log_entry, is_system_info))
+            if is_system_info:
+                system_info.append((log_entry, True))
+
+        # Ringpuffer verwerfen die ältesten Einträge selbst (max_logs)
+        self._log_model.append_entries(items)
+        self._logs_dirty = True
+        if system_info:
+            self._system_info_model.append_entries(system_info)
+            self._system_info_dirty = True
+
+        self._writer.write(entries)
+        return entries
+
+    @Slot()
+    def flush(self):
+        """Process queued messages and emit the coalesced change signals"""
+        entries = self._drain_pending()
+        if entries:
+            self.logsAdded.emit(entries)
+            self.logAdded.emit(entries[-1])
+        if self._logs_dirty:
+            self._logs_dirty = False
+            self.logsChanged.emit()
+        if self._system_info_dirty:
+            self._system_info_dirty = False
             self.systemInfoLogsChanged.emit()
-        
-        # Keep only the last max_logs entries
-        if len(self._logs) > self._max_logs:
-            self._logs = self._logs[-self._max_logs:]
-            
-        if len(self._system_info_logs) > self._max_logs:
-            self._system_info_logs = self._system_info_logs[-self._max_logs:]
-        
-        # Emit signals
-        self.logAdded.emit(log_entry)
-        self.logsChanged.emit()
+
+    @Slot()
+    def close(self):
+        """Flush everything and stop the background writer"""
+        self._flush_timer.stop()
+        self.flush()
+        self._writer.close()
 
     @Slot(result=str)
     def getLogs(self):
-        return "\n".join(self._logs)
+        self._drain_pending()
+        return "\n".join(self._log_model.entries())
 
     @Slot()
     def clear(self):
-        self._logs = []
-        self._system_info_logs = []
+        self._drain_pending()
+        self._log_model.clear()
+        self._system_info_model.clear()
+        self._logs_dirty = False
+        self._system_info_dirty = False
         self.logsChanged.emit()
         self.systemInfoLogsChanged.emit()
         self.addLog("Logs cleared")
-        
+
     @Slot(result='QVariantList')
     def getSystemInfoLogs(self):
         """Gibt nur die Logs zurück, die Systeminformationen enthalten"""
+        self._drain_pending()
         # Wenn keine Systeminformationen vorhanden sind, geben wir einen Hinweis zurück
-        if not self._system_info_logs:
+        if not len(self._system_info_model):
             return ["Waiting for FC system information..."]
-        return self._system_info_logs
-        
+        return self._system_info_model.entries()
+
     @Slot(str)
     def addSystemInfoLog(self, message):
         """Fügt manuell ein System-Info Log hinzu (für Tests)"""
+        self._drain_pending()
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         log_entry = f"[{timestamp}] [SYSTEM INFO] {message}"
-        self._system_info_logs.append(log_entry)
-        print(f"Manually added system info log: {log_entry}")
-        self.systemInfoLogsChanged.emit()
+        self._system_info_model.append(log_entry, True)
+        self._system_info_dirty = True
+        self._writer.write([log_entry])
         return True
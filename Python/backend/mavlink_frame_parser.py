@@ -0,0 +1,212 @@
+"""
+Header-only MAVLink framing with on-demand payload decoding.
+
+pymavlink's ``recv_match`` turns every frame into a Python message object,
+including high-rate types nobody listens for. ``LazyFrameParser`` splits the
+byte stream into frames using only the header (marker, length, flags,
+msgid) and hands a frame to ``mav.decode`` only if the decode filter wants
+that msgid. A skipped frame is still checked (known msgid, length, CRC
+with crc_extra, as pymavlink does when decoding) so that noise on the link
+cannot swallow the real frames behind it; then it is merely counted.
+"""
+
+import sys
+
+from pymavlink import mavutil
+from pymavlink.generator.mavcrc import x25crc
+
+mavlink = mavutil.mavlink
+
+
+class LazyFrameParser:
+    """
+    Splits a MAVLink byte stream into frames and decodes only wanted msgids.
+
+    ``decode_filter`` is a callable ``(msgid) -> bool``; None decodes every
+    frame. HEARTBEAT is always decoded because the connection state (target
+    system, flight mode) depends on it.
+    """
+
+    ALWAYS_DECODE = frozenset({mavlink.MAVLINK_MSG_ID_HEARTBEAT})
+    MAX_BUFFER = 65536  # Bytes - Schutz gegen endlosen Datenmüll ohne Marker
+
+    def __init__(self, mav, decode_filter=None):
+        self._mav = mav
+        # Nachrichtentabelle des Dialekts der Verbindung (nicht des mavutil-Standards)
+        dialect = sys.modules.get(type(mav).__module__, mavlink)
+        self._mavlink_map = getattr(dialect, 'mavlink_map', mavlink.mavlink_map)
+        self._decode_filter = decode_filter
+        self._frame_observer = None
+        self._bad_frame_observer = None
+        self._frame_tap = None
+        self._buf = bytearray()
+        self._frames = 0
+        self._decoded = 0
+        self._skipped_decodes = 0
+        self._bad_frames = 0
+        self._skipped_by_id = {}
+
+    @property
+    def frames(self):
+        """Number of complete frames seen"""
+        return self._frames
+
+    @property
+    def decoded(self):
+        return self._decoded
+
+    @property
+    def skipped_decodes(self):
+        """Number of frames whose payload was not decoded"""
+        return self._skipped_decodes
+
+    @property
+    def bad_frames(self):
+        """Frames dropped because of CRC or length errors"""
+        return self._bad_frames
+
+    @property
+    def skipped_by_id(self):
+        """Copy of {msgid: skipped count}"""
+        return dict(self._skipped_by_id)
+
+    def set_decode_filter(self, decode_filter):
+        """Set the ``(msgid) -> bool`` filter (None decodes everything)"""
+        self._decode_filter = decode_filter
+
+    def set_frame_observer(self, observer, bad_frame_observer=None):
+        """
+        Call ``observer(msgid, sysid, compid, seq, length)`` for every valid
+        frame, decoded or not, and ``bad_frame_observer()`` for every rejected
+        one (None disables). Used for link statistics.
+        """
+        self._frame_observer = observer
+        self._bad_frame_observer = bad_frame_observer
+
+    def set_frame_tap(self, tap):
+        """Call ``tap(frame, None)`` with the bytes of every valid frame (None disables)"""
+        self._frame_tap = tap
+
+    def reset_counters(self):
+        self._frames = 0
+        self._decoded = 0
+        self._skipped_decodes = 0
+        self._bad_frames = 0
+        self._skipped_by_id = {}
+
+    def reset(self):
+        """Drop partially received data"""
+        self._buf = bytearray()
+
+    def _wants(self, msgid):
+        if self._decode_filter is None or msgid in self.ALWAYS_DECODE:
+            return True
+        return self._decode_filter(msgid)
+
+    def feed(self, data):
+        """Append received bytes and return the list of decoded messages"""
+        buf = self._buf
+        if data:
+            buf += data
+        messages = []
+        observer = self._frame_observer
+        tap = self._frame_tap
+        pos = 0
+        end = len(buf)
+
+        while pos < end:
+            magic = buf[pos]
+            if magic == mavlink.PROTOCOL_MARKER_V2:
+                if end - pos < mavlink.HEADER_LEN_V2:
+                    break
+                mlen = buf[pos + 1]
+                header_len = mavlink.HEADER_LEN_V2
+                signature_len = (mavlink.MAVLINK_SIGNATURE_BLOCK_LEN
+                                 if buf[pos + 2] & mavlink.MAVLINK_IFLAG_SIGNED else 0)
+                msgid = buf[pos + 7] | (buf[pos + 8] << 8) | (buf[pos + 9] << 16)
+                seq_at = pos + 4
+            elif magic == mavlink.PROTOCOL_MARKER_V1:
+                if end - pos < mavlink.HEADER_LEN_V1:
+                    break
+                mlen = buf[pos + 1]
+                header_len = mavlink.HEADER_LEN_V1
+                signature_len = 0
+                msgid = buf[pos + 5]
+                seq_at = pos + 2
+            else:
+                # Kein Frame-Anfang - bis zum nächsten Marker vorspulen
+                pos = self._next_marker(buf, pos + 1, end)
+                continue
+
+            frame_len = header_len + mlen + 2 + signature_len
+            if end - pos < frame_len:
+                break
+
+            msgtype = self._mavlink_map.get(msgid)
+            if msgtype is None:
+                # Unbekannte msgid: eher Datenmüll als ein fremder Dialekt
+                self._reject()
+                pos += 1
+                continue
+
+            if self._wants(msgid):
+                msg = self._decode(buf[pos:pos + frame_len])
+                if msg is None:
+                    # Ungültiger Frame - ab dem nächsten Byte neu synchronisieren
+                    self._reject()
+                    pos += 1
+                    continue
+                self._decoded += 1
+                messages.append(msg)
+            else:
+                if (mlen > msgtype.unpacker.size
+                        or not self._crc_ok(buf, pos, header_len + mlen, msgtype.crc_extra)):
+                    # Länge oder Prüfsumme passt nicht zum Nachrichtentyp - Datenmüll
+                    self._reject()
+                    pos += 1
+                    continue
+                self._skipped_decodes += 1
+                self._skipped_by_id[msgid] = self._skipped_by_id.get(msgid, 0) + 1
+            self._frames += 1
+            if observer is not None:
+                # Auf seq folgen sysid und compid
+                observer(msgid, buf[seq_at + 1], buf[seq_at + 2], buf[seq_at], frame_len)
+            if tap is not None:
+                tap(bytes(buf[pos:pos + frame_len]), None)
+            pos += frame_len
+
+        if pos:
+            del buf[:pos]
+        if len(buf) > self.MAX_BUFFER:
+            del buf[:-self.MAX_BUFFER]
+        return messages
+
+    @staticmethod
+    def _next_marker(buf, start, end):
+        """Index of the next v1/v2 start marker at or after ``start``"""
+        v2 = buf.find(mavlink.PROTOCOL_MARKER_V2, start, end)
+        v1 = buf.find(mavlink.PROTOCOL_MARKER_V1, start, end)
+        if v2 < 0 and v1 < 0:
+            return end
+        if v2 < 0 or (0 <= v1 < v2):
+            return v1
+        return v2
+
+    def _reject(self):
+        self._bad_frames += 1
+        if self._bad_frame_observer is not None:
+            self._bad_frame_observer()
+
+    @staticmethod
+    def _crc_ok(buf, pos, crc_at, crc_extra):
+        """X.25 checksum over header (without marker) and payload plus crc_extra"""
+        crc = x25crc(bytes(buf[pos + 1:pos + crc_at]))
+        crc.accumulate(bytes((crc_extra,)))
+        return crc.crc == buf[pos + crc_at] | (buf[pos + crc_at + 1] << 8)
+
+    def _decode(self, frame):
+        try:
+            return self._mav.decode(frame)
+        except Exception:
+            # MAVError des jeweiligen Dialekts oder struct-Fehler
+            return None
@@ -7,8 +7,12 @@ import time
 from typing import Optional, Dict, Any
 from pymavlink import mavutil
 from pymavlink.dialects.v20 import ardupilotmega as mavlink
+from concurrent.futures import Future
 from PySide6.QtCore import QObject, Signal, QTimer
 
+from backend.mavlink_transport import MAVLinkTransport
+from backend.connection_worker import ConnectionWorker
+
 class MAVLinkProtocol(QObject):
     """
     Handles low-level MAVLink communication.
@@ -29,6 +33,8 @@ class MAVLinkProtocol(QObject):
     def __init__(self):
         super().__init__()
         self.connection = None
+        self.transport = None  # Einziger Leser der Verbindung
+        self._inbox = None  # Nachrichten für receive_message()
         self._system_id = None
         self._component_id = None
         self._last_heartbeat = 0
@@ -37,6 +43,9 @@ class MAVLinkProtocol(QObject):
         self._heartbeat_timer = QTimer()
         self._heartbeat_timer.timeout.connect(self._check_heartbeat)
         self._heartbeat_timer.start(1000)  # Check every second
+        self._connection_worker = ConnectionWorker(connect=self._open_connection, parent=self)
+        self._connection_worker.linkOpened.connect(self._on_link_opened)
+        self._connection_worker.failed.connect(self._on_link_failed)
         self.debug = False
         
     def _log_info(self, message: str) -> None:
@@ -77,50 +86,60 @@ class MAVLinkProtocol(QObject):
             self._log_error("Maximum reconnection attempts reached")
             self._update_connection_state("error")
             
-    def connect_to_port(self, port: str, baudrate: int) -> bool:
+    def connect_to_port(self, port: str, baudrate: int) -> Future:
         """
         Connects to a serial port.
+
+        Opening the port and waiting for the heartbeat run on the
+        ConnectionWorker; the state changes to "connected" or "error" when
+        the attempt ends.
         
         Args:
             port: Serial port name
             baudrate: Baud rate
             
         Returns:
-            bool: True if connection was successful
+            Future: Resolves to the LinkResult, cancel it to abort
         """
-        try:
-            self._update_connection_state("connecting")
-            
-            # Create MAVLink connection
-            self.connection = mavutil.mavlink_connection(
-                port,
-                baud=baudrate,
-                source_system=255,  # GCS System ID
-                source_component=1,  # GCS Component ID
-                dialect='ardupilotmega'
-            )
-            
-            # Wait for heartbeat
-            self._log_info("Waiting for heartbeat...")
-            msg = self.connection.recv_match(type='HEARTBEAT', blocking=True, timeout=self.HEARTBEAT_TIMEOUT)
-            
-            if msg:
-                self._system_id = msg.get_srcSystem()
-                self._component_id = msg.get_srcComponent()
-                self._last_heartbeat = time.time()
-                self._log_info(f"Connected to system {self._system_id}, component {self._component_id}")
-                self._update_connection_state("connected")
-                self._reconnect_attempts = 0
-                return True
-            else:
-                self._log_error("No heartbeat received")
-                self._update_connection_state("error")
-                return False
-                
-        except Exception as e:
-            self._log_error(f"Connection error: {str(e)}")
-            self._update_connection_state("error")
-            return False
+        self._update_connection_state("connecting")
+        self._log_info("Waiting for heartbeat...")
+        return self._connection_worker.open_link(port, baudrate, heartbeat_timeout=self.HEARTBEAT_TIMEOUT)
+
+    def cancel_connect(self) -> None:
+        """Aborts a running connect_to_port()"""
+        self._connection_worker.cancel()
+        if self._connection_state == "connecting":
+            self._update_connection_state("disconnected")
+
+    @staticmethod
+    def _open_connection(port: str, baudrate: int):
+        return mavutil.mavlink_connection(
+            port,
+            baud=baudrate,
+            source_system=255,  # GCS System ID
+            source_component=1,  # GCS Component ID
+            dialect='ardupilotmega'
+        )
+
+    def _on_link_opened(self, link) -> None:
+        if self._connection_state != "connecting":
+            # Inzwischen abgebrochen
+            link.connection.close()
+            return
+        self.connection = link.connection
+        self._attach_transport()
+        self._system_id = link.system_id
+        self._component_id = link.component_id
+        self._last_heartbeat = time.time()
+        self._log_info(f"Connected to system {self._system_id}, component {self._component_id}")
+        self._update_connection_state("connected")
+        self._reconnect_attempts = 0
+
+    def _on_link_failed(self, message: str) -> None:
+        if self._connection_state != "connecting":
+            return
+        self._log_error(f"Connection error: {message}")
+        self._update_connection_state("error")
             
     def send_message(self, message: mavlink.MAVLink_message) -> bool:
         """
@@ -142,9 +161,24 @@ class MAVLinkProtocol(QObject):
             self._log_error(f"Error sending message: {str(e)}")
             return False
             
+    def _attach_transport(self) -> None:
+        """Creates the transport that reads the connection for all consumers"""
+        self.transport = MAVLinkTransport(self.connection, threaded=False, parent=self)
+        self.transport.add_listener(self._on_message)
+        self.transport.errorOccurred.connect(self._log_error)
+        self._inbox = self.transport.subscription()
+
+    def _on_message(self, msg) -> None:
+        if msg.get_type() == 'HEARTBEAT':
+            self._last_heartbeat = time.time()
+        self.message_received.emit(msg)
+
     def receive_message(self) -> Optional[mavlink.MAVLink_message]:
         """
         Receives a MAVLink message.
+
+        Reads through the transport, so other consumers registered at
+        ``self.transport`` see the same messages.
         
         Returns:
             Optional[mavlink.MAVLink_message]: Received message or None
@@ -153,12 +187,11 @@ class MAVLinkProtocol(QObject):
             return None
             
         try:
-            msg = self.connection.recv_match(blocking=False)
-            if msg:
-                if msg.get_type() == 'HEARTBEAT':
-                    self._last_heartbeat = time.time()
-                self.message_received.emit(msg)
-            return msg
+            if self.transport is None or self.transport.connection is not self.connection:
+                self._attach_transport()
+            if not self._inbox:
+                self.transport.poll()
+            return self._inbox.get_nowait()
         except Exception as e:
             self._log_error(f"Error receiving message: {str(e)}")
             return None
@@ -193,6 +226,12 @@ class MAVLinkProtocol(QObject):
     def close(self) -> None:
         """Closes the connection"""
         try:
+            self._connection_worker.cancel()
+            if self.transport is not None:
+                self.transport.stop()
+                self._inbox.close()
+                self.transport = None
+                self._inbox = None
             if self.connection:
                 self.connection.close()
             self._heartbeat_timer.stop()
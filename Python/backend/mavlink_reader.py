@@ -0,0 +1,418 @@
+"""
+Background reader for MAVLink connections.
+
+The reader thread owns ``recv_match`` on the pymavlink connection, pushes the
+decoded messages into a bounded ring buffer and wakes the Qt side with a
+queued signal. The UI thread only drains the buffer and dispatches.
+"""
+
+import threading
+import time
+from collections import deque
+
+from PySide6.QtCore import QObject, Signal, Slot, Property
+
+from backend.mavlink_frame_parser import LazyFrameParser
+
+
+class MessageRingBuffer:
+    """
+    Bounded FIFO between the reader thread and the UI thread.
+
+    Overflow policies:
+        drop_oldest: discard the oldest queued message (default, keeps data fresh)
+        drop_newest: discard the incoming message
+        block:       wait up to ``block_timeout`` seconds for space, then drop the incoming message
+    """
+
+    DROP_OLDEST = "drop_oldest"
+    DROP_NEWEST = "drop_newest"
+    BLOCK = "block"
+    POLICIES = (DROP_OLDEST, DROP_NEWEST, BLOCK)
+
+    def __init__(self, capacity=1024, overflow_policy=DROP_OLDEST, block_timeout=0.1):
+        if capacity < 1:
+            raise ValueError(f"Invalid ring buffer capacity: {capacity}")
+        if overflow_policy not in self.POLICIES:
+            raise ValueError(f"Unknown overflow policy: {overflow_policy}")
+        self._capacity = capacity
+        self._policy = overflow_policy
+        self._block_timeout = block_timeout
+        self._items = deque()
+        self._lock = threading.Lock()
+        self._not_full = threading.Condition(self._lock)
+        self._dropped = 0
+        self._high_water = 0
+        self._total_put = 0
+
+    @property
+    def capacity(self):
+        return self._capacity
+
+    @property
+    def overflow_policy(self):
+        return self._policy
+
+    @overflow_policy.setter
+    def overflow_policy(self, policy):
+        if policy not in self.POLICIES:
+            raise ValueError(f"Unknown overflow policy: {policy}")
+        with self._lock:
+            self._policy = policy
+            self._not_full.notify_all()
+
+    @property
+    def depth(self):
+        return len(self._items)
+
+    @property
+    def dropped(self):
+        return self._dropped
+
+    @property
+    def high_water(self):
+        return self._high_water
+
+    @property
+    def total_put(self):
+        return self._total_put
+
+    def put(self, item):
+        """Append an item. Returns False if the item (or an older one) was dropped."""
+        with self._lock:
+            accepted = True
+            if len(self._items) >= self._capacity:
+                if self._policy == self.DROP_OLDEST:
+                    self._items.popleft()
+                    self._dropped += 1
+                    accepted = False
+                elif self._policy == self.DROP_NEWEST:
+                    self._dropped += 1
+                    return False
+                else:
+                    deadline = time.monotonic() + self._block_timeout
+                    while len(self._items) >= self._capacity:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0 or self._policy != self.BLOCK:
+                            break
+                        self._not_full.wait(remaining)
+                    if len(self._items) >= self._capacity:
+                        self._dropped += 1
+                        return False
+            self._items.append(item)
+            self._total_put += 1
+            if len(self._items) > self._high_water:
+                self._high_water = len(self._items)
+            return accepted
+
+    def get_batch(self, max_items=None):
+        """Remove and return up to ``max_items`` queued items (all if None)."""
+        with self._lock:
+            count = len(self._items)
+            if max_items is not None and max_items < count:
+                count = max_items
+            popleft = self._items.popleft
+            batch = [popleft() for _ in range(count)]
+            if batch:
+                self._not_full.notify_all()
+            return batch
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self._not_full.notify_all()
+
+    def reset_counters(self):
+        with self._lock:
+            self._dropped = 0
+            self._high_water = len(self._items)
+            self._total_put = 0
+
+
+def tap_message(tap, msg):
+    """Hand the raw bytes of a decoded message to a frame tap"""
+    frame = msg.get_msgbuf()
+    if frame:
+        tap(frame, getattr(msg, "_timestamp", None))
+
+
+class MAVLinkReader(QObject):
+    """
+    Reads MAVLink messages on a dedicated thread.
+
+    The thread calls ``recv_match`` in a blocking loop and stores the messages
+    in a ``MessageRingBuffer``. ``messagesAvailable`` is emitted only when the
+    buffer goes from drained to non-empty, so the Qt event queue never holds
+    more than one pending wake-up regardless of the message rate.
+
+    With lazy decoding enabled the thread reads raw bytes instead and a
+    ``LazyFrameParser`` decodes only the msgids accepted by the decode filter
+    (typically the msgids with at least one dispatcher subscriber).
+
+    Signals:
+        messagesAvailable: Messages are waiting in the buffer (queued to the UI thread)
+        statsChanged: Queue depth or drop counters changed
+        errorOccurred: The reader thread hit an error while reading
+    """
+
+    messagesAvailable = Signal()
+    statsChanged = Signal()
+    errorOccurred = Signal(str)
+
+    DEFAULT_CAPACITY = 4096
+    DEFAULT_BATCH_SIZE = 500
+    READ_TIMEOUT = 0.1  # Sekunden - bestimmt, wie schnell stop() greift
+    STATS_INTERVAL = 0.5  # Sekunden zwischen statsChanged-Meldungen
+    LAZY_READ_SIZE = 4096  # Bytes pro recv() im Lazy-Modus
+
+    def __init__(self, connection, capacity=DEFAULT_CAPACITY,
+                 overflow_policy=MessageRingBuffer.DROP_OLDEST, parent=None,
+                 lazy_decoding=False, decode_filter=None):
+        super().__init__(parent)
+        self._connection = connection
+        self._buffer = MessageRingBuffer(capacity, overflow_policy)
+        self._lazy_decoding = lazy_decoding
+        self._parser = LazyFrameParser(getattr(connection, 'mav', None), decode_filter)
+        self._tracer = None
+        self._link_stats = None
+        self._frame_tap = None
+        self._thread = None
+        self._stop_event = threading.Event()
+        self._wakeup_lock = threading.Lock()
+        self._wakeup_pending = False
+        self._messages_read = 0
+        self._read_errors = 0
+        self._last_stats_emit = 0.0
+
+    @property
+    def buffer(self):
+        return self._buffer
+
+    @property
+    def connection(self):
+        return self._connection
+
+    @property
+    def parser(self):
+        return self._parser
+
+    def set_decode_filter(self, decode_filter):
+        """Set the ``(msgid) -> bool`` filter used in lazy decoding mode"""
+        self._parser.set_decode_filter(decode_filter)
+
+    def set_latency_tracer(self, tracer):
+        """Stamp messages with their read time for a LatencyTracer (None disables)"""
+        self._tracer = tracer
+
+    def set_link_stats(self, stats):
+        """Count every frame read in a LinkStatistics (None disables)"""
+        self._link_stats = stats
+        if stats is not None:
+            self._parser.set_frame_observer(stats.observe_frame, stats.observe_bad_frame)
+        else:
+            self._parser.set_frame_observer(None)
+
+    def set_frame_tap(self, tap):
+        """
+        Call ``tap(frame, timestamp)`` with the raw bytes of every valid frame
+        (None disables). Runs on the reader thread before the ring buffer, so
+        neither the decode filter nor the overflow policy hides frames;
+        ``timestamp`` is None when the frame was not decoded.
+        """
+        self._frame_tap = tap
+        self._parser.set_frame_tap(tap)
+
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Start the reader thread"""
+        if self.is_running():
+            return True
+        if self._connection is None:
+            self.errorOccurred.emit("❌ No MAVLink connection available")
+            return False
+        if self._lazy_decoding and getattr(self._connection, 'mav', None) is None:
+            self.errorOccurred.emit("❌ Lazy decoding needs a pymavlink connection")
+            return False
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="MAVLinkReader", daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self, timeout=1.0):
+        """Stop the reader thread and wait for it to finish"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        self._buffer.clear()
+        with self._wakeup_lock:
+            self._wakeup_pending = False
+
+    def _read_one(self):
+        """Read a single message from the connection (runs on the reader thread)"""
+        return self._connection.recv_match(blocking=True, timeout=self.READ_TIMEOUT)
+
+    def _read_lazy(self):
+        """Read raw bytes and decode only the wanted frames (runs on the reader thread)"""
+        connection = self._connection
+        if not connection.select(self.READ_TIMEOUT):
+            return []
+        data = connection.recv(self.LAZY_READ_SIZE)
+        if not data:
+            return []
+        messages = self._parser.feed(data)
+        post_message = getattr(connection, 'post_message', None)
+        if post_message is not None:
+            # Verbindungsstatus (messages, Sequenzen) wie bei recv_match pflegen
+            for msg in messages:
+                post_message(msg)
+        return messages
+
+    def _run(self):
+        """Reader thread main loop"""
+        while not self._stop_event.is_set():
+            if self._lazy_decoding:
+                self._run_lazy_step()
+                continue
+            try:
+                msg = self._read_one()
+            except Exception as e:
+                self._read_errors += 1
+                if self._stop_event.is_set():
+                    break
+                self.errorOccurred.emit(f"❌ Error reading MAVLink data: {str(e)}")
+                time.sleep(self.READ_TIMEOUT)
+                continue
+            if msg is None:
+                continue
+            tracer = self._tracer
+            if tracer is not None and tracer.enabled:
+                tracer.stamp(msg)
+            stats = self._link_stats
+            if stats is not None:
+                stats.observe_message(msg)
+            tap = self._frame_tap
+            if tap is not None:
+                tap_message(tap, msg)
+            self._messages_read += 1
+            self._buffer.put(msg)
+            self._notify()
+
+    def _run_lazy_step(self):
+        try:
+            messages = self._read_lazy()
+        except Exception as e:
+            self._read_errors += 1
+            if self._stop_event.is_set():
+                return
+            self.errorOccurred.emit(f"❌ Error reading MAVLink data: {str(e)}")
+            time.sleep(self.READ_TIMEOUT)
+            return
+        if not messages:
+            return
+        tracer = self._tracer
+        if tracer is not None and tracer.enabled:
+            for msg in messages:
+                tracer.stamp(msg)
+        self._messages_read += len(messages)
+        for msg in messages:
+            self._buffer.put(msg)
+        self._notify()
+
+    def _notify(self):
+        """Emit messagesAvailable once per drain cycle"""
+        with self._wakeup_lock:
+            if self._wakeup_pending:
+                return
+            self._wakeup_pending = True
+        self.messagesAvailable.emit()
+
+    def take_messages(self, max_items=DEFAULT_BATCH_SIZE):
+        """
+        Drain up to ``max_items`` messages (UI thread).
+
+        The wake-up flag is re-armed only when the buffer is empty afterwards,
+        so a caller that leaves messages behind must call again.
+        """
+        with self._wakeup_lock:
+            batch = self._buffer.get_batch(max_items)
+            if self._buffer.depth == 0:
+                self._wakeup_pending = False
+
+        now = time.monotonic()
+        if now - self._last_stats_emit >= self.STATS_INTERVAL:
+            self._last_stats_emit = now
+            self.statsChanged.emit()
+        return batch
+
+    def has_pending(self):
+        return self._buffer.depth > 0
+
+    @Slot(str)
+    def setOverflowPolicy(self, policy):
+        """Change the overflow policy (drop_oldest, drop_newest, block)"""
+        self._buffer.overflow_policy = policy
+        self.statsChanged.emit()
+
+    @Slot(bool)
+    def setLazyDecoding(self, enabled):
+        """Switch between recv_match (full decode) and header-only framing"""
+        if enabled == self._lazy_decoding:
+            return
+        if enabled and getattr(self._connection, 'mav', None) is None:
+            self.errorOccurred.emit("❌ Lazy decoding needs a pymavlink connection")
+            return
+        self._parser.reset()
+        self._lazy_decoding = enabled
+        self.statsChanged.emit()
+
+    @Slot()
+    def resetCounters(self):
+        self._buffer.reset_counters()
+        self._parser.reset_counters()
+        self._messages_read = 0
+        self._read_errors = 0
+        self.statsChanged.emit()
+
+    @Property(int, notify=statsChanged)
+    def queueDepth(self):
+        return self._buffer.depth
+
+    @Property(int, notify=statsChanged)
+    def queueCapacity(self):
+        return self._buffer.capacity
+
+    @Property(int, notify=statsChanged)
+    def highWaterMark(self):
+        return self._buffer.high_water
+
+    @Property(int, notify=statsChanged)
+    def droppedMessages(self):
+        return self._buffer.dropped
+
+    @Property(int, notify=statsChanged)
+    def messagesRead(self):
+        return self._messages_read
+
+    @Property(int, notify=statsChanged)
+    def readErrors(self):
+        return self._read_errors
+
+    @Property(bool, notify=statsChanged)
+    def lazyDecoding(self):
+        return self._lazy_decoding
+
+    @Property(int, notify=statsChanged)
+    def skippedDecodes(self):
+        """Frames whose payload was not decoded because nobody subscribed"""
+        return self._parser.skipped_decodes
+
+    @Property(int, notify=statsChanged)
+    def badFrames(self):
+        return self._parser.bad_frames
+
+    @Property(str, notify=statsChanged)
+    def overflowPolicy(self):
+        return self._buffer.overflow_policy
@@ -0,0 +1,370 @@
+"""
+One shared reader per MAVLink link with fan-out to any number of consumers.
+
+pymavlink connections are not meant to be read by several callers: every
+``recv_match`` consumes the message, so a parameter download polling the
+connection steals frames from the telemetry loop and vice versa. The
+``MAVLinkTransport`` is the only component that reads a link. Everything
+else registers as a consumer:
+
+* callbacks per message type (the ``MessageDispatcher`` table),
+* listeners that see every decoded message,
+* a frame tap and link statistics that see every raw frame on the reader
+  thread, before decoding and buffering (recorder, link health),
+* ``MessageSubscription`` queues, filtered by message type, that can be
+  drained synchronously or consumed with ``async for``.
+"""
+
+import asyncio
+from collections import deque
+
+from PySide6.QtCore import QObject, Signal, Slot, QTimer
+
+from backend.mavlink_reader import MAVLinkReader, MessageRingBuffer, tap_message
+from backend.message_dispatcher import MessageDispatcher
+
+
+class MessageSubscription:
+    """
+    Bounded queue of the messages one consumer is interested in.
+
+    Filled on the thread that dispatches the transport (the Qt thread).
+    ``drain()`` and ``get_nowait()`` take messages synchronously;
+    ``async for msg in subscription`` waits for new ones on an asyncio loop,
+    which may run on another thread. When the queue is full the oldest
+    message is dropped and counted in ``dropped``.
+    """
+
+    def __init__(self, transport, message_types=None, maxlen=1000):
+        self._transport = transport
+        self._msgids = (None if message_types is None
+                        else frozenset(MessageDispatcher.resolve_msgid(t) for t in message_types))
+        self._queue = deque(maxlen=maxlen)
+        self._dropped = 0
+        self._closed = False
+        self._waiter = None  # (Loop, Future) eines wartenden __anext__
+
+    @property
+    def msgids(self):
+        """Subscribed msgids, or None for all messages"""
+        return self._msgids
+
+    @property
+    def dropped(self):
+        return self._dropped
+
+    @property
+    def closed(self):
+        return self._closed
+
+    def __len__(self):
+        return len(self._queue)
+
+    def push(self, msg):
+        """Queue a message (called by the transport)"""
+        if self._closed:
+            return
+        if len(self._queue) == self._queue.maxlen:
+            self._dropped += 1
+        self._queue.append(msg)
+        self._wake()
+
+    def get_nowait(self):
+        """Oldest queued message, or None"""
+        try:
+            return self._queue.popleft()
+        except IndexError:
+            return None
+
+    def drain(self):
+        """All queued messages, oldest first"""
+        messages = []
+        while self._queue:
+            messages.append(self._queue.popleft())
+        return messages
+
+    def __iter__(self):
+        return iter(self.drain())
+
+    def close(self):
+        """Stop receiving; a waiting ``async for`` ends"""
+        if self._closed:
+            return
+        self._closed = True
+        self._transport.remove_subscription(self)
+        self._wake()
+
+    def _wake(self):
+        waiter = self._waiter
+        if waiter is None:
+            return
+        loop, future = waiter
+        loop.call_soon_threadsafe(self._resolve, future)
+
+    @staticmethod
+    def _resolve(future):
+        if not future.done():
+            future.set_result(None)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        while not self._queue:
+            if self._closed:
+                raise StopAsyncIteration
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._waiter = (loop, future)
+            try:
+                # Erneut prüfen: push() kann vor dem Setzen des Waiters gelaufen sein
+                if not self._queue and not self._closed:
+                    await future
+            finally:
+                self._waiter = None
+        return self._queue.popleft()
+
+
+class MAVLinkTransport(QObject):
+    """
+    Single reader of one MAVLink connection.
+
+    Threaded (default), a ``MAVLinkReader`` reads on its own thread and the
+    messages are dispatched on the Qt thread when it wakes us. Unthreaded,
+    ``poll()`` reads whatever is available without blocking (driven by a
+    timer after ``start()``, or called directly).
+
+    Sending is not serialised here; senders keep using
+    ``transport.connection.mav``.
+
+    Signals:
+        messageReceived(object): Every dispatched message (for QML/debugging;
+            Python consumers should use subscribe/add_listener instead)
+        errorOccurred(str): Reading failed
+    """
+
+    messageReceived = Signal(object)
+    errorOccurred = Signal(str)
+
+    BATCH_SIZE = MAVLinkReader.DEFAULT_BATCH_SIZE  # Nachrichten pro Event-Loop-Durchlauf
+    POLL_INTERVAL_MS = 20  # Nur ohne Reader-Thread
+    POLL_BATCH_SIZE = 100
+
+    def __init__(self, connection, dispatcher=None, threaded=True,
+                 capacity=MAVLinkReader.DEFAULT_CAPACITY,
+                 overflow_policy=MessageRingBuffer.DROP_OLDEST,
+                 lazy_decoding=False, parent=None):
+        super().__init__(parent)
+        self._connection = connection
+        self._dispatcher = dispatcher if dispatcher is not None else MessageDispatcher(self._on_dispatch_error)
+        self._listeners = ()  # Callables für jede Nachricht
+        self._subscriptions = {}  # msgid -> Tuple von MessageSubscription
+        self._tracer = None
+        self._link_stats = None  # Nur ohne Reader-Thread, sonst zählt der Reader
+        self._frame_tap = None  # Ebenso
+        self._running = False
+        self._delivered = 0
+        self._emit_messages = False
+
+        self._reader = None
+        self._poll_timer = None
+        if threaded:
+            self._reader = MAVLinkReader(connection, capacity=capacity,
+                                         overflow_policy=overflow_policy,
+                                         lazy_decoding=lazy_decoding)
+            self._reader.set_decode_filter(self.wants)
+            self._reader.messagesAvailable.connect(self.process_messages)
+            self._reader.errorOccurred.connect(self.errorOccurred)
+
+    # --- Eigenschaften -------------------------------------------------------
+
+    @property
+    def connection(self):
+        return self._connection
+
+    @property
+    def reader(self):
+        """The MAVLinkReader (None when unthreaded)"""
+        return self._reader
+
+    @property
+    def dispatcher(self):
+        return self._dispatcher
+
+    @property
+    def delivered(self):
+        """Number of messages dispatched so far"""
+        return self._delivered
+
+    def is_running(self):
+        return self._running
+
+    def set_dispatcher(self, dispatcher):
+        """Dispatch into another MessageDispatcher (e.g. the MessageHandler's)"""
+        self._dispatcher = dispatcher
+
+    def set_latency_tracer(self, tracer):
+        """Trace read, queue and dispatch latency (None disables)"""
+        self._tracer = tracer
+        if self._reader is not None:
+            self._reader.set_latency_tracer(tracer)
+
+    def set_link_stats(self, stats):
+        """Count received frames in a LinkStatistics (None disables)"""
+        if self._reader is not None:
+            # Auf dem Reader-Thread, auch für nicht dekodierte Frames
+            self._reader.set_link_stats(stats)
+        else:
+            self._link_stats = stats
+
+    def set_frame_tap(self, tap):
+        """Call ``tap(frame, timestamp)`` with the raw bytes of every received frame (None disables)"""
+        if self._reader is not None:
+            self._reader.set_frame_tap(tap)
+        else:
+            self._frame_tap = tap
+
+    def set_emit_messages(self, enabled):
+        """Also emit messageReceived for every message (off by default)"""
+        self._emit_messages = enabled
+
+    # --- Konsumenten -------------------------------------------------------
+
+    def subscribe(self, message_type, handler):
+        """Call ``handler(msg)`` for every message of a type. Returns the msgid."""
+        return self._dispatcher.subscribe(message_type, handler)
+
+    def unsubscribe(self, message_type, handler):
+        return self._dispatcher.unsubscribe(message_type, handler)
+
+    def add_listener(self, listener):
+        """Call ``listener(msg)`` for every message"""
+        if listener not in self._listeners:
+            self._listeners = self._listeners + (listener,)
+
+    def remove_listener(self, listener):
+        self._listeners = tuple(l for l in self._listeners if l != listener)
+
+    def subscription(self, message_types=None, maxlen=1000):
+        """
+        New MessageSubscription for some message types (None: all).
+
+        Close it when done, otherwise it keeps collecting (up to maxlen).
+        """
+        subscription = MessageSubscription(self, message_types, maxlen)
+        keys = subscription.msgids if subscription.msgids is not None else (None,)
+        for key in keys:
+            self._subscriptions[key] = self._subscriptions.get(key, ()) + (subscription,)
+        return subscription
+
+    def remove_subscription(self, subscription):
+        for key in list(self._subscriptions):
+            remaining = tuple(s for s in self._subscriptions[key] if s is not subscription)
+            if remaining:
+                self._subscriptions[key] = remaining
+            else:
+                del self._subscriptions[key]
+
+    def wants(self, msgid):
+        """True if any consumer needs this msgid decoded (lazy decode filter)"""
+        return (bool(self._listeners) or None in self._subscriptions
+                or msgid in self._subscriptions or self._dispatcher.wants(msgid))
+
+    # --- Lesen und Verteilen -------------------------------------------------
+
+    def start(self):
+        """Start reading the link"""
+        if self._running:
+            return True
+        if self._connection is None:
+            self.errorOccurred.emit("❌ No MAVLink connection available")
+            return False
+        if self._reader is not None:
+            if not self._reader.start():
+                return False
+        else:
+            if self._poll_timer is None:
+                self._poll_timer = QTimer(self)
+                self._poll_timer.setInterval(self.POLL_INTERVAL_MS)
+                self._poll_timer.timeout.connect(self.poll)
+            self._poll_timer.start()
+        self._running = True
+        return True
+
+    def stop(self):
+        """Stop reading; subscriptions stay registered"""
+        self._running = False
+        if self._reader is not None:
+            self._reader.stop()
+        if self._poll_timer is not None:
+            self._poll_timer.stop()
+
+    @Slot()
+    def process_messages(self):
+        """Dispatch what the reader thread has buffered (Qt thread)"""
+        reader = self._reader
+        if reader is None:
+            return 0
+        batch = reader.take_messages(self.BATCH_SIZE)
+        if not self._running:
+            return 0
+        self._deliver_batch(batch)
+        # Rest im nächsten Event-Loop-Durchlauf, damit die UI nicht blockiert
+        if reader.has_pending():
+            QTimer.singleShot(0, self.process_messages)
+        return len(batch)
+
+    @Slot()
+    def poll(self, max_items=None):
+        """Read and dispatch available messages without blocking (unthreaded mode)"""
+        connection = self._connection
+        if connection is None:
+            return 0
+        limit = self.POLL_BATCH_SIZE if max_items is None else max_items
+        batch = []
+        try:
+            while len(batch) < limit:
+                msg = connection.recv_match(blocking=False)
+                if not msg:
+                    break
+                batch.append(msg)
+        except Exception as e:
+            self.errorOccurred.emit(f"❌ Error reading MAVLink data: {str(e)}")
+        self._deliver_batch(batch)
+        return len(batch)
+
+    def _deliver_batch(self, batch):
+        tracer = self._tracer
+        if tracer is not None and tracer.enabled:
+            for msg in batch:
+                tracer.begin(msg)
+                self.deliver(msg)
+                tracer.end()
+        else:
+            for msg in batch:
+                self.deliver(msg)
+
+    def _on_dispatch_error(self, msg, error):
+        self.errorOccurred.emit(f"⚠️ Error processing {msg.get_type()}: {str(error)}")
+
+    def deliver(self, msg):
+        """Fan a message out to all consumers"""
+        self._delivered += 1
+        if self._link_stats is not None:
+            self._link_stats.observe_message(msg)
+        if self._frame_tap is not None:
+            tap_message(self._frame_tap, msg)
+        for listener in self._listeners:
+            try:
+                listener(msg)
+            except Exception as e:
+                self.errorOccurred.emit(f"⚠️ Error in message listener: {str(e)}")
+        subscriptions = self._subscriptions
+        if subscriptions:
+            for subscription in subscriptions.get(msg.get_msgId(), ()):
+                subscription.push(msg)
+            for subscription in subscriptions.get(None, ()):
+                subscription.push(msg)
+        self._dispatcher.dispatch(msg)
+        if self._emit_messages:
+            self.messageReceived.emit(msg)
@@ -0,0 +1,95 @@
+"""
+Table-driven MAVLink message dispatch.
+
+Handlers are registered per message and looked up by numeric msgid, so a
+packet costs one dict lookup no matter how many message types are handled,
+and unsubscribed types cost nothing beyond that lookup.
+"""
+
+from pymavlink import mavutil
+
+
+class MessageDispatcher:
+    """
+    Registry of MAVLink message handlers keyed by msgid.
+
+    Handlers are plain callables taking the message object. The handler lists
+    are stored as tuples and replaced on (un)subscribe, so dispatch never needs
+    a lock or a copy and handlers may (un)subscribe while being dispatched.
+    """
+
+    def __init__(self, error_callback=None):
+        self._handlers = {}  # msgid -> tuple of callables
+        self._error_callback = error_callback
+
+    @staticmethod
+    def resolve_msgid(message_type):
+        """Translate a message name (e.g. 'ATTITUDE') or msgid into the numeric msgid"""
+        if isinstance(message_type, int):
+            return message_type
+        msgid = getattr(mavutil.mavlink, f"MAVLINK_MSG_ID_{message_type}", None)
+        if msgid is None:
+            raise ValueError(f"Unknown MAVLink message type: {message_type}")
+        return msgid
+
+    def set_error_callback(self, callback):
+        """Called as callback(msg, error) when a handler raises"""
+        self._error_callback = callback
+
+    def subscribe(self, message_type, handler):
+        """Register a handler for a message name or msgid. Returns the msgid."""
+        msgid = self.resolve_msgid(message_type)
+        handlers = self._handlers.get(msgid, ())
+        if handler not in handlers:
+            self._handlers[msgid] = handlers + (handler,)
+        return msgid
+
+    def subscribe_many(self, handler_map):
+        """Register several handlers at once: {message_type: handler}"""
+        for message_type, handler in handler_map.items():
+            self.subscribe(message_type, handler)
+
+    def unsubscribe(self, message_type, handler):
+        """Remove a handler. Returns True if it was registered."""
+        msgid = self.resolve_msgid(message_type)
+        handlers = self._handlers.get(msgid, ())
+        if handler not in handlers:
+            return False
+        remaining = tuple(h for h in handlers if h != handler)
+        if remaining:
+            self._handlers[msgid] = remaining
+        else:
+            del self._handlers[msgid]
+        return True
+
+    def clear(self):
+        self._handlers = {}
+
+    def has_subscribers(self, message_type):
+        return self.resolve_msgid(message_type) in self._handlers
+
+    def wants(self, msgid):
+        """Cheap membership test for numeric msgids (usable as decode filter)"""
+        return msgid in self._handlers
+
+    def subscribed_ids(self):
+        """Set of msgids with at least one handler"""
+        return frozenset(self._handlers)
+
+    def dispatch(self, msg):
+        """
+        Call all handlers registered for the message.
+
+        Returns True if at least one handler was registered. A raising handler
+        does not prevent the remaining handlers from running.
+        """
+        handlers = self._handlers.get(msg.get_msgId())
+        if handlers is None:
+            return False
+        for handler in handlers:
+            try:
+                handler(msg)
+            except Exception as e:
+                if self._error_callback is not None:
+                    self._error_callback(msg, e)
+        return True
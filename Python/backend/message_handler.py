@@ -1,6 +1,10 @@
 from PySide6.QtCore import QObject, Signal, Slot, QTimer
 from pymavlink import mavutil
 from .logger import Logger
+from .message_dispatcher import MessageDispatcher
+from .mavlink_transport import MAVLinkTransport
+from .command_manager import CommandManager, result_name
+from .system_info_classifier import SystemInfoClassifier
 import time
 import math
 import re
@@ -38,11 +42,30 @@ class MessageHandler(QObject):
         
         # Zeitpunkt der letzten UI-Aktualisierung
         self._last_ui_update_time = time.time()
+
+        # Nachrichten-Registry: msgid -> Handler
+        self._dispatcher = MessageDispatcher(self._on_dispatch_error)
+        self._register_default_handlers()
+
+        # COMMAND_LONG mit Bestätigung durch COMMAND_ACK
+        self._command_manager = CommandManager(parent=self)
+        self._dispatcher.subscribe('COMMAND_ACK', self._command_manager.handle_command_ack)
+
+        # Einziger Leser der Verbindung (MAVLinkTransport)
+        self._transport = None
+        self._max_messages_per_cycle = 10  # Nur für das Polling ohne Reader-Thread
+        self._tracer = None
+
+        # Klassifizierung wichtiger Statustexte (mit Cache für wiederholte Texte)
+        self._status_classifier = SystemInfoClassifier.for_status_text()
         
     def set_connection(self, connection, is_simulator=False):
         """Set the MAVLink connection to use"""
+        if self._transport is not None and self._transport.connection is not connection:
+            self._transport = None
         self._mavlink_connection = connection
         self._is_simulator = is_simulator
+        self._command_manager.set_connection(connection)
         
     def start(self):
         """Start message handling"""
@@ -206,6 +229,7 @@ class MessageHandler(QObject):
     def stop(self):
         """Stop message handling"""
         self._running = False
+        self._command_manager.cancel_all()
         self._logger.addLog("🛑 Message handler stopped")
         
         # Reset simulator state
@@ -346,132 +370,190 @@ class MessageHandler(QObject):
         except Exception as e:
             self._logger.addLog(f"Error in delayed message update: {str(e)}")
         
+    def attach_transport(self, transport):
+        """
+        Receive messages through a MAVLinkTransport (the link's only reader).
+
+        The transport dispatches into this handler's registry, so everything
+        subscribed at get_dispatcher() is one consumer among the transport's
+        listeners and subscriptions.
+        """
+        self._transport = transport
+        if transport is not None:
+            transport.set_dispatcher(self._dispatcher)
+            transport.set_latency_tracer(self._tracer)
+
+    def get_transport(self):
+        return self._transport
+
+    def _polling_transport(self):
+        """Transport used without reader thread (created on demand)"""
+        if self._transport is None:
+            self._transport = MAVLinkTransport(self._mavlink_connection, dispatcher=self._dispatcher,
+                                               threaded=False, parent=self)
+            self._transport.set_latency_tracer(self._tracer)
+        return self._transport
+
+    @Slot()
     def process_messages(self):
-        """Process incoming MAVLink messages"""
+        """Process incoming MAVLink messages through the link's transport"""
         if not self._running or not self._mavlink_connection:
             return
-        
-        # Process multiple messages in one cycle for better performance
-        messages_processed = 0
-        max_messages_per_cycle = 10  # Process up to 10 messages per cycle
-            
+        # Nur der Transport liest die Verbindung
+        transport = self._polling_transport()
+        if transport.reader is not None:
+            transport.process_messages()
+        else:
+            transport.poll(self._max_messages_per_cycle)
+
+    def _handle_message(self, msg):
+        """Dispatch a single MAVLink message"""
+        self._dispatcher.dispatch(msg)
+
+    def set_latency_tracer(self, tracer):
+        """Record queue and dispatch latency in a LatencyTracer (None disables)"""
+        self._tracer = tracer
+        if self._transport is not None:
+            self._transport.set_latency_tracer(tracer)
+
+    def get_status_classifier(self):
+        """Classifier deciding which STATUSTEXT messages are system info"""
+        return self._status_classifier
+
+    def get_dispatcher(self):
+        """Gibt den MessageDispatcher zurück, bei dem sich Komponenten registrieren"""
+        return self._dispatcher
+
+    def get_command_manager(self):
+        """Gibt den CommandManager zurück (COMMAND_LONG mit Bestätigung)"""
+        return self._command_manager
+
+    def send_command(self, command, *params, description=None, **kwargs):
+        """Send a COMMAND_LONG through the CommandManager; with a description the ack is logged"""
+        future = self._command_manager.send_command(command, *params, **kwargs)
+        if description:
+            future.add_done_callback(lambda f: self._log_command_result(description, f))
+        return future
+
+    def _log_command_result(self, description, future):
+        """Log the COMMAND_ACK result of a command (Qt thread)"""
+        if future.cancelled():
+            return
+        error = future.exception()
+        if error is not None:
+            error_msg = f"❌ {description}: {str(error)}"
+        elif future.result() != mavutil.mavlink.MAV_RESULT_ACCEPTED:
+            error_msg = f"❌ {description} abgelehnt ({result_name(future.result())})"
+        else:
+            self._logger.addLog(f"✅ {description} bestätigt")
+            return
+        self._logger.addLog(error_msg)
+        self.error_occurred.emit(error_msg)
+
+    def _register_default_handlers(self):
+        """Register the handlers of the MessageHandler itself"""
+        self._dispatcher.subscribe_many({
+            'HEARTBEAT': self._on_heartbeat,
+            'ATTITUDE': self._on_attitude,
+            'GLOBAL_POSITION_INT': self._on_global_position_int,
+            'SYS_STATUS': self._on_sys_status,
+            'VFR_HUD': self._on_vfr_hud,
+            'STATUSTEXT': self._on_statustext,
+            'PARAM_VALUE': self._on_param_value,
+            'SERVO_OUTPUT_RAW': self._on_servo_output_raw,
+            'RC_CHANNELS': self._on_rc_channels,
+            'MISSION_CURRENT': self._on_mission_current,
+        })
+
+    def _on_dispatch_error(self, msg, error):
+        """Report an exception raised by a registered handler"""
+        error_msg = f"Error in message processing ({msg.get_type()}): {str(error)}"
+        self._logger.addLog(error_msg)
+        self.error_occurred.emit(error_msg)
+
+    def _on_heartbeat(self, msg):
+        self.heartbeat_received.emit(msg)
+        self._handle_heartbeat(msg)
+
+        # Flugmodus als Systeminfo hinzufügen
         try:
-            while messages_processed < max_messages_per_cycle:
-                msg = self._mavlink_connection.recv_match(blocking=False)
-                if not msg:
-                    break  # No more messages in the queue
-                    
-                messages_processed += 1
-                msg_type = msg.get_type()
-                
-                # Add important debug output for sensor values
-                self._logger.addLog(f"Receiving MAVLink message: {msg_type}")
-                
-                if msg_type == 'HEARTBEAT':
-                    self.heartbeat_received.emit(msg)
-                    self._handle_heartbeat(msg)
-                    
-                    # Flugmodus als Systeminfo hinzufügen
-                    try:
-                        mode = mavutil.mode_string_v10(msg)
-                        armed = (msg.base_mode & mavutil.mavlink.MAV_MODE_FLAG_SAFETY_ARMED) != 0
-                        status = "ARMED" if armed else "DISARMED"
-                        self._logger.addSystemInfoLog(f"Flight Mode: {mode} | System {status}")
-                    except Exception as e:
-                        pass
-                    
-                elif msg_type == 'ATTITUDE':
-                    self.attitude_received.emit(msg)
-                    # Debug
-                    try:
-                        roll_deg = round(msg.roll * 180 / 3.14159, 1)
-                        pitch_deg = round(msg.pitch * 180 / 3.14159, 1)
-                        yaw_deg = round(msg.yaw * 180 / 3.14159, 1)
-                        attitude_msg = f"Attitude: Roll={roll_deg}°, Pitch={pitch_deg}°, Yaw={yaw_deg}°"
-                        self._logger.addLog(f"[DEBUG] {attitude_msg}")
-                        
-                        # Lagewinkel nicht mehr als Systeminfo hinzufügen
-                        # (auf Wunsch des Benutzers entfernt)
-                    except Exception as e:
-                        pass
-                    
-                elif msg_type == 'GLOBAL_POSITION_INT':
-                    self.gps_received.emit(msg)
-                    # Debug
-                    try:
-                        lat = msg.lat / 1e7
-                        lon = msg.lon / 1e7
-                        alt = msg.relative_alt / 1000.0
-                        gps_msg = f"GPS: Lat={lat:.6f}, Lon={lon:.6f}, Alt={alt:.1f}m"
-                        self._logger.addLog(f"[DEBUG] {gps_msg}")
-                        
-                        # GPS-Position nicht mehr als Systeminfo hinzufügen
-                        # (auf Wunsch des Benutzers entfernt)
-                    except Exception as e:
-                        pass
-                        
-                elif msg_type == 'SYS_STATUS':
-                    self.battery_received.emit(msg)
-                    # Debug
-                    try:
-                        voltage = msg.voltage_battery / 1000.0
-                        current = msg.current_battery / 100.0
-                        remaining = msg.battery_remaining
-                        battery_msg = f"Battery: {voltage:.1f}V, {current:.1f}A, {remaining}%"
-                        self._logger.addLog(f"[DEBUG] {battery_msg}")
-                        
-                        # Cache SYS_STATUS-Nachricht für verzögerte Aktualisierung
-                        self._sys_status_cache = msg
-                        
-                        # Batteriestatus nicht mehr als Systeminfo hinzufügen
-                        # (auf Wunsch des Benutzers entfernt)
-                    except Exception as e:
-                        pass
-                    
-                elif msg_type == 'VFR_HUD':
-                    # Add direct signal for VFR_HUD
-                    try:
-                        airspeed = msg.airspeed
-                        groundspeed = msg.groundspeed
-                        alt = msg.alt
-                        speed_msg = f"Speed: Air={airspeed:.1f}m/s, Ground={groundspeed:.1f}m/s, Alt={alt:.1f}m"
-                        self._logger.addLog(f"[DEBUG] {speed_msg}")
-                        
-                        # Geschwindigkeiten und Höhe nicht mehr als Systeminfo hinzufügen
-                        # (auf Wunsch des Benutzers entfernt)
-                        
-                        # Forward VFR_HUD signal directly to SensorModel
-                        self.vfr_hud_received.emit(msg)
-                    except Exception as vfr_error:
-                        self._logger.addLog(f"Error with VFR_HUD: {str(vfr_error)}")
-                        pass
-                    
-                elif msg_type == 'STATUSTEXT':
-                    self.status_text_received.emit(msg)
-                    self._handle_statustext(msg)
-                    
-                elif msg_type == 'PARAM_VALUE':
-                    self.parameter_received.emit(msg)
-                    
-                elif msg_type == 'SERVO_OUTPUT_RAW':
-                    # Cache SERVO_OUTPUT_RAW-Nachricht für verzögerte Aktualisierung
-                    self._servo_output_raw_cache = msg
-                    self._logger.addLog(f"SERVO_OUTPUT_RAW cached for delayed display")
-                    
-                elif msg_type == 'RC_CHANNELS':
-                    # Cache RC_CHANNELS-Nachricht für verzögerte Aktualisierung
-                    self._rc_channels_cache = msg
-                    self._logger.addLog(f"RC_CHANNELS cached for delayed display")
-                    
-                elif msg_type == 'MISSION_CURRENT':
-                    # Cache MISSION_CURRENT-Nachricht für verzögerte Aktualisierung
-                    self._mission_current_cache = msg
-                    self._logger.addLog(f"MISSION_CURRENT cached for delayed display")
+            mode = mavutil.mode_string_v10(msg)
+            armed = (msg.base_mode & mavutil.mavlink.MAV_MODE_FLAG_SAFETY_ARMED) != 0
+            status = "ARMED" if armed else "DISARMED"
+            self._logger.addSystemInfoLog(f"Flight Mode: {mode} | System {status}")
         except Exception as e:
-            error_msg = f"Error in message processing: {str(e)}"
-            self._logger.addLog(error_msg)
-            self.error_occurred.emit(error_msg)
-            
+            pass
+
+    def _on_attitude(self, msg):
+        self.attitude_received.emit(msg)
+        # Debug
+        try:
+            roll_deg = round(msg.roll * 180 / 3.14159, 1)
+            pitch_deg = round(msg.pitch * 180 / 3.14159, 1)
+            yaw_deg = round(msg.yaw * 180 / 3.14159, 1)
+            attitude_msg = f"Attitude: Roll={roll_deg}°, Pitch={pitch_deg}°, Yaw={yaw_deg}°"
+            self._logger.addLog(f"[DEBUG] {attitude_msg}")
+        except Exception as e:
+            pass
+
+    def _on_global_position_int(self, msg):
+        self.gps_received.emit(msg)
+        # Debug
+        try:
+            lat = msg.lat / 1e7
+            lon = msg.lon / 1e7
+            alt = msg.relative_alt / 1000.0
+            gps_msg = f"GPS: Lat={lat:.6f}, Lon={lon:.6f}, Alt={alt:.1f}m"
+            self._logger.addLog(f"[DEBUG] {gps_msg}")
+        except Exception as e:
+            pass
+
+    def _on_sys_status(self, msg):
+        self.battery_received.emit(msg)
+        # Cache SYS_STATUS-Nachricht für verzögerte Aktualisierung
+        self._sys_status_cache = msg
+        # Debug
+        try:
+            voltage = msg.voltage_battery / 1000.0
+            current = msg.current_battery / 100.0
+            remaining = msg.battery_remaining
+            battery_msg = f"Battery: {voltage:.1f}V, {current:.1f}A, {remaining}%"
+            self._logger.addLog(f"[DEBUG] {battery_msg}")
+        except Exception as e:
+            pass
+
+    def _on_vfr_hud(self, msg):
+        try:
+            speed_msg = f"Speed: Air={msg.airspeed:.1f}m/s, Ground={msg.groundspeed:.1f}m/s, Alt={msg.alt:.1f}m"
+            self._logger.addLog(f"[DEBUG] {speed_msg}")
+
+            # Forward VFR_HUD signal directly to SensorModel
+            self.vfr_hud_received.emit(msg)
+        except Exception as vfr_error:
+            self._logger.addLog(f"Error with VFR_HUD: {str(vfr_error)}")
+
+    def _on_statustext(self, msg):
+        self.status_text_received.emit(msg)
+        self._handle_statustext(msg)
+
+    def _on_param_value(self, msg):
+        self.parameter_received.emit(msg)
+
+    def _on_servo_output_raw(self, msg):
+        # Cache SERVO_OUTPUT_RAW-Nachricht für verzögerte Aktualisierung
+        self._servo_output_raw_cache = msg
+        self._logger.addLog(f"SERVO_OUTPUT_RAW cached for delayed display")
+
+    def _on_rc_channels(self, msg):
+        # Cache RC_CHANNELS-Nachricht für verzögerte Aktualisierung
+        self._rc_channels_cache = msg
+        self._logger.addLog(f"RC_CHANNELS cached for delayed display")
+
+    def _on_mission_current(self, msg):
+        # Cache MISSION_CURRENT-Nachricht für verzögerte Aktualisierung
+        self._mission_current_cache = msg
+        self._logger.addLog(f"MISSION_CURRENT cached for delayed display")
+
     def _handle_heartbeat(self, msg):
         """Handle heartbeat message"""
         try:
@@ -493,12 +575,17 @@ class MessageHandler(QObject):
             self.error_occurred.emit(error_msg)
             
     def start_compass_calibration(self):
-        """Sendet den MAVLink-Befehl, um die Kompass-Kalibrierung zu starten"""
+        """
+        Sendet den MAVLink-Befehl, um die Kompass-Kalibrierung zu starten.
+
+        Returns the Future of the COMMAND_ACK result, None if nothing was sent.
+        The calibration only runs once the vehicle acknowledges it.
+        """
         if not self._mavlink_connection or not self._running:
             error_msg = "❌ Keine MAVLink-Verbindung verfügbar"
             self._logger.addLog(error_msg)
             self.error_occurred.emit(error_msg)
-            return False
+            return None
             
         try:
             # MAV_CMD_DO_START_MAG_CAL - Kompass-Kalibrierung starten
@@ -506,23 +593,21 @@ class MessageHandler(QObject):
             # Parameter 2: 1=Autodecline (automatisches Beenden), 0=Manuelle Bestätigung erforderlich
             # Parameter 3: 1=Autosave (automatisches Speichern), 0=Manuelles Speichern erforderlich
             # Parameter 4-7: Ungenutzt (0)
-            self._mavlink_connection.mav.command_long_send(
-                self._mavlink_connection.target_system,
-                self._mavlink_connection.target_component,
+            future = self.send_command(
                 mavutil.mavlink.MAV_CMD_DO_START_MAG_CAL,
-                0,  # Confirmation
                 255,  # All compasses
                 0,    # Manual acceptance required
                 1,    # Auto save
-                0, 0, 0, 0  # Unused parameters
+                0, 0, 0, 0,  # Unused parameters
+                description="Start der Kompass-Kalibrierung",
             )
-            self._logger.addLog("🧭 Kompass-Kalibrierung gestartet")
-            return True
+            self._logger.addLog("🧭 Kompass-Kalibrierung angefordert, warte auf Bestätigung")
+            return future
         except Exception as e:
             error_msg = f"❌ Fehler beim Starten der Kompass-Kalibrierung: {str(e)}"
             self._logger.addLog(error_msg)
             self.error_occurred.emit(error_msg)
-            return False
+            return None
             
     def cancel_compass_calibration(self):
         """Sendet den MAVLink-Befehl, um die Kompass-Kalibrierung abzubrechen"""
@@ -531,13 +616,11 @@ class MessageHandler(QObject):
             
         try:
             # MAV_CMD_DO_CANCEL_MAG_CAL - Kompass-Kalibrierung abbrechen
-            self._mavlink_connection.mav.command_long_send(
-                self._mavlink_connection.target_system,
-                self._mavlink_connection.target_component,
+            self.send_command(
                 mavutil.mavlink.MAV_CMD_DO_CANCEL_MAG_CAL,
-                0,  # Confirmation
                 255,  # All compasses
-                0, 0, 0, 0, 0, 0  # Unused parameters
+                0, 0, 0, 0, 0, 0,  # Unused parameters
+                description="Abbruch der Kompass-Kalibrierung",
             )
             self._logger.addLog("🧭 Kompass-Kalibrierung abgebrochen")
             return True
@@ -554,13 +637,11 @@ class MessageHandler(QObject):
             
         try:
             # MAV_CMD_DO_ACCEPT_MAG_CAL - Kompass-Kalibrierung akzeptieren
-            self._mavlink_connection.mav.command_long_send(
-                self._mavlink_connection.target_system,
-                self._mavlink_connection.target_component,
+            self.send_command(
                 mavutil.mavlink.MAV_CMD_DO_ACCEPT_MAG_CAL,
-                0,  # Confirmation
                 255,  # All compasses
-                0, 0, 0, 0, 0, 0  # Unused parameters
+                0, 0, 0, 0, 0, 0,  # Unused parameters
+                description="Übernahme der Kompass-Kalibrierung",
             )
             self._logger.addLog("✅ Kompass-Kalibrierung akzeptiert")
             return True
@@ -571,36 +652,38 @@ class MessageHandler(QObject):
             return False
             
     def start_accel_calibration(self):
-        """Sendet den MAVLink-Befehl, um die Accelerometer-Kalibrierung zu starten"""
+        """
+        Sendet den MAVLink-Befehl, um die Accelerometer-Kalibrierung zu starten.
+
+        Returns the Future of the COMMAND_ACK result, None if nothing was sent.
+        """
         if not self._mavlink_connection or not self._running:
             error_msg = "❌ Keine MAVLink-Verbindung verfügbar"
             self._logger.addLog(error_msg)
             self.error_occurred.emit(error_msg)
-            return False
+            return None
             
         try:
             # PREFLIGHT_CALIBRATION-Nachricht für Accelerometer-Kalibrierung
             # Parameter 1-7: [gyro_cal, mag_cal, ground_pressure, radio_cal, accel_cal, comp_arm_cal, param7]
-            self._mavlink_connection.mav.command_long_send(
-                self._mavlink_connection.target_system,
-                self._mavlink_connection.target_component,
+            future = self.send_command(
                 mavutil.mavlink.MAV_CMD_PREFLIGHT_CALIBRATION,
-                0,  # Confirmation
                 0,  # No gyro calibration
                 0,  # No mag calibration
                 0,  # No ground pressure
                 0,  # No radio calibration
                 1,  # Accel calibration
                 0,  # No compass/motor interference
-                0   # Unused
+                0,  # Unused
+                description="Start der Accelerometer-Kalibrierung",
             )
-            self._logger.addLog("📊 Accelerometer-Kalibrierung gestartet")
-            return True
+            self._logger.addLog("📊 Accelerometer-Kalibrierung angefordert, warte auf Bestätigung")
+            return future
         except Exception as e:
             error_msg = f"❌ Fehler beim Starten der Accelerometer-Kalibrierung: {str(e)}"
             self._logger.addLog(error_msg)
             self.error_occurred.emit(error_msg)
-            return False
+            return None
             
     def next_accel_calibration_step(self):
         """Sendet einen Befehl, um zum nächsten Schritt der Accelerometer-Kalibrierung zu gelangen"""
@@ -1067,18 +1150,12 @@ class MessageHandler(QObject):
             # Extract the text from the message
             text = msg.text
             
-            # Look for specific system information patterns in status text
-            if any(pattern in text for pattern in ["Frame:", "RCOut:", "MicoAir", "ChibiOS:", "ArduCopter", "PreArm:"]):
-                # This is a system information message we're looking for
+            # Systeminformationen, EKF- und Arming-Meldungen in einem Durchlauf erkennen
+            if self._status_classifier.classify_cached(text) is not None:
                 self._logger.addLog(f"🔍 {text}")
                 # Add to system info logs directly
                 self._logger.addSystemInfoLog(text)
                 
-            # Auch weitere wichtige Statustexte hinzufügen
-            elif text.startswith("EKF") or "ready to arm" in text.lower() or "armed" in text.lower():
-                self._logger.addLog(f"🔍 {text}")
-                self._logger.addSystemInfoLog(text)
-                
         except Exception as e:
             error_msg = f"❌ Error handling status text: {str(e)}"
             self._logger.addLog(error_msg)
@@ -0,0 +1,271 @@
+"""
+Priority scheduling and rate shaping of outgoing MAVLink traffic.
+
+Every ``connection.mav.*_send`` ends in ``MAVLink.send(msg)``, which packs
+the message and writes it to the link at once. On a 57600 baud telemetry
+radio a bulk parameter write then fills the radio's buffer and an RTL
+command queues behind hundreds of PARAM_SETs. The ``OutgoingScheduler``
+takes over ``send`` of a connection:
+
+* messages are sorted into priority classes (emergency, control, normal,
+  bulk) and leave strictly by class, FIFO within a class;
+* a token bucket limits the bytes per second to a share of the baud rate,
+  so the backlog stays in our queues where priorities apply and not in the
+  radio;
+* emergency messages are never held back: they are sent at once and their
+  bytes are charged to the bucket, which may go negative.
+
+Messages are packed when they leave the queue, so sequence numbers follow
+the order on the wire. Queue depth, sent bytes and queueing latency are
+kept per class. All methods are meant for the Qt thread.
+"""
+
+import time
+from collections import deque
+
+from PySide6.QtCore import QObject, Signal, Slot, Property, QTimer
+from pymavlink import mavutil
+
+from backend.latency_tracer import LatencyHistogram
+
+MAV = mavutil.mavlink
+
+
+class OutgoingScheduler(QObject):
+    """
+    Token-bucket shaped, priority ordered sender for one MAVLink connection.
+
+    ``attach(connection, baud_rate)`` routes ``connection.mav.send`` through
+    the scheduler; existing senders need no changes. ``baud_rate=None``
+    disables shaping (USB, UDP), the priority order still applies.
+
+    Signals:
+        statsChanged: Queue or latency statistics changed (at most once per STATS_INTERVAL_MS)
+    """
+
+    statsChanged = Signal()
+
+    EMERGENCY = "emergency"
+    CONTROL = "control"
+    NORMAL = "normal"
+    BULK = "bulk"
+    CLASSES = (EMERGENCY, CONTROL, NORMAL, BULK)
+
+    # Nachrichtentyp -> Klasse (Rest: NORMAL)
+    MESSAGE_CLASSES = {
+        'SET_MODE': EMERGENCY,
+        'HEARTBEAT': CONTROL,
+        'COMMAND_LONG': CONTROL,
+        'COMMAND_INT': CONTROL,
+        'COMMAND_ACK': CONTROL,
+        'MANUAL_CONTROL': CONTROL,
+        'RC_CHANNELS_OVERRIDE': CONTROL,
+        'SET_POSITION_TARGET_LOCAL_NED': CONTROL,
+        'SET_POSITION_TARGET_GLOBAL_INT': CONTROL,
+        'PARAM_SET': BULK,
+        'PARAM_REQUEST_LIST': BULK,
+        'MISSION_ITEM': BULK,
+        'MISSION_ITEM_INT': BULK,
+        'MISSION_REQUEST_LIST': BULK,
+        'LOG_REQUEST_DATA': BULK,
+        'FILE_TRANSFER_PROTOCOL': BULK,
+    }
+
+    # Befehle, die nie warten dürfen
+    EMERGENCY_COMMANDS = frozenset((
+        MAV.MAV_CMD_NAV_RETURN_TO_LAUNCH,
+        MAV.MAV_CMD_NAV_LAND,
+        MAV.MAV_CMD_DO_FLIGHTTERMINATION,
+        MAV.MAV_CMD_COMPONENT_ARM_DISARM,
+        MAV.MAV_CMD_DO_SET_MODE,
+    ))
+
+    BITS_PER_BYTE = 10  # 8N1: Start- und Stoppbit
+    UPLINK_SHARE = 0.5  # SiK-Funkmodule teilen die Luftrate zwischen beiden Richtungen
+    BURST_SECONDS = 0.1
+    MIN_BURST_BYTES = 300  # Mindestens eine MAVLink-2-Nachricht maximaler Länge
+    FRAME_OVERHEAD = 12  # MAVLink-2-Header und CRC
+    STATS_INTERVAL_MS = 1000
+
+    def __init__(self, baud_rate=None, clock=time.monotonic, parent=None):
+        super().__init__(parent)
+        self._clock = clock
+        self._connection = None
+        self._mav = None
+        self._send = None  # Ursprüngliches MAVLink.send
+        self._queues = {cls: deque() for cls in self.CLASSES}  # (Nachricht, kwargs, Einreihzeit)
+        self._latency = {cls: LatencyHistogram() for cls in self.CLASSES}
+        self._sent = dict.fromkeys(self.CLASSES, 0)
+        self._bytes = dict.fromkeys(self.CLASSES, 0)
+        self._dirty = False
+
+        self._rate = None  # Bytes pro Sekunde, None = unbegrenzt
+        self._burst = 0.0
+        self._tokens = 0.0
+        self._last_refill = clock()
+        self.set_baud_rate(baud_rate)
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self.flush)
+
+        self._stats_timer = QTimer(self)
+        self._stats_timer.setInterval(self.STATS_INTERVAL_MS)
+        self._stats_timer.timeout.connect(self._emit_stats)
+
+    # --- Verbindung ------------------------------------------------------
+
+    def attach(self, connection, baud_rate=None):
+        """Route all sends of ``connection.mav`` through this scheduler"""
+        self.detach()
+        self.set_baud_rate(baud_rate)
+        self._connection = connection
+        self._mav = connection.mav
+        self._send = connection.mav.send
+        connection.mav.send = self.send
+        self._stats_timer.start()
+
+    def detach(self):
+        """Restore direct sending; queued messages are dropped"""
+        if self._mav is not None:
+            self._mav.send = self._send
+        self._connection = None
+        self._mav = None
+        self._send = None
+        for queue in self._queues.values():
+            queue.clear()
+        self._timer.stop()
+        self._stats_timer.stop()
+        self._mark_dirty()
+
+    def is_attached(self):
+        return self._mav is not None
+
+    def set_baud_rate(self, baud_rate):
+        """Byte budget from the serial baud rate (None: no shaping)"""
+        if not baud_rate:
+            self._rate = None
+            self._burst = float("inf")
+            self._tokens = float("inf")
+        else:
+            self._rate = baud_rate / self.BITS_PER_BYTE * self.UPLINK_SHARE
+            self._burst = max(self.MIN_BURST_BYTES, self._rate * self.BURST_SECONDS)
+            self._tokens = self._burst
+        self._last_refill = self._clock()
+
+    @property
+    def byte_rate(self):
+        """Budget in bytes per second, or None"""
+        return self._rate
+
+    # --- Senden ----------------------------------------------------------
+
+    def classify(self, msg):
+        """Priority class of an outgoing message"""
+        msg_type = msg.get_type()
+        if msg_type in ('COMMAND_LONG', 'COMMAND_INT') and msg.command in self.EMERGENCY_COMMANDS:
+            return self.EMERGENCY
+        return self.MESSAGE_CLASSES.get(msg_type, self.NORMAL)
+
+    def send(self, msg, force_mavlink1=False, priority=None):
+        """Queue a message (replaces ``connection.mav.send``)"""
+        if self._send is None:
+            raise RuntimeError("OutgoingScheduler is not attached to a connection")
+        cls = priority or self.classify(msg)
+        now = self._clock()
+        kwargs = {"force_mavlink1": force_mavlink1} if force_mavlink1 else {}
+        if cls == self.EMERGENCY:
+            # Notfallbefehle überholen alles; ihre Bytes belasten das Budget
+            self._refill(now)
+            self._transmit(cls, msg, kwargs, now, now)
+            return
+        self._queues[cls].append((msg, kwargs, now))
+        self.flush(now)
+
+    @Slot()
+    def flush(self, now=None):
+        """Send what the budget allows, highest class first"""
+        if self._send is None:
+            return
+        now = self._clock() if now is None else now
+        self._refill(now)
+        for cls in self.CLASSES:
+            queue = self._queues[cls]
+            while queue:
+                msg, kwargs, queued = queue[0]
+                if self._tokens < self._estimate_size(msg):
+                    # Strikte Priorität: keine niedrigere Klasse vorlassen
+                    self._schedule(self._estimate_size(msg))
+                    return
+                queue.popleft()
+                self._transmit(cls, msg, kwargs, queued, now)
+
+    def _transmit(self, cls, msg, kwargs, queued, now):
+        mav = self._mav
+        before = getattr(mav, "total_bytes_sent", None)
+        self._send(msg, **kwargs)
+        after = getattr(mav, "total_bytes_sent", None)
+        size = after - before if isinstance(before, int) and isinstance(after, int) else self._estimate_size(msg)
+        if self._rate is not None:
+            self._tokens -= size
+        self._sent[cls] += 1
+        self._bytes[cls] += size
+        self._latency[cls].add(now - queued)
+        self._mark_dirty()
+
+    def _refill(self, now):
+        if self._rate is not None:
+            self._tokens = min(self._burst, self._tokens + (now - self._last_refill) * self._rate)
+        self._last_refill = now
+
+    def _schedule(self, needed):
+        if self._rate is None or self._timer.isActive():
+            return
+        wait_ms = max(1, int((needed - self._tokens) / self._rate * 1000.0 + 0.999))
+        self._timer.start(wait_ms)
+
+    def _estimate_size(self, msg):
+        unpacker = getattr(type(msg), "unpacker", None)
+        payload = unpacker.size if unpacker is not None else 0
+        return self.FRAME_OVERHEAD + payload
+
+    # --- Statistik -------------------------------------------------------
+
+    def queue_depth(self, cls=None):
+        """Queued messages of one class, or of all classes"""
+        if cls is not None:
+            return len(self._queues[cls])
+        return sum(len(queue) for queue in self._queues.values())
+
+    def stats(self):
+        """{class: depth, sent, bytes and queueing latency summary}"""
+        return {cls: {"depth": len(self._queues[cls]), "sent": self._sent[cls],
+                      "bytes": self._bytes[cls], "latency": self._latency[cls].summary()}
+                for cls in self.CLASSES}
+
+    @Slot()
+    def resetStats(self):
+        self._latency = {cls: LatencyHistogram() for cls in self.CLASSES}
+        self._sent = dict.fromkeys(self.CLASSES, 0)
+        self._bytes = dict.fromkeys(self.CLASSES, 0)
+        self.statsChanged.emit()
+
+    def _mark_dirty(self):
+        self._dirty = True
+
+    def _emit_stats(self):
+        if self._dirty:
+            self._dirty = False
+            self.statsChanged.emit()
+
+    @Property('QVariantMap', notify=statsChanged)
+    def queueStats(self):
+        return self.stats()
+
+    @Property(int, notify=statsChanged)
+    def queueDepth(self):
+        return self.queue_depth()
+
+    @Property(float, notify=statsChanged)
+    def byteRate(self):
+        return self._rate or 0.0
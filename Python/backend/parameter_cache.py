@@ -0,0 +1,143 @@
+"""
+On-disk cache of downloaded parameter sets.
+
+One JSON file per vehicle system id. It stores the firmware version and the
+parameter hash next to the values, so a cached set is only used while both
+still match the connected flight controller.
+
+The hash follows the ``_HASH_CHECK`` convention (as used by PX4 and QGC):
+NuttX ``crc32part`` over the name and the 4 value bytes of every parameter
+in index order. The flight controller answers a PARAM_REQUEST_READ of
+``_HASH_CHECK`` with a PARAM_VALUE whose float bits carry the uint32 hash.
+"""
+
+import json
+import os
+import struct
+import tempfile
+import time
+from pathlib import Path
+
+HASH_CHECK_PARAM = "_HASH_CHECK"
+
+
+def _crc32_table():
+    table = []
+    for byte in range(256):
+        crc = byte
+        for _ in range(8):
+            crc = (crc >> 1) ^ 0xEDB88320 if crc & 1 else crc >> 1
+        table.append(crc)
+    return tuple(table)
+
+
+_CRC32_TABLE = _crc32_table()
+
+
+def crc32part(data, crc=0):
+    """
+    NuttX ``crc32part``: reflected CRC-32 without inversion before or after.
+
+    Unlike ``zlib.crc32`` the running value is used as is, so chaining
+    calls starting at 0 gives the hash PX4 reports for ``_HASH_CHECK``.
+    """
+    table = _CRC32_TABLE
+    for byte in data:
+        crc = table[(crc ^ byte) & 0xFF] ^ (crc >> 8)
+    return crc
+
+
+def compute_parameter_hash(params):
+    """crc32part over name and float32 value bytes of each parameter (list order)"""
+    crc = 0
+    for param in params:
+        name = param["name"]
+        if name == HASH_CHECK_PARAM:
+            continue
+        crc = crc32part(name.encode("ascii", "replace"), crc)
+        crc = crc32part(struct.pack("<f", float(param["value"])), crc)
+    return crc
+
+
+def hash_from_param_value(value):
+    """uint32 hash carried in the float bits of a _HASH_CHECK PARAM_VALUE"""
+    return struct.unpack("<I", struct.pack("<f", value))[0]
+
+
+def firmware_from_autopilot_version(flight_sw_version):
+    """'major.minor.patch' from AUTOPILOT_VERSION.flight_sw_version"""
+    return (f"{(flight_sw_version >> 24) & 0xFF}."
+            f"{(flight_sw_version >> 16) & 0xFF}."
+            f"{(flight_sw_version >> 8) & 0xFF}")
+
+
+class ParameterCache:
+    """
+    Stores parameter lists per vehicle.
+
+    ``load`` returns the cached entry only if the firmware version is known
+    and matches; an entry of an unknown firmware is never used.
+    Writes go to a temporary file that replaces the old one, so a crash
+    never leaves a half-written cache.
+    """
+
+    VERSION = 1
+
+    def __init__(self, directory):
+        self._directory = Path(directory)
+
+    @staticmethod
+    def default_directory():
+        return Path(__file__).resolve().parent.parent / "cache" / "parameters"
+
+    @property
+    def directory(self):
+        return self._directory
+
+    def path_for(self, sysid):
+        return self._directory / f"sys{int(sysid)}.json"
+
+    def load(self, sysid, firmware=None):
+        """Cached entry dict (sysid, firmware, hash, saved, parameters) or None"""
+        path = self.path_for(sysid)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if entry.get("version") != self.VERSION or not entry.get("parameters"):
+            return None
+        if not firmware or entry.get("firmware") != firmware:
+            return None
+        return entry
+
+    def save(self, sysid, params, firmware=None, param_hash=None):
+        """Write a parameter list; the hash is computed if not given"""
+        if param_hash is None:
+            param_hash = compute_parameter_hash(params)
+        entry = {
+            "version": self.VERSION,
+            "sysid": int(sysid),
+            "firmware": firmware or "",
+            "hash": int(param_hash),
+            "saved": time.time(),
+            "parameters": [{"name": p["name"], "value": p["value"]} for p in params],
+        }
+        self._directory.mkdir(parents=True, exist_ok=True)
+        path = self.path_for(sysid)
+        fd, temp_path = tempfile.mkstemp(dir=self._directory, prefix=path.name, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(entry, f, separators=(",", ":"))
+            os.replace(temp_path, path)
+        except OSError:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        return entry
+
+    def invalidate(self, sysid):
+        try:
+            os.remove(self.path_for(sysid))
+        except OSError:
+            pass
@@ -0,0 +1,307 @@
+"""
+Event-driven download of the flight controller parameter list.
+
+The download never blocks the Qt thread: it sends PARAM_REQUEST_LIST and
+then only reacts to PARAM_VALUE messages delivered by the MessageDispatcher
+and to a periodic timer. Received values are tracked by ``param_index``
+against ``param_count``; indices that were lost on the link are re-requested
+with PARAM_REQUEST_READ in pipelined windows.
+"""
+
+import time
+
+from PySide6.QtCore import QObject, Signal, Slot, Property, QTimer
+
+
+class ParameterDownloader(QObject):
+    """
+    State machine for one parameter download.
+
+    States:
+        idle       no download running
+        listing    PARAM_REQUEST_LIST sent, the FC streams the list
+        filling    re-requesting missing indices with PARAM_REQUEST_READ
+        done       all ``param_count`` values received
+        failed     gave up (no answer, or indices still missing after retries)
+
+    An incomplete download keeps what it has received. ``resume()`` (or a new
+    ``start()`` on the same connection) only requests the missing indices.
+
+    Signals:
+        progressChanged(int, int): Received values and total count
+        parameterReceived(object): Parameter dict of every new value
+        finished(list): All parameters, ordered by index
+        failed(str): The download gave up
+        stateChanged(str): The state changed
+    """
+
+    progressChanged = Signal(int, int)
+    parameterReceived = Signal(object)
+    finished = Signal(list)
+    failed = Signal(str)
+    stateChanged = Signal(str)
+
+    IDLE = "idle"
+    LISTING = "listing"
+    FILLING = "filling"
+    DONE = "done"
+    FAILED = "failed"
+
+    TICK_MS = 100
+    LIST_TIMEOUT = 3.0  # Sekunden ohne Antwort auf PARAM_REQUEST_LIST
+    LIST_RETRIES = 3
+    GAP_TIMEOUT = 1.0  # Pause im Listenstrom, nach der Lücken nachgefordert werden
+    READ_TIMEOUT = 0.5  # Antwortzeit für ein einzelnes PARAM_REQUEST_READ
+    READ_RETRIES = 5
+    WINDOW = 8  # Gleichzeitig offene PARAM_REQUEST_READ
+
+    def __init__(self, clock=time.monotonic, parent=None):
+        super().__init__(parent)
+        self._clock = clock
+        self._connection = None
+        self._state = self.IDLE
+        self._count = None
+        self._received = {}  # param_index -> Parameter-Dict
+        self._last_rx = 0.0
+        self._list_requests = 0
+        self._missing = []  # noch anzufordernde Indizes (aufsteigend)
+        self._outstanding = {}  # param_index -> Sendezeit
+        self._retries = {}  # param_index -> Anzahl PARAM_REQUEST_READ
+        self._started = 0.0
+        self._duration = 0.0
+
+        self._timer = QTimer(self)
+        self._timer.setInterval(self.TICK_MS)
+        self._timer.timeout.connect(self.poll)
+
+    # --- Zustand ---------------------------------------------------------
+
+    @property
+    def state(self):
+        return self._state
+
+    @property
+    def connection(self):
+        return self._connection
+
+    @property
+    def count(self):
+        """param_count reported by the FC, or None before the first value"""
+        return self._count
+
+    @property
+    def received_count(self):
+        return len(self._received)
+
+    @property
+    def duration(self):
+        """Seconds from start to the end of the last download"""
+        return self._duration
+
+    def missing_indices(self):
+        if self._count is None:
+            return []
+        return [i for i in range(self._count) if i not in self._received]
+
+    def parameters(self):
+        """Received parameters, ordered by index"""
+        return [self._received[i] for i in sorted(self._received)]
+
+    def is_active(self):
+        return self._state in (self.LISTING, self.FILLING)
+
+    def is_complete(self):
+        return self._count is not None and len(self._received) >= self._count
+
+    @Property(bool, notify=stateChanged)
+    def active(self):
+        return self.is_active()
+
+    @Property(float, notify=progressChanged)
+    def progress(self):
+        """0.0 - 1.0"""
+        if not self._count:
+            return 0.0
+        return min(1.0, len(self._received) / self._count)
+
+    def _set_state(self, state):
+        if state != self._state:
+            self._state = state
+            self.stateChanged.emit(state)
+
+    # --- Steuerung -------------------------------------------------------
+
+    def start(self, connection):
+        """
+        Start (or resume) a download on the given connection.
+
+        If an incomplete download of the same connection exists, only the
+        missing indices are requested.
+        """
+        if connection is self._connection and self._count is not None and not self.is_complete():
+            self.resume()
+            return
+        self._connection = connection
+        self._count = None
+        self._received = {}
+        self._missing = []
+        self._outstanding = {}
+        self._retries = {}
+        self._list_requests = 0
+        self._started = self._clock()
+        self._duration = 0.0
+        self._set_state(self.LISTING)
+        self._request_list()
+        self._timer.start()
+
+    @Slot()
+    def resume(self):
+        """Continue an incomplete download with the missing indices"""
+        if self._connection is None or self._count is None or self.is_complete():
+            return
+        self._retries = {}
+        self._outstanding = {}
+        self._started = self._clock()
+        self._enter_filling()
+        self._timer.start()
+
+    @Slot()
+    def cancel(self):
+        """Stop requesting; what was received so far is kept"""
+        self._timer.stop()
+        self._outstanding = {}
+        if self.is_active():
+            self._set_state(self.IDLE)
+
+    def reset(self):
+        """Forget everything (e.g. after a reconnect)"""
+        self.cancel()
+        self._connection = None
+        self._count = None
+        self._received = {}
+        self._missing = []
+        self._set_state(self.IDLE)
+
+    # --- Nachrichten -----------------------------------------------------
+
+    def handle_param_value(self, msg):
+        """
+        Feed a PARAM_VALUE message.
+
+        Returns the parameter dict if the message belonged to the download,
+        otherwise None (answers to PARAM_SET or reads by name).
+        """
+        if not self.is_active():
+            return None
+        count = msg.param_count
+        index = msg.param_index
+        if count <= 0 or index < 0 or index >= count or index == 65535:
+            return None
+
+        self._last_rx = self._clock()
+        if self._count is None or count != self._count:
+            # Erste Antwort (oder die Parameteranzahl hat sich geändert)
+            if self._count is not None:
+                self._received = {i: p for i, p in self._received.items() if i < count}
+            self._count = count
+
+        param = {
+            "name": msg.param_id,
+            "value": msg.param_value,
+            "defaultValue": "",
+            "unit": "",
+            "options": "",
+            "desc": "",
+        }
+        is_new = index not in self._received
+        self._received[index] = param
+        self._outstanding.pop(index, None)
+        if is_new:
+            self.parameterReceived.emit(param)
+            self.progressChanged.emit(len(self._received), self._count)
+
+        if self.is_complete():
+            self._finish()
+        elif self._state == self.LISTING and index == self._count - 1:
+            # Letzter Index der Liste: Lücken sofort nachfordern statt zu warten
+            self._enter_filling()
+        elif self._state == self.FILLING:
+            self._fill_window()
+        return param
+
+    @Slot()
+    def poll(self, now=None):
+        """Timer tick: detect timeouts and re-request what is missing"""
+        if not self.is_active():
+            self._timer.stop()
+            return
+        now = self._clock() if now is None else now
+
+        if self._state == self.LISTING:
+            if self._count is None:
+                if now - self._last_rx >= self.LIST_TIMEOUT:
+                    if self._list_requests >= self.LIST_RETRIES:
+                        self._fail("No answer to the parameter request")
+                    else:
+                        self._request_list()
+            elif now - self._last_rx >= self.GAP_TIMEOUT:
+                self._enter_filling()
+            return
+
+        # FILLING: unbeantwortete Anfragen erneut einreihen
+        expired = [i for i, sent in self._outstanding.items() if now - sent >= self.READ_TIMEOUT]
+        for index in expired:
+            del self._outstanding[index]
+            if index not in self._received:
+                self._missing.append(index)
+        if expired:
+            self._missing.sort()
+            self._fill_window(now)
+
+    def _request_list(self):
+        self._list_requests += 1
+        self._last_rx = self._clock()
+        self._connection.param_fetch_all()
+
+    def _enter_filling(self):
+        self._set_state(self.FILLING)
+        self._missing = self.missing_indices()
+        self._fill_window()
+
+    def _fill_window(self, now=None):
+        now = self._clock() if now is None else now
+        while self._missing and len(self._outstanding) < self.WINDOW:
+            index = self._missing.pop(0)
+            if index in self._received or index in self._outstanding:
+                continue
+            retries = self._retries.get(index, 0)
+            if retries >= self.READ_RETRIES:
+                continue
+            self._retries[index] = retries + 1
+            self._outstanding[index] = now
+            self._request_read(index)
+
+        if not self._outstanding and not self._missing and not self.is_complete():
+            missing = len(self.missing_indices())
+            self._fail(f"{missing} parameters missing after {self.READ_RETRIES} retries")
+
+    def _request_read(self, index):
+        connection = self._connection
+        connection.mav.param_request_read_send(
+            connection.target_system, connection.target_component, b"", index)
+
+    def _finish(self):
+        self._timer.stop()
+        self._outstanding = {}
+        self._missing = []
+        self._duration = self._clock() - self._started
+        self._set_state(self.DONE)
+        self.finished.emit(self.parameters())
+
+    def _fail(self, reason):
+        self._timer.stop()
+        self._outstanding = {}
+        self._missing = []
+        self._duration = self._clock() - self._started
+        self._set_state(self.FAILED)
+        self.failed.emit(reason)
@@ -1,6 +1,13 @@
-from PySide6.QtCore import QObject, Signal, Slot
+import os
+
+from PySide6.QtCore import QObject, Signal, Slot, QTimer
+from pymavlink import mavutil
 from .parameter_model import ParameterTableModel
 from .logger import Logger
+from .parameter_downloader import ParameterDownloader
+from .parameter_writer import ParameterWriter, parse_parameter_file
+from .parameter_cache import (HASH_CHECK_PARAM, hash_from_param_value,
+                              firmware_from_autopilot_version)
 
 class ParameterManager(QObject):
     """Manages parameter data and updates"""
@@ -9,72 +16,357 @@ class ParameterManager(QObject):
     parametersLoaded = Signal(list)  # Emits list of parameters
     parameterUpdated = Signal(str, float)  # Emits parameter name and value
     errorOccurred = Signal(str)  # Emits error message
+    loadProgress = Signal(int, int)  # Received parameters, total count
+    cacheVerified = Signal(bool)  # True: cached set confirmed, False: reloading
+    writeProgress = Signal(int, int)  # Parameters with a result, total count
+    writeFinished = Signal(dict)  # name -> result dict (see ParameterWriter)
+
+    HASH_TIMEOUT_MS = 3000  # Wartezeit auf die Antwort zu _HASH_CHECK bzw. die Stichproben
+    SAMPLE_COUNT = 8  # Stichproben per PARAM_REQUEST_READ, wenn der FC kein _HASH_CHECK kennt
+    VERSION_TIMEOUT_MS = 2000  # Wartezeit auf AUTOPILOT_VERSION nach dem Verbinden
     
-    def __init__(self, parameter_model: ParameterTableModel, logger: Logger):
+    def __init__(self, parameter_model: ParameterTableModel, logger: Logger, cache=None):
         super().__init__()
         self._parameter_model = parameter_model
         self._logger = logger
         self._mavlink_connection = None
+
+        # Optionaler Parameter-Cache auf der Festplatte (ParameterCache)
+        self._cache = cache
+        self._firmware = None
+        self._fc_hash = None  # Zuletzt vom FC gemeldeter _HASH_CHECK
+        self._cached_entry = None  # Aus dem Cache geladen, Prüfung läuft
+        self._samples = {}  # param_index -> (Name, Wert) der ausstehenden Stichproben
+        self._verify_timer = QTimer(self)
+        self._verify_timer.setSingleShot(True)
+        self._verify_timer.setInterval(self.HASH_TIMEOUT_MS)
+        self._verify_timer.timeout.connect(self._on_verify_timeout)
+
+        # Firmware-Version für den Cache: beim Verbinden angefordert, load_parameters() wartet darauf
+        self._load_pending = False
+        self._version_timer = QTimer(self)
+        self._version_timer.setSingleShot(True)
+        self._version_timer.setInterval(self.VERSION_TIMEOUT_MS)
+        self._version_timer.timeout.connect(self._on_version_timeout)
+
+        # Nicht blockierender Download (PARAM_VALUE kommt über den Dispatcher)
+        self._downloader = ParameterDownloader(parent=self)
+        self._downloader.progressChanged.connect(self._on_download_progress)
+        self._downloader.finished.connect(self._on_download_finished)
+        self._downloader.failed.connect(self._on_download_failed)
+
+        # Schreiben mit Bestätigung durch das PARAM_VALUE-Echo
+        self._writer = ParameterWriter(parent=self)
+        self._writer.progressChanged.connect(self.writeProgress)
+        self._writer.finished.connect(self._on_write_finished)
         
     def set_connection(self, connection):
-        """Set the MAVLink connection to use"""
+        """Set the MAVLink connection to use; requests AUTOPILOT_VERSION for the cache"""
+        if connection is self._mavlink_connection:
+            return
+        self._downloader.reset()
+        self._writer.cancel()
+        self._verify_timer.stop()
+        self._version_timer.stop()
+        self._load_pending = False
+        self._cached_entry = None
+        self._samples = {}
+        self._fc_hash = None
+        self._firmware = None
         self._mavlink_connection = connection
-        
+        if connection is not None and self._cache is not None:
+            self._request_firmware_version()
+
+    def _request_firmware_version(self):
+        connection = self._mavlink_connection
+        try:
+            connection.mav.command_long_send(
+                connection.target_system, connection.target_component,
+                mavutil.mavlink.MAV_CMD_REQUEST_MESSAGE, 0,
+                mavutil.mavlink.MAVLINK_MSG_ID_AUTOPILOT_VERSION, 0, 0, 0, 0, 0, 0)
+        except Exception as e:
+            self._logger.addLog(f"⚠️ Could not request firmware version: {str(e)}")
+            return
+        self._version_timer.start()
+
+    def register(self, dispatcher):
+        """Subscribe the PARAM_VALUE handler at a MessageDispatcher"""
+        dispatcher.subscribe('PARAM_VALUE', self.handle_parameter)
+        dispatcher.subscribe('AUTOPILOT_VERSION', self.handle_autopilot_version)
+
+    def unregister(self, dispatcher):
+        """Remove the PARAM_VALUE handler from a MessageDispatcher"""
+        dispatcher.unsubscribe('PARAM_VALUE', self.handle_parameter)
+        dispatcher.unsubscribe('AUTOPILOT_VERSION', self.handle_autopilot_version)
+
+    def set_cache(self, cache):
+        """Use a ParameterCache (None disables caching)"""
+        self._cache = cache
+
+    @Slot(object)
+    def handle_autopilot_version(self, msg):
+        """Remember the firmware version for the parameter cache"""
+        self._firmware = firmware_from_autopilot_version(msg.flight_sw_version)
+        self._version_timer.stop()
+        if self._load_pending:
+            self._load_pending = False
+            self._start_loading()
+
+    def _on_version_timeout(self):
+        if not self._load_pending:
+            return
+        # Firmware unbekannt: _load_from_cache() lässt den Cache aus
+        self._load_pending = False
+        self._logger.addLog("[LOAD] No firmware version from FC, skipping parameter cache")
+        self._start_loading()
+
     @Slot()
     def load_parameters(self):
-        """Load parameters from the flight controller"""
+        """
+        Start loading the parameters from the flight controller.
+
+        Returns immediately; the values arrive through the dispatcher while
+        telemetry keeps flowing. An interrupted download of the same
+        connection is resumed. While the AUTOPILOT_VERSION requested on
+        connect is outstanding, loading waits for it (at most
+        ``VERSION_TIMEOUT_MS``) so the cache lookup knows the firmware.
+        """
         if not self._mavlink_connection:
             error_msg = "[ERR] Not connected to FC!"
             self._logger.addLog(error_msg)
             self.errorOccurred.emit(error_msg)
             return
-            
+
+        if self._version_timer.isActive():
+            self._load_pending = True
+            self._logger.addLog("[LOAD] Waiting for firmware version...")
+            return
+        self._start_loading()
+
+    def _start_loading(self):
         try:
+            if self._load_from_cache():
+                return
             self._logger.addLog("[LOAD] Loading parameters from FC...")
-            params = []
-            self._mavlink_connection.param_fetch_all()
-            
-            while True:
-                msg = self._mavlink_connection.recv_match(type='PARAM_VALUE', blocking=True, timeout=2)
-                if not msg:
-                    break
-                    
-                param = {
-                    "name": msg.param_id,
-                    "value": msg.param_value,
-                    "defaultValue": "",  # Optional: add from XML
-                    "unit": "",
-                    "options": "",
-                    "desc": ""
-                }
-                params.append(param)
-                self.parameterUpdated.emit(param["name"], param["value"])
-                
-            if self._parameter_model:
-                self._parameter_model.set_parameters(params)
-                self.parametersLoaded.emit(params)
-            self._logger.addLog(f"[OK] {len(params)} parameters loaded")
-            
+            self._downloader.start(self._mavlink_connection)
         except Exception as e:
             error_msg = f"[ERR] Error loading parameters: {str(e)}"
             self._logger.addLog(error_msg)
             self.errorOccurred.emit(error_msg)
-            
+
+    @Slot()
+    def cancel_loading(self):
+        """Stop an ongoing parameter download (received values are kept)"""
+        self._load_pending = False
+        self._downloader.cancel()
+
+    def get_downloader(self):
+        return self._downloader
+
+    def get_writer(self):
+        return self._writer
+
+    def write_parameters(self, params):
+        """
+        Write several parameters with acknowledgement tracking.
+
+        ``params`` is a {name: value} dict, a list of parameter dicts or the
+        path of a parameter file. Values that already match the parameter
+        model are not sent. Returns immediately; the per-parameter results
+        arrive with writeFinished.
+        """
+        if not self._mavlink_connection:
+            error_msg = "[ERR] Not connected to FC!"
+            self._logger.addLog(error_msg)
+            self.errorOccurred.emit(error_msg)
+            return False
+
+        try:
+            if isinstance(params, (str, os.PathLike)):
+                params = parse_parameter_file(params)
+            elif isinstance(params, list):
+                params = {p["name"]: p["value"] for p in params}
+            current = None
+            if self._parameter_model:
+                current = {p.get("name"): p.get("value") for p in self._parameter_model.get_parameters()}
+            self._logger.addLog(f"[LOAD] Writing {len(params)} parameters...")
+            self._writer.start(self._mavlink_connection, params, current)
+            return True
+        except (OSError, ValueError, KeyError) as e:
+            error_msg = f"[ERR] Error writing parameters: {str(e)}"
+            self._logger.addLog(error_msg)
+            self.errorOccurred.emit(error_msg)
+            return False
+
+    @Slot(str, result=bool)
+    def write_parameter_file(self, path):
+        """Write all parameters of a parameter file"""
+        return self.write_parameters(path)
+
+    @Slot()
+    def cancel_writing(self):
+        """Stop an ongoing bulk write"""
+        self._writer.cancel()
+
+    def _on_write_finished(self, results):
+        failed = self._writer.failed_names()
+        unchanged = sum(1 for r in results.values() if r["status"] == ParameterWriter.UNCHANGED)
+        if failed:
+            error_msg = (f"[ERR] {len(failed)} of {len(results)} parameters not written: "
+                         f"{', '.join(failed[:10])}")
+            self._logger.addLog(error_msg)
+            self.errorOccurred.emit(error_msg)
+        else:
+            self._logger.addLog(
+                f"[OK] {len(results)} parameters written ({unchanged} unchanged) "
+                f"in {self._writer.duration:.1f} s")
+        self.writeFinished.emit(results)
+
+    def _vehicle_sysid(self):
+        return getattr(self._mavlink_connection, "target_system", 0) or 0
+
+    def _load_from_cache(self):
+        """Show a matching cached set at once and verify it in the background"""
+        if self._cache is None or self._firmware is None or self._downloader.is_active():
+            # Ohne Firmware-Version könnte der Satz von einer anderen Firmware stammen
+            return False
+        entry = self._cache.load(self._vehicle_sysid(), self._firmware)
+        if entry is None:
+            return False
+
+        params = [self._make_param(p["name"], p["value"]) for p in entry["parameters"]]
+        if self._parameter_model:
+            self._parameter_model.set_parameters(params)
+        self.parametersLoaded.emit(params)
+        self._logger.addLog(f"[OK] {len(params)} parameters loaded from cache, verifying...")
+
+        # Hintergrundprüfung: FC nach dem Parameter-Hash fragen
+        self._cached_entry = entry
+        self._fc_hash = None
+        connection = self._mavlink_connection
+        connection.mav.param_request_read_send(
+            connection.target_system, connection.target_component,
+            HASH_CHECK_PARAM.encode("ascii"), -1)
+        self._verify_timer.start()
+        return True
+
+    def _on_hash_check(self, fc_hash):
+        self._fc_hash = fc_hash
+        entry = self._cached_entry
+        if entry is None:
+            return
+        if fc_hash == entry["hash"]:
+            self._cache_verified("[OK] Parameter cache verified")
+        else:
+            self._reload("[LOAD] Parameters changed on the FC, reloading...")
+
+    def _on_verify_timeout(self):
+        if self._cached_entry is None or self._mavlink_connection is None:
+            return
+        if self._samples:
+            self._reload("[LOAD] Parameter samples not answered, reloading...")
+            return
+        # Ohne _HASH_CHECK-Unterstützung (z.B. ArduPilot): Anzahl und einige Werte per Stichprobe prüfen
+        params = self._cached_entry["parameters"]
+        last = len(params) - 1
+        indices = {round(i * last / (self.SAMPLE_COUNT - 1)) for i in range(self.SAMPLE_COUNT)}
+        self._samples = {i: (params[i]["name"], params[i]["value"]) for i in indices}
+        self._logger.addLog(f"[LOAD] No parameter hash from FC, checking {len(indices)} samples...")
+        connection = self._mavlink_connection
+        for index in sorted(indices):
+            connection.mav.param_request_read_send(
+                connection.target_system, connection.target_component, b"", index)
+        self._verify_timer.start()
+
+    def _check_sample(self, msg):
+        """Compare the answer to a sample read; True if it was one"""
+        expected = self._samples.pop(msg.param_index, None)
+        if expected is None:
+            return False
+        if (msg.param_count != len(self._cached_entry["parameters"])
+                or (msg.param_id, msg.param_value) != expected):
+            self._reload("[LOAD] Parameters changed on the FC, reloading...")
+        elif not self._samples:
+            self._cache_verified("[OK] Parameter cache verified by samples")
+        return True
+
+    def _cache_verified(self, message):
+        self._verify_timer.stop()
+        self._cached_entry = None
+        self._samples = {}
+        self._logger.addLog(message)
+        self.cacheVerified.emit(True)
+
+    def _reload(self, message):
+        self._verify_timer.stop()
+        self._cached_entry = None
+        self._samples = {}
+        self._logger.addLog(message)
+        self.cacheVerified.emit(False)
+        self._downloader.start(self._mavlink_connection)
+
+    def _save_to_cache(self, params):
+        if self._cache is None or self._firmware is None or not params:
+            return
+        try:
+            self._cache.save(self._vehicle_sysid(), params, self._firmware, self._fc_hash)
+        except OSError as e:
+            self._logger.addLog(f"⚠️ Could not write parameter cache: {str(e)}")
+
+    @staticmethod
+    def _make_param(name, value):
+        return {
+            "name": name,
+            "value": value,
+            "defaultValue": "",
+            "unit": "",
+            "options": "",
+            "desc": ""
+        }
+
+    def _on_download_progress(self, received, total):
+        self.loadProgress.emit(received, total)
+
+    def _on_download_finished(self, params):
+        if self._parameter_model:
+            self._parameter_model.set_parameters(params)
+        self.parametersLoaded.emit(params)
+        self._logger.addLog(
+            f"[OK] {len(params)} parameters loaded in {self._downloader.duration:.1f} s")
+        self._save_to_cache(params)
+
+    def _on_download_failed(self, reason):
+        params = self._downloader.parameters()
+        # Teilergebnis trotzdem anzeigen - load_parameters() setzt fort
+        if self._parameter_model and params:
+            self._parameter_model.set_parameters(params)
+        error_msg = f"[ERR] Error loading parameters: {reason} ({len(params)} received)"
+        self._logger.addLog(error_msg)
+        self.errorOccurred.emit(error_msg)
+
     @Slot(object)
     def handle_parameter(self, msg):
         """Handle parameter message"""
-        if not self._parameter_model:
-            return
-            
         try:
-            param = {
-                "name": msg.param_id,
-                "value": msg.param_value,
-                "defaultValue": "",
-                "unit": "",
-                "options": "",
-                "desc": ""
-            }
+            if msg.param_id == HASH_CHECK_PARAM:
+                self._on_hash_check(hash_from_param_value(msg.param_value))
+                return
+            if self._samples and self._check_sample(msg):
+                return
+
+            # Echo eines PARAM_SET: bestätigen und danach wie jeden Wert übernehmen
+            self._writer.handle_param_value(msg)
+
+            # Während eines Downloads sammelt der Downloader die Werte
+            param = self._downloader.handle_param_value(msg)
+            if param is not None:
+                self.parameterUpdated.emit(param["name"], param["value"])
+                return
+
+            if not self._parameter_model:
+                return
+
+            param = self._make_param(msg.param_id, msg.param_value)
             self._parameter_model.add_parameter(param)
             self.parameterUpdated.emit(param["name"], param["value"])
         except Exception as e:
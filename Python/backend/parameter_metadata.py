@@ -0,0 +1,213 @@
+"""
+ArduPilot parameter metadata (units, options, descriptions, defaults).
+
+The parameter definition XML (``apm.pdef.xml``) is parsed once and compiled
+into a compact binary file that is memory-mapped on startup. Opening it only
+validates the header; a lookup is a binary search over fixed-size name
+records, and only the fields of the requested parameter are decoded.
+
+Binary layout (little endian)::
+
+    header   magic "RZPM", version, count, source size, source mtime_ns,
+             vehicle (16 bytes)
+    index    count x (name 16 bytes, data offset u32, data length u32),
+             sorted by name
+    data     per parameter: FIELDS in order, each u32 length + UTF-8 bytes
+"""
+
+import mmap
+import os
+import struct
+import tempfile
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+FIELDS = ("humanName", "desc", "unit", "options", "range", "defaultValue")
+
+_HEADER = struct.Struct("<4sIIQQ16s")
+_RECORD = struct.Struct("<16sII")
+_LENGTH = struct.Struct("<I")
+_MAGIC = b"RZPM"
+_VERSION = 1
+NAME_LENGTH = 16  # MAVLink param_id
+
+
+def parse_parameter_xml(path, vehicle=None):
+    """
+    Parse an ArduPilot parameter definition XML.
+
+    Returns {name: {field: str}}. Vehicle parameters are named
+    ``"ArduCopter:NAME"`` in the file; the prefix is dropped. With
+    ``vehicle`` given, other vehicles' sections are skipped.
+    """
+    entries = {}
+    for _, element in ET.iterparse(path, events=("end",)):
+        if element.tag != "parameters":
+            continue
+        for param in element.iter("param"):
+            name = param.get("name", "")
+            if ":" in name:
+                prefix, name = name.split(":", 1)
+                if vehicle and prefix != vehicle:
+                    continue
+            if not name or len(name) > NAME_LENGTH or name in entries:
+                continue
+            entries[name] = _parse_param(param)
+        element.clear()
+    return entries
+
+
+def _parse_param(param):
+    fields = {child.get("name"): (child.text or "").strip() for child in param.findall("field")}
+    values = [f"{value.get('code')}:{(value.text or '').strip()}" for value in param.iter("value")]
+    if not values and fields.get("Bitmask"):
+        values = [item.strip() for item in fields["Bitmask"].split(",") if item.strip()]
+    return {
+        "humanName": param.get("humanName", ""),
+        "desc": " ".join(param.get("documentation", "").split()),
+        "unit": fields.get("Units", ""),
+        "options": ",".join(values),
+        "range": fields.get("Range", ""),
+        "defaultValue": fields.get("Default", ""),
+    }
+
+
+def compile_metadata(entries, cache_path, source_size=0, source_mtime_ns=0, vehicle=None):
+    """Write entries ({name: {field: str}}) as binary metadata file"""
+    names = sorted(entries, key=lambda n: n.encode("ascii", "replace"))
+    index = bytearray()
+    data = bytearray()
+    for name in names:
+        entry = entries[name]
+        offset = len(data)
+        for field in FIELDS:
+            value = str(entry.get(field, "") or "").encode("utf-8")
+            data += _LENGTH.pack(len(value))
+            data += value
+        index += _RECORD.pack(name.encode("ascii", "replace"), offset, len(data) - offset)
+
+    header = _HEADER.pack(_MAGIC, _VERSION, len(names), source_size, source_mtime_ns,
+                          (vehicle or "").encode("ascii", "replace")[:16])
+    cache_path = Path(cache_path)
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=cache_path.parent, prefix=cache_path.name, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(header)
+            f.write(index)
+            f.write(data)
+        os.replace(temp_path, cache_path)
+    except OSError:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+class ParameterMetadata:
+    """
+    Read-only, memory-mapped metadata store keyed by parameter name.
+
+    ``get(name)`` returns a dict with the FIELDS or None. Use ``load`` to get
+    an instance for an XML file; the binary cache is rebuilt only when the
+    XML changed.
+    """
+
+    def __init__(self, cache_path):
+        self._path = Path(cache_path)
+        self._file = open(self._path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, version, count, size, mtime_ns, vehicle = _HEADER.unpack_from(self._map, 0)
+        except (ValueError, struct.error, OSError):
+            self._file.close()
+            raise ValueError(f"Invalid parameter metadata file: {cache_path}")
+        if magic != _MAGIC or version != _VERSION:
+            self.close()
+            raise ValueError(f"Invalid parameter metadata file: {cache_path}")
+        self._count = count
+        self.source_size = size
+        self.source_mtime_ns = mtime_ns
+        self.vehicle = vehicle.rstrip(b"\0").decode("ascii", "replace")
+        self._data_start = _HEADER.size + count * _RECORD.size
+
+    @staticmethod
+    def default_cache_path(xml_path, vehicle=None):
+        cache_dir = Path(__file__).resolve().parent.parent / "cache" / "metadata"
+        return cache_dir / f"{Path(xml_path).stem}-{vehicle or 'all'}.bin"
+
+    @classmethod
+    def load(cls, xml_path, cache_path=None, vehicle=None):
+        """Open the binary cache of an XML file, compiling it if it is missing or stale"""
+        xml_path = Path(xml_path)
+        cache_path = Path(cache_path) if cache_path else cls.default_cache_path(xml_path, vehicle)
+        stat = xml_path.stat()
+        if cache_path.exists():
+            try:
+                metadata = cls(cache_path)
+                if (metadata.source_size == stat.st_size
+                        and metadata.source_mtime_ns == stat.st_mtime_ns
+                        and metadata.vehicle == (vehicle or "")):
+                    return metadata
+                metadata.close()
+            except ValueError:
+                pass
+        entries = parse_parameter_xml(xml_path, vehicle)
+        compile_metadata(entries, cache_path, stat.st_size, stat.st_mtime_ns, vehicle)
+        return cls(cache_path)
+
+    @property
+    def path(self):
+        return self._path
+
+    def __len__(self):
+        return self._count
+
+    def __contains__(self, name):
+        return self._find(name) >= 0
+
+    def _name_at(self, i):
+        start = _HEADER.size + i * _RECORD.size
+        return self._map[start:start + NAME_LENGTH]
+
+    def _find(self, name):
+        try:
+            key = name.encode("ascii").ljust(NAME_LENGTH, b"\0")
+        except (UnicodeEncodeError, AttributeError):
+            return -1
+        if len(key) > NAME_LENGTH:
+            return -1
+        low, high = 0, self._count
+        while low < high:
+            mid = (low + high) // 2
+            if self._name_at(mid) < key:
+                low = mid + 1
+            else:
+                high = mid
+        if low < self._count and self._name_at(low) == key:
+            return low
+        return -1
+
+    def get(self, name):
+        """Metadata dict of a parameter, or None if unknown"""
+        i = self._find(name)
+        if i < 0:
+            return None
+        _, offset, _ = _RECORD.unpack_from(self._map, _HEADER.size + i * _RECORD.size)
+        position = self._data_start + offset
+        entry = {}
+        for field in FIELDS:
+            (length,) = _LENGTH.unpack_from(self._map, position)
+            position += _LENGTH.size
+            entry[field] = self._map[position:position + length].decode("utf-8", "replace")
+            position += length
+        return entry
+
+    def names(self):
+        return [self._name_at(i).rstrip(b"\0").decode("ascii", "replace") for i in range(self._count)]
+
+    def close(self):
+        if getattr(self, "_map", None) is not None:
+            self._map.close()
+            self._map = None
+        if not self._file.closed:
+            self._file.close()
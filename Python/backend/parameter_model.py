@@ -1,6 +1,23 @@
-from PySide6.QtCore import QAbstractListModel, Qt, QModelIndex, Slot, Signal, QSortFilterProxyModel
+import bisect
+
+from PySide6.QtCore import (QAbstractListModel, QAbstractProxyModel, Qt, QModelIndex, Slot, Signal,
+                            Property, QSortFilterProxyModel, QTimer)
+
+from .parameter_search import ParameterSearchIndex, search_text as search_text_of, split_terms
 
 class ParameterTableModel(QAbstractListModel):
+    """
+    Parameter list for the parameter view.
+
+    Rows are found through a name -> row index. ``add_parameter`` is an
+    upsert: a known name updates its row in place (``dataChanged``), new
+    names are collected and inserted in one ``rowsInserted`` per flush.
+
+    With ``set_metadata`` attached, empty unit/options/desc/defaultValue
+    fields are looked up by name when a row is first read through ``data()``
+    (i.e. when QML shows it) and remembered per name.
+    """
+
     NameRole = Qt.UserRole + 1
     ValueRole = Qt.UserRole + 2
     DefaultValueRole = Qt.UserRole + 3
@@ -12,9 +29,28 @@ class ParameterTableModel(QAbstractListModel):
     parametersLoaded = Signal()
     parameterChanged = Signal(str, str)  # Name des Parameters, neuer Wert
 
+    # Feld im Parameter-Dict -> Rolle (für dataChanged beim Upsert)
+    FIELD_ROLES = {
+        "value": Qt.UserRole + 2,
+        "defaultValue": Qt.UserRole + 3,
+        "unit": Qt.UserRole + 4,
+        "options": Qt.UserRole + 5,
+        "desc": Qt.UserRole + 6,
+    }
+
+    INSERT_FLUSH_MS = 50  # Neue Parameter gesammelt einfügen
+
+    # Felder, die aus den Parameter-Metadaten ergänzt werden
+    METADATA_FIELDS = ("defaultValue", "unit", "options", "desc")
+
     def __init__(self):
         super().__init__()
         self._params = []
+        self._rows = {}  # name -> Zeile in _params
+        self._pending = {}  # name -> noch nicht eingefügter Parameter
+        self._insert_timer = None
+        self._metadata = None
+        self._resolved = {}  # name -> Metadaten-Dict (leer, wenn unbekannt)
 
     def rowCount(self, parent=QModelIndex()):
         return len(self._params)
@@ -28,15 +64,21 @@ class ParameterTableModel(QAbstractListModel):
         elif role == self.ValueRole:
             return param.get("value", "")
         elif role == self.DefaultValueRole:
-            return param.get("defaultValue", "")
+            return self._field(param, "defaultValue")
         elif role == self.UnitRole:
-            return param.get("unit", "")
+            return self._field(param, "unit")
         elif role == self.OptionsRole:
-            return param.get("options", "")
+            return self._field(param, "options")
         elif role == self.DescRole:
-            return param.get("desc", "")
+            return self._field(param, "desc")
         return None
 
+    def _field(self, param, field):
+        value = param.get(field, "")
+        if value in ("", None) and self._metadata is not None:
+            return self.metadata_of(param.get("name")).get(field, "")
+        return value
+
     def roleNames(self):
         return {
             self.NameRole: b"name",
@@ -47,6 +89,51 @@ class ParameterTableModel(QAbstractListModel):
             self.DescRole: b"desc"
         }
 
+    def set_metadata(self, metadata):
+        """
+        Attach a metadata store (``get(name)`` -> dict or None), or None.
+
+        Only the rows the view reads afterwards are resolved. The model is
+        reset instead of emitting ``dataChanged`` for every row, so a search
+        index drops its entries and rebuilds them on the next search.
+        """
+        if not self._params:
+            self._metadata = metadata
+            self._resolved = {}
+            return
+        self.beginResetModel()
+        self._metadata = metadata
+        self._resolved = {}
+        self.endResetModel()
+
+    @property
+    def metadata(self):
+        return self._metadata
+
+    def metadata_of(self, name):
+        """Metadata dict of a parameter name ({} if unknown or none attached)"""
+        entry = self._resolved.get(name)
+        if entry is None:
+            entry = (self._metadata.get(name) if self._metadata is not None else None) or {}
+            self._resolved[name] = entry
+        return entry
+
+    def resolved_parameter(self, row):
+        """Parameter of a row with empty fields filled from the metadata (row itself unchanged)"""
+        param = self._params[row]
+        if self._metadata is None:
+            return param
+        missing = [field for field in self.METADATA_FIELDS if param.get(field) in ("", None)]
+        if not missing:
+            return param
+        entry = self.metadata_of(param.get("name"))
+        if not entry:
+            return param
+        resolved = dict(param)
+        for field in missing:
+            resolved[field] = entry.get(field, "")
+        return resolved
+
     @Slot(list)
     def set_parameters(self, param_list):
         for p in param_list:
@@ -54,11 +141,26 @@ class ParameterTableModel(QAbstractListModel):
                 p['defaultValue'] = p.pop('default')
         self.beginResetModel()
         self._params = param_list
+        self._pending = {}
+        self._rebuild_index()
         self.endResetModel()
         self.parametersLoaded.emit()
 
+    def _rebuild_index(self):
+        rows = {}
+        for row, param in enumerate(self._params):
+            # Bei doppelten Namen gilt die erste Zeile
+            rows.setdefault(param.get("name"), row)
+        self._rows = rows
+
+    def row_of(self, name):
+        """Row of a parameter, or -1 if unknown"""
+        self.flush()
+        return self._rows.get(name, -1)
+
     @Slot(result='QVariantList')
     def get_parameters(self):
+        self.flush()
         return self._params
         
     @Slot(str, str, result=bool)
@@ -66,20 +168,21 @@ class ParameterTableModel(QAbstractListModel):
         """Setzt den Wert eines Parameters"""
         try:
             print(f"Versuche Parameter zu setzen: {name} = {value}")
-            # Finde den Parameter mit dem angegebenen Namen
-            for i, param in enumerate(self._params):
-                if param.get("name") == name:
-                    print(f"Parameter {name} gefunden, aktualisiere Wert von {param.get('value')} zu {value}")
-                    # Aktualisiere den Wert
-                    param["value"] = value
-                    # Emitiere das dataChanged-Signal
-                    index = self.index(i, 0)
-                    self.dataChanged.emit(index, index, [self.ValueRole])
-                    # Parameter-Änderung signalisieren
-                    self.parameterChanged.emit(name, value)
-                    return True
-            print(f"Parameter {name} nicht gefunden")
-            return False
+            self.flush()
+            row = self._rows.get(name)
+            if row is None:
+                print(f"Parameter {name} nicht gefunden")
+                return False
+            param = self._params[row]
+            print(f"Parameter {name} gefunden, aktualisiere Wert von {param.get('value')} zu {value}")
+            # Aktualisiere den Wert
+            param["value"] = value
+            # Emitiere das dataChanged-Signal
+            index = self.index(row, 0)
+            self.dataChanged.emit(index, index, [self.ValueRole])
+            # Parameter-Änderung signalisieren
+            self.parameterChanged.emit(name, value)
+            return True
         except Exception as e:
             print(f"Fehler beim Setzen des Parameters: {str(e)}")
             import traceback
@@ -89,47 +192,106 @@ class ParameterTableModel(QAbstractListModel):
     @Slot(str, result='QVariantMap')
     def get_parameter_by_name(self, name):
         """Gibt einen Parameter anhand seines Namens zurück"""
-        for param in self._params:
-            if param.get("name") == name:
-                return param
-        return {}
+        row = self._rows.get(name)
+        if row is not None:
+            return self._params[row]
+        return self._pending.get(name, {})
         
     @Slot(str, result='QVariantList')
     def filter_parameters(self, search_text):
-        """Filtert Parameter basierend auf dem Suchtext"""
+        """Filtert Parameter basierend auf dem Suchtext (Kopie - QML nutzt ParameterFilterProxyModel)"""
+        self.flush()
         if not search_text:
             return self._params
         
         # Debug-Output
         print(f"Filtere {len(self._params)} Parameter nach '{search_text}'")
         
-        search_text = search_text.lower()
+        terms = split_terms(search_text)
         filtered_params = []
         
         for param in self._params:
-            name = param.get("name", "").lower()
-            desc = param.get("desc", "").lower()
-            option = param.get("option", "").lower()
-            value = str(param.get("value", "")).lower()
-            
-            if search_text in name or search_text in desc or search_text in option or search_text in value:
+            text = search_text_of(param)
+            if all(term in text for term in terms):
                 filtered_params.append(param)
         
         # Debug-Output
         print(f"Filter-Ergebnis: {len(filtered_params)} Parameter gefunden")
         return filtered_params
         
-    @Slot(dict)
-    def add_parameter(self, param):
+    @staticmethod
+    def _normalize(param):
         # Standardisiere die Parameternamen
         if 'description' in param and 'desc' not in param:
             param['desc'] = param.pop('description')
         if 'default' in param and 'defaultValue' not in param:
             param['defaultValue'] = param.pop('default')
-        
-        # Füge Parameter zum Modell hinzu
-        self.beginInsertRows(QModelIndex(), len(self._params), len(self._params))
-        self._params.append(param)
+        return param
+
+    @Slot(dict)
+    def add_parameter(self, param):
+        """
+        Insert or update a parameter (upsert by name).
+
+        A known name updates its row in place. New parameters are inserted
+        together after INSERT_FLUSH_MS (or on flush()).
+        """
+        param = self._normalize(param)
+        name = param.get("name")
+        row = self._rows.get(name)
+        if row is not None:
+            self._update_row(row, param)
+            return
+        pending = self._pending.get(name)
+        if pending is not None:
+            pending.update(param)
+            return
+        self._pending[name] = param
+        self._schedule_insert()
+
+    @Slot(list)
+    def add_parameters(self, params):
+        """Upsert several parameters; new ones are inserted at once"""
+        for param in params:
+            self.add_parameter(param)
+        self.flush()
+
+    def _update_row(self, row, param):
+        current = self._params[row]
+        roles = []
+        for field, value in param.items():
+            if current.get(field) != value:
+                current[field] = value
+                role = self.FIELD_ROLES.get(field)
+                if role is not None:
+                    roles.append(role)
+        if roles:
+            index = self.index(row, 0)
+            self.dataChanged.emit(index, index, roles)
+
+    def _schedule_insert(self):
+        if self._insert_timer is None:
+            self._insert_timer = QTimer(self)
+            self._insert_timer.setSingleShot(True)
+            self._insert_timer.setInterval(self.INSERT_FLUSH_MS)
+            self._insert_timer.timeout.connect(self.flush)
+        if not self._insert_timer.isActive():
+            self._insert_timer.start()
+
+    @Slot()
+    def flush(self):
+        """Insert the collected new parameters with one rowsInserted"""
+        if not self._pending:
+            return
+        if self._insert_timer is not None:
+            self._insert_timer.stop()
+        new_params = list(self._pending.values())
+        self._pending = {}
+        first = len(self._params)
+        self.beginInsertRows(QModelIndex(), first, first + len(new_params) - 1)
+        for row, param in enumerate(new_params, first):
+            self._params.append(param)
+            self._rows[param.get("name")] = row
         self.endInsertRows()
         self.parametersLoaded.emit()
     
@@ -137,4 +299,217 @@ class ParameterTableModel(QAbstractListModel):
     def clear_parameters(self):
         self.beginResetModel()
         self._params = []
-        self.endResetModel()
\ No newline at end of file
+        self._rows = {}
+        self._pending = {}
+        if self._insert_timer is not None:
+            self._insert_timer.stop()
+        self.endResetModel()
+
+
+
+class ParameterFilterProxyModel(QAbstractProxyModel):
+    """
+    Search view on a ParameterTableModel.
+
+    Matching rows come from a ParameterSearchIndex that is kept in sync with
+    the source (reset, batched inserts, dataChanged), so a keystroke never
+    lowercases or scans the whole parameter list. The proxy holds the sorted
+    list of matching source rows; a new search resets the view instead of
+    asking Python for a decision per source row (a filterAcceptsRow override
+    costs more than a frame at 10 000 parameters).
+
+    The index includes the source's metadata (descriptions, options), so it
+    is only built on the first non-empty search; until then descriptions are
+    resolved just for the rows the view shows.
+    """
+
+    searchTextChanged = Signal()
+    countChanged = Signal()
+
+    def __init__(self, source_model=None, parent=None):
+        super().__init__(parent)
+        self._index = ParameterSearchIndex()
+        self._index_ready = False
+        self._search_text = ""
+        self._terms = []
+        self._rows = []  # Proxy-Zeile -> Quell-Zeile (aufsteigend)
+        self._proxy_rows = None  # Quell-Zeile -> Proxy-Zeile, bei Bedarf
+        self._filtered = False
+        if source_model is not None:
+            self.setSourceModel(source_model)
+
+    def setSourceModel(self, source_model):
+        old = self.sourceModel()
+        if old is not None:
+            old.modelReset.disconnect(self._on_source_reset)
+            old.rowsInserted.disconnect(self._on_source_rows_inserted)
+            old.dataChanged.disconnect(self._on_source_data_changed)
+        self.beginResetModel()
+        super().setSourceModel(source_model)
+        if source_model is not None:
+            source_model.modelReset.connect(self._on_source_reset)
+            source_model.rowsInserted.connect(self._on_source_rows_inserted)
+            source_model.dataChanged.connect(self._on_source_data_changed)
+        self._index_ready = False
+        self._apply_search()
+        self.endResetModel()
+        self.countChanged.emit()
+
+    @property
+    def search_index(self):
+        """The search index, built on first access"""
+        self._ensure_index()
+        return self._index
+
+    def _source_params(self, first, last):
+        source = self.sourceModel()
+        return [source.resolved_parameter(row) for row in range(first, last + 1)]
+
+    def _ensure_index(self):
+        if self._index_ready:
+            return
+        source = self.sourceModel()
+        count = source.rowCount() if source is not None else 0
+        self._index.rebuild(self._source_params(0, count - 1))
+        self._index_ready = True
+
+    def _apply_search(self):
+        if self._terms:
+            self._ensure_index()
+            matches = self._index.search(self._search_text)
+        else:
+            matches = None
+        self._filtered = matches is not None
+        if matches is None:
+            source = self.sourceModel()
+            self._rows = list(range(source.rowCount() if source is not None else 0))
+        else:
+            self._rows = sorted(matches)
+        self._proxy_rows = None
+
+    def _proxy_row(self, source_row):
+        if self._proxy_rows is None:
+            self._proxy_rows = {row: i for i, row in enumerate(self._rows)}
+        return self._proxy_rows.get(source_row, -1)
+
+    # --- QAbstractProxyModel ------------------------------------------
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 1
+
+    def index(self, row, column=0, parent=QModelIndex()):
+        if parent.isValid() or column != 0 or row < 0 or row >= len(self._rows):
+            return QModelIndex()
+        return self.createIndex(row, column)
+
+    def parent(self, index=QModelIndex()):
+        return QModelIndex()
+
+    def mapToSource(self, proxy_index):
+        source = self.sourceModel()
+        if source is None or not proxy_index.isValid() or proxy_index.row() >= len(self._rows):
+            return QModelIndex()
+        return source.index(self._rows[proxy_index.row()], 0)
+
+    def mapFromSource(self, source_index):
+        if not source_index.isValid():
+            return QModelIndex()
+        row = self._proxy_row(source_index.row())
+        return self.index(row, 0) if row >= 0 else QModelIndex()
+
+    def data(self, index, role=Qt.DisplayRole):
+        source = self.sourceModel()
+        if source is None or not index.isValid() or index.row() >= len(self._rows):
+            return None
+        return source.data(source.index(self._rows[index.row()], 0), role)
+
+    def roleNames(self):
+        source = self.sourceModel()
+        return source.roleNames() if source is not None else {}
+
+    # --- Quellmodell -------------------------------------------------------
+
+    def _on_source_reset(self):
+        self.beginResetModel()
+        self._index_ready = False
+        self._apply_search()
+        self.endResetModel()
+        self.countChanged.emit()
+
+    def _on_source_rows_inserted(self, parent, first, last):
+        if self._index_ready:
+            self._index.append(self._source_params(first, last))
+        # Die Quelle hängt nur an: passende Zeilen kommen ans Ende
+        new_rows = [row for row in range(first, last + 1)
+                    if not self._filtered or self._index.matches_row(row, self._terms)]
+        if not new_rows:
+            return
+        start = len(self._rows)
+        self.beginInsertRows(QModelIndex(), start, start + len(new_rows) - 1)
+        self._rows.extend(new_rows)
+        self._proxy_rows = None
+        self.endInsertRows()
+        self.countChanged.emit()
+
+    def _on_source_data_changed(self, top_left, bottom_right, roles=()):
+        if not self._index_ready:
+            # Ungefiltert ohne Index: Proxy-Zeile == Quell-Zeile
+            self.dataChanged.emit(self.index(top_left.row(), 0), self.index(bottom_right.row(), 0), roles)
+            return
+        source = self.sourceModel()
+        for row in range(top_left.row(), bottom_right.row() + 1):
+            self._index.update(row, source.resolved_parameter(row))
+            proxy_row = self._proxy_row(row)
+            matches = not self._filtered or self._index.matches_row(row, self._terms)
+            if proxy_row >= 0 and matches:
+                index = self.index(proxy_row, 0)
+                self.dataChanged.emit(index, index, roles)
+            elif proxy_row >= 0:
+                self.beginRemoveRows(QModelIndex(), proxy_row, proxy_row)
+                del self._rows[proxy_row]
+                self._proxy_rows = None
+                self.endRemoveRows()
+                self.countChanged.emit()
+            elif matches:
+                position = bisect.bisect_left(self._rows, row)
+                self.beginInsertRows(QModelIndex(), position, position)
+                self._rows.insert(position, row)
+                self._proxy_rows = None
+                self.endInsertRows()
+                self.countChanged.emit()
+
+    # --- QML ---------------------------------------------------------------
+
+    @Slot(str)
+    def setSearchText(self, text):
+        """Filter by text; every whitespace-separated term has to match"""
+        text = text or ""
+        if text == self._search_text:
+            return
+        self._search_text = text
+        self._terms = split_terms(text)
+        self.beginResetModel()
+        self._apply_search()
+        self.endResetModel()
+        self.searchTextChanged.emit()
+        self.countChanged.emit()
+
+    @Property(str, fset=setSearchText, notify=searchTextChanged)
+    def searchText(self):
+        return self._search_text
+
+    @Property(int, notify=countChanged)
+    def count(self):
+        return len(self._rows)
+
+    @Slot(int, result=str)
+    def nameAt(self, row):
+        """Parameter name of a proxy row"""
+        if 0 <= row < len(self._rows):
+            return self.sourceModel()._params[self._rows[row]].get("name", "")
+        return ""
@@ -0,0 +1,131 @@
+"""
+Precomputed search index over the parameter list.
+
+Every row is stored once as a lowercase search text (name, description,
+options and value) and split into whitespace tokens. The token index maps
+each distinct token to the rows containing it. Search terms never contain
+whitespace, so a term matches a row exactly when it is a substring of one of
+the row's tokens: a query scans the (much smaller, heavily repeated)
+vocabulary instead of every row. When the user keeps typing, each term is
+only checked against the tokens the previous, shorter term matched.
+"""
+
+
+def search_text(param):
+    """Lowercase text a parameter is found by"""
+    options = param.get("options", "")
+    if isinstance(options, (list, tuple)):
+        options = " ".join(str(o) for o in options)
+    parts = (param.get("name", ""), param.get("desc", ""), options, param.get("value", ""))
+    return "\n".join(str(part) for part in parts if part not in (None, "")).lower()
+
+
+def split_terms(query):
+    """Lowercase search terms; all of them have to match"""
+    return query.lower().split()
+
+
+class ParameterSearchIndex:
+    """
+    Token index with incremental narrowing.
+
+    Rows are addressed by their row number in the source list; ``append``
+    and ``update`` keep the index in sync with inserted and changed rows.
+    """
+
+    def __init__(self):
+        self._texts = []
+        self._row_tokens = []  # Zeile -> Tokens dieser Zeile
+        self._tokens = {}  # Token -> Menge der Zeilen
+        self._last_tokens = {}  # Begriff -> passende Tokens der letzten Suche
+
+    def __len__(self):
+        return len(self._texts)
+
+    def rebuild(self, params):
+        self._texts = []
+        self._row_tokens = []
+        self._tokens = {}
+        self.append(params)
+
+    def append(self, params):
+        """Index new rows at the end of the list"""
+        index = self._tokens
+        for param in params:
+            text = search_text(param)
+            tokens = set(text.split())
+            row = len(self._texts)
+            for token in tokens:
+                rows = index.get(token)
+                if rows is None:
+                    index[token] = {row}
+                else:
+                    rows.add(row)
+            self._texts.append(text)
+            self._row_tokens.append(tokens)
+        self._forget_last()
+
+    def update(self, row, param):
+        """Re-index a changed row"""
+        text = search_text(param)
+        if text == self._texts[row]:
+            return
+        tokens = set(text.split())
+        old_tokens = self._row_tokens[row]
+        for token in old_tokens - tokens:
+            rows = self._tokens[token]
+            rows.discard(row)
+            if not rows:
+                del self._tokens[token]
+        for token in tokens - old_tokens:
+            self._tokens.setdefault(token, set()).add(row)
+        self._texts[row] = text
+        self._row_tokens[row] = tokens
+        self._forget_last()
+
+    def _forget_last(self):
+        self._last_tokens = {}
+
+    def matches_row(self, row, terms):
+        text = self._texts[row]
+        return all(term in text for term in terms)
+
+    def _narrowing_base(self, term, previous):
+        """Smallest token list of a previous term contained in this term"""
+        base = None
+        for old_term, old_tokens in previous.items():
+            # Enthält der neue Begriff einen früheren, ist seine Tokenmenge eine Teilmenge
+            if old_term in term and (base is None or len(old_tokens) < len(base)):
+                base = old_tokens
+        return base
+
+    def search(self, query):
+        """Set of matching rows, or None if the query is empty (all rows)"""
+        terms = split_terms(query)
+        if not terms:
+            self._forget_last()
+            return None
+
+        previous = self._last_tokens
+        bases = {term: self._narrowing_base(term, previous) for term in set(terms)}
+        # Eingeschränkte und lange Begriffe zuerst - sie sind am selektivsten
+        ordered = sorted(bases, key=lambda t: (bases[t] is None, -len(t)))
+
+        index = self._tokens
+        texts = self._texts
+        term_tokens = {}
+        result = None
+        for term in ordered:
+            base = bases[term] if bases[term] is not None else index
+            if result is not None and len(result) < len(base):
+                # Wenige Zeilen übrig: direkt prüfen statt Vokabular durchsuchen
+                result = {row for row in result if term in texts[row]}
+            else:
+                tokens = [token for token in base if term in token]
+                term_tokens[term] = tokens
+                rows = set().union(*[index[token] for token in tokens])
+                result = rows if result is None else result & rows
+            if not result:
+                break
+        self._last_tokens = term_tokens
+        return result
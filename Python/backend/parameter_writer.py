@@ -0,0 +1,253 @@
+"""
+Pipelined bulk write of parameters to the flight controller.
+
+A PARAM_SET is only confirmed when the flight controller echoes the
+parameter in a PARAM_VALUE. The writer keeps a bounded window of
+unconfirmed PARAM_SETs, matches the echoes by name, re-sends on timeout and
+reports a result per parameter. Like the ParameterDownloader it never
+blocks the Qt thread: it reacts to PARAM_VALUE messages from the
+MessageDispatcher and to a periodic timer.
+"""
+
+import math
+import struct
+import time
+from collections import deque
+
+from PySide6.QtCore import QObject, Signal, Slot, QTimer
+
+
+def same_value(a, b):
+    """True if two parameter values are equal as float32 (the wire format)"""
+    try:
+        a = float(a)
+        b = float(b)
+    except (TypeError, ValueError):
+        return False
+    try:
+        return struct.pack("<f", a) == struct.pack("<f", b)
+    except OverflowError:
+        return a == b or (math.isnan(a) and math.isnan(b))
+
+
+def parse_parameter_file(path):
+    """
+    Read a parameter file into {name: value}.
+
+    Accepts the Mission Planner / ArduPilot format (``NAME,VALUE`` or
+    ``NAME VALUE``) and the QGroundControl format
+    (``sysid compid NAME VALUE type``, tab separated). ``#`` starts a
+    comment.
+    """
+    params = {}
+    with open(path, "r", encoding="utf-8") as f:
+        for number, line in enumerate(f, 1):
+            line = line.split("#", 1)[0].strip()
+            if not line:
+                continue
+            fields = line.replace(",", " ").split()
+            if len(fields) == 5 and fields[0].isdigit() and fields[1].isdigit():
+                fields = fields[2:4]
+            if len(fields) < 2:
+                raise ValueError(f"{path}:{number}: expected name and value")
+            try:
+                params[fields[0]] = float(fields[1])
+            except ValueError:
+                raise ValueError(f"{path}:{number}: invalid value '{fields[1]}'")
+    return params
+
+
+class ParameterWriter(QObject):
+    """
+    State machine for one bulk parameter write.
+
+    States:
+        idle       no write running
+        writing    PARAM_SETs in flight
+        done       every parameter has a result
+
+    Result status per parameter:
+        ok         echoed with the requested value
+        unchanged  the current value already matched, nothing was sent
+        mismatch   echoed with a different value (rejected or clamped)
+        timeout    no echo after WRITE_RETRIES attempts
+        cancelled  the write was cancelled before a result
+
+    Signals:
+        progressChanged(int, int): Parameters with a result and total count
+        parameterWritten(str, str): Name and status of every result
+        finished(dict): name -> result dict (status, requested, value, attempts)
+        stateChanged(str): The state changed
+    """
+
+    progressChanged = Signal(int, int)
+    parameterWritten = Signal(str, str)
+    finished = Signal(dict)
+    stateChanged = Signal(str)
+
+    IDLE = "idle"
+    WRITING = "writing"
+    DONE = "done"
+
+    OK = "ok"
+    UNCHANGED = "unchanged"
+    MISMATCH = "mismatch"
+    TIMEOUT = "timeout"
+    CANCELLED = "cancelled"
+
+    TICK_MS = 100
+    WRITE_TIMEOUT = 1.0  # Sekunden bis ein PARAM_SET erneut gesendet wird
+    WRITE_RETRIES = 3
+    WINDOW = 16  # Gleichzeitig unbestätigte PARAM_SET
+
+    def __init__(self, clock=time.monotonic, parent=None):
+        super().__init__(parent)
+        self._clock = clock
+        self._connection = None
+        self._state = self.IDLE
+        self._results = {}  # name -> Ergebnis-Dict (in Schreibreihenfolge)
+        self._queue = deque()  # noch zu sendende Namen
+        self._outstanding = {}  # name -> Sendezeit
+        self._done = 0
+        self._started = 0.0
+        self._duration = 0.0
+
+        self._timer = QTimer(self)
+        self._timer.setInterval(self.TICK_MS)
+        self._timer.timeout.connect(self.poll)
+
+    # --- Zustand ---------------------------------------------------------
+
+    @property
+    def state(self):
+        return self._state
+
+    @property
+    def duration(self):
+        """Seconds from start to the end of the last write"""
+        return self._duration
+
+    def is_active(self):
+        return self._state == self.WRITING
+
+    def results(self):
+        return dict(self._results)
+
+    def failed_names(self):
+        return [name for name, result in self._results.items()
+                if result["status"] not in (self.OK, self.UNCHANGED)]
+
+    def _set_state(self, state):
+        if state != self._state:
+            self._state = state
+            self.stateChanged.emit(state)
+
+    # --- Steuerung -------------------------------------------------------
+
+    def start(self, connection, params, current=None):
+        """
+        Write ``params`` ({name: value}) in order.
+
+        ``current`` ({name: value}, e.g. the parameter model) marks names
+        whose value already matches as unchanged without sending them.
+        """
+        self.cancel()
+        self._connection = connection
+        self._results = {}
+        self._queue = deque()
+        self._outstanding = {}
+        self._done = 0
+        self._started = self._clock()
+        self._duration = 0.0
+        self._set_state(self.WRITING)
+
+        for name, value in params.items():
+            self._results[name] = {"status": None, "requested": value, "value": None, "attempts": 0}
+            if current is not None and name in current and same_value(current[name], value):
+                self._set_result(name, self.UNCHANGED, current[name])
+            else:
+                self._queue.append(name)
+
+        self._timer.start()
+        self._fill_window()
+
+    @Slot()
+    def cancel(self):
+        """Stop writing; parameters without a result are marked cancelled"""
+        self._timer.stop()
+        if not self.is_active():
+            return
+        self._outstanding = {}
+        self._queue = deque()
+        for name, result in self._results.items():
+            if result["status"] is None:
+                self._set_result(name, self.CANCELLED)
+        self._finish()
+
+    # --- Nachrichten -----------------------------------------------------
+
+    def handle_param_value(self, msg):
+        """
+        Feed a PARAM_VALUE message.
+
+        Returns the result dict if it confirmed a parameter of this write,
+        otherwise None.
+        """
+        if not self.is_active():
+            return None
+        name = msg.param_id
+        result = self._results.get(name)
+        if result is None or result["status"] is not None or result["attempts"] == 0:
+            return None
+
+        if self._outstanding.pop(name, None) is None and name in self._queue:
+            # Antwort auf einen bereits abgelaufenen Versuch
+            self._queue.remove(name)
+        status = self.OK if same_value(msg.param_value, result["requested"]) else self.MISMATCH
+        self._set_result(name, status, msg.param_value)
+        self._fill_window()
+        return result
+
+    @Slot()
+    def poll(self, now=None):
+        """Timer tick: re-send PARAM_SETs without echo"""
+        if not self.is_active():
+            self._timer.stop()
+            return
+        now = self._clock() if now is None else now
+        expired = [name for name, sent in self._outstanding.items() if now - sent >= self.WRITE_TIMEOUT]
+        for name in reversed(expired):
+            del self._outstanding[name]
+            if self._results[name]["attempts"] >= self.WRITE_RETRIES:
+                self._set_result(name, self.TIMEOUT)
+            else:
+                # Wiederholungen vor neuen Parametern senden
+                self._queue.appendleft(name)
+        self._fill_window(now)
+
+    def _fill_window(self, now=None):
+        now = self._clock() if now is None else now
+        while self._queue and len(self._outstanding) < self.WINDOW:
+            name = self._queue.popleft()
+            result = self._results[name]
+            result["attempts"] += 1
+            self._outstanding[name] = now
+            self._connection.param_set_send(name, float(result["requested"]))
+        if self._done >= len(self._results):
+            self._finish()
+
+    def _set_result(self, name, status, value=None):
+        result = self._results[name]
+        result["status"] = status
+        result["value"] = value
+        self._done += 1
+        self.parameterWritten.emit(name, status)
+        self.progressChanged.emit(self._done, len(self._results))
+
+    def _finish(self):
+        if not self.is_active():
+            return
+        self._timer.stop()
+        self._duration = self._clock() - self._started
+        self._set_state(self.DONE)
+        self.finished.emit(self.results())
@@ -13,14 +13,46 @@ class SensorManager(QObject):
         super().__init__()
         self._sensor_model = sensor_model
         self._logger = logger
+        self._coalescer = None
+
+    def set_coalescer(self, coalescer):
+        """
+        Route sensor values through a TelemetryCoalescer.
+
+        The model is then updated once per UI frame with the newest values
+        instead of once per received message.
+        """
+        self._coalescer = coalescer
+
+    def _update_sensor(self, sensor_id, value):
+        if self._coalescer is not None:
+            self._coalescer.publish(sensor_id, value)
+        else:
+            self._sensor_model.update_sensor(sensor_id, value)
+
+    def register(self, dispatcher):
+        """Subscribe the sensor handlers at a MessageDispatcher"""
+        dispatcher.subscribe_many({
+            'ATTITUDE': self.handle_attitude,
+            'GLOBAL_POSITION_INT': self.handle_gps,
+            'SYS_STATUS': self.handle_battery,
+            'VFR_HUD': self.handle_vfr_hud,
+        })
+
+    def unregister(self, dispatcher):
+        """Remove the sensor handlers from a MessageDispatcher"""
+        dispatcher.unsubscribe('ATTITUDE', self.handle_attitude)
+        dispatcher.unsubscribe('GLOBAL_POSITION_INT', self.handle_gps)
+        dispatcher.unsubscribe('SYS_STATUS', self.handle_battery)
+        dispatcher.unsubscribe('VFR_HUD', self.handle_vfr_hud)
         
     @Slot(object)
     def handle_attitude(self, msg):
         """Handle attitude message"""
         try:
-            self._sensor_model.update_sensor("roll", round(msg.roll, 2))
-            self._sensor_model.update_sensor("pitch", round(msg.pitch, 2))
-            self._sensor_model.update_sensor("yaw", round(msg.yaw, 2))
+            self._update_sensor("roll", round(msg.roll, 2))
+            self._update_sensor("pitch", round(msg.pitch, 2))
+            self._update_sensor("yaw", round(msg.yaw, 2))
             self.sensorUpdated.emit("attitude", msg.roll)
         except Exception as e:
             error_msg = f"❌ Error handling attitude: {str(e)}"
@@ -35,15 +67,15 @@ class SensorManager(QObject):
             lon = msg.lon / 1e7
             alt = msg.relative_alt / 1000.0
             
-            self._sensor_model.update_sensor("gps_lat", round(lat, 6))
-            self._sensor_model.update_sensor("gps_lon", round(lon, 6))
-            self._sensor_model.update_sensor("altitude", round(alt, 1))
+            self._update_sensor("gps_lat", round(lat, 6))
+            self._update_sensor("gps_lon", round(lon, 6))
+            self._update_sensor("altitude", round(alt, 1))
             
             # Calculate ground speed
             vx = msg.vx / 100.0
             vy = msg.vy / 100.0
             ground_speed = (vx*vx + vy*vy)**0.5
-            self._sensor_model.update_sensor("groundspeed", round(ground_speed, 1))
+            self._update_sensor("groundspeed", round(ground_speed, 1))
             
             self.sensorUpdated.emit("gps", lat)
         except Exception as e:
@@ -59,9 +91,9 @@ class SensorManager(QObject):
             current = msg.current_battery / 100.0
             remaining = msg.battery_remaining
             
-            self._sensor_model.update_sensor("battery_voltage", round(voltage, 1))
-            self._sensor_model.update_sensor("battery_current", round(current, 1))
-            self._sensor_model.update_sensor("battery_remaining", round(remaining, 1))
+            self._update_sensor("battery_voltage", round(voltage, 1))
+            self._update_sensor("battery_current", round(current, 1))
+            self._update_sensor("battery_remaining", round(remaining, 1))
             
             self._logger.addLog(f"📊 Batterie: {voltage:.1f}V, {current:.1f}A, {remaining}%")
             self.sensorUpdated.emit("battery", voltage)
@@ -83,16 +115,16 @@ class SensorManager(QObject):
             climb = float(getattr(msg, 'climb', 0.0))
             
             # Sensorwerte aktualisieren
-            self._sensor_model.update_sensor("airspeed", round(airspeed, 1))
-            self._sensor_model.update_sensor("groundspeed", round(groundspeed, 1))
-            self._sensor_model.update_sensor("heading", round(heading, 1))
+            self._update_sensor("airspeed", round(airspeed, 1))
+            self._update_sensor("groundspeed", round(groundspeed, 1))
+            self._update_sensor("heading", round(heading, 1))
             # Throttle als Prozent
-            self._sensor_model.update_sensor("throttle", round(throttle, 0))
+            self._update_sensor("throttle", round(throttle, 0))
             # Alternativ Höhe, falls GPS nicht verfügbar
             if alt > 0:
-                self._sensor_model.update_sensor("altitude", round(alt, 1))
+                self._update_sensor("altitude", round(alt, 1))
             # Steigrate hinzufügen
-            self._sensor_model.update_sensor("climb", round(climb, 1))
+            self._update_sensor("climb", round(climb, 1))
             
             self._logger.addLog(f"📊 VFR_HUD: Air={airspeed:.1f}m/s, Ground={groundspeed:.1f}m/s, Alt={alt:.1f}m")
             self.sensorUpdated.emit("vfr_hud", airspeed)
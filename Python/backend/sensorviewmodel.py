@@ -1,6 +1,15 @@
 from PySide6.QtCore import QObject, Signal, Slot, Property, QAbstractListModel, Qt, QModelIndex
 
 class SensorViewModel(QAbstractListModel):
+    """
+    List model of the sensor values shown in the UI.
+
+    Sensors are looked up through an id -> row index, so an update costs
+    O(1) regardless of the number of sensors. ``update_many`` applies a whole
+    batch and signals the changed rows as few contiguous ``dataChanged``
+    ranges.
+    """
+
     NameRole = Qt.UserRole + 1
     ValueRole = Qt.UserRole + 2
     UnitRole = Qt.UserRole + 3
@@ -9,6 +18,8 @@ class SensorViewModel(QAbstractListModel):
     def __init__(self):
         super().__init__()
         self._sensors = []
+        self._rows = {}  # sensor_id -> Zeile in _sensors
+        self._tracer = None
 
     def roleNames(self):
         return {
@@ -44,17 +55,66 @@ class SensorViewModel(QAbstractListModel):
             "value": 0.0,
             "unit": unit
         })
+        # Bei doppelten IDs gilt wie bisher der erste Eintrag
+        self._rows.setdefault(sensor_id, len(self._sensors) - 1)
         self.endInsertRows()
 
+    def row_of(self, sensor_id):
+        """Row of a sensor, or -1 if unknown"""
+        return self._rows.get(sensor_id, -1)
+
     @Slot(str, float)
     def update_sensor(self, sensor_id, value):
-        for i, sensor in enumerate(self._sensors):
-            if sensor["id"] == sensor_id:
+        row = self._rows.get(sensor_id)
+        if row is not None:
+            sensor = self._sensors[row]
+            if sensor["value"] != value:
+                sensor["value"] = value
+                index = self.index(row, 0)
+                self.dataChanged.emit(index, index, [self.ValueRole])
+        tracer = self._tracer
+        if tracer is not None and tracer.enabled:
+            tracer.mark("model")
+
+    @Slot('QVariantMap')
+    def update_many(self, values):
+        """
+        Update several sensors at once: {sensor_id: value}.
+
+        Unknown ids and unchanged values are ignored. The changed rows are
+        merged into contiguous ranges with one dataChanged signal each.
+        Returns the number of changed sensors.
+        """
+        rows = self._rows
+        sensors = self._sensors
+        changed = []
+        for sensor_id, value in values.items():
+            row = rows.get(sensor_id)
+            if row is not None:
+                sensor = sensors[row]
                 if sensor["value"] != value:
-                    self._sensors[i]["value"] = value
-                    index = self.index(i, 0)
-                    self.dataChanged.emit(index, index, [self.ValueRole])
-                break
+                    sensor["value"] = value
+                    changed.append(row)
+
+        if changed:
+            changed.sort()
+            roles = [self.ValueRole]
+            first = last = changed[0]
+            for row in changed[1:]:
+                if row != last + 1:
+                    self.dataChanged.emit(self.index(first, 0), self.index(last, 0), roles)
+                    first = row
+                last = row
+            self.dataChanged.emit(self.index(first, 0), self.index(last, 0), roles)
+
+        tracer = self._tracer
+        if tracer is not None and tracer.enabled:
+            tracer.mark("model")
+        return len(changed)
+
+    def set_latency_tracer(self, tracer):
+        """Record the age of values reaching the model (None disables)"""
+        self._tracer = tracer
 
     @Slot(float, float)
     def update_gps(self, lat, lon):
@@ -19,8 +19,22 @@ from backend.sensorviewmodel import SensorViewModel
 from backend.logger import Logger
 from backend.parameter_model import ParameterTableModel
 from backend.message_handler import MessageHandler
+from backend.message_dispatcher import MessageDispatcher
+from backend.mavlink_reader import MAVLinkReader, MessageRingBuffer
+from backend.mavlink_transport import MAVLinkTransport
+from backend.connection_worker import ConnectionWorker
+from backend.command_manager import result_name
+from backend.outgoing_scheduler import OutgoingScheduler
+from backend.tlog_recorder import TlogRecorder
+from backend.link_statistics import LinkStatsModel
+from backend.tlog_replay import TlogReplay
+from backend.telemetry_coalescer import TelemetryCoalescer
+from backend.telemetry_store import TelemetryStore
+from backend.telemetry_plot import TelemetryPlotter
+from backend.latency_tracer import LatencyTracer
 from backend.sensor_manager import SensorManager
 from backend.parameter_manager import ParameterManager
+from backend.parameter_cache import ParameterCache
 from backend.simulator_connector import SimulatorConnector
 from backend.direct_sensor_simulator import DirectSensorSimulator
 from backend.compatible_simulator import CompatibleSensorSimulator
@@ -51,6 +65,12 @@ class SerialConnector(QObject):
     gpsChanged = Signal(float, float, float)  # lat, lon, alt
     batteryChanged = Signal(float, float, float)  # voltage, current, remaining
     statusTextReceived = Signal(str)  # status text messages
+    readerChanged = Signal()
+    parameterLoadProgress = Signal(int, int)  # received, total
+    parameterWriteProgress = Signal(int, int)  # written, total
+    connectingChanged = Signal(bool)
+    connectionProgress = Signal(str)  # progress of a connection attempt
+    replayChanged = Signal()
 
     def __init__(self, sensor_model: SensorViewModel, logger: Logger, parameter_model=None):
         """
@@ -70,30 +90,85 @@ class SerialConnector(QObject):
         self._available_ports = []
         self._available_baud_rates = [9600, 19200, 38400, 57600, 115200]
         self._mavlink_connection = None
-        self._timer = None
         self._simulator_connector = None
+        self._reader = None
+        self._transport = None
+        self._reader_capacity = MAVLinkReader.DEFAULT_CAPACITY
+        self._reader_overflow_policy = MessageRingBuffer.DROP_OLDEST
+        self._reader_lazy_decoding = False
+        self._pending_link = None  # Future des laufenden Verbindungsversuchs
+
+        # Port öffnen und auf Heartbeat warten außerhalb des UI-Threads
+        self._connection_worker = ConnectionWorker(parent=self)
+        self._connection_worker.progress.connect(self._on_connection_progress)
+        self._connection_worker.linkOpened.connect(self._on_link_opened)
+        self._connection_worker.failed.connect(self._on_link_failed)
+
+        # Ausgehende Nachrichten nach Priorität und Baudraten-Budget senden
+        self._outgoing_scheduler = OutgoingScheduler(parent=self)
+        self._outgoing_shaping = True
+
+        # Rohe MAVLink-Frames als tlog aufzeichnen (auf Anfrage)
+        self._recorder = TlogRecorder(parent=self)
+        self._recorder.errorOccurred.connect(self._log_error)
+        self._replay = None  # TlogReplay, solange ein Mitschnitt abgespielt wird
+
+        # Nachrichtenraten, Bytes/s und Paketverlust der aktuellen Verbindung
+        self._link_stats = LinkStatsModel(parent=self)
         
         # Initialize managers
         self._message_handler = MessageHandler(logger)
         self._sensor_manager = SensorManager(sensor_model, logger)
-        self._parameter_manager = ParameterManager(parameter_model, logger)
+        self._parameter_manager = ParameterManager(
+            parameter_model, logger, cache=ParameterCache(ParameterCache.default_directory()))
         
-        # Connect signals
-        self._message_handler.attitude_received.connect(self._sensor_manager.handle_attitude)
-        self._message_handler.gps_received.connect(self._sensor_manager.handle_gps)
-        self._message_handler.battery_received.connect(self._sensor_manager.handle_battery)
-        self._message_handler.parameter_received.connect(self._parameter_manager.handle_parameter)
-        
-        # Connect new VFR_HUD signal handler
-        if hasattr(self._message_handler, 'vfr_hud_received') and hasattr(self._sensor_manager, 'handle_vfr_hud'):
-            self._message_handler.vfr_hud_received.connect(self._sensor_manager.handle_vfr_hud)
-            self._logger.addLog("[INFO] VFR_HUD handler connected")
+        # Telemetrie-Werte im Frame-Takt an die UI weitergeben (neuester Wert gewinnt)
+        self._coalescer = TelemetryCoalescer(parent=self)
+        self._coalescer.flushed.connect(self._apply_telemetry)
+        self._sensor_manager.set_coalescer(self._coalescer)
+
+        # Verlauf ausgewählter Telemetriefelder für Graphen und Analyse
+        self._telemetry_store = TelemetryStore(parent=self)
+        self._telemetry_plotter = TelemetryPlotter(self._telemetry_store, parent=self)
+
+        # Optionale Latenzmessung vom Lesen bis zur UI (standardmäßig aus)
+        self._latency_tracer = LatencyTracer(parent=self)
+        self._message_handler.set_latency_tracer(self._latency_tracer)
+        self._coalescer.set_latency_tracer(self._latency_tracer)
+        for component in (sensor_model, logger):
+            if hasattr(component, "set_latency_tracer"):
+                component.set_latency_tracer(self._latency_tracer)
+
+        # Handler direkt beim Dispatcher des MessageHandlers registrieren
+        dispatcher = self._message_handler.get_dispatcher()
+        self._sensor_manager.register(dispatcher)
+        self._parameter_manager.register(dispatcher)
+        self._telemetry_store.register(dispatcher)
+        self._parameter_manager.loadProgress.connect(self.parameterLoadProgress)
+        self._parameter_manager.writeProgress.connect(self.parameterWriteProgress)
+
+        # Eigene Dispatch-Tabelle für Nachrichten des SimulatorConnectors
+        self._simulator_dispatcher = MessageDispatcher(self._on_simulator_dispatch_error)
+        self._simulator_dispatcher.subscribe_many({
+            'HEARTBEAT': self._handle_heartbeat,
+            'ATTITUDE': self._on_simulator_attitude,
+            'GLOBAL_POSITION_INT': self._on_simulator_gps,
+            'SYS_STATUS': self._on_simulator_battery,
+            'STATUSTEXT': self._handle_status_text,
+            'PARAM_VALUE': self._handle_parameter,
+        })
+        self._telemetry_store.register(self._simulator_dispatcher)
 
     @Property(bool, notify=connectedChanged)
     def connected(self):
         """True if currently connected to a drone/simulator."""
         return self._connected
 
+    @Property(bool, notify=connectingChanged)
+    def connecting(self):
+        """True while a connection attempt or port probe is running."""
+        return self._pending_link is not None
+
     @Property(str, notify=portChanged)
     def port(self):
         return self._port
@@ -102,10 +177,36 @@ class SerialConnector(QObject):
     def baud_rate(self):
         return self._baud_rate
 
+    @Property(QObject, notify=readerChanged)
+    def reader(self):
+        """The active MAVLinkReader (queue depth / drop counters), or None."""
+        return self._reader
+
+    @Slot(str)
+    def setReaderOverflowPolicy(self, policy):
+        """Set the ring buffer overflow policy (drop_oldest, drop_newest, block)"""
+        if policy not in MessageRingBuffer.POLICIES:
+            self._logger.addLog(f"⚠️ Unknown overflow policy: {policy}")
+            return
+        self._reader_overflow_policy = policy
+        if self._reader is not None:
+            self._reader.setOverflowPolicy(policy)
+
+    @Slot(bool)
+    def setLazyDecoding(self, enabled):
+        """Decode only subscribed message types (header-only framing for the rest)"""
+        self._reader_lazy_decoding = enabled
+        if self._reader is not None:
+            self._reader.setLazyDecoding(enabled)
+
     def get_message_handler(self):
         """Gibt den MessageHandler zurück für die Kalibrierung"""
         return self._message_handler
 
+    def get_transport(self):
+        """The MAVLinkTransport of the active link (subscribe here instead of reading), or None"""
+        return self._transport
+
     @Property('QVariantList', notify=availablePortsChanged)
     def availablePorts(self):
         return self._available_ports
@@ -150,6 +251,7 @@ class SerialConnector(QObject):
             return
 
         # If already connected, disconnect first
+        self._cancel_pending_link()
         if self._connected:
             self.disconnect()
 
@@ -193,6 +295,10 @@ class SerialConnector(QObject):
                     self._simulator_connector.connectionStatusChanged.connect(self._on_simulator_connection_changed)
                     self._simulator_connector.messageReceived.connect(self._on_simulator_message)
                     self._simulator_connector.errorOccurred.connect(self._on_simulator_error)
+
+                    # Mitschnitt und Verbindungsstatistik wie bei einer seriellen Verbindung
+                    self._recorder.attach(self._simulator_connector.transport)
+                    self._link_stats.attach(self._simulator_connector.transport)
                     
                     # Connection established
                     self._connected = True
@@ -273,10 +379,89 @@ class SerialConnector(QObject):
             raise
 
     def _connect_to_serial_port(self):
-        """Connects to a physical serial port."""
+        """Starts opening a physical serial port; finished in _on_link_opened."""
+        self._set_pending_link(self._connection_worker.open_link(self._port, self._baud_rate))
+        return True
+
+    @Slot()
+    def autoConnect(self):
+        """Probes all serial ports at common baud rates and connects to the first vehicle."""
+        ports = [port for port in self._available_ports if port != "Simulator"]
+        if not ports:
+            self.errorOccurred.emit("No serial ports to probe")
+            self._logger.addLog("[ERR] No serial ports to probe")
+            return
+        self._cancel_pending_link()
+        if self._connected:
+            self.disconnect()
+        self._logger.addLog(f"[INFO] Probing {', '.join(ports)} for a vehicle...")
+        self._set_pending_link(self._connection_worker.probe_ports(ports))
+
+    @Slot()
+    def cancelConnect(self):
+        """Cancels a running connection attempt or port probe."""
+        if self._pending_link is not None:
+            self._cancel_pending_link()
+            self._logger.addLog("[INFO] Connection attempt cancelled")
+
+    def _set_pending_link(self, future):
+        self._pending_link = future
+        self.connectingChanged.emit(future is not None)
+
+    def _cancel_pending_link(self):
+        if self._pending_link is not None:
+            self._connection_worker.cancel()
+            self._set_pending_link(None)
+
+    def _is_pending(self, link=None):
+        # Signale früherer, inzwischen ersetzter Versuche ignorieren
+        future = self._pending_link
+        if future is None or not future.done() or future.cancelled():
+            return False
+        if link is not None:
+            return future.exception() is None and future.result() is link
+        return future.exception() is not None
+
+    def _on_connection_progress(self, message):
+        self._logger.addLog(message)
+        self.connectionProgress.emit(message)
+
+    def _on_link_opened(self, link):
+        """A heartbeat arrived on the worker: finish the connection on the Qt thread."""
+        if not self._is_pending(link):
+            # Zu spät: Versuch wurde abgebrochen oder ersetzt
+            try:
+                link.connection.close()
+            except Exception:
+                pass
+            return
+        self._set_pending_link(None)
+        self.setPort(link.port)
+        self.setBaudRate(link.baud)
         try:
-            # MAVLink-Verbindung herstellen
-            self._mavlink_connection = mavutil.mavlink_connection(self._port, self._baud_rate)
+            self._attach_link(link.connection)
+        except Exception as e:
+            error_msg = f"[ERR] Connection failed: {str(e)}"
+            self.errorOccurred.emit(error_msg)
+            self._logger.addLog(error_msg)
+            self._cleanup_connection()
+
+    def _on_link_failed(self, message):
+        if not self._is_pending():
+            return
+        self._set_pending_link(None)
+        error_msg = f"[ERR] Connection failed: {message}"
+        self.errorOccurred.emit(error_msg)
+        self._logger.addLog(error_msg)
+
+    def _attach_link(self, connection, threaded=True):
+        """Sets up handlers, streams and the reader for a connection with a heartbeat."""
+        try:
+            self._mavlink_connection = connection
+
+            # Alle Sender (Befehle, Parameter, Streams) gehen über den Scheduler
+            self._outgoing_scheduler.attach(
+                connection, self._baud_rate if self._outgoing_shaping else None)
             
             # Verbindung in Managern setzen
             self._message_handler.set_connection(self._mavlink_connection, is_simulator=False)
@@ -285,17 +470,6 @@ class SerialConnector(QObject):
             # Sensoren initialisieren
             self._sensor_manager.initialize_sensors()
             
-            # Auf Heartbeat warten
-            self._logger.addLog("⌛ Waiting for heartbeat...")
-            try:
-                self._mavlink_connection.wait_heartbeat(timeout=10)
-                self._logger.addLog("💓 Heartbeat received!")
-            except Exception as e:
-                error_msg = f"[ERR] Error waiting for heartbeat: {str(e)}"
-                self._logger.addLog(error_msg)
-                self.errorOccurred.emit(error_msg)
-                raise ConnectionError(f"No heartbeat received: {str(e)}")
-            
             # Message Handler starten
             if not self._message_handler.start():
                 raise ConnectionError("Failed to start message handler")
@@ -303,11 +477,24 @@ class SerialConnector(QObject):
             # Datenströme anfordern
             self._message_handler.request_data_streams()
             
-            # Timer für Nachrichtenverarbeitung starten
-            self._timer = QTimer(self)
-            self._timer.timeout.connect(self._message_handler.process_messages)
-            self._timer.start(100)  # 100ms Intervall
-            self._logger.addLog("⏱️ Message handling timer started")
+            # Einziger Leser der Verbindung: Reader-Thread + Verteilung an alle Handler
+            self._transport = MAVLinkTransport(
+                self._mavlink_connection,
+                threaded=threaded,
+                capacity=self._reader_capacity,
+                overflow_policy=self._reader_overflow_policy,
+                lazy_decoding=self._reader_lazy_decoding,
+                parent=self,
+            )
+            self._transport.errorOccurred.connect(self._log_error)
+            self._message_handler.attach_transport(self._transport)
+            self._recorder.attach(self._transport)
+            self._link_stats.attach(self._transport, self._baud_rate if threaded else None)
+            self._transport.start()
+            self._reader = self._transport.reader
+            self.readerChanged.emit()
+            if threaded:
+                self._logger.addLog("🧵 MAVLink reader thread started")
 
             # Verbindung hergestellt - Status setzen
             self._connected = True
@@ -318,6 +505,14 @@ class SerialConnector(QObject):
             
         except Exception as e:
             # Bei Fehler aufräumen und Exception weiterreichen
+            if self._transport is not None:
+                self._transport.stop()
+                self._message_handler.attach_transport(None)
+                self._transport = None
+                self._reader = None
+            self._recorder.detach()
+            self._link_stats.detach()
+            self._outgoing_scheduler.detach()
             if self._mavlink_connection:
                 try:
                     self._mavlink_connection.close()
@@ -330,6 +525,7 @@ class SerialConnector(QObject):
     @Slot()
     def disconnect(self):
         """Trennt die Verbindung zum Port."""
+        self.cancelConnect()
         if not self._connected:
             return
             
@@ -352,11 +548,33 @@ class SerialConnector(QObject):
 
     def _cleanup_connection(self):
         """Bereinigt alle Verbindungsressourcen."""
-        # Timer stoppen
-        if self._timer:
-            self._timer.stop()
-            self._timer = None
+        # Laufenden Verbindungsversuch abbrechen
+        self._cancel_pending_link()
+
+        # Reader-Thread stoppen, bevor die Verbindung geschlossen wird
+        if self._transport is not None:
+            self._transport.stop()
+            self._message_handler.attach_transport(None)
+            self._transport = None
+        self._recorder.detach()
+        self._link_stats.detach()
+        if self._reader is not None:
+            self._reader = None
+            self.readerChanged.emit()
             
+        # Warteschlangen für ausgehende Nachrichten verwerfen
+        self._outgoing_scheduler.detach()
+
+        # Wiedergabe beenden (die Verbindung schließt die Datei)
+        if self._replay is not None:
+            self._replay.pause()
+            self._replay = None
+            self.replayChanged.emit()
+
+        # Laufenden Parameter-Download anhalten (kann fortgesetzt werden)
+        self._parameter_manager.cancel_loading()
+        self._parameter_manager.cancel_writing()
+
         # Message Handler stoppen
         if hasattr(self, '_message_handler'):
             self._message_handler.stop()
@@ -381,6 +599,12 @@ class SerialConnector(QObject):
         self._log_info("[LOAD] Lade Parameter vom Flugcontroller...")
         self._parameter_manager.load_parameters()
         
+    @Slot(str, result=bool)
+    def write_parameter_file(self, path):
+        """Schreibe alle Parameter einer Parameterdatei mit Bestätigung"""
+        self._log_info(f"[LOAD] Schreibe Parameterdatei {path}...")
+        return self._parameter_manager.write_parameter_file(path)
+
     @Slot(str, str)
     def set_parameter(self, name, value):
         """Setze einen Parameter-Wert auf dem Flugcontroller"""
@@ -491,6 +715,7 @@ class SerialConnector(QObject):
 
     def stop(self):
         self.disconnect()
+        self.stopRecording()
 
     def update_gps(self, lat: float, lon: float):
         # Update GPS coordinates in the sensor model.
@@ -601,18 +826,11 @@ class SerialConnector(QObject):
                     roll_deg, pitch_deg, yaw_deg = 0.0, 0.0, 0.0
                     roll_rad, pitch_rad, yaw_rad = 0.0, 0.0, 0.0
             
-            # Send signals with robust values
-            self.attitudeChanged.emit(float(roll_rad), float(pitch_rad), float(yaw_rad))
-            
-            # Update sensors
-            if self._sensor_model:
-                self._sensor_model.update_sensor("roll", float(roll_deg))
-                self._sensor_model.update_sensor("pitch", float(pitch_deg))
-                self._sensor_model.update_sensor("yaw", float(yaw_deg))
-                
-                # Only log when valid data is present
-                if roll_deg != 0.0 or pitch_deg != 0.0 or yaw_deg != 0.0:
-                    self._logger.addLog(f"[INFO] Attitude sensors updated: Roll={roll_deg}°, Pitch={pitch_deg}°, Yaw={yaw_deg}°")
+            # Nur den neuesten Wert vormerken - Signal und Sensoren werden im Frame-Takt aktualisiert
+            self._coalescer.publish("attitude", (float(roll_rad), float(pitch_rad), float(yaw_rad)))
+            self._coalescer.publish("roll", float(roll_deg))
+            self._coalescer.publish("pitch", float(pitch_deg))
+            self._coalescer.publish("yaw", float(yaw_deg))
         except Exception as e:
             self._logger.addLog(f"Attitude error: {str(e)}")
             # Use default values
@@ -651,28 +869,21 @@ class SerialConnector(QObject):
                     lat, lon, alt = 0.0, 0.0, 0.0
                     groundspeed = 0.0
             
-            # Send signals with robust values
-            self.gpsChanged.emit(float(lat), float(lon), float(alt))
-            
-            # Update sensors
-            if self._sensor_model:
-                self._sensor_model.update_sensor("gps_lat", float(round(lat, 6)))
-                self._sensor_model.update_sensor("gps_lon", float(round(lon, 6)))
-                self._sensor_model.update_sensor("altitude", float(round(alt, 1)))
-                self._sensor_model.update_sensor("groundspeed", float(groundspeed))
-                
-                # Heading (if available)
-                if hasattr(msg, 'hdg') and msg.hdg != 0:
-                    try:
-                        heading = float(msg.hdg) / 100.0  # cdeg to deg
-                        self._sensor_model.update_sensor("heading", float(round(heading, 1)))
-                    except:
-                        # Ignore heading errors
-                        pass
-                
-                # Only log when valid data is present
-                if lat != 0.0 or lon != 0.0:
-                    self._logger.addLog(f"[INFO] GPS sensors updated: Lat={lat:.6f}, Lon={lon:.6f}, Alt={alt:.1f}m, Speed={groundspeed}m/s")
+            # Nur den neuesten Wert vormerken - Signal und Sensoren werden im Frame-Takt aktualisiert
+            self._coalescer.publish("gps", (float(lat), float(lon), float(alt)))
+            self._coalescer.publish("gps_lat", float(round(lat, 6)))
+            self._coalescer.publish("gps_lon", float(round(lon, 6)))
+            self._coalescer.publish("altitude", float(round(alt, 1)))
+            self._coalescer.publish("groundspeed", float(groundspeed))
+
+            # Heading (if available)
+            if hasattr(msg, 'hdg') and msg.hdg != 0:
+                try:
+                    heading = float(msg.hdg) / 100.0  # cdeg to deg
+                    self._coalescer.publish("heading", float(round(heading, 1)))
+                except:
+                    # Ignore heading errors
+                    pass
         except Exception as e:
             self._logger.addLog(f"GPS error: {str(e)}")
             # Use default values
@@ -682,6 +893,60 @@ class SerialConnector(QObject):
                 self._sensor_model.update_sensor("altitude", 0.0)
                 self._sensor_model.update_sensor("groundspeed", 0.0)
 
+    def _apply_telemetry(self, batch):
+        """Applies one coalesced batch of telemetry values to signals and the sensor model"""
+        sensor_values = {}
+        for topic, value in batch.items():
+            if topic == "attitude":
+                self.attitudeChanged.emit(*value)
+            elif topic == "gps":
+                self.gpsChanged.emit(*value)
+            else:
+                sensor_values[topic] = value
+        if sensor_values and self._sensor_model:
+            # Ein Durchlauf, zusammenhängende dataChanged-Bereiche
+            self._sensor_model.update_many(sensor_values)
+        tracer = self._latency_tracer
+        if tracer.enabled and ("attitude" in batch or "gps" in batch):
+            tracer.mark("signal")
+
+    @Property(QObject, constant=True)
+    def telemetryCoalescer(self):
+        """Coalescing stage between message rate and UI rate"""
+        return self._coalescer
+
+    @Property(QObject, constant=True)
+    def latencyTracer(self):
+        """Per-stage latency histograms (enable with setLatencyTracing)"""
+        return self._latency_tracer
+
+    @Slot(bool)
+    def setLatencyTracing(self, enabled):
+        """Switches the hot-path latency instrumentation on or off"""
+        self._latency_tracer.setEnabled(enabled)
+        self._logger.addLog(f"⏱️ Latency tracing {'enabled' if enabled else 'disabled'}")
+
+    @Slot()
+    def dumpLatencyStats(self):
+        """Writes the latency histograms to the log"""
+        for line in self._latency_tracer.dump().splitlines():
+            self._logger.addLog(f"⏱️ {line}")
+
+    @Property(QObject, constant=True)
+    def telemetryStore(self):
+        """TelemetryStore with the history of the telemetry fields"""
+        return self._telemetry_store
+
+    @Property(QObject, constant=True)
+    def telemetryPlotter(self):
+        """TelemetryPlotter: downsampled history series for charts"""
+        return self._telemetry_plotter
+
+    @Slot(float)
+    def setUiUpdateRate(self, rate_hz):
+        """Sets the rate in Hz at which telemetry is pushed to the UI"""
+        self._coalescer.setUpdateRate(rate_hz)
+
     def _handle_battery(self, msg):
         """Handle battery message from simulator"""
         try:
@@ -695,9 +960,11 @@ class SerialConnector(QObject):
             
             # Update sensors
             if self._sensor_model:
-                self._sensor_model.update_sensor("battery_voltage", round(voltage, 1))
-                self._sensor_model.update_sensor("battery_current", round(current, 1))
-                self._sensor_model.update_sensor("battery_remaining", round(remaining, 0))
+                self._sensor_model.update_many({
+                    "battery_voltage": round(voltage, 1),
+                    "battery_current": round(current, 1),
+                    "battery_remaining": round(remaining, 0),
+                })
                 
                 self._logger.addLog(f"[INFO] Battery sensors updated: {voltage:.1f}V, {current:.1f}A, {remaining}%")
         except Exception as e:
@@ -710,15 +977,7 @@ class SerialConnector(QObject):
 
     def _handle_parameter(self, msg):
         """Handle parameter message from simulator"""
-        if self.parameter_model:
-            self.parameter_model.add_parameter({
-                "name": msg.param_id,
-                "value": msg.param_value,
-                "defaultValue": "",
-                "unit": "",
-                "options": "",
-                "desc": ""
-            })
+        self._parameter_manager.handle_parameter(msg)
             
     # Event handlers for SimulatorConnector
     def _on_simulator_connection_changed(self, connected):
@@ -730,52 +989,41 @@ class SerialConnector(QObject):
             if connected:
                 self._logger.addLog(f"[OK] Connected to {self._port}")
             else:
+                self._recorder.detach()
+                self._link_stats.detach()
                 self._logger.addLog(f"Disconnected from {self._port}")
     
     def _on_simulator_message(self, msg):
         """Handles incoming MAVLink messages from the SimulatorConnector"""
-        # Determine message type and forward to corresponding handlers
         try:
-            # Get message type
-            msgtype = msg.get_type()
-            self._logger.addLog(f"Receiving MAVLink message: {msgtype}")
-            
-            # Process based on message type
-            if msgtype == "HEARTBEAT":
-                self._handle_heartbeat(msg)
-            elif msgtype == "ATTITUDE":
-                self._handle_attitude(msg)
-                self._logger.addLog(f"📊 Attitude: Roll={msg.roll:.2f}, Pitch={msg.pitch:.2f}, Yaw={msg.yaw:.2f}")
-            elif msgtype == "GLOBAL_POSITION_INT":
-                self._handle_gps(msg)
-                lat = msg.lat / 1e7
-                lon = msg.lon / 1e7
-                alt = msg.relative_alt / 1000.0
-                self._logger.addLog(f"📊 GPS: Lat={lat:.6f}, Lon={lon:.6f}, Alt={alt:.1f}m")
-            elif msgtype == "SYS_STATUS":
-                self._handle_battery(msg)
-                voltage = msg.voltage_battery / 1000.0
-                current = msg.current_battery / 100.0
-                remaining = msg.battery_remaining
-                self._logger.addLog(f"📊 Battery: {voltage:.1f}V, {current:.1f}A, {remaining}%")
-            elif msgtype == "STATUSTEXT":
-                self._handle_status_text(msg)
-            elif msgtype == "PARAM_VALUE":
-                self._handle_parameter(msg)
-                
-            # Force a model update
-            if self._sensor_model:
-                # Debug output of current sensor values
-                sensors = self._sensor_model.get_all_sensors()
-                self._logger.addLog(f"📊 Sensor update: {len(sensors)} sensors in model")
-                
-                # Force UI update
-                self._sensor_model.dataChanged.emit(self._sensor_model.index(0), 
-                                                self._sensor_model.index(self._sensor_model.rowCount() - 1))
+            # Das Modell meldet geänderte Zeilen selbst (dataChanged pro Bereich)
+            self._simulator_dispatcher.dispatch(msg)
         except Exception as e:
-            self._logger.addLog(f"⚠️ Error processing {msgtype}: {str(e)}")
-            import traceback
-            self._logger.addLog(traceback.format_exc())
+            self._logger.addLog(f"⚠️ Error processing {msg.get_type()}: {str(e)}")
+
+    def _on_simulator_dispatch_error(self, msg, error):
+        """Reports exceptions raised by simulator message handlers"""
+        self._logger.addLog(f"⚠️ Error processing {msg.get_type()}: {str(error)}")
+        import traceback
+        self._logger.addLog(traceback.format_exc())
+
+    def _on_simulator_attitude(self, msg):
+        self._handle_attitude(msg)
+        self._logger.addLog(f"📊 Attitude: Roll={msg.roll:.2f}, Pitch={msg.pitch:.2f}, Yaw={msg.yaw:.2f}")
+
+    def _on_simulator_gps(self, msg):
+        self._handle_gps(msg)
+        lat = msg.lat / 1e7
+        lon = msg.lon / 1e7
+        alt = msg.relative_alt / 1000.0
+        self._logger.addLog(f"📊 GPS: Lat={lat:.6f}, Lon={lon:.6f}, Alt={alt:.1f}m")
+
+    def _on_simulator_battery(self, msg):
+        self._handle_battery(msg)
+        voltage = msg.voltage_battery / 1000.0
+        current = msg.current_battery / 100.0
+        remaining = msg.battery_remaining
+        self._logger.addLog(f"📊 Battery: {voltage:.1f}V, {current:.1f}A, {remaining}%")
             
     def _on_simulator_error(self, error_msg):
         """Handles error messages from the SimulatorConnector"""
@@ -828,8 +1076,15 @@ class SerialConnector(QObject):
                     # Send SET_MODE message
                     if mode in mode_mapping:
                         mode_id = mode_mapping[mode]
-                        self._mavlink_connection.set_mode(mode_id)
-                        self._logger.addLog(f"Flight mode set to {mode}")
+                        # Erfolg erst mit dem COMMAND_ACK melden
+                        future = self._message_handler.send_command(
+                            mavutil.mavlink.MAV_CMD_DO_SET_MODE,
+                            mavutil.mavlink.MAV_MODE_FLAG_CUSTOM_MODE_ENABLED,
+                            mode_id,
+                        )
+                        future.add_done_callback(
+                            lambda f: self._log_command_result(f, f"Flight mode set to {mode}",
+                                                               f"Setting flight mode to {mode}"))
                     else:
                         self._logger.addLog(f"⚠️ Unknown flight mode: {mode}")
                 else:
@@ -837,6 +1092,112 @@ class SerialConnector(QObject):
         except Exception as e:
             self._logger.addLog(f"[ERR] Error setting flight mode: {str(e)}")
             
+    def _log_command_result(self, future, success_msg, action):
+        """Logs the COMMAND_ACK result of a command sent via the CommandManager"""
+        if future.cancelled():
+            return
+        error = future.exception()
+        if error is not None:
+            error_msg = f"[ERR] {action} failed: {str(error)}"
+        elif future.result() != mavutil.mavlink.MAV_RESULT_ACCEPTED:
+            error_msg = f"[ERR] {action} rejected: {result_name(future.result())}"
+        else:
+            self._logger.addLog(success_msg)
+            return
+        self._logger.addLog(error_msg)
+        self.errorOccurred.emit(error_msg)
+
+    @Property(QObject, constant=True)
+    def outgoingScheduler(self):
+        """OutgoingScheduler with queue depth and queueing latency per priority class"""
+        return self._outgoing_scheduler
+
+    @Slot(bool)
+    def setOutgoingShaping(self, enabled):
+        """Limits outgoing bytes to a share of the baud rate (on by default)"""
+        self._outgoing_shaping = enabled
+        self._outgoing_scheduler.set_baud_rate(self._baud_rate if enabled else None)
+
+    @Property(QObject, constant=True)
+    def recorder(self):
+        """TlogRecorder with recording state, path and frame counters"""
+        return self._recorder
+
+    @Slot()
+    @Slot(str)
+    def startRecording(self, path=""):
+        """
+        Records all MAVLink traffic into a tlog (default: logs/tlogs/<time>.tlog).
+
+        Without a connection, recording starts with the next link. The
+        fallback simulators feed the sensor model directly and have no MAVLink
+        link to record, so recording is refused while they run.
+        """
+        if self._connected and self._recorder.transport is None:
+            error_msg = f"[ERR] Cannot record {self._port}: no MAVLink link"
+            self.errorOccurred.emit(error_msg)
+            self._logger.addLog(error_msg)
+            return
+        path = self._recorder.start(path or None)
+        if path is not None:
+            self._logger.addLog(f"⏺️ Recording MAVLink traffic to {path}")
+
+    @Slot()
+    def stopRecording(self):
+        """Stops the tlog recording and closes the file"""
+        if not self._recorder.is_recording():
+            return
+        path = self._recorder.recordingPath
+        self._recorder.stop()
+        stats = self._recorder.stats()
+        self._logger.addLog(
+            f"⏹️ Recording saved to {path} ({stats['received'] + stats['sent']} frames, {stats['bytes']} bytes)")
+
+    @Property(QObject, constant=True)
+    def linkStats(self):
+        """LinkStatsModel: per-msgid rates, bytes/s, CRC errors and packet loss"""
+        return self._link_stats
+
+    @Property(QObject, notify=replayChanged)
+    def replay(self):
+        """TlogReplay of the running replay (play/pause/step/seek/setSpeed), or null"""
+        return self._replay
+
+    @Slot(str, result=bool)
+    def startReplay(self, path):
+        """Plays a recorded tlog through the normal message path as if it were a live link"""
+        self.disconnect()
+        try:
+            replay = TlogReplay(path, parent=self)
+        except (OSError, ValueError) as e:
+            error_msg = f"[ERR] Could not open tlog {path}: {str(e)}"
+            self.errorOccurred.emit(error_msg)
+            self._logger.addLog(error_msg)
+            return False
+        self.setPort(f"Replay: {replay.path.name}")
+        self._telemetry_store.clear()
+        try:
+            # Ohne Reader-Thread: die Wiedergabe liefert selbst an den Transport
+            self._attach_link(replay.link, threaded=False)
+        except Exception as e:
+            replay.close()
+            error_msg = f"[ERR] Replay failed: {str(e)}"
+            self.errorOccurred.emit(error_msg)
+            self._logger.addLog(error_msg)
+            return False
+        replay.attach(self._transport)
+        self._replay = replay
+        self.replayChanged.emit()
+        self._logger.addLog(
+            f"▶️ Replaying {replay.path.name}: {replay.frameCount} frames, {replay.duration:.1f} s")
+        replay.play()
+        return True
+
+    @Property(QObject, constant=True)
+    def commandManager(self):
+        """CommandManager with in-flight count and command round-trip latency"""
+        return self._message_handler.get_command_manager()
+
     @Slot(bool)
     def armDisarm(self, arm):
         """Arms or disarms the aircraft."""
@@ -859,9 +1220,12 @@ class SerialConnector(QObject):
             else:
                 # For normal connection via MAVLink
                 if self._mavlink_connection:
-                    # Send ARM_DISARM command
-                    self._mavlink_connection.arducopter_arm() if arm else self._mavlink_connection.arducopter_disarm()
-                    self._logger.addLog(f"[OK] Aircraft successfully {'armed' if arm else 'disarmed'}")
+                    # Send ARM_DISARM command, success is reported with the COMMAND_ACK
+                    future = self._message_handler.send_command(
+                        mavutil.mavlink.MAV_CMD_COMPONENT_ARM_DISARM, 1 if arm else 0)
+                    future.add_done_callback(
+                        lambda f: self._log_command_result(
+                            f, f"[OK] Aircraft successfully {'armed' if arm else 'disarmed'}", action))
                 else:
                     self._logger.addLog("[ERR] No MAVLink connection available")
         except Exception as e:
@@ -4,11 +4,11 @@ Dieses Modul stellt eine robuste UDP-basierte Verbindung zum MAVLink-Simulator b
 """
 
 import asyncio
-import time
 from PySide6.QtCore import QObject, Signal, Slot, QTimer
 from pymavlink import mavutil
 
 from backend.simple_mavlink_simulator import SimpleMAVLinkSimulator
+from backend.mavlink_transport import MAVLinkTransport
 from backend.logger import Logger
 
 class SimulatorConnector(QObject):
@@ -24,6 +24,8 @@ class SimulatorConnector(QObject):
     heartbeatReceived = Signal()             # Heartbeat empfangen
     messageReceived = Signal(object)         # MAVLink-Nachricht empfangen
     errorOccurred = Signal(str)              # Fehler aufgetreten
+
+    HEARTBEAT_TIMEOUT_MS = 2000
     
     def __init__(self, logger: Logger):
         """
@@ -37,14 +39,26 @@ class SimulatorConnector(QObject):
         self._connected = False
         self._mavlink_connection = None
         self._simulator = None
-        self._receive_timer = None
+        self._transport = None
         self._simulator_started = False
+        self._heartbeat_seen = False
+
+        # Meldet einmalig, wenn nach dem Verbinden kein Heartbeat kommt
+        self._heartbeat_timer = QTimer(self)
+        self._heartbeat_timer.setSingleShot(True)
+        self._heartbeat_timer.setInterval(self.HEARTBEAT_TIMEOUT_MS)
+        self._heartbeat_timer.timeout.connect(self._on_heartbeat_timeout)
         
     @property
     def connected(self):
         """Gibt an, ob eine Verbindung besteht."""
         return self._connected
         
+    @property
+    def transport(self):
+        """MAVLinkTransport der Simulatorverbindung (weitere Konsumenten registrieren sich hier)"""
+        return self._transport
+
     @Slot()
     def start_connection(self):
         """Stellt eine Verbindung zum Simulator her."""
@@ -55,19 +69,8 @@ class SimulatorConnector(QObject):
         try:
             self._logger.addLog("🔄 Verbinde mit Simulator...")
             
-            # Start simulator process
-            self._simulator = SimpleMAVLinkSimulator()
-            if not self._simulator.start():
-                self._logger.addLog("❌ Fehler beim Starten des Simulators")
-                return False
-                
-            self._simulator_started = True
-            self._logger.addLog("✅ Simulator gestartet")
-            
-            # Wait a moment for the simulator to initialize
-            time.sleep(0.5)
-            
-            # Create MAVLink connection to receive simulator data
+            # Erst den UDP-Port öffnen, dann den Simulator starten: kein Warten nötig,
+            # bis der Simulator bereit ist
             try:
                 self._mavlink_connection = mavutil.mavlink_connection(
                     'udpin:localhost:14551',
@@ -79,21 +82,27 @@ class SimulatorConnector(QObject):
             except Exception as e:
                 self._logger.addLog(f"❌ Fehler bei MAVLink-Verbindung: {str(e)}")
                 return False
+
+            # Start simulator process
+            self._simulator = SimpleMAVLinkSimulator()
+            if not self._simulator.start():
+                self._logger.addLog("❌ Fehler beim Starten des Simulators")
+                self._cleanup_connection()
+                return False
                 
-            # Wait for heartbeat with timeout
-            self._logger.addLog("⌛ Warte auf Heartbeat...")
-            try:
-                self._mavlink_connection.wait_heartbeat(timeout=2)
-                self._logger.addLog("💓 Heartbeat empfangen!")
-                self.heartbeatReceived.emit()
-            except Exception as e:
-                # Heartbeat might not come in simulator mode immediately
-                self._logger.addLog("⚠️ Kein Heartbeat empfangen, fahre trotzdem fort")
+            self._simulator_started = True
+            self._logger.addLog("✅ Simulator gestartet")
             
-            # Start message receive timer
-            self._receive_timer = QTimer(self)
-            self._receive_timer.timeout.connect(self._receive_messages)
-            self._receive_timer.start(100)  # 100ms
+            # Einziger Leser der Verbindung (Reader-Thread), verteilt an alle Konsumenten
+            self._transport = MAVLinkTransport(self._mavlink_connection, parent=self)
+            self._transport.add_listener(self._on_message)
+            self._transport.errorOccurred.connect(self._on_transport_error)
+            self._transport.start()
+
+            # Heartbeat wird vom Transport gemeldet; nicht im UI-Thread darauf warten
+            self._logger.addLog("⌛ Warte auf Heartbeat...")
+            self._heartbeat_seen = False
+            self._heartbeat_timer.start()
             
             # Set connected state
             self._connected = True
@@ -121,10 +130,12 @@ class SimulatorConnector(QObject):
         
     def _cleanup_connection(self):
         """Räumt alle Verbindungsressourcen auf."""
-        # Stop the message receive timer
-        if self._receive_timer is not None:
-            self._receive_timer.stop()
-            self._receive_timer = None
+        self._heartbeat_timer.stop()
+
+        # Stop the message transport
+        if self._transport is not None:
+            self._transport.stop()
+            self._transport = None
             
         # Stop the simulator
         if self._simulator is not None and self._simulator_started:
@@ -148,25 +159,27 @@ class SimulatorConnector(QObject):
             self._connected = False
             self.connectionStatusChanged.emit(False)
             
-    def _receive_messages(self):
-        """Empfängt und verarbeitet MAVLink-Nachrichten."""
-        if not self._connected or self._mavlink_connection is None:
+    def _on_message(self, msg):
+        """Verarbeitet eine vom Transport gelesene MAVLink-Nachricht."""
+        if not self._connected:
             return
             
-        try:
-            # Check for new messages
-            msg = self._mavlink_connection.recv_match(blocking=False)
-            if msg:
-                # Process message
-                msgtype = msg.get_type()
-                
-                # Emit message for handlers
-                self.messageReceived.emit(msg)
-                
-                # Special handling for heartbeat
-                if msgtype == "HEARTBEAT":
-                    self.heartbeatReceived.emit()
-                    
-        except Exception as e:
-            self._logger.addLog(f"⚠️ Fehler beim Empfangen von Nachrichten: {str(e)}")
-            # Don't disconnect on receive errors
+        # Emit message for handlers
+        self.messageReceived.emit(msg)
+        
+        # Special handling for heartbeat
+        if msg.get_type() == "HEARTBEAT":
+            if not self._heartbeat_seen:
+                self._heartbeat_seen = True
+                self._heartbeat_timer.stop()
+                self._logger.addLog("💓 Heartbeat empfangen!")
+            self.heartbeatReceived.emit()
+
+    def _on_heartbeat_timeout(self):
+        # Heartbeat might not come in simulator mode immediately
+        if self._connected and not self._heartbeat_seen:
+            self._logger.addLog("⚠️ Kein Heartbeat empfangen, fahre trotzdem fort")
+
+    def _on_transport_error(self, error_msg):
+        # Don't disconnect on receive errors
+        self._logger.addLog(f"⚠️ Fehler beim Empfangen von Nachrichten: {error_msg}")
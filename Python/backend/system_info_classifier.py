@@ -0,0 +1,142 @@
+"""
+Single-pass classification of log lines and STATUSTEXT messages.
+
+All patterns of all categories are compiled into one alternation regex, so
+a line is scanned once no matter how many patterns are configured. The scan
+regex has no capturing groups, which keeps the regex engine's literal prefix
+search enabled; only on a hit is the category resolved with the per-category
+regexes at the match position.
+"""
+
+import re
+
+# Systeminformationen des Flight Controllers (Logger und STATUSTEXT)
+SYSTEM_INFO_PATTERNS = {
+    "frame": ["Frame:"],
+    "rcout": ["RCOut:"],
+    "board": ["MicoAir", "ChibiOS:"],
+    "firmware": ["ArduCopter"],
+    "prearm": ["PreArm:"],
+}
+
+# Zusätzliche wichtige Statustexte (nur STATUSTEXT)
+STATUS_TEXT_PATTERNS = {
+    "ekf": {"patterns": [r"^EKF"], "regex": True},
+    "arming": {"patterns": ["armed", "ready to arm"], "ignore_case": True},
+}
+
+
+class SystemInfoClassifier:
+    """
+    Compiled multi-pattern matcher with categories.
+
+    ``categories`` maps a category name to either a list of literal
+    substrings or a dict ``{"patterns": [...], "regex": bool,
+    "ignore_case": bool}``. Categories are tried in insertion order when
+    several match at the same position.
+    """
+
+    DEFAULT_CACHE_SIZE = 1024
+
+    def __init__(self, categories=None, cache_size=DEFAULT_CACHE_SIZE):
+        self._cache_size = cache_size
+        self._cache = {}
+        self._categories = {}
+        self._regex = None
+        self._category_regexes = []
+        self.set_categories(SYSTEM_INFO_PATTERNS if categories is None else categories)
+
+    @classmethod
+    def for_status_text(cls, cache_size=DEFAULT_CACHE_SIZE):
+        """Classifier for STATUSTEXT: system info plus EKF and arming messages"""
+        return cls({**SYSTEM_INFO_PATTERNS, **STATUS_TEXT_PATTERNS}, cache_size)
+
+    @staticmethod
+    def _normalize(spec):
+        if isinstance(spec, dict):
+            return {
+                "patterns": list(spec.get("patterns", [])),
+                "regex": bool(spec.get("regex", False)),
+                "ignore_case": bool(spec.get("ignore_case", False)),
+            }
+        if isinstance(spec, str):
+            spec = [spec]
+        return {"patterns": list(spec), "regex": False, "ignore_case": False}
+
+    def set_categories(self, categories):
+        """Replace the whole pattern set and recompile"""
+        normalized = {}
+        for name, spec in categories.items():
+            if not re.fullmatch(r"[A-Za-z_][A-Za-z0-9_]*", name):
+                raise ValueError(f"Invalid category name: {name}")
+            normalized[name] = self._normalize(spec)
+        self._categories = normalized
+        self._compile()
+
+    def add_category(self, name, patterns, regex=False, ignore_case=False):
+        """Add or replace one category"""
+        categories = dict(self._categories)
+        categories[name] = {"patterns": list(patterns), "regex": regex, "ignore_case": ignore_case}
+        self.set_categories(categories)
+
+    def remove_category(self, name):
+        if name in self._categories:
+            categories = dict(self._categories)
+            del categories[name]
+            self.set_categories(categories)
+
+    def categories(self):
+        """Copy of the configured categories"""
+        return {name: dict(spec, patterns=list(spec["patterns"]))
+                for name, spec in self._categories.items()}
+
+    def _compile(self):
+        bodies = []
+        category_regexes = []
+        for name, spec in self._categories.items():
+            patterns = spec["patterns"] if spec["regex"] else [re.escape(p) for p in spec["patterns"]]
+            if not patterns:
+                continue
+            body = "|".join(patterns)
+            if spec["ignore_case"]:
+                body = f"(?i:{body})"
+            bodies.append(f"(?:{body})")
+            category_regexes.append((name, re.compile(body)))
+        # Benannte Gruppen würden die Präfix-Suche der re-Engine abschalten
+        self._regex = re.compile("|".join(bodies)) if bodies else None
+        self._category_regexes = category_regexes
+        self._cache = {}
+
+    def classify(self, text):
+        """Category of the first match in the text, or None (uncached)"""
+        if self._regex is None:
+            return None
+        match = self._regex.search(text)
+        if match is None:
+            return None
+        # Treffer sind selten: Kategorie an der Trefferposition bestimmen
+        position = match.start()
+        for name, regex in self._category_regexes:
+            if regex.match(text, position):
+                return name
+        return None
+
+    def classify_cached(self, text):
+        """Like classify, but remembers results for repeated identical texts"""
+        try:
+            return self._cache[text]
+        except KeyError:
+            pass
+        category = self.classify(text)
+        if len(self._cache) >= self._cache_size:
+            # Einfache Verdrängung: bei vollem Cache neu beginnen
+            self._cache = {}
+        self._cache[text] = category
+        return category
+
+    def matches(self, text):
+        return self.classify(text) is not None
+
+    @property
+    def cache_size(self):
+        return len(self._cache)
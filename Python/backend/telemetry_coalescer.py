@@ -0,0 +1,132 @@
+"""
+Latest-value-wins coalescing of telemetry for the UI.
+
+High-rate messages (ATTITUDE, GLOBAL_POSITION_INT at 50 Hz and more) would
+otherwise trigger QML re-evaluation on every packet. The coalescer keeps
+only the newest value per topic and hands them to the UI in one batch per
+frame. Full-rate consumers (recorders, statistics) register as listeners and
+still see every value.
+"""
+
+from PySide6.QtCore import QObject, Signal, Slot, Property, QTimer
+
+
+class TelemetryCoalescer(QObject):
+    """
+    Buffers the newest value per topic and flushes them at the UI rate.
+
+    Signals:
+        flushed: dict {topic: value} with the newest values since the last flush
+        updateRateChanged: The flush rate was changed
+    """
+
+    flushed = Signal(dict)
+    updateRateChanged = Signal(float)
+
+    DEFAULT_RATE_HZ = 60.0
+    MIN_RATE_HZ = 1.0
+    MAX_RATE_HZ = 240.0
+
+    def __init__(self, rate_hz=DEFAULT_RATE_HZ, parent=None):
+        super().__init__(parent)
+        self._pending = {}
+        self._listeners = []
+        self._rate_hz = self._clamp_rate(rate_hz)
+        self._published = 0
+        self._delivered = 0
+        self._tracer = None
+        self._oldest_read_time = None  # Ältester Lesezeitpunkt der anstehenden Werte
+
+        self._timer = QTimer(self)
+        self._timer.setInterval(self._interval_ms(self._rate_hz))
+        self._timer.timeout.connect(self.flush)
+
+    @classmethod
+    def _clamp_rate(cls, rate_hz):
+        return max(cls.MIN_RATE_HZ, min(float(rate_hz), cls.MAX_RATE_HZ))
+
+    @staticmethod
+    def _interval_ms(rate_hz):
+        return max(1, int(round(1000.0 / rate_hz)))
+
+    def set_latency_tracer(self, tracer):
+        """Carry message read times across the coalescing delay (None disables)"""
+        self._tracer = tracer
+
+    def add_listener(self, callback):
+        """Register a full-rate consumer: callback(topic, value) for every publish"""
+        if callback not in self._listeners:
+            self._listeners.append(callback)
+
+    def remove_listener(self, callback):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def publish(self, topic, value):
+        """Store the newest value for a topic (cheap, called at message rate)"""
+        self._pending[topic] = value
+        self._published += 1
+        tracer = self._tracer
+        if tracer is not None and tracer.enabled and tracer.current is not None:
+            if self._oldest_read_time is None or tracer.current < self._oldest_read_time:
+                self._oldest_read_time = tracer.current
+        for listener in self._listeners:
+            listener(topic, value)
+        if not self._timer.isActive():
+            self._timer.start()
+
+    def publish_many(self, values):
+        """Store several topic values at once"""
+        for topic, value in values.items():
+            self.publish(topic, value)
+
+    @Slot()
+    def flush(self):
+        """Emit all pending values in one batch"""
+        if not self._pending:
+            # Nichts mehr zu tun - Timer ruht bis zum nächsten publish()
+            self._timer.stop()
+            return
+        batch = self._pending
+        self._pending = {}
+        self._delivered += len(batch)
+        tracer = self._tracer
+        if tracer is not None and tracer.enabled and self._oldest_read_time is not None:
+            # Latenz der UI-Stufen am ältesten Wert des Batches messen
+            tracer.set_current(self._oldest_read_time)
+            self._oldest_read_time = None
+            self.flushed.emit(batch)
+            tracer.set_current(None)
+            return
+        self._oldest_read_time = None
+        self.flushed.emit(batch)
+
+    def clear(self):
+        """Drop pending values without emitting them"""
+        self._pending = {}
+        self._oldest_read_time = None
+        self._timer.stop()
+
+    @Slot(float)
+    def setUpdateRate(self, rate_hz):
+        """Set the UI flush rate in Hz"""
+        rate_hz = self._clamp_rate(rate_hz)
+        if rate_hz == self._rate_hz:
+            return
+        self._rate_hz = rate_hz
+        self._timer.setInterval(self._interval_ms(rate_hz))
+        self.updateRateChanged.emit(rate_hz)
+
+    @Property(float, notify=updateRateChanged)
+    def updateRate(self):
+        return self._rate_hz
+
+    @property
+    def published_count(self):
+        """Number of values published at full rate"""
+        return self._published
+
+    @property
+    def delivered_count(self):
+        """Number of values handed to the UI after coalescing"""
+        return self._delivered
@@ -0,0 +1,196 @@
+"""
+Downsampled views of the telemetry history for plotting.
+
+A QML chart is a few hundred to a few thousand pixels wide, a flight has
+millions of samples. ``TelemetryPlotter`` returns at most about two points
+per pixel for a time window, computed with numpy from the views of the
+``TelemetryStore``:
+
+* ``minmax``: per pixel bucket the minimum and maximum in time order, which
+  keeps every spike visible (default);
+* ``lttb``: Largest-Triangle-Three-Buckets, one point per bucket that keeps
+  the shape of smooth signals.
+
+Results are cached per zoom level in tiles. A level has buckets of a power
+of two seconds, a tile covers TILE_BUCKETS buckets on a fixed time grid, so
+panning only computes the tiles that come into view and zooming back finds
+the tiles of the earlier level. Tiles still receiving data are not cached.
+"""
+
+import math
+from collections import OrderedDict
+
+import numpy as np
+from PySide6.QtCore import QObject, Slot, QPointF
+
+
+def minmax_indices(times, values, t_start, bucket_width, buckets):
+    """
+    Indices of the minimum and maximum of each time bucket, in time order.
+
+    Bucket ``k`` covers ``[t_start + k * bucket_width, ...)``; samples past
+    the last bucket count to it. NaN values are ignored.
+    """
+    n = len(times)
+    if n == 0:
+        return np.empty(0, dtype=np.int64)
+    nan = np.isnan(values)
+    if nan.any():
+        valid = np.flatnonzero(~nan)
+        return valid[minmax_indices(times[valid], values[valid], t_start, bucket_width, buckets)]
+    ids = np.clip(((times - t_start) // bucket_width).astype(np.int64), 0, buckets - 1)
+    starts = np.flatnonzero(np.diff(ids, prepend=ids[0] - 1))
+    counts = np.diff(np.append(starts, n))
+    positions = np.arange(n)
+    # Erste Position des Minimums/Maximums je Bucket
+    mins = np.repeat(np.minimum.reduceat(values, starts), counts)
+    maxs = np.repeat(np.maximum.reduceat(values, starts), counts)
+    imin = np.minimum.reduceat(np.where(values == mins, positions, n), starts)
+    imax = np.minimum.reduceat(np.where(values == maxs, positions, n), starts)
+    first = np.minimum(imin, imax)
+    second = np.maximum(imin, imax)
+    pairs = np.column_stack((first, second)).ravel()
+    keep = np.ones(len(pairs), dtype=bool)
+    keep[1::2] = second != first
+    return pairs[keep]
+
+
+def lttb_indices(times, values, n_out):
+    """Indices of ``n_out`` points chosen by Largest-Triangle-Three-Buckets"""
+    n = len(times)
+    if n <= n_out or n_out < 3:
+        return np.arange(n)
+    x = np.asarray(times, dtype=np.float64)
+    y = np.asarray(values, dtype=np.float64)
+    # Erster und letzter Punkt fest, dazwischen n_out - 2 Buckets
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    counts = np.diff(edges)
+    mean_x = np.add.reduceat(x[:n - 1], edges[:-1]) / counts
+    mean_y = np.add.reduceat(y[:n - 1], edges[:-1]) / counts
+    next_x = np.append(mean_x[1:], x[-1])
+    next_y = np.append(mean_y[1:], y[-1])
+
+    out = np.empty(n_out, dtype=np.int64)
+    out[0] = 0
+    out[-1] = n - 1
+    a = 0
+    for i in range(n_out - 2):
+        s, e = edges[i], edges[i + 1]
+        ax, ay = x[a], y[a]
+        # Doppelte Dreiecksfläche mit dem gewählten Punkt und dem Mittel des nächsten Buckets
+        areas = np.abs((ax - next_x[i]) * (y[s:e] - ay) - (ax - x[s:e]) * (next_y[i] - ay))
+        a = s + int(areas.argmax())
+        out[i + 1] = a
+    return out
+
+
+class TelemetryPlotter(QObject):
+    """
+    Downsampling API on top of a TelemetryStore.
+
+    ``series(name, t0, t1, width)`` returns numpy arrays, ``downsample``
+    the same as a list of QPointF (x = epoch seconds) for QML charts.
+    """
+
+    MINMAX = "minmax"
+    LTTB = "lttb"
+    METHODS = (MINMAX, LTTB)
+
+    TILE_BUCKETS = 256  # Buckets (Pixel) pro Kachel
+    MIN_LEVEL = -16  # ~15 µs pro Bucket; feiner lösen Epochen-Sekunden in float64 nicht auf
+    MAX_CACHE_POINTS = 4_000_000  # Punkte aller gecachten Kacheln zusammen
+
+    def __init__(self, store, parent=None):
+        super().__init__(parent)
+        self._store = store
+        self._cache = OrderedDict()  # (Serie, Methode, Stufe, Kachel, Generation) -> (Zeiten, Werte)
+        self._cached_points = 0
+        self._hits = 0
+        self._misses = 0
+        store.seriesChanged.connect(self.clear_cache)
+
+    @classmethod
+    def level_for(cls, t0, t1, width):
+        """
+        Zoom level: buckets of 2**level seconds, at least one pixel wide.
+
+        The window then touches at most ``width`` buckets (one more than
+        fit into it, with partial ones at both ends), so minmax returns at
+        most two points per pixel plus one neighbour on each side.
+        """
+        if t1 <= t0:
+            return cls.MIN_LEVEL
+        # Aufrunden: ein Bucket ist nie schmaler als ein Pixel
+        return max(cls.MIN_LEVEL, math.ceil(math.log2((t1 - t0) / max(width - 1, 1))))
+
+    def series(self, name, t0, t1, width, method=MINMAX):
+        """(times, values) of a series between t0 and t1 for ``width`` pixels"""
+        if method not in self.METHODS:
+            raise ValueError(f"Unknown downsampling method: {method}")
+        table, field = self._store.lookup(name)
+        empty = (np.empty(0, dtype=np.float64), np.empty(0, dtype=np.float32))
+        if table is None or not len(table) or t1 <= t0 or width < 1:
+            return empty
+        first, last = table.time_range()
+        t0, t1 = max(t0, first), min(t1, last)
+        if t1 < t0:
+            return empty
+
+        level = self.level_for(t0, t1, width)
+        span = self.TILE_BUCKETS * 2.0 ** level
+        parts = [self._tile(name, table, field, method, level, tile, span, last)
+                 for tile in range(math.floor(t0 / span), math.floor(t1 / span) + 1)]
+        times = np.concatenate([p[0] for p in parts])
+        values = np.concatenate([p[1] for p in parts])
+        # Je einen Punkt außerhalb behalten, damit die Linie bis zum Rand reicht
+        lo = max(0, int(np.searchsorted(times, t0, side="left")) - 1)
+        hi = min(len(times), int(np.searchsorted(times, t1, side="right")) + 1)
+        return times[lo:hi], values[lo:hi]
+
+    def _tile(self, name, table, field, method, level, tile, span, last):
+        key = (name, method, level, tile, table.generation)
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            self._hits += 1
+            return cached
+        self._misses += 1
+        start = tile * span
+        end = start + span
+        times, values = table.window(field, start, np.nextafter(end, -np.inf))
+        if method == self.MINMAX:
+            indices = minmax_indices(times, values, start, span / self.TILE_BUCKETS, self.TILE_BUCKETS)
+        else:
+            indices = lttb_indices(times, values, self.TILE_BUCKETS)
+        result = (times[indices], values[indices])
+        if end <= last:
+            # Nur abgeschlossene Kacheln: in offene kommen noch Daten
+            self._remember(key, result)
+        return result
+
+    def _remember(self, key, result):
+        self._cache[key] = result
+        self._cached_points += len(result[0])
+        while self._cached_points > self.MAX_CACHE_POINTS and self._cache:
+            _, (times, _) = self._cache.popitem(last=False)
+            self._cached_points -= len(times)
+
+    @Slot()
+    def clear_cache(self):
+        self._cache.clear()
+        self._cached_points = 0
+
+    def cache_info(self):
+        """Hits, misses, cached tiles and points"""
+        return {"hits": self._hits, "misses": self._misses,
+                "tiles": len(self._cache), "points": self._cached_points}
+
+    @Slot(str, float, float, int, result=list)
+    @Slot(str, float, float, int, str, result=list)
+    def downsample(self, name, t0, t1, width, method=MINMAX):
+        """Downsampled series as QPointF list for a QML LineSeries (x in epoch seconds)"""
+        try:
+            times, values = self.series(name, t0, t1, width, method)
+        except (KeyError, ValueError):
+            return []
+        return [QPointF(t, v) for t, v in zip(times.tolist(), values.tolist())]
@@ -0,0 +1,282 @@
+"""
+Columnar in-memory history of telemetry values.
+
+The SensorViewModel only holds the current value of every sensor. The
+``TelemetryStore`` keeps the history of selected MAVLink fields for graphs
+and analysis. Each message type gets a ``TimeSeriesTable``: one float64
+time column and one float32 column per field, preallocated as ring
+buffers. Appending a message writes one row in place, so no Python object
+is kept per sample.
+
+Every row is written twice, at ``i`` and ``i + capacity``. The buffer then
+always holds the last ``capacity`` rows as one contiguous slice, and a time
+window is a zero-copy numpy view found by binary search. Views stay valid
+until ``capacity`` further rows have been appended; copy what you keep.
+"""
+
+import time
+from operator import attrgetter
+
+import numpy as np
+from PySide6.QtCore import QObject, Signal, Slot, Property
+
+
+class TimeSeriesTable:
+    """
+    Ring buffer of (timestamp, field values) rows of one message type.
+
+    Timestamps must not decrease; a row older than the newest one starts a
+    new timeline (e.g. after seeking back in a replay) and clears the table.
+    """
+
+    def __init__(self, fields, capacity):
+        if capacity < 1:
+            raise ValueError(f"Invalid capacity: {capacity}")
+        self._fields = tuple(fields)
+        self._columns = {name: i for i, name in enumerate(self._fields)}
+        self._capacity = capacity
+        # Doppelt so lang: das Fenster der letzten capacity Zeilen ist immer zusammenhängend
+        self._times = np.zeros(2 * capacity, dtype=np.float64)
+        self._values = np.zeros((len(self._fields), 2 * capacity), dtype=np.float32)
+        self._head = 0  # Nächste Schreibposition in [0, capacity)
+        self._count = 0
+        self._total = 0
+        self._generation = 0
+
+    @property
+    def fields(self):
+        return self._fields
+
+    @property
+    def capacity(self):
+        return self._capacity
+
+    @property
+    def total(self):
+        """Rows appended since the last clear, including overwritten ones"""
+        return self._total
+
+    @property
+    def generation(self):
+        """Incremented by every clear (caches of derived data compare it)"""
+        return self._generation
+
+    @property
+    def nbytes(self):
+        return self._times.nbytes + self._values.nbytes
+
+    def __len__(self):
+        return self._count
+
+    def append(self, timestamp, row):
+        """Append one row; ``row`` holds a value per field in field order"""
+        if self._count and timestamp < self._times[self._head - 1 + self._capacity]:
+            self.clear()
+        head = self._head
+        mirror = head + self._capacity
+        self._times[head] = timestamp
+        self._times[mirror] = timestamp
+        self._values[:, head] = row
+        self._values[:, mirror] = row
+        self._head = head + 1 if head + 1 < self._capacity else 0
+        if self._count < self._capacity:
+            self._count += 1
+        self._total += 1
+
+    def clear(self):
+        self._head = 0
+        self._count = 0
+        self._total = 0
+        self._generation += 1
+
+    def _bounds(self):
+        # Zusammenhängender Bereich der gültigen Zeilen im doppelten Puffer
+        end = self._head + self._capacity
+        return end - self._count, end
+
+    def times(self):
+        start, end = self._bounds()
+        return self._readonly(self._times[start:end])
+
+    def column(self, field):
+        start, end = self._bounds()
+        return self._readonly(self._values[self._columns[field], start:end])
+
+    def window(self, field, t0=None, t1=None):
+        """(times, values) views of the rows with t0 <= time <= t1"""
+        column = self._columns[field]
+        start, end = self._bounds()
+        times = self._times[start:end]
+        lo = 0 if t0 is None else int(np.searchsorted(times, t0, side="left"))
+        hi = len(times) if t1 is None else int(np.searchsorted(times, t1, side="right"))
+        return (self._readonly(times[lo:hi]),
+                self._readonly(self._values[column, start + lo:start + hi]))
+
+    def time_range(self):
+        """(first, last) timestamp, or None if empty"""
+        if not self._count:
+            return None
+        start, end = self._bounds()
+        return float(self._times[start]), float(self._times[end - 1])
+
+    def latest(self, field):
+        """(timestamp, value) of the newest row, or None"""
+        if not self._count:
+            return None
+        last = self._head - 1 + self._capacity
+        return float(self._times[last]), float(self._values[self._columns[field], last])
+
+    @staticmethod
+    def _readonly(view):
+        view.flags.writeable = False
+        return view
+
+
+class TelemetryStore(QObject):
+    """
+    History of the fields in FIELDS, one TimeSeriesTable per message type.
+
+    Series are named ``"MESSAGE.field"`` (e.g. ``"ATTITUDE.roll"``) and hold
+    values in SI-like units (FIELDS scales the raw integers). Samples are
+    stamped with the receive time pymavlink puts on the message, which for a
+    replay is the recorded time.
+
+    All tables get the same capacity in rows, chosen so that the tables of
+    all configured message types together stay below ``memory_limit``
+    bytes. A table is allocated when its first message arrives.
+
+    Signals:
+        seriesChanged: A table was allocated or the store was cleared
+    """
+
+    seriesChanged = Signal()
+
+    DEFAULT_MEMORY_LIMIT = 256 * 1024 * 1024  # Bytes
+
+    # Nachrichtentyp -> ((Feld, Skalierung), ...)
+    FIELDS = {
+        'ATTITUDE': (('roll', 1.0), ('pitch', 1.0), ('yaw', 1.0),
+                     ('rollspeed', 1.0), ('pitchspeed', 1.0), ('yawspeed', 1.0)),
+        'GLOBAL_POSITION_INT': (('lat', 1e-7), ('lon', 1e-7), ('alt', 1e-3), ('relative_alt', 1e-3),
+                                ('vx', 1e-2), ('vy', 1e-2), ('vz', 1e-2), ('hdg', 1e-2)),
+        'VFR_HUD': (('airspeed', 1.0), ('groundspeed', 1.0), ('alt', 1.0),
+                    ('climb', 1.0), ('throttle', 1.0), ('heading', 1.0)),
+        'SYS_STATUS': (('voltage_battery', 1e-3), ('current_battery', 1e-2),
+                       ('battery_remaining', 1.0), ('drop_rate_comm', 1e-2)),
+        'GPS_RAW_INT': (('fix_type', 1.0), ('satellites_visible', 1.0), ('eph', 1e-2), ('epv', 1e-2)),
+        'VIBRATION': (('vibration_x', 1.0), ('vibration_y', 1.0), ('vibration_z', 1.0)),
+        'SERVO_OUTPUT_RAW': (('servo1_raw', 1.0), ('servo2_raw', 1.0),
+                             ('servo3_raw', 1.0), ('servo4_raw', 1.0)),
+    }
+
+    def __init__(self, fields=None, memory_limit=DEFAULT_MEMORY_LIMIT, clock=time.time, parent=None):
+        super().__init__(parent)
+        self._fields = dict(self.FIELDS if fields is None else fields)
+        self._clock = clock
+        self._memory_limit = memory_limit
+        # Bytes pro Zeile aller Tabellen (Zeit + Werte, doppelt gepuffert)
+        row_bytes = sum(2 * (8 + 4 * len(spec)) for spec in self._fields.values())
+        self._capacity = max(1, memory_limit // row_bytes) if row_bytes else 1
+        self._tables = {}
+        self._handlers = {}
+        for msg_type, spec in self._fields.items():
+            getter = attrgetter(*(name for name, _ in spec))
+            scales = np.array([scale for _, scale in spec], dtype=np.float64)
+            self._handlers[msg_type] = self._make_handler(msg_type, getter, scales)
+
+    def _make_handler(self, msg_type, getter, scales):
+        def handle(msg):
+            timestamp = getattr(msg, "_timestamp", None) or self._clock()
+            self.append(msg_type, timestamp, np.multiply(getter(msg), scales))
+        return handle
+
+    # --- Anbindung -------------------------------------------------------
+
+    def register(self, dispatcher):
+        """Subscribe at a MessageDispatcher for every configured message type"""
+        dispatcher.subscribe_many(self._handlers)
+
+    def unregister(self, dispatcher):
+        for msg_type, handler in self._handlers.items():
+            dispatcher.unsubscribe(msg_type, handler)
+
+    def handler(self, msg_type):
+        """Dispatcher callback of a message type"""
+        return self._handlers[msg_type]
+
+    # --- Schreiben -------------------------------------------------------
+
+    def append(self, msg_type, timestamp, row):
+        """Append one row of (already scaled) values of a configured message type"""
+        table = self._tables.get(msg_type)
+        if table is None:
+            spec = self._fields[msg_type]
+            table = self._tables[msg_type] = TimeSeriesTable((name for name, _ in spec), self._capacity)
+            self.seriesChanged.emit()
+        table.append(timestamp, row)
+
+    @Slot()
+    def clear(self):
+        """Drop all history and release the tables"""
+        self._tables = {}
+        self.seriesChanged.emit()
+
+    # --- Lesen -----------------------------------------------------------
+
+    @property
+    def capacity(self):
+        """Rows per message type"""
+        return self._capacity
+
+    @property
+    def memory_limit(self):
+        return self._memory_limit
+
+    def memory_usage(self):
+        """Bytes allocated by the tables so far"""
+        return sum(table.nbytes for table in self._tables.values())
+
+    def table(self, msg_type):
+        """TimeSeriesTable of a message type, or None before its first message"""
+        return self._tables.get(msg_type)
+
+    def series_names(self):
+        """Names of all series with data, "MESSAGE.field" """
+        return [f"{msg_type}.{field}"
+                for msg_type, table in self._tables.items() for field in table.fields]
+
+    def lookup(self, name):
+        """(TimeSeriesTable or None before the first message, field) of a series"""
+        msg_type, _, field = name.partition(".")
+        table = self._tables.get(msg_type)
+        if table is None:
+            if msg_type not in self._fields or field not in (f for f, _ in self._fields[msg_type]):
+                raise KeyError(f"Unknown telemetry series: {name}")
+        elif field not in table.fields:
+            raise KeyError(f"Unknown telemetry series: {name}")
+        return table, field
+
+    def window(self, name, t0=None, t1=None):
+        """(times, values) read-only views of a series between t0 and t1 (inclusive)"""
+        table, field = self.lookup(name)
+        if table is None:
+            return np.empty(0, dtype=np.float64), np.empty(0, dtype=np.float32)
+        return table.window(field, t0, t1)
+
+    def time_range(self, name):
+        """(first, last) timestamp of a series, or None if empty"""
+        table, _ = self.lookup(name)
+        return table.time_range() if table is not None else None
+
+    def latest(self, name):
+        """(timestamp, value) of the newest sample of a series, or None"""
+        table, field = self.lookup(name)
+        return table.latest(field) if table is not None else None
+
+    @Property(list, notify=seriesChanged)
+    def seriesNames(self):
+        return self.series_names()
+
+    @Property(int, notify=seriesChanged)
+    def memoryUsage(self):
+        return self.memory_usage()
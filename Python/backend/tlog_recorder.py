@@ -0,0 +1,327 @@
+"""
+Flight recorder for raw MAVLink traffic in the tlog format.
+
+A tlog is the format of Mission Planner, MAVProxy and pymavlink's
+``mavlogfile``: every frame is stored as an 8-byte big-endian timestamp in
+microseconds since the epoch followed by the raw MAVLink frame, without any
+further framing. ``mavutil.mavlink_connection("flight.tlog")`` reads it back.
+
+Recording has to keep up with 1000+ messages per second on the reader
+thread, so the ``TlogWriter`` does not call ``write()`` per frame. It preallocates
+the file in chunks, maps it into memory and appends with a slice
+assignment; the pages reach the disk on a periodic ``flush()`` and when the
+file is closed, which also truncates it to the recorded length. After a
+crash the file may end with zero padding, which tlog readers skip as bad
+data.
+"""
+
+import mmap
+import struct
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+from PySide6.QtCore import QObject, Qt, Signal, Slot, Property, QTimer
+
+from backend.latency_tracer import LatencyHistogram
+
+_TIMESTAMP = struct.Struct(">Q")
+
+
+class TlogWriter:
+    """
+    Append-only tlog file on a preallocated memory map.
+
+    ``append`` may be called from any thread; ``flush`` writes the pages
+    appended since the last flush.
+    """
+
+    CHUNK_SIZE = 4 * 1024 * 1024  # Bytes, um die die Datei jeweils wächst
+
+    def __init__(self, path, chunk_size=CHUNK_SIZE):
+        if chunk_size < mmap.ALLOCATIONGRANULARITY:
+            raise ValueError(f"Chunk size must be at least {mmap.ALLOCATIONGRANULARITY} bytes")
+        self._path = Path(path)
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        self._chunk_size = chunk_size
+        self._lock = threading.Lock()
+        self._file = open(self._path, "w+b")
+        self._capacity = chunk_size
+        self._file.truncate(self._capacity)
+        self._map = mmap.mmap(self._file.fileno(), self._capacity)
+        self._length = 0
+        self._flushed = 0
+        self._frames = 0
+
+    @property
+    def path(self):
+        return self._path
+
+    @property
+    def length(self):
+        """Recorded bytes (timestamps and frames)"""
+        return self._length
+
+    @property
+    def frames(self):
+        return self._frames
+
+    @property
+    def closed(self):
+        return self._map is None
+
+    def append(self, timestamp_us, frame):
+        """Append one frame with its timestamp in microseconds since the epoch"""
+        size = _TIMESTAMP.size + len(frame)
+        with self._lock:
+            if self._map is None:
+                raise ValueError("Tlog file is closed")
+            start = self._length
+            end = start + size
+            if end > self._capacity:
+                self._grow(end)
+            _TIMESTAMP.pack_into(self._map, start, timestamp_us)
+            self._map[start + _TIMESTAMP.size:end] = frame
+            self._length = end
+            self._frames += 1
+
+    def _grow(self, needed):
+        # Neu abbilden statt resize(): funktioniert auf allen Plattformen
+        capacity = self._capacity
+        while capacity < needed:
+            capacity += self._chunk_size
+        self._map.flush()
+        self._map.close()
+        self._file.truncate(capacity)
+        self._map = mmap.mmap(self._file.fileno(), capacity)
+        self._capacity = capacity
+
+    def flush(self):
+        """Write the appended pages to disk"""
+        with self._lock:
+            if self._map is None or self._flushed == self._length:
+                return
+            # msync verlangt einen an der Seitengröße ausgerichteten Offset
+            start = self._flushed - self._flushed % mmap.ALLOCATIONGRANULARITY
+            self._map.flush(start, self._length - start)
+            self._flushed = self._length
+
+    def close(self):
+        """Flush, cut the preallocated tail and close the file"""
+        with self._lock:
+            if self._map is None:
+                return
+            self._map.flush()
+            self._map.close()
+            self._map = None
+            self._file.truncate(self._length)
+            self._file.close()
+            self._flushed = self._length
+
+
+class TlogRecorder(QObject):
+    """
+    Records the traffic of a MAVLinkTransport into a tlog file.
+
+    Received frames come from the transport's frame tap: the raw bytes of
+    every valid frame, taken on the reader thread before the ring buffer, so
+    lazy decoding and the overflow policy do not hide any. Decoded frames
+    keep the receive time pymavlink stamped on them, the others get the
+    recorder's clock. Sent frames are taken from the ``send_callback`` of the
+    connection's MAVLink object. The recorder stays attached across
+    reconnects, so one recording can span several links.
+
+    Signals:
+        recordingChanged(bool): Recording started or stopped
+        statsChanged: Frame and byte counters changed (at most once per FLUSH_INTERVAL_MS)
+        errorOccurred(str): The file could not be opened or written
+    """
+
+    recordingChanged = Signal(bool)
+    statsChanged = Signal()
+    errorOccurred = Signal(str)
+    _stopRequested = Signal()  # Schreibfehler auf dem Reader-Thread
+
+    FLUSH_INTERVAL_MS = 1000
+
+    def __init__(self, clock=time.time, parent=None):
+        super().__init__(parent)
+        self._clock = clock
+        self._writer = None
+        self._failed_writer = None  # Writer, der einen Fehler gemeldet hat
+        self._transport = None
+        self._mav = None  # MAVLink-Objekt, dessen send_callback wir belegt haben
+        self._record_outgoing = True
+        self._write_latency = LatencyHistogram()
+        self._received = 0
+        self._sent = 0
+        self._bytes = 0  # Länge der zuletzt geschlossenen Aufzeichnung
+
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setInterval(self.FLUSH_INTERVAL_MS)
+        self._flush_timer.timeout.connect(self.flush)
+        self._stopRequested.connect(self.stop, Qt.QueuedConnection)
+
+    @staticmethod
+    def default_directory():
+        return Path(__file__).resolve().parent.parent / "logs" / "tlogs"
+
+    @classmethod
+    def default_path(cls, now=None):
+        stamp = datetime.fromtimestamp(time.time() if now is None else now)
+        return cls.default_directory() / stamp.strftime("%Y-%m-%d_%H-%M-%S.tlog")
+
+    # --- Transport -------------------------------------------------------
+
+    @property
+    def transport(self):
+        """MAVLinkTransport recorded from, or None"""
+        return self._transport
+
+    def attach(self, transport):
+        """Record from this transport (None detaches)"""
+        if transport is self._transport:
+            return
+        self._unhook()
+        self._transport = transport
+        if self._writer is not None:
+            self._hook()
+
+    def detach(self):
+        self.attach(None)
+
+    def _hook(self):
+        transport = self._transport
+        if transport is None:
+            return
+        transport.set_frame_tap(self.record_frame)
+        mav = getattr(transport.connection, "mav", None)
+        if self._record_outgoing and mav is not None and getattr(mav, "send_callback", None) is None:
+            mav.set_send_callback(self._on_sent)
+            self._mav = mav
+
+    def _unhook(self):
+        if self._transport is not None:
+            self._transport.set_frame_tap(None)
+        if self._mav is not None:
+            self._mav.send_callback = None
+            self._mav = None
+
+    # --- Aufzeichnung ----------------------------------------------------
+
+    def start(self, path=None, record_outgoing=True):
+        """
+        Start recording into ``path`` (default: a new file in default_directory).
+
+        Returns the path, or None if the file could not be created.
+        """
+        self.stop()
+        path = Path(path) if path else self.default_path(self._clock())
+        try:
+            self._writer = TlogWriter(path)
+        except (OSError, ValueError) as e:
+            self.errorOccurred.emit(f"❌ Could not create tlog {path}: {str(e)}")
+            return None
+        self._record_outgoing = record_outgoing
+        self._received = 0
+        self._sent = 0
+        self._bytes = 0
+        self._write_latency = LatencyHistogram()
+        self._hook()
+        self._flush_timer.start()
+        self.recordingChanged.emit(True)
+        return path
+
+    @Slot()
+    def stop(self):
+        """Stop recording and close the file"""
+        writer = self._writer
+        if writer is None:
+            return
+        self._unhook()
+        self._writer = None
+        self._failed_writer = None
+        self._flush_timer.stop()
+        self._bytes = writer.length
+        try:
+            writer.close()
+        except OSError as e:
+            self.errorOccurred.emit(f"❌ Error closing tlog {writer.path}: {str(e)}")
+        self.recordingChanged.emit(False)
+        self.statsChanged.emit()
+
+    def is_recording(self):
+        return self._writer is not None
+
+    def record_frame(self, frame, timestamp=None):
+        """Append a received raw frame (frame tap, usually on the reader thread)"""
+        if self._append(frame, timestamp or self._clock()):
+            self._received += 1
+
+    def record(self, msg, timestamp=None):
+        """Append a received message"""
+        self.record_frame(msg.get_msgbuf(), timestamp or getattr(msg, "_timestamp", None))
+
+    def _on_sent(self, msg):
+        if self._append(msg.get_msgbuf(), self._clock()):
+            self._sent += 1
+
+    def _append(self, frame, timestamp):
+        writer = self._writer
+        if writer is None or writer is self._failed_writer or not frame:
+            return False
+        started = time.perf_counter()
+        try:
+            writer.append(int(timestamp * 1e6), frame)
+        except (OSError, ValueError) as e:
+            if self._writer is not writer:
+                # stop() hat die Datei zwischenzeitlich geschlossen
+                return False
+            self._failed_writer = writer
+            self.errorOccurred.emit(f"❌ Error writing tlog: {str(e)}")
+            # Schließen auf dem Qt-Thread; wir laufen evtl. auf dem Reader-Thread
+            self._stopRequested.emit()
+            return False
+        self._write_latency.add(time.perf_counter() - started)
+        return True
+
+    @Slot()
+    def flush(self):
+        """Write recorded pages to disk (timer tick)"""
+        writer = self._writer
+        if writer is None:
+            return
+        try:
+            writer.flush()
+        except OSError as e:
+            self.errorOccurred.emit(f"❌ Error flushing tlog: {str(e)}")
+        self.statsChanged.emit()
+
+    # --- Statistik -------------------------------------------------------
+
+    def stats(self):
+        """Received and sent frames, bytes and append latency"""
+        writer = self._writer
+        return {
+            "received": self._received,
+            "sent": self._sent,
+            "bytes": writer.length if writer is not None else self._bytes,
+            "write_latency": self._write_latency.summary(),
+        }
+
+    @Property(bool, notify=recordingChanged)
+    def recording(self):
+        return self._writer is not None
+
+    @Property(str, notify=recordingChanged)
+    def recordingPath(self):
+        return str(self._writer.path) if self._writer is not None else ""
+
+    @Property(int, notify=statsChanged)
+    def framesRecorded(self):
+        return self._received + self._sent
+
+    @Property('QVariantMap', notify=statsChanged)
+    def recorderStats(self):
+        return self.stats()
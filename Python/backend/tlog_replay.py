@@ -0,0 +1,534 @@
+"""
+Playback of recorded tlog files as if they were a live link.
+
+``TlogIndex`` maps time to byte offsets. It is built by one scan over the
+file on first open and stored next to it as ``<file>.idx`` (validated by
+size and mtime of the tlog), so later opens only read two arrays and a seek
+is a binary search.
+
+``TlogReplay`` decodes the frames and delivers them to a MAVLinkTransport on
+the Qt thread, paced by the recorded timestamps at 0.1x to 100x speed or as
+fast as possible. Delivery happens from a timer, never from a reader
+thread, so every message reaches the consumers exactly once and in order:
+a replay is a deterministic input. Only the recorded vehicle's frames are
+delivered; what the ground station sent (recorded by default) is skipped,
+otherwise its HEARTBEATs and commands would look like vehicle traffic.
+``ReplayLink`` is the matching connection
+object for ``SerialConnector``; everything sent to it is discarded.
+
+Sidecar layout (little endian)::
+
+    header   magic "RZTI", version, tlog size, tlog mtime_ns, frame count
+    data     count x int64 timestamp (µs), count x uint64 record offset
+"""
+
+import mmap
+import os
+import struct
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+from PySide6.QtCore import QObject, Signal, Slot, Property, QTimer
+from pymavlink import mavutil
+
+from backend.connection_worker import is_vehicle_heartbeat
+
+MAV = mavutil.mavlink
+
+_HEADER = struct.Struct("<4sIQqQ")
+_MAGIC = b"RZTI"
+_VERSION = 1
+_TIMESTAMP = struct.Struct(">Q")
+TIMESTAMP_SIZE = _TIMESTAMP.size
+MAX_TIME_JUMP_US = 3 * 24 * 3600 * 1000000  # Wie mavlogfile: größere Sprünge sind Datenmüll
+GCS_SYSID = 255  # System-ID dieser Bodenstation (MAVLinkProtocol)
+
+
+def frame_length(buf, pos, end):
+    """Length of the MAVLink frame starting at ``pos``, or None if there is none"""
+    if pos + 2 > end:
+        return None
+    magic = buf[pos]
+    if magic == MAV.PROTOCOL_MARKER_V2:
+        if pos + 3 > end:
+            return None
+        signed = buf[pos + 2] & MAV.MAVLINK_IFLAG_SIGNED
+        length = (MAV.HEADER_LEN_V2 + buf[pos + 1] + 2
+                  + (MAV.MAVLINK_SIGNATURE_BLOCK_LEN if signed else 0))
+    elif magic == MAV.PROTOCOL_MARKER_V1:
+        length = MAV.HEADER_LEN_V1 + buf[pos + 1] + 2
+    else:
+        return None
+    return length if pos + length <= end else None
+
+
+def frame_msgid(buf, pos):
+    if buf[pos] == MAV.PROTOCOL_MARKER_V2:
+        return buf[pos + 7] | (buf[pos + 8] << 8) | (buf[pos + 9] << 16)
+    return buf[pos + 5]
+
+
+def frame_sysid(buf, pos):
+    if buf[pos] == MAV.PROTOCOL_MARKER_V2:
+        return buf[pos + 5]
+    return buf[pos + 3]
+
+
+class TlogIndex:
+    """
+    Timestamps and record offsets of all frames of a tlog.
+
+    ``timestamps`` are the recorded µs values in file order. Seeking uses
+    their running maximum, because sent and received frames may be a few
+    microseconds out of order.
+    """
+
+    def __init__(self, timestamps, offsets):
+        self.timestamps = np.asarray(timestamps, dtype=np.int64)
+        self.offsets = np.asarray(offsets, dtype=np.uint64)
+        self._monotonic = np.maximum.accumulate(self.timestamps) if len(self.timestamps) else self.timestamps
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    @property
+    def start_us(self):
+        return int(self.timestamps[0]) if len(self) else 0
+
+    @property
+    def end_us(self):
+        return int(self._monotonic[-1]) if len(self) else 0
+
+    def due_us(self, i):
+        """Playback time of frame ``i`` (never earlier than a previous frame)"""
+        return int(self._monotonic[i])
+
+    def find(self, timestamp_us):
+        """Index of the first frame at or after ``timestamp_us``"""
+        return int(np.searchsorted(self._monotonic, timestamp_us, side="left"))
+
+    @staticmethod
+    def sidecar_path(tlog_path):
+        tlog_path = Path(tlog_path)
+        return tlog_path.with_name(tlog_path.name + ".idx")
+
+    @classmethod
+    def build(cls, data):
+        """Scan tlog bytes; garbage between records is skipped byte by byte"""
+        end = len(data)
+        timestamps = []
+        offsets = []
+        last = None
+        pos = 0
+        while pos + TIMESTAMP_SIZE < end:
+            length = frame_length(data, pos + TIMESTAMP_SIZE, end)
+            if length is not None:
+                (stamp,) = _TIMESTAMP.unpack_from(data, pos)
+                if last is None or abs(stamp - last) <= MAX_TIME_JUMP_US:
+                    timestamps.append(stamp)
+                    offsets.append(pos)
+                    last = stamp
+                    pos += TIMESTAMP_SIZE + length
+                    continue
+            pos += 1
+        return cls(timestamps, offsets)
+
+    @classmethod
+    def load(cls, tlog_path, sidecar_path=None):
+        """
+        Index of a tlog, from its sidecar if that is current.
+
+        A missing or stale sidecar is rebuilt; if it cannot be written the
+        index is only kept in memory.
+        """
+        tlog_path = Path(tlog_path)
+        sidecar_path = Path(sidecar_path) if sidecar_path else cls.sidecar_path(tlog_path)
+        stat = tlog_path.stat()
+        index = cls._read_sidecar(sidecar_path, stat)
+        if index is not None:
+            return index
+        with open(tlog_path, "rb") as f:
+            if stat.st_size:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                    index = cls.build(data)
+            else:
+                index = cls([], [])
+        try:
+            index._write_sidecar(sidecar_path, stat)
+        except OSError:
+            pass
+        return index
+
+    @classmethod
+    def _read_sidecar(cls, path, stat):
+        try:
+            with open(path, "rb") as f:
+                header = f.read(_HEADER.size)
+                magic, version, size, mtime_ns, count = _HEADER.unpack(header)
+                if (magic, version, size, mtime_ns) != (_MAGIC, _VERSION, stat.st_size, stat.st_mtime_ns):
+                    return None
+                timestamps = np.fromfile(f, dtype="<i8", count=count)
+                offsets = np.fromfile(f, dtype="<u8", count=count)
+        except (OSError, struct.error, ValueError):
+            return None
+        if len(timestamps) != count or len(offsets) != count:
+            return None
+        return cls(timestamps, offsets)
+
+    def _write_sidecar(self, path, stat):
+        # Temporäre Datei + replace: nie ein halb geschriebener Index
+        fd, temp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(_HEADER.pack(_MAGIC, _VERSION, stat.st_size, stat.st_mtime_ns, len(self)))
+                f.write(self.timestamps.astype("<i8").tobytes())
+                f.write(self.offsets.astype("<u8").tobytes())
+            os.replace(temp_path, path)
+        except OSError:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+
+class _Discard:
+    """File object for ReplayLink.mav: sent bytes go nowhere"""
+
+    def write(self, buf):
+        pass
+
+
+class ReplayLink:
+    """
+    Connection object of a replay for SerialConnector and its managers.
+
+    ``mav`` encodes like a live connection but discards what is sent;
+    received messages are pushed by the TlogReplay, so ``recv_match``
+    never returns any.
+    """
+
+    def __init__(self, replay, target_system=1, target_component=1):
+        self._replay = replay
+        self.mav = MAV.MAVLink(_Discard(), srcSystem=GCS_SYSID, srcComponent=190)
+        self.target_system = target_system
+        self.target_component = target_component
+        self.port = str(replay.path)
+
+    @property
+    def replay(self):
+        return self._replay
+
+    def recv_match(self, type=None, blocking=False, timeout=None):
+        return None
+
+    def close(self):
+        self._replay.close()
+
+
+class TlogReplay(QObject):
+    """
+    Plays a tlog into a MAVLinkTransport.
+
+    Positions are seconds since the first frame. ``speed`` is 0.1 to 100
+    (real time = 1.0) or AS_FAST_AS_POSSIBLE (0), which delivers MAX_BATCH
+    frames per event-loop pass. Frames that fail to decode are skipped and
+    counted in ``bad_frames``. Frames from other systems than the vehicle of
+    the first vehicle HEARTBEAT (or, without one, from the GCS system ID)
+    are skipped and counted in ``skipped_frames``.
+
+    Signals:
+        positionChanged(float): Seconds since the first frame of the last delivered frame
+        stateChanged: Playing, paused or finished changed
+        speedChanged(float): Playback speed changed
+        finished: The last frame was delivered
+    """
+
+    positionChanged = Signal(float)
+    stateChanged = Signal()
+    speedChanged = Signal(float)
+    finished = Signal()
+
+    AS_FAST_AS_POSSIBLE = 0.0
+    MIN_SPEED = 0.1
+    MAX_SPEED = 100.0
+    MAX_BATCH = 500  # Frames pro Event-Loop-Durchlauf
+    MAX_WAIT_MS = 100  # Spätestens dann Uhr neu prüfen (Pause, Geschwindigkeit)
+    HEARTBEAT_SCAN = 2000  # Frames, in denen der erste Fahrzeug-Heartbeat gesucht wird
+
+    def __init__(self, path, index=None, clock=time.monotonic, parent=None):
+        super().__init__(parent)
+        self._path = Path(path)
+        self._clock = clock
+        self._file = open(self._path, "rb")
+        try:
+            size = os.fstat(self._file.fileno()).st_size
+            self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+            self._index = index if index is not None else TlogIndex.load(self._path)
+        except Exception:
+            self._file.close()
+            raise
+        self._parser = MAV.MAVLink(None)
+        self._deliver = None
+        self._next = 0
+        self._position_us = self._index.start_us
+        self._playing = False
+        self._finished = False
+        self._speed = 1.0
+        self._anchor = (0.0, 0)  # (Uhrzeit, Logzeit in µs) beim letzten (Neu-)Start
+        self._delivered = 0
+        self._bad_frames = 0
+        self._skipped_frames = 0
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._tick)
+
+        vehicle = self._find_vehicle()
+        self._vehicle_sysid = vehicle[0] if vehicle is not None else None
+        self._link = ReplayLink(self, *(vehicle or (1, 1)))
+
+    @property
+    def path(self):
+        return self._path
+
+    @property
+    def index(self):
+        return self._index
+
+    @property
+    def link(self):
+        """ReplayLink to hand to SerialConnector as the connection"""
+        return self._link
+
+    @property
+    def delivered(self):
+        return self._delivered
+
+    @property
+    def bad_frames(self):
+        return self._bad_frames
+
+    @property
+    def skipped_frames(self):
+        """Frames not from the vehicle (e.g. what the GCS sent)"""
+        return self._skipped_frames
+
+    def attach(self, transport):
+        """Deliver into this MAVLinkTransport (None: nowhere)"""
+        self._deliver = transport.deliver if transport is not None else None
+
+    def close(self):
+        self.pause()
+        self._deliver = None
+        if self._data:
+            self._data.close()
+            self._data = b""
+        if not self._file.closed:
+            self._file.close()
+
+    # --- Frames ------------------------------------------------------------
+
+    def _frame_start(self, i):
+        return int(self._index.offsets[i]) + TIMESTAMP_SIZE
+
+    def _frame(self, i):
+        start = self._frame_start(i)
+        length = frame_length(self._data, start, len(self._data))
+        return self._data[start:start + length]
+
+    def _decode(self, i):
+        try:
+            msg = self._parser.decode(bytearray(self._frame(i)))
+        except Exception:
+            # CRC- oder Längenfehler im Mitschnitt
+            return None
+        msg._timestamp = int(self._index.timestamps[i]) * 1e-6
+        return msg
+
+    def _find_vehicle(self):
+        """(sysid, compid) of the first vehicle HEARTBEAT, or None"""
+        for i in range(min(len(self._index), self.HEARTBEAT_SCAN)):
+            start = self._frame_start(i)
+            if frame_msgid(self._data, start) != MAV.MAVLINK_MSG_ID_HEARTBEAT:
+                continue
+            msg = self._decode(i)
+            if msg is not None and is_vehicle_heartbeat(msg):
+                return msg.get_srcSystem(), msg.get_srcComponent()
+        return None
+
+    def _from_vehicle(self, i):
+        sysid = frame_sysid(self._data, self._frame_start(i))
+        if self._vehicle_sysid is not None:
+            return sysid == self._vehicle_sysid
+        return sysid != GCS_SYSID
+
+    def _deliver_next(self):
+        """Deliver the next frame; False if it was skipped"""
+        i = self._next
+        self._next += 1
+        self._position_us = self._index.due_us(i)
+        if not self._from_vehicle(i):
+            self._skipped_frames += 1
+            return False
+        msg = self._decode(i)
+        if msg is None:
+            self._bad_frames += 1
+            return False
+        self._delivered += 1
+        if self._deliver is not None:
+            self._deliver(msg)
+        return True
+
+    # --- Wiedergabe --------------------------------------------------------
+
+    @Slot()
+    def play(self):
+        if self._playing or self.at_end():
+            return
+        self._playing = True
+        self._reanchor()
+        self.stateChanged.emit()
+        self._timer.start(0)
+
+    @Slot()
+    def pause(self):
+        self._timer.stop()
+        if self._playing:
+            self._playing = False
+            self.stateChanged.emit()
+
+    @Slot()
+    def togglePlayback(self):
+        if self._playing:
+            self.pause()
+        else:
+            self.play()
+
+    @Slot()
+    @Slot(int)
+    def step(self, count=1):
+        """Pause and deliver the next ``count`` frames"""
+        self.pause()
+        delivered = 0
+        while delivered < count and not self.at_end():
+            delivered += self._deliver_next()
+        self.positionChanged.emit(self.position)
+        self._check_end()
+
+    @Slot(float)
+    def seek(self, seconds):
+        """Continue from the first frame at ``seconds`` since the start"""
+        target = self._index.start_us + int(max(0.0, seconds) * 1e6)
+        self._next = min(self._index.find(target), len(self._index))
+        self._position_us = min(max(target, self._index.start_us), self._index.end_us)
+        self._finished = False
+        self._reanchor()
+        self.positionChanged.emit(self.position)
+        if self._playing:
+            self._timer.start(0)
+        else:
+            self.stateChanged.emit()  # atEnd kann sich geändert haben
+
+    @Slot(float)
+    def setSpeed(self, speed):
+        """Playback speed factor, <= 0 for as fast as possible"""
+        speed = self.AS_FAST_AS_POSSIBLE if speed <= 0 else min(max(speed, self.MIN_SPEED), self.MAX_SPEED)
+        if speed == self._speed:
+            return
+        self._speed = speed
+        self._reanchor()
+        self.speedChanged.emit(speed)
+
+    def run_to_end(self):
+        """Deliver all remaining frames at once (benchmarks, tests). Returns the count."""
+        self.pause()
+        count = len(self._index) - self._next
+        while not self.at_end():
+            self._deliver_next()
+        self.positionChanged.emit(self.position)
+        self._check_end()
+        return count
+
+    def at_end(self):
+        return self._next >= len(self._index)
+
+    def _reanchor(self):
+        # Ab jetzt läuft die Logzeit ab der aktuellen Position mit der neuen Geschwindigkeit
+        self._anchor = (self._clock(), self._position_us)
+
+    def _log_time_us(self, now):
+        wall, log_us = self._anchor
+        return log_us + (now - wall) * self._speed * 1e6
+
+    @Slot()
+    def _tick(self):
+        if not self._playing:
+            return
+        batch = 0
+        if self._speed == self.AS_FAST_AS_POSSIBLE:
+            while batch < self.MAX_BATCH and not self.at_end():
+                self._deliver_next()
+                batch += 1
+            wait_ms = 0
+        else:
+            now_us = self._log_time_us(self._clock())
+            while batch < self.MAX_BATCH and not self.at_end() and self._index.due_us(self._next) <= now_us:
+                self._deliver_next()
+                batch += 1
+            if batch == self.MAX_BATCH or self.at_end():
+                wait_ms = 0
+            else:
+                due_in = (self._index.due_us(self._next) - now_us) / self._speed / 1000.0
+                wait_ms = int(min(max(due_in, 1.0), self.MAX_WAIT_MS))
+        if batch:
+            self.positionChanged.emit(self.position)
+        if not self._check_end():
+            self._timer.start(wait_ms)
+
+    def _check_end(self):
+        if not self.at_end():
+            return False
+        self._timer.stop()
+        self._playing = False
+        if not self._finished:
+            self._finished = True
+            self.stateChanged.emit()
+            self.finished.emit()
+        return True
+
+    # --- Eigenschaften -----------------------------------------------------
+
+    @Property(bool, notify=stateChanged)
+    def playing(self):
+        return self._playing
+
+    @Property(bool, notify=stateChanged)
+    def atEnd(self):
+        return self.at_end()
+
+    @Property(float, notify=speedChanged)
+    def speed(self):
+        return self._speed
+
+    @Property(float, notify=positionChanged)
+    def position(self):
+        """Seconds since the first frame"""
+        return (self._position_us - self._index.start_us) * 1e-6
+
+    @Property(float, constant=True)
+    def duration(self):
+        return (self._index.end_us - self._index.start_us) * 1e-6
+
+    @Property(float, constant=True)
+    def startTime(self):
+        """Epoch seconds of the first frame"""
+        return self._index.start_us * 1e-6
+
+    @Property(int, constant=True)
+    def frameCount(self):
+        return len(self._index)
+
+    @Property(str, constant=True)
+    def fileName(self):
+        return self._path.name
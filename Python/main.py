@@ -11,7 +11,8 @@ from PySide6.QtWidgets import QApplication
 from backend.logger import Logger
 from backend.serial_connector import SerialConnector
 from backend.sensorviewmodel import SensorViewModel
-from backend.parameter_model import ParameterTableModel
+from backend.parameter_model import ParameterTableModel, ParameterFilterProxyModel
+from backend.parameter_metadata import ParameterMetadata
 from backend.flight_view_controller import FlightViewController
 from backend.calibration_view_controller import CalibrationViewController
 from backend.motor_test_controller import MotorTestController
@@ -19,15 +20,30 @@ from backend.motor_test_controller import MotorTestController
 class Backend(QObject):
     def __init__(self):
         super().__init__()
-        self.logger = Logger()
+        self.logger = Logger(log_file=str(Path(__file__).parent / "logs" / "rzgcs.log"))
         self.sensor_model = SensorViewModel()
         self.parameter_model = ParameterTableModel()
+        self._load_parameter_metadata()
+        self.parameter_search_model = ParameterFilterProxyModel(self.parameter_model)
         self.serial_connector = SerialConnector(self.sensor_model, self.logger, self.parameter_model)
         # Set simulator as port
         self.serial_connector.setPort("Simulator")
         # Set baudrate (not used for simulator, but required)
         self.serial_connector.setBaudRate(57600)
 
+    def _load_parameter_metadata(self):
+        # ArduPilot-Parameterdefinition (apm.pdef.xml), optional
+        xml_path = Path(__file__).parent / "resources" / "apm.pdef.xml"
+        if not xml_path.exists():
+            return
+        try:
+            metadata = ParameterMetadata.load(xml_path)
+        except Exception as e:
+            self.logger.addLog(f"⚠️ Error loading parameter metadata: {str(e)}")
+            return
+        self.parameter_model.set_metadata(metadata)
+        self.logger.addLog(f"[LOAD] Parameter metadata: {len(metadata)} definitions")
+
 def main():
     # QApplication statt QGuiApplication für Widget-Support
     app = QApplication(sys.argv)
@@ -38,6 +54,8 @@ def main():
     
     # Create backend
     backend = Backend()
+    app.aboutToQuit.connect(backend.logger.close)
+    app.aboutToQuit.connect(backend.serial_connector.stopRecording)
     
     # Create QML engine
     engine = QQmlApplicationEngine()
@@ -47,6 +65,7 @@ def main():
     engine.rootContext().setContextProperty("serialConnector", backend.serial_connector)
     engine.rootContext().setContextProperty("sensorModel", backend.sensor_model)
     engine.rootContext().setContextProperty("parameterModel", backend.parameter_model)
+    engine.rootContext().setContextProperty("parameterSearchModel", backend.parameter_search_model)
     
     # Load main QML file first
     qml_file = Path(__file__).parent.parent / "RZGCSContent" / "App.qml"
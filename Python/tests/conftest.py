@@ -1,6 +1,7 @@
 """
 Globale Test-Konfiguration und Fixtures für die RZ Ground Control Station-Tests.
 """
+import gc
 import os
 import sys
 import pytest
@@ -22,6 +23,18 @@ def app():
     # Aufräumen am Ende der Testsitzung
     QTimer.singleShot(0, app.quit)
 
+@pytest.fixture(autouse=True)
+def collect_qt_garbage():
+    """
+    Räumt nach jedem Test im Hauptthread auf.
+
+    Sonst kann die zyklische Garbage Collection verwaiste QObjects (mit
+    QTimern) später in einem Hintergrund-Thread (Reader, Log-Writer) löschen,
+    was Qt zum Absturz bringt.
+    """
+    yield
+    gc.collect()
+
 @pytest.fixture
 def qml_engine(app):
     """Fixture für die QML-Engine, die für UI-Tests benötigt wird."""
@@ -0,0 +1,258 @@
+"""
+Unit-Tests für COMMAND_LONG mit Bestätigung, Wiederholung und Laufzeitstatistik.
+"""
+import pytest
+import sys
+import os
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+# Korrekte Pfadangaben für Import
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pymavlink import mavutil
+
+from backend.calibration_view_controller import CalibrationViewController
+from backend.command_manager import CommandManager, command_name
+from backend.exceptions import CommandTimeoutError
+from backend.logger import Logger
+from backend.message_handler import MessageHandler
+from test_mavlink_reader import FakeMessage
+from test_parameter_downloader import FakeClock
+
+MAV = mavutil.mavlink
+
+
+class FakeVehicle:
+    """Zeichnet gesendete COMMAND_LONG auf; Acks werden im Test ausgelöst."""
+
+    def __init__(self):
+        self.target_system = 1
+        self.target_component = 1
+        self.sent = []  # (Befehl, Confirmation, Parameter)
+        self.mav = SimpleNamespace(command_long_send=self._command_long_send)
+
+    def _command_long_send(self, target_system, target_component, command, confirmation, *params):
+        self.sent.append((command, confirmation, params))
+
+
+def ack(command, result=MAV.MAV_RESULT_ACCEPTED, progress=0):
+    return FakeMessage('COMMAND_ACK', command=command, result=result, progress=progress)
+
+
+class TestCommandManager:
+    """Test-Suite für den CommandManager."""
+
+    @pytest.fixture
+    def clock(self):
+        return FakeClock()
+
+    @pytest.fixture
+    def vehicle(self):
+        return FakeVehicle()
+
+    @pytest.fixture
+    def manager(self, app, clock, vehicle):
+        manager = CommandManager(clock=clock)
+        manager.set_connection(vehicle)
+        return manager
+
+    def test_ack_resolves_future(self, manager, clock, vehicle):
+        future = manager.send_command(MAV.MAV_CMD_COMPONENT_ARM_DISARM, 1)
+        assert vehicle.sent == [(MAV.MAV_CMD_COMPONENT_ARM_DISARM, 0, (1.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0))]
+        assert not future.done()
+        assert manager.inFlight == 1
+
+        clock.now += 0.08
+        manager.handle_command_ack(ack(MAV.MAV_CMD_COMPONENT_ARM_DISARM))
+        assert future.result() == MAV.MAV_RESULT_ACCEPTED
+        assert manager.inFlight == 0
+        stats = manager.latency_stats()
+        assert stats["MAV_CMD_COMPONENT_ARM_DISARM"]["count"] == 1
+        assert 70.0 <= stats["all"]["max_ms"] <= 90.0
+
+    def test_rejection_is_a_result(self, manager):
+        future = manager.send_command(MAV.MAV_CMD_COMPONENT_ARM_DISARM, 1)
+        manager.handle_command_ack(ack(MAV.MAV_CMD_COMPONENT_ARM_DISARM, MAV.MAV_RESULT_DENIED))
+        assert future.result() == MAV.MAV_RESULT_DENIED
+
+    def test_retransmission_increments_confirmation(self, manager, clock, vehicle):
+        finished = []
+        manager.commandFinished.connect(lambda command, result: finished.append((command, result)))
+        future = manager.send_command(MAV.MAV_CMD_DO_SET_MODE, 1, 4)
+        for _ in range(CommandManager.DEFAULT_RETRIES):
+            clock.now += CommandManager.DEFAULT_TIMEOUT
+            manager.poll()
+        assert [confirmation for _, confirmation, _ in vehicle.sent] == [0, 1, 2]
+        with pytest.raises(CommandTimeoutError):
+            future.result(timeout=0)
+        assert finished == [(MAV.MAV_CMD_DO_SET_MODE, CommandManager.TIMEOUT_RESULT)]
+        counters = manager.counters()
+        assert counters["retransmitted"] == 2
+        assert counters["timeouts"] == 1
+        # Ohne eindeutige Zuordnung keine Laufzeitmessung
+        assert manager.latency_stats() == {}
+
+    def test_ack_after_retransmission(self, manager, clock, vehicle):
+        future = manager.send_command(MAV.MAV_CMD_DO_SET_MODE, 1, 4)
+        clock.now += CommandManager.DEFAULT_TIMEOUT
+        manager.poll()
+        manager.handle_command_ack(ack(MAV.MAV_CMD_DO_SET_MODE))
+        assert future.result() == MAV.MAV_RESULT_ACCEPTED
+        assert len(vehicle.sent) == 2
+        assert manager.latency_stats() == {}
+
+    def test_multiple_commands_in_flight(self, manager, vehicle):
+        mode = manager.send_command(MAV.MAV_CMD_DO_SET_MODE, 1, 4)
+        arm = manager.send_command(MAV.MAV_CMD_COMPONENT_ARM_DISARM, 1)
+        banner = manager.send_command(MAV.MAV_CMD_DO_SEND_BANNER)
+        assert manager.inFlight == 3
+        manager.handle_command_ack(ack(MAV.MAV_CMD_DO_SEND_BANNER))
+        manager.handle_command_ack(ack(MAV.MAV_CMD_COMPONENT_ARM_DISARM, MAV.MAV_RESULT_TEMPORARILY_REJECTED))
+        assert banner.result() == MAV.MAV_RESULT_ACCEPTED
+        assert arm.result() == MAV.MAV_RESULT_TEMPORARILY_REJECTED
+        assert not mode.done()
+        assert manager.inFlight == 1
+
+    def test_same_command_waits_for_previous_ack(self, manager, vehicle):
+        arm = manager.send_command(MAV.MAV_CMD_COMPONENT_ARM_DISARM, 1)
+        disarm = manager.send_command(MAV.MAV_CMD_COMPONENT_ARM_DISARM, 0)
+        assert len(vehicle.sent) == 1
+        manager.handle_command_ack(ack(MAV.MAV_CMD_COMPONENT_ARM_DISARM))
+        assert arm.done() and not disarm.done()
+        assert vehicle.sent[1][2][0] == 0.0
+        manager.handle_command_ack(ack(MAV.MAV_CMD_COMPONENT_ARM_DISARM))
+        assert disarm.result() == MAV.MAV_RESULT_ACCEPTED
+
+    def test_in_progress_extends_deadline(self, manager, clock, vehicle):
+        progress = []
+        manager.commandProgress.connect(lambda command, value: progress.append(value))
+        future = manager.send_command(MAV.MAV_CMD_DO_START_MAG_CAL, 255, 0, 1)
+        manager.handle_command_ack(ack(MAV.MAV_CMD_DO_START_MAG_CAL, MAV.MAV_RESULT_IN_PROGRESS, 40))
+        clock.now += CommandManager.IN_PROGRESS_TIMEOUT - 0.1
+        manager.poll()
+        assert len(vehicle.sent) == 1  # Kein erneutes Senden während IN_PROGRESS
+        assert not future.done()
+        manager.handle_command_ack(ack(MAV.MAV_CMD_DO_START_MAG_CAL))
+        assert future.result() == MAV.MAV_RESULT_ACCEPTED
+        assert progress == [40]
+
+    def test_calibration_is_not_retransmitted(self, manager, clock, vehicle):
+        future = manager.send_command(MAV.MAV_CMD_PREFLIGHT_CALIBRATION, 0, 0, 0, 0, 1)
+        clock.now += 30.0
+        manager.poll()
+        assert len(vehicle.sent) == 1
+        assert isinstance(future.exception(timeout=0), CommandTimeoutError)
+
+    def test_unrelated_ack_is_ignored(self, manager):
+        assert manager.handle_command_ack(ack(MAV.MAV_CMD_NAV_TAKEOFF)) is None
+
+    def test_connection_change_cancels(self, manager, vehicle):
+        arm = manager.send_command(MAV.MAV_CMD_COMPONENT_ARM_DISARM, 1)
+        disarm = manager.send_command(MAV.MAV_CMD_COMPONENT_ARM_DISARM, 0)
+        manager.set_connection(None)
+        assert arm.cancelled() and disarm.cancelled()
+        assert manager.inFlight == 0
+        assert manager.send_command(MAV.MAV_CMD_COMPONENT_ARM_DISARM, 1).exception(timeout=0) is not None
+
+    def test_command_name(self):
+        assert command_name(MAV.MAV_CMD_COMPONENT_ARM_DISARM) == "MAV_CMD_COMPONENT_ARM_DISARM"
+        assert command_name(65000) == "65000"
+
+
+class TestMessageHandlerCommands:
+    """Test-Suite für Kalibrierungsbefehle über den CommandManager."""
+
+    def test_calibration_waits_for_ack(self, app):
+        logger = MagicMock(spec=Logger)
+        handler = MessageHandler(logger)
+        vehicle = FakeVehicle()
+        handler.set_connection(vehicle)
+        handler.start()
+
+        future = handler.start_compass_calibration()
+        assert vehicle.sent[0][0] == MAV.MAV_CMD_DO_START_MAG_CAL
+        assert handler.get_command_manager().inFlight == 1
+        assert not future.done()
+
+        # COMMAND_ACK kommt über den Dispatcher wie vom Transport
+        handler.get_dispatcher().dispatch(ack(MAV.MAV_CMD_DO_START_MAG_CAL, MAV.MAV_RESULT_FAILED))
+        assert handler.get_command_manager().inFlight == 0
+        assert future.result() == MAV.MAV_RESULT_FAILED
+        logged = [call.args[0] for call in logger.addLog.call_args_list]
+        assert "❌ Start der Kompass-Kalibrierung abgelehnt (MAV_RESULT_FAILED)" in logged
+
+
+class TestCalibrationViewController:
+    """Test-Suite für den Kalibrierungsstart mit Bestätigung."""
+
+    @pytest.fixture
+    def clock(self):
+        return FakeClock()
+
+    @pytest.fixture
+    def handler(self, app, clock):
+        handler = MessageHandler(MagicMock(spec=Logger))
+        handler._command_manager._clock = clock
+        handler.set_connection(FakeVehicle())
+        handler.start()
+        yield handler
+        handler.stop()
+
+    @pytest.fixture
+    def controller(self, handler):
+        controller = CalibrationViewController()
+        controller.initialize(handler)
+        controller._simulation_timer.stop()
+        controller.progress = []
+        controller.finished = []
+        controller.calibrationProgressChanged.connect(lambda p, text: controller.progress.append(text))
+        controller.calibrationFinished.connect(lambda ok, text: controller.finished.append((ok, text)))
+        return controller
+
+    def test_instructions_only_after_ack(self, handler, controller):
+        controller.startCompassCalibration()
+        assert not controller._calibration_in_progress
+        assert controller.progress == []
+        handler.get_dispatcher().dispatch(ack(MAV.MAV_CMD_DO_START_MAG_CAL))
+        assert controller._calibration_in_progress
+        assert controller.progress == ["Rotieren Sie die Drohne in alle Richtungen"]
+        assert controller.finished == []
+
+    def test_in_progress_starts_calibration(self, handler, controller):
+        controller.startAccelCalibration()
+        handler.get_dispatcher().dispatch(
+            ack(MAV.MAV_CMD_PREFLIGHT_CALIBRATION, MAV.MAV_RESULT_IN_PROGRESS, 10))
+        assert controller._calibration_in_progress
+        assert controller.progress == ["Platzieren Sie die Drohne horizontal"]
+        # Das endgültige Ack startet nicht noch einmal
+        handler.get_dispatcher().dispatch(ack(MAV.MAV_CMD_PREFLIGHT_CALIBRATION))
+        assert controller.progress == ["Platzieren Sie die Drohne horizontal"]
+
+    def test_denied_ack_fails(self, handler, controller):
+        controller.startAccelCalibration()
+        handler.get_dispatcher().dispatch(
+            ack(MAV.MAV_CMD_PREFLIGHT_CALIBRATION, MAV.MAV_RESULT_DENIED))
+        assert not controller._calibration_in_progress
+        assert controller.progress == []
+        assert controller.finished == [
+            (False, "Fehler beim Starten der Accelerometer-Kalibrierung (MAV_RESULT_DENIED)")]
+
+    def test_timeout_fails(self, handler, controller, clock):
+        controller.startCompassCalibration()
+        for _ in range(3):
+            clock.now += 5.0
+            handler.get_command_manager().poll()
+        assert not controller._calibration_in_progress
+        assert controller.progress == []
+        assert len(controller.finished) == 1
+        ok, text = controller.finished[0]
+        assert not ok and text.startswith("Fehler beim Starten der Kompass-Kalibrierung: No COMMAND_ACK")
+
+    def test_late_ack_after_cancel_is_ignored(self, handler, controller):
+        controller.startCompassCalibration()
+        controller.cancelCalibration()
+        handler.get_dispatcher().dispatch(ack(MAV.MAV_CMD_DO_START_MAG_CAL))
+        assert not controller._calibration_in_progress
+        assert controller.progress == []
+        assert controller.finished == [(False, "compass-Kalibrierung abgebrochen")]
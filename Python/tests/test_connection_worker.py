@@ -0,0 +1,256 @@
+"""
+Unit-Tests für den Verbindungsaufbau außerhalb des UI-Threads.
+"""
+import pytest
+import sys
+import os
+import threading
+import time
+from unittest.mock import MagicMock
+
+# Korrekte Pfadangaben für Import
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pymavlink import mavutil
+
+from backend.connection_worker import ConnectionWorker, LinkResult
+from backend.exceptions import ConnectionTimeoutError
+from backend.logger import Logger
+from backend.mavlink_protocol import MAVLinkProtocol
+from backend.parameter_model import ParameterTableModel
+from backend.sensorviewmodel import SensorViewModel
+from backend.serial_connector import SerialConnector
+from test_mavlink_reader import FakeMessage, wait_for
+
+MAV = mavutil.mavlink
+
+
+class HeartbeatMessage(FakeMessage):
+    def __init__(self, system_id=1, component_id=1, mav_type=MAV.MAV_TYPE_QUADROTOR,
+                 autopilot=MAV.MAV_AUTOPILOT_ARDUPILOTMEGA):
+        super().__init__('HEARTBEAT', type=mav_type, autopilot=autopilot,
+                         base_mode=0, custom_mode=0, system_status=0)
+        self._system_id = system_id
+        self._component_id = component_id
+
+    def get_srcSystem(self):
+        return self._system_id
+
+    def get_srcComponent(self):
+        return self._component_id
+
+
+class FakeLink:
+    """Serielle Verbindung, die nur bei der richtigen Baudrate Heartbeats liefert."""
+
+    def __init__(self, port, baud, heartbeats):
+        self.port = port
+        self.baud = baud
+        self.heartbeats = list(heartbeats)
+        self.closed = False
+        self.mav = MagicMock()
+        self.target_system = 1
+        self.target_component = 1
+
+    def recv_match(self, type=None, blocking=False, timeout=None):
+        if self.closed:
+            raise OSError("port closed")
+        if self.heartbeats and (type in (None, 'HEARTBEAT')):
+            return self.heartbeats.pop(0)
+        if blocking and timeout:
+            time.sleep(timeout)
+        return None
+
+    def close(self):
+        self.closed = True
+
+
+class FakePorts:
+    """Verbindungsfabrik: ein Fahrzeug pro (Port, Baudrate), Rest schweigt."""
+
+    def __init__(self, vehicles=None, broken=()):
+        self.vehicles = vehicles or {}
+        self.broken = set(broken)
+        self.opened = []
+        self._lock = threading.Lock()
+
+    def __call__(self, port, baud):
+        if port in self.broken:
+            raise OSError(f"could not open port {port}")
+        link = FakeLink(port, baud, self.vehicles.get((port, baud), []))
+        with self._lock:
+            self.opened.append(link)
+        return link
+
+
+class TestConnectionWorker:
+    """Test-Suite für den ConnectionWorker."""
+
+    @pytest.fixture
+    def worker_for(self, app):
+        workers = []
+
+        def create(ports):
+            worker = ConnectionWorker(connect=ports)
+            workers.append(worker)
+            return worker
+
+        yield create
+        for worker in workers:
+            worker.shutdown()
+
+    def test_open_link_waits_for_vehicle_heartbeat(self, app, worker_for):
+        # Heartbeat einer anderen Bodenstation zählt nicht
+        ports = FakePorts({('COM3', 57600): [
+            HeartbeatMessage(255, 190, mav_type=MAV.MAV_TYPE_GCS, autopilot=MAV.MAV_AUTOPILOT_INVALID),
+            HeartbeatMessage(7, 1)]})
+        worker = worker_for(ports)
+        opened = []
+        worker.linkOpened.connect(opened.append)
+
+        link = worker.open_link('COM3', 57600, heartbeat_timeout=1.0).result(timeout=2.0)
+        assert isinstance(link, LinkResult)
+        assert (link.port, link.baud, link.system_id, link.component_id) == ('COM3', 57600, 7, 1)
+        assert not link.connection.closed
+        assert wait_for(app, lambda: opened == [link])
+
+    def test_open_link_returns_immediately(self, app, worker_for):
+        worker = worker_for(FakePorts())
+        start = time.perf_counter()
+        future = worker.open_link('COM3', 57600, heartbeat_timeout=0.5)
+        assert time.perf_counter() - start < 0.05
+        assert worker.is_busy()
+        with pytest.raises(ConnectionTimeoutError):
+            future.result(timeout=2.0)
+
+    def test_timeout_closes_connection_and_reports(self, app, worker_for):
+        ports = FakePorts()
+        worker = worker_for(ports)
+        failures = []
+        worker.failed.connect(failures.append)
+        future = worker.open_link('COM3', 57600, heartbeat_timeout=0.2)
+        assert isinstance(future.exception(timeout=2.0), ConnectionTimeoutError)
+        assert ports.opened[0].closed
+        assert wait_for(app, lambda: len(failures) == 1)
+
+    def test_cancel_stops_waiting(self, app, worker_for):
+        ports = FakePorts()
+        worker = worker_for(ports)
+        signals = []
+        worker.linkOpened.connect(signals.append)
+        worker.failed.connect(signals.append)
+        future = worker.open_link('COM3', 57600, heartbeat_timeout=10.0)
+        assert wait_for(app, lambda: len(ports.opened) == 1)
+
+        start = time.perf_counter()
+        worker.cancel()
+        assert future.cancelled()
+        assert wait_for(app, lambda: ports.opened[0].closed)
+        assert time.perf_counter() - start < 0.5
+        app.processEvents()
+        assert signals == []
+
+    def test_probe_finds_vehicle_on_any_port_and_baud(self, app, worker_for):
+        ports = FakePorts({('ttyUSB1', 115200): [HeartbeatMessage(3, 1)]})
+        worker = worker_for(ports)
+        start = time.perf_counter()
+        future = worker.probe_ports(['ttyACM0', 'ttyUSB0', 'ttyUSB1'],
+                                    baud_rates=[57600, 115200], timeout=0.3)
+        link = future.result(timeout=5.0)
+        elapsed = time.perf_counter() - start
+
+        assert (link.port, link.baud, link.system_id) == ('ttyUSB1', 115200, 3)
+        # Ports parallel: etwa zwei Wartezeiten statt sechs
+        assert elapsed < 3 * 0.3
+        # Alle anderen Versuche geben ihren Port wieder frei
+        assert wait_for(app, lambda: all(l.closed for l in ports.opened if l is not link.connection))
+        assert not link.connection.closed
+
+    def test_probe_skips_ports_that_cannot_be_opened(self, app, worker_for):
+        ports = FakePorts({('COM4', 57600): [HeartbeatMessage()]}, broken={'COM1'})
+        worker = worker_for(ports)
+        link = worker.probe_ports(['COM1', 'COM4'], baud_rates=[57600], timeout=0.5).result(timeout=2.0)
+        assert link.port == 'COM4'
+
+    def test_probe_without_vehicle_fails(self, app, worker_for):
+        ports = FakePorts(broken={'COM1'})
+        worker = worker_for(ports)
+        failures = []
+        worker.failed.connect(failures.append)
+        future = worker.probe_ports(['COM1', 'COM2'], baud_rates=[57600, 115200], timeout=0.1)
+        error = future.exception(timeout=2.0)
+        assert isinstance(error, ConnectionTimeoutError)
+        assert 'COM1' in str(error)
+        assert len(ports.opened) == 2  # COM2 mit beiden Baudraten
+        assert all(link.closed for link in ports.opened)
+        assert wait_for(app, lambda: len(failures) == 1)
+
+
+class TestSerialConnectorConnect:
+    """Test-Suite für den nicht blockierenden Verbindungsaufbau im SerialConnector."""
+
+    @pytest.fixture
+    def connector(self, app, monkeypatch, tmp_path):
+        monkeypatch.setattr("backend.parameter_cache.ParameterCache.default_directory",
+                            staticmethod(lambda: str(tmp_path)))
+        connector = SerialConnector(SensorViewModel(), MagicMock(spec=Logger), ParameterTableModel())
+        yield connector
+        connector.disconnect()
+        connector._connection_worker.shutdown()
+
+    def test_connect_does_not_block_ui_thread(self, app, connector, monkeypatch):
+        ports = FakePorts({('COM3', 57600): [HeartbeatMessage()]})
+        monkeypatch.setattr("backend.connection_worker.mavutil.mavlink_connection", ports)
+        connector.setPort('COM3')
+        connector.setBaudRate(57600)
+
+        start = time.perf_counter()
+        connector.connect()
+        assert time.perf_counter() - start < 0.1
+        assert connector.connecting
+        assert wait_for(app, lambda: connector.connected)
+        assert not connector.connecting
+        assert connector.get_transport() is not None
+
+    def test_auto_connect_selects_probed_port(self, app, connector, monkeypatch):
+        ports = FakePorts({('ttyUSB0', 115200): [HeartbeatMessage()]})
+        monkeypatch.setattr("backend.connection_worker.mavutil.mavlink_connection", ports)
+        monkeypatch.setattr(ConnectionWorker, "PROBE_TIMEOUT", 0.2)
+        connector._available_ports = ["Simulator", "ttyS0", "ttyUSB0"]
+
+        connector.autoConnect()
+        assert wait_for(app, lambda: connector.connected, timeout=5.0)
+        assert (connector.port, connector.baud_rate) == ('ttyUSB0', 115200)
+
+    def test_cancel_connect(self, app, connector, monkeypatch):
+        ports = FakePorts()
+        monkeypatch.setattr("backend.connection_worker.mavutil.mavlink_connection", ports)
+        connector.setPort('COM3')
+        connector.connect()
+        assert wait_for(app, lambda: len(ports.opened) == 1)
+        connector.cancelConnect()
+        assert not connector.connecting
+        assert wait_for(app, lambda: ports.opened[0].closed)
+        app.processEvents()
+        assert not connector.connected
+        logged = [call.args[0] for call in connector._logger.addLog.call_args_list]
+        assert not any(line.startswith("[ERR]") for line in logged)
+
+
+class TestProtocolConnect:
+    """Test-Suite für MAVLinkProtocol.connect_to_port über den ConnectionWorker."""
+
+    def test_connect_to_port_resolves_in_background(self, app, monkeypatch):
+        ports = FakePorts({('COM3', 57600): [HeartbeatMessage(9, 1)]})
+        monkeypatch.setattr("backend.mavlink_protocol.mavutil.mavlink_connection",
+                            lambda port, baud, **kwargs: ports(port, baud))
+        protocol = MAVLinkProtocol()
+        states = []
+        protocol.connection_status_changed.connect(states.append)
+
+        future = protocol.connect_to_port('COM3', 57600)
+        assert future.result(timeout=2.0).system_id == 9
+        assert wait_for(app, lambda: protocol.connection is not None)
+        assert protocol.transport is not None
+        assert states[-1] is True
+        protocol.close()
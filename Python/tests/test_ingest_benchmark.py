@@ -0,0 +1,264 @@
+"""
+Ingest-Benchmark für die RZ Ground Control Station.
+
+Erzeugt gepackte MAVLink-Byteströme mit 100 / 1 000 / 10 000 Nachrichten pro
+Sekunde, schickt sie über eine UDP-Loopback-Verbindung durch den echten Pfad
+MAVLinkTransport (Reader-Thread) -> MessageHandler -> SensorManager -> Logger,
+aufgebaut wie in ``SerialConnector._attach_link``, und misst Durchsatz,
+CPU-Kosten pro Nachricht sowie p50/p99-Zustelllatenz.
+
+Die Ergebnisse werden maschinenlesbar nach ``tests/reports/ingest_benchmark.json``
+geschrieben (überschreibbar mit ``RZGCS_BENCH_REPORT``), die Messdauer pro
+Lauf lässt sich mit ``RZGCS_BENCH_DURATION`` (Sekunden) einstellen.
+"""
+import pytest
+import sys
+import os
+import json
+import platform
+import socket
+import threading
+import time
+from datetime import datetime
+from unittest.mock import MagicMock
+
+# Korrekte Pfadangaben für Import
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pymavlink import mavutil
+from pymavlink.dialects.v20 import ardupilotmega as mavlink
+
+from backend.link_statistics import LinkStatsModel
+from backend.logger import Logger
+from backend.mavlink_transport import MAVLinkTransport
+from backend.message_handler import MessageHandler
+from backend.sensor_manager import SensorManager
+from backend.sensorviewmodel import SensorViewModel
+from backend.telemetry_coalescer import TelemetryCoalescer
+
+RATES = (100, 1000, 10000)
+DURATION = float(os.environ.get("RZGCS_BENCH_DURATION", "1.0"))
+REPORT_PATH = os.environ.get(
+    "RZGCS_BENCH_REPORT",
+    os.path.join(os.path.dirname(__file__), "reports", "ingest_benchmark.json"),
+)
+DRAIN_TIMEOUT = 2.0  # Sekunden Nachlauf, nachdem der Sender fertig ist
+
+
+def free_udp_port():
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return port
+
+
+def percentile(values, fraction):
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class SyntheticTelemetrySource:
+    """
+    Erzeugt einen typischen Nachrichtenmix und sendet ihn mit fester Rate.
+
+    Jede fünfte Nachricht ist ATTITUDE; deren ``time_boot_ms`` trägt den
+    Sendeindex, damit der Empfänger die Latenz zuordnen kann. RAW_IMU hat
+    keinen Abonnenten und zeigt den Nutzen der Lazy-Dekodierung.
+    """
+
+    MIX = ("ATTITUDE", "GLOBAL_POSITION_INT", "RAW_IMU", "VFR_HUD", "SYS_STATUS")
+    TICK = 0.001  # Sekunden zwischen Sende-Bursts
+
+    def __init__(self, port, rate, duration):
+        self._address = ("127.0.0.1", port)
+        self._rate = rate
+        self._duration = duration
+        self._mav = mavlink.MAVLink(None, srcSystem=1, srcComponent=1)
+        self.send_times = {}  # ATTITUDE-Index -> perf_counter beim Senden
+        self.sent = 0
+        self.cpu_time = 0.0
+        self._thread = None
+
+    def _pack(self, index):
+        kind = self.MIX[index % len(self.MIX)]
+        if kind == "ATTITUDE":
+            msg = mavlink.MAVLink_attitude_message(index, 0.1, -0.1, 1.5, 0.0, 0.0, 0.0)
+        elif kind == "GLOBAL_POSITION_INT":
+            msg = mavlink.MAVLink_global_position_int_message(
+                index, 473977418, 85455938, 500000, 10000, 100, 0, 0, 9000)
+        elif kind == "RAW_IMU":
+            msg = mavlink.MAVLink_raw_imu_message(index, 1, 2, 1000, 0, 0, 0, 100, 200, 300)
+        elif kind == "VFR_HUD":
+            msg = mavlink.MAVLink_vfr_hud_message(12.0, 11.5, 90, 50, 10.0, 0.5)
+        else:
+            msg = mavlink.MAVLink_sys_status_message(
+                0, 0, 0, 500, 12600, -1, 80, 0, 0, 0, 0, 0, 0)
+        return kind, bytes(msg.pack(self._mav))
+
+    def _run(self):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        cpu_start = time.thread_time()
+        start = time.perf_counter()
+        total = int(self._rate * self._duration)
+        index = 0
+        while index < total:
+            due = min(total, int((time.perf_counter() - start) * self._rate) + 1)
+            while index < due:
+                kind, data = self._pack(index)
+                if kind == "ATTITUDE":
+                    self.send_times[index] = time.perf_counter()
+                sock.sendto(data, self._address)
+                index += 1
+            time.sleep(self.TICK)
+        self.sent = index
+        self.cpu_time = time.thread_time() - cpu_start
+        sock.close()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="BenchSender", daemon=True)
+        self._thread.start()
+
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def join(self):
+        if self._thread is not None:
+            self._thread.join()
+
+
+def run_ingest(app, rate, lazy_decoding):
+    """Einen Benchmark-Lauf durchführen und die Kennzahlen zurückgeben"""
+    port = free_udp_port()
+    connection = mavutil.mavlink_connection(f"udpin:127.0.0.1:{port}", dialect="ardupilotmega")
+    connection.port.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4 * 1024 * 1024)
+
+    logger = Logger()
+    logger.addLog = MagicMock(wraps=logger.addLog)
+    handler = MessageHandler(logger)
+    sensor_manager = SensorManager(SensorViewModel(), logger)
+    coalescer = TelemetryCoalescer()
+    sensor_manager.set_coalescer(coalescer)
+    sensor_manager.register(handler.get_dispatcher())
+
+    # Wie SerialConnector._attach_link: der Transport ist der einzige Leser der Verbindung
+    handler.set_connection(connection)
+    handler.start()
+    transport = MAVLinkTransport(connection, threaded=True, lazy_decoding=lazy_decoding)
+    handler.attach_transport(transport)
+    link_stats = LinkStatsModel()
+    link_stats.attach(transport)
+
+    source = SyntheticTelemetrySource(port, rate, DURATION)
+    latencies = []
+    delivered = [0]
+
+    def on_attitude(msg):
+        sent_at = source.send_times.get(msg.time_boot_ms)
+        if sent_at is not None:
+            latencies.append(time.perf_counter() - sent_at)
+
+    def on_any(msg):
+        delivered[0] += 1
+
+    handler.attitude_received.connect(on_attitude)
+    dispatcher = handler.get_dispatcher()
+    for kind in SyntheticTelemetrySource.MIX:
+        if kind != "RAW_IMU":
+            dispatcher.subscribe(kind, on_any)
+
+    transport.start()
+    reader = transport.reader
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    source.start()
+    try:
+        while source.is_running():
+            app.processEvents()
+            time.sleep(0.0005)
+        source.join()
+        expected_attitudes = len(source.send_times)
+        deadline = time.perf_counter() + DRAIN_TIMEOUT
+        while len(latencies) < expected_attitudes and time.perf_counter() < deadline:
+            app.processEvents()
+            time.sleep(0.0005)
+        wall = time.perf_counter() - wall_start
+        cpu = time.process_time() - cpu_start - source.cpu_time
+    finally:
+        transport.stop()
+        link_stats.detach()
+        handler.attach_transport(None)
+        handler.stop()
+        connection.close()
+
+    expected_delivered = sum(
+        1 for i in range(source.sent)
+        if SyntheticTelemetrySource.MIX[i % len(SyntheticTelemetrySource.MIX)] != "RAW_IMU")
+    received = reader.messagesRead
+    return {
+        "rate": rate,
+        "lazy_decoding": lazy_decoding,
+        "duration_s": round(wall, 4),
+        "sent": source.sent,
+        "received": received,
+        "delivered": delivered[0],
+        "expected_delivered": expected_delivered,
+        "loss_ratio": round(1.0 - delivered[0] / expected_delivered, 4) if expected_delivered else 0.0,
+        "throughput_msg_s": round(delivered[0] / wall, 1) if wall > 0 else 0.0,
+        "cpu_s": round(cpu, 4),
+        "cpu_us_per_msg": round(cpu / delivered[0] * 1e6, 2) if delivered[0] else None,
+        "skipped_decodes": reader.skippedDecodes,
+        "dropped": reader.droppedMessages,
+        "high_water": reader.highWaterMark,
+        "frames_received": link_stats.framesReceived,
+        "packets_lost": link_stats.packetsLost,
+        "crc_errors": link_stats.crcErrors,
+        "latency_p50_ms": round(percentile(latencies, 0.50) * 1000, 3) if latencies else None,
+        "latency_p99_ms": round(percentile(latencies, 0.99) * 1000, 3) if latencies else None,
+        "latency_samples": len(latencies),
+        "log_calls": logger.addLog.call_count,
+    }
+
+
+@pytest.fixture(scope="module")
+def benchmark_report():
+    """Sammelt die Ergebnisse aller Läufe und schreibt sie als JSON."""
+    results = []
+    yield results
+    if not results:
+        return
+    report = {
+        "benchmark": "telemetry_ingest",
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "duration_per_run_s": DURATION,
+        "results": results,
+    }
+    os.makedirs(os.path.dirname(REPORT_PATH), exist_ok=True)
+    with open(REPORT_PATH, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+
+class TestIngestBenchmark:
+    """Benchmark-Suite für den Telemetrie-Eingangspfad."""
+
+    @pytest.mark.parametrize("lazy_decoding", [False, True], ids=["full", "lazy"])
+    @pytest.mark.parametrize("rate", RATES)
+    def test_ingest(self, app, benchmark_report, rate, lazy_decoding):
+        result = run_ingest(app, rate, lazy_decoding)
+        benchmark_report.append(result)
+        print(json.dumps(result))
+
+        assert result["sent"] == int(rate * DURATION)
+        assert result["delivered"] > 0
+        assert result["latency_samples"] > 0
+        if lazy_decoding:
+            # RAW_IMU hat keinen Abonnenten und wird nicht dekodiert
+            assert result["skipped_decodes"] > 0
+        if rate <= 1000:
+            # Niedrige Raten müssen auch auf langsamen Maschinen verlustfrei sein
+            assert result["loss_ratio"] < 0.05
@@ -0,0 +1,106 @@
+"""
+Unit-Tests für die Latenz-Instrumentierung des Telemetriepfads.
+"""
+import pytest
+import sys
+import os
+from unittest.mock import MagicMock
+
+# Korrekte Pfadangaben für Import
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from backend.latency_tracer import LatencyHistogram, LatencyTracer
+from backend.logger import Logger
+from backend.mavlink_reader import MAVLinkReader
+from backend.mavlink_transport import MAVLinkTransport
+from backend.message_handler import MessageHandler
+from backend.sensor_manager import SensorManager
+from backend.sensorviewmodel import SensorViewModel
+from backend.telemetry_coalescer import TelemetryCoalescer
+from tests.test_mavlink_reader import FakeConnection, FakeMessage, wait_for
+
+
+class TestLatencyHistogram:
+    """Test-Suite für das logarithmische Histogramm."""
+
+    def test_percentiles(self):
+        histogram = LatencyHistogram()
+        for _ in range(90):
+            histogram.add(0.001)  # 1 ms
+        for _ in range(10):
+            histogram.add(0.100)  # 100 ms
+        summary = histogram.summary()
+        assert summary["count"] == 100
+        assert summary["p50_ms"] == pytest.approx(1.0, rel=0.2)
+        assert summary["p99_ms"] == pytest.approx(100.0, rel=0.2)
+        assert summary["max_ms"] == pytest.approx(100.0)
+
+    def test_empty(self):
+        assert LatencyHistogram().summary()["count"] == 0
+
+
+class TestLatencyTracer:
+    """Test-Suite für den LatencyTracer."""
+
+    def test_stage_order_and_dump(self, app):
+        tracer = LatencyTracer(enabled=True)
+        msg = FakeMessage("ATTITUDE")
+        tracer.stamp(msg)
+        tracer.begin(msg)
+        tracer.mark("model")
+        tracer.end()
+        tracer.record("logger.addLog", 0.0002)
+        assert list(tracer.snapshot()) == ["queue", "dispatch", "model", "logger.addLog"]
+        assert "dispatch" in tracer.dump()
+
+    def test_unstamped_messages_are_ignored(self, app):
+        tracer = LatencyTracer(enabled=True)
+        tracer.begin(FakeMessage("ATTITUDE"))
+        tracer.end()
+        assert tracer.snapshot() == {}
+
+    def test_disabled_reader_does_not_stamp(self, app):
+        tracer = LatencyTracer(enabled=False)
+        messages = [FakeMessage("ATTITUDE") for _ in range(5)]
+        reader = MAVLinkReader(FakeConnection(messages))
+        reader.set_latency_tracer(tracer)
+        reader.start()
+        try:
+            assert wait_for(app, lambda: reader.messagesRead == 5)
+        finally:
+            reader.stop()
+        assert not any(hasattr(m, LatencyTracer.STAMP_ATTR) for m in messages)
+
+    def test_end_to_end_stages(self, app):
+        tracer = LatencyTracer(enabled=True)
+        logger = MagicMock(spec=Logger)
+        handler = MessageHandler(logger)
+        model = SensorViewModel()
+        model.add_sensor("roll", "Roll", "°")
+        model.set_latency_tracer(tracer)
+        coalescer = TelemetryCoalescer()
+        coalescer.set_latency_tracer(tracer)
+        coalescer.flushed.connect(lambda batch: [model.update_sensor(k, v) for k, v in batch.items()])
+        sensor_manager = SensorManager(model, logger)
+        sensor_manager.set_coalescer(coalescer)
+        sensor_manager.register(handler.get_dispatcher())
+        handler.set_latency_tracer(tracer)
+
+        messages = [FakeMessage("ATTITUDE", roll=0.1 * i, pitch=0.0, yaw=0.0) for i in range(20)]
+        connection = FakeConnection(messages)
+        handler.set_connection(connection)
+        handler.start()
+        # Wie SerialConnector._attach_link: der Handler gibt seinen Tracer an den Transport
+        transport = MAVLinkTransport(connection, threaded=True)
+        handler.attach_transport(transport)
+        transport.start()
+        try:
+            assert wait_for(app, lambda: tracer.histogram("model") is not None)
+        finally:
+            transport.stop()
+            handler.attach_transport(None)
+        stats = tracer.stats
+        assert stats["queue"]["count"] == 20
+        assert stats["dispatch"]["count"] == 20
+        assert stats["dispatch"]["p50_ms"] >= stats["queue"]["p50_ms"]
+        assert stats["model"]["count"] >= 1
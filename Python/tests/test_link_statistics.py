@@ -0,0 +1,216 @@
+"""
+Unit-Tests für Nachrichtenraten, Bytes/s und Paketverlust pro Verbindung.
+"""
+import pytest
+import sys
+import os
+from unittest.mock import MagicMock
+
+# Korrekte Pfadangaben für Import
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pymavlink import mavutil
+
+from backend.link_statistics import LinkStatistics, LinkStatsModel
+from backend.logger import Logger
+from backend.mavlink_frame_parser import LazyFrameParser
+from backend.mavlink_reader import MAVLinkReader
+from backend.parameter_model import ParameterTableModel
+from backend.sensorviewmodel import SensorViewModel
+from backend.serial_connector import SerialConnector
+from test_mavlink_frame_parser import ByteConnection, attitude, heartbeat, raw_imu
+from test_mavlink_reader import wait_for
+from test_parameter_downloader import FakeClock
+from test_tlog_recorder import Sink
+from test_tlog_replay import RATE, SECONDS, write_flight
+
+MAV = mavutil.mavlink
+ATTITUDE = MAV.MAVLINK_MSG_ID_ATTITUDE
+RAW_IMU = MAV.MAVLINK_MSG_ID_RAW_IMU
+
+
+def frames(messages, sysid=1, drop=()):
+    """MAVLink-2-Bytes der Nachrichten; Indizes in drop gehen auf der Strecke verloren"""
+    sender = MAV.MAVLink(Sink(), srcSystem=sysid, srcComponent=1)
+    packed = []
+    for msg in messages:
+        packed.append(bytes(msg.pack(sender)))
+        sender.seq = (sender.seq + 1) % 256  # Wie MAVLink.send
+    return b"".join(frame for i, frame in enumerate(packed) if i not in drop)
+
+
+class FakeTransport:
+    def __init__(self):
+        self.connection = MagicMock()
+        self.connection.mav = MAV.MAVLink(Sink(), srcSystem=255, srcComponent=190)
+        self.reader = None
+        self.stats = None
+
+    def set_link_stats(self, stats):
+        self.stats = stats
+
+
+class TestLinkStatistics:
+    """Test-Suite für die LinkStatistics."""
+
+    def test_sequence_gaps_per_source(self):
+        stats = LinkStatistics()
+        for seq in (0, 1, 2, 5, 6):
+            stats.observe_frame(ATTITUDE, 1, 1, seq, 40)
+        # Überlauf von 255 auf 0 ist kein Verlust, eine Wiederholung auch nicht
+        for seq in (254, 255, 0, 1, 1):
+            stats.observe_frame(RAW_IMU, 2, 1, seq, 30)
+        assert stats.sources() == {(1, 1): (5, 2), (2, 1): (5, 0)}
+        assert stats.messages() == {ATTITUDE: (5, 200), RAW_IMU: (5, 150)}
+
+    def test_parser_reports_skipped_frames(self):
+        stats = LinkStatistics()
+        parser = LazyFrameParser(MAV.MAVLink(None), decode_filter=lambda msgid: False)
+        parser.set_frame_observer(stats.observe_frame)
+        data = frames([raw_imu(i) for i in range(10)] + [heartbeat()], drop=(3, 4))
+        messages = parser.feed(data)
+        assert [m.get_type() for m in messages] == ["HEARTBEAT"]
+        assert stats.messages()[RAW_IMU] == (8, 8 * len(frames([raw_imu()])))
+        assert stats.sources() == {(1, 1): (9, 2)}
+
+    def test_decoded_message(self):
+        stats = LinkStatistics()
+        data = frames([attitude(), attitude()], sysid=3, drop=(0,))
+        msg = MAV.MAVLink(None).parse_char(data)
+        stats.observe_message(msg)
+        assert stats.messages() == {ATTITUDE: (1, len(data))}
+        assert stats.sources() == {(3, 1): (1, 0)}
+
+
+class TestLinkStatsModel:
+    """Test-Suite für das LinkStatsModel."""
+
+    @pytest.fixture
+    def clock(self):
+        return FakeClock()
+
+    @pytest.fixture
+    def model(self, app, clock):
+        return LinkStatsModel(clock=clock)
+
+    def test_rates_and_rows(self, model, clock):
+        transport = FakeTransport()
+        model.attach(transport, baud_rate=57600)
+        stats = transport.stats
+        for seq in range(50):
+            stats.observe_frame(RAW_IMU, 1, 1, seq, 40)
+        for seq in range(50, 60):
+            stats.observe_frame(ATTITUDE, 1, 1, seq, 40)
+        transport.connection.mav.param_request_list_send(1, 1)
+        clock.now += 2.0
+        model.update()
+
+        # Nach msgid sortiert: RAW_IMU (27) vor ATTITUDE (30)
+        assert model.rowCount() == 2
+        raw_imu_row, attitude_row = model.index(0), model.index(1)
+        assert model.data(attitude_row, LinkStatsModel.NameRole) == "ATTITUDE"
+        assert model.data(attitude_row, LinkStatsModel.RateRole) == pytest.approx(5.0)
+        assert model.data(attitude_row, LinkStatsModel.ShareRole) == pytest.approx(10 / 60)
+        assert model.data(raw_imu_row, LinkStatsModel.CountRole) == 50
+        assert model.rxMessagesPerSecond == pytest.approx(30.0)
+        assert model.rxBytesPerSecond == pytest.approx(1200.0)
+        assert model.txBytesPerSecond == pytest.approx(transport.connection.mav.total_bytes_sent / 2.0)
+        assert model.linkUsage == pytest.approx(1200.0 / 5760.0)
+
+        # Nächstes Intervall: nur noch ATTITUDE, zwei Pakete verloren
+        for seq in (60, 63):
+            stats.observe_frame(ATTITUDE, 1, 1, seq, 40)
+        clock.now += 1.0
+        model.update()
+        assert model.data(raw_imu_row, LinkStatsModel.RateRole) == 0.0
+        assert model.data(attitude_row, LinkStatsModel.CountRole) == 12
+        assert model.packetsLost == 2
+        assert model.packetLoss == pytest.approx(50.0)
+        assert model.sources == [{"sysid": 1, "compid": 1, "received": 62, "lost": 2,
+                                  "loss": pytest.approx(100 * 2 / 64)}]
+
+    def test_crc_errors_since_attach(self, model, clock):
+        transport = FakeTransport()
+        transport.connection.mav.total_receive_errors = 4
+        model.attach(transport)
+        transport.connection.mav.total_receive_errors = 7
+        clock.now += 1.0
+        model.update()
+        assert model.crcErrors == 3
+        assert model.linkUsage == 0.0
+        model.detach()
+        assert model.crcErrors == 3
+
+    def test_detach_keeps_counts(self, model, clock):
+        transport = FakeTransport()
+        model.attach(transport)
+        transport.stats.observe_frame(ATTITUDE, 1, 1, 0, 40)
+        clock.now += 1.0
+        model.detach()
+        assert transport.stats is None
+        assert model.data(model.index(0), LinkStatsModel.CountRole) == 1
+        assert model.data(model.index(0), LinkStatsModel.RateRole) == 0.0
+        assert model.rxBytesPerSecond == 0.0
+
+    def test_corrupt_frame_is_crc_error_not_loss(self, model, clock):
+        transport = FakeTransport()
+        model.attach(transport)
+        parser = LazyFrameParser(MAV.MAVLink(None), decode_filter=lambda msgid: False)
+        parser.set_frame_observer(model.statistics.observe_frame, model.statistics.observe_bad_frame)
+        packed = [frames([raw_imu(i) for i in range(5)], drop=(0, 1, 3, 4)),
+                  frames([raw_imu(i) for i in range(5)], drop=(0, 1, 2, 4))]
+        corrupt = bytearray(frames([raw_imu(i) for i in range(5)], drop=(0, 2, 3, 4)))
+        # Nutzdaten und Absenderfelder verfälscht: CRC passt nicht mehr
+        corrupt[5] ^= 0x40
+        corrupt[14] ^= 0x01
+        parser.feed(frames([raw_imu(0)]) + bytes(corrupt) + packed[0] + packed[1])
+        clock.now += 1.0
+        model.update()
+        assert model.crcErrors == 1
+        assert model.framesReceived == 3
+        assert model.rowCount() == 1
+        # seq 1 fehlt: ein verlorenes Paket, keine Phantom-Quelle
+        assert model.sources == [{"sysid": 1, "compid": 1, "received": 3, "lost": 1,
+                                  "loss": pytest.approx(25.0)}]
+
+    def test_lazy_reader_counts_undecoded_frames(self, app):
+        data = frames([raw_imu(i) for i in range(20)] + [heartbeat()], drop=(7,))
+        reader = MAVLinkReader(ByteConnection(data), lazy_decoding=True,
+                               decode_filter=lambda msgid: False)
+        stats = LinkStatistics()
+        reader.set_link_stats(stats)
+        try:
+            reader.start()
+            assert wait_for(app, lambda: stats.sources().get((1, 1), (0, 0))[0] == 20)
+        finally:
+            reader.stop()
+        assert stats.messages()[RAW_IMU][0] == 19
+        assert stats.sources() == {(1, 1): (20, 1)}
+        assert reader.parser.skipped_decodes == 19
+
+
+class TestSerialConnectorLinkStats:
+    """Test-Suite für die Verbindungsstatistik im SerialConnector."""
+
+    def test_replay_fills_link_stats(self, app, monkeypatch, tmp_path):
+        monkeypatch.setattr("backend.parameter_cache.ParameterCache.default_directory",
+                            staticmethod(lambda: str(tmp_path)))
+        path = tmp_path / "flight.tlog"
+        write_flight(path)
+        connector = SerialConnector(SensorViewModel(), MagicMock(spec=Logger), ParameterTableModel())
+        try:
+            connector.startReplay(str(path))
+            connector.replay.run_to_end()
+            link_stats = connector.linkStats
+            link_stats.update()
+            names = [link_stats.data(link_stats.index(row), LinkStatsModel.NameRole)
+                     for row in range(link_stats.rowCount())]
+            assert names == ["HEARTBEAT", "ATTITUDE"]
+            assert link_stats.framesReceived == SECONDS * RATE + SECONDS
+            assert link_stats.packetsLost == 0
+            assert [(s["sysid"], s["compid"]) for s in link_stats.sources] == [(7, 1)]
+
+            connector.disconnect()
+            assert link_stats.rxBytesPerSecond == 0.0
+        finally:
+            connector._connection_worker.shutdown()
@@ -0,0 +1,134 @@
+"""
+Unit-Tests für den gepufferten Logger und den Hintergrund-Dateischreiber.
+"""
+import pytest
+import sys
+import os
+
+# Korrekte Pfadangaben für Import
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from backend.logger import Logger, LogFileWriter
+from backend.log_list_model import LogListModel
+
+
+class TestLogger:
+    """Test-Suite für den Logger."""
+
+    def test_add_log_is_deferred(self, app):
+        logger = Logger(console=False)
+        changes = []
+        logger.logsChanged.connect(lambda: changes.append(1))
+        for i in range(100):
+            logger.addLog(f"message {i}")
+        assert changes == []
+        logger.flush()
+        assert len(changes) == 1
+        assert logger.logs[-1].endswith("message 99")
+
+    def test_getters_see_pending_entries(self, app):
+        logger = Logger(console=False)
+        logger.addLog("hello")
+        assert logger.getLogs().endswith("hello")
+
+    def test_batch_signal(self, app):
+        logger = Logger(console=False)
+        logger.flush()
+        batches = []
+        logger.logsAdded.connect(batches.append)
+        logger.addLog("a")
+        logger.addLog("b")
+        logger.flush()
+        assert len(batches) == 1
+        assert [entry[-1] for entry in batches[0]] == ["a", "b"]
+
+    def test_system_info_classification(self, app):
+        logger = Logger(console=False)
+        logger.addLog("Frame: QUAD/X")
+        logger.addLog("ATTITUDE received")
+        assert logger.system_info_logs[-1].endswith("Frame: QUAD/X")
+        assert len(logger.system_info_logs) == 2
+
+    def test_max_logs(self, app):
+        logger = Logger(console=False, max_logs=1000)
+        for i in range(1500):
+            logger.addLog(str(i))
+        assert len(logger.logs) == 1000
+        assert logger.logs[-1].endswith("1499")
+
+    def test_models_follow_logs(self, app):
+        logger = Logger(console=False)
+        logger.addLog("PreArm: Compass not calibrated")
+        logger.flush()
+        model = logger.logModel
+        row = model.rowCount() - 1
+        assert model.data(model.index(row, 0), LogListModel.EntryRole).endswith("Compass not calibrated")
+        assert model.data(model.index(row, 0), LogListModel.SystemInfoRole) is True
+        assert logger.systemInfoModel.count == 2
+
+
+class TestLogListModel:
+    """Test-Suite für das Ringpuffer-Listenmodell."""
+
+    def test_incremental_signals(self, app):
+        model = LogListModel(capacity=5)
+        inserted = []
+        removed = []
+        model.rowsInserted.connect(lambda parent, first, last: inserted.append((first, last)))
+        model.rowsRemoved.connect(lambda parent, first, last: removed.append((first, last)))
+        model.append_entries([(f"e{i}", False) for i in range(4)])
+        model.append_entries([(f"e{i}", False) for i in range(4, 7)])
+        assert inserted == [(0, 3), (2, 4)]
+        assert removed == [(0, 1)]
+        assert model.entries() == ["e2", "e3", "e4", "e5", "e6"]
+
+    def test_random_access_after_wrap(self, app):
+        model = LogListModel(capacity=3)
+        for i in range(10):
+            model.append(f"e{i}")
+        assert model.rowCount() == 3
+        assert model.data(model.index(0, 0)) == "e7"
+        assert model.entry(-1) == "e9"
+        assert model.entries(last=2) == ["e8", "e9"]
+
+    def test_oversized_batch(self, app):
+        model = LogListModel(capacity=3)
+        model.append_entries([(str(i), False) for i in range(10)])
+        assert model.entries() == ["7", "8", "9"]
+
+    def test_large_capacity(self, app):
+        model = LogListModel(capacity=100000)
+        model.append_entries([(str(i), False) for i in range(150000)])
+        assert model.rowCount() == 100000
+        assert model.entry(0) == "50000"
+
+    def test_clear(self, app):
+        model = LogListModel(capacity=3)
+        model.append("x")
+        model.clear()
+        assert model.rowCount() == 0
+
+
+class TestLogFileWriter:
+    """Test-Suite für den Hintergrund-Dateischreiber."""
+
+    def test_writes_file(self, app, tmp_path):
+        path = tmp_path / "logs" / "rzgcs.log"
+        logger = Logger(log_file=str(path), console=False)
+        logger.addLog("to disk")
+        logger.close()
+        content = path.read_text(encoding="utf-8")
+        assert "Logger initialized" in content
+        assert "to disk" in content
+
+    def test_rotation(self, tmp_path):
+        path = tmp_path / "rot.log"
+        writer = LogFileWriter(str(path), max_bytes=200, backup_count=2, console=False)
+        for i in range(20):
+            writer.write([f"line {i:03d} " + "x" * 40])
+            writer.flush()
+        writer.close()
+        assert (tmp_path / "rot.log.1").exists()
+        assert (tmp_path / "rot.log.2").exists()
+        assert not (tmp_path / "rot.log.3").exists()
+        assert "line 019" in (tmp_path / "rot.log.1").read_text() + (path.read_text() if path.exists() else "")
@@ -0,0 +1,170 @@
+"""
+Unit-Tests für das Header-only-Framing mit bedarfsgesteuerter Dekodierung.
+"""
+import pytest
+import sys
+import os
+import threading
+
+# Korrekte Pfadangaben für Import
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pymavlink.dialects.v20 import ardupilotmega as mavlink
+
+from backend.mavlink_frame_parser import LazyFrameParser
+from backend.mavlink_reader import MAVLinkReader
+from backend.message_dispatcher import MessageDispatcher
+from tests.test_mavlink_reader import wait_for
+
+
+def make_mav():
+    return mavlink.MAVLink(None, srcSystem=1, srcComponent=1)
+
+
+def encode(mav, msg, force_mavlink1=False):
+    return bytes(msg.pack(mav, force_mavlink1=force_mavlink1))
+
+
+def attitude(i=0):
+    return mavlink.MAVLink_attitude_message(i, 0.1, 0.2, 0.3, 0.0, 0.0, 0.0)
+
+
+def raw_imu(i=0):
+    return mavlink.MAVLink_raw_imu_message(i, 1, 2, 3, 4, 5, 6, 7, 8, 9)
+
+
+def heartbeat():
+    return mavlink.MAVLink_heartbeat_message(2, 3, 0, 0, 4, 3)
+
+
+class ByteConnection:
+    """Liefert vorbereitete Bytes wie eine pymavlink-Verbindung."""
+
+    def __init__(self, data):
+        self.mav = make_mav()
+        self._data = bytearray(data)
+        self._lock = threading.Lock()
+        self.posted = []
+
+    def select(self, timeout):
+        with self._lock:
+            if self._data:
+                return True
+        threading.Event().wait(timeout)
+        return False
+
+    def recv(self, n=None):
+        with self._lock:
+            chunk = bytes(self._data[:n or 1])
+            del self._data[:len(chunk)]
+            return chunk
+
+    def post_message(self, msg):
+        self.posted.append(msg)
+
+
+class TestLazyFrameParser:
+    """Test-Suite für den LazyFrameParser."""
+
+    def test_decodes_everything_without_filter(self):
+        sender = make_mav()
+        data = encode(sender, attitude()) + encode(sender, raw_imu())
+        parser = LazyFrameParser(make_mav())
+        messages = parser.feed(data)
+        assert [m.get_type() for m in messages] == ["ATTITUDE", "RAW_IMU"]
+        assert parser.skipped_decodes == 0
+
+    def test_skips_unsubscribed_ids(self):
+        sender = make_mav()
+        data = b"".join(encode(sender, raw_imu(i)) for i in range(10)) + encode(sender, attitude())
+        dispatcher = MessageDispatcher()
+        dispatcher.subscribe("ATTITUDE", lambda msg: None)
+        parser = LazyFrameParser(make_mav(), dispatcher.wants)
+        messages = parser.feed(data)
+        assert [m.get_type() for m in messages] == ["ATTITUDE"]
+        assert parser.skipped_decodes == 10
+        assert parser.skipped_by_id == {mavlink.MAVLINK_MSG_ID_RAW_IMU: 10}
+        assert parser.frames == 11
+
+    def test_heartbeat_always_decoded(self):
+        parser = LazyFrameParser(make_mav(), lambda msgid: False)
+        messages = parser.feed(encode(make_mav(), heartbeat()))
+        assert [m.get_type() for m in messages] == ["HEARTBEAT"]
+
+    def test_split_frames(self):
+        data = encode(make_mav(), attitude(42))
+        parser = LazyFrameParser(make_mav())
+        messages = []
+        for i in range(len(data)):
+            messages.extend(parser.feed(data[i:i + 1]))
+        assert len(messages) == 1
+        assert messages[0].time_boot_ms == 42
+
+    def test_resync_after_garbage_and_bad_crc(self):
+        sender = make_mav()
+        broken = bytearray(encode(sender, attitude(1)))
+        broken[-1] ^= 0xFF
+        data = b"\x00\x11\x22" + bytes(broken) + encode(sender, attitude(2))
+        parser = LazyFrameParser(make_mav())
+        messages = parser.feed(data)
+        assert [m.time_boot_ms for m in messages] == [2]
+        assert parser.bad_frames >= 1
+
+    def test_noise_does_not_swallow_skipped_frames(self):
+        sender = make_mav()
+        frames = encode(sender, attitude(1)) + encode(sender, heartbeat()) + encode(sender, attitude(2))
+        wanted = lambda msgid: msgid == mavlink.MAVLINK_MSG_ID_ATTITUDE
+        # Ein 0xFD-Byte aus dem Rauschen: unbekannte msgid bzw. RAW_IMU mit falscher Prüfsumme
+        for noise in (bytes.fromhex("fd280000000101556677"), bytes.fromhex("fd1a00000001011b0000")):
+            parser = LazyFrameParser(make_mav(), decode_filter=wanted)
+            messages = parser.feed(noise + frames)
+            assert [m.get_type() for m in messages] == ["ATTITUDE", "HEARTBEAT", "ATTITUDE"]
+            assert parser.frames == 3
+            assert parser.skipped_by_id == {}
+            assert parser.bad_frames >= 1
+
+    def test_skipped_frame_with_bad_crc(self):
+        sender = make_mav()
+        broken = bytearray(encode(sender, raw_imu(1)))
+        broken[12] ^= 0x01
+        parser = LazyFrameParser(make_mav(), decode_filter=lambda msgid: False)
+        messages = parser.feed(bytes(broken) + encode(sender, raw_imu(2)) + encode(sender, heartbeat()))
+        assert [m.get_type() for m in messages] == ["HEARTBEAT"]
+        assert parser.skipped_by_id == {mavlink.MAVLINK_MSG_ID_RAW_IMU: 1}
+        assert parser.bad_frames >= 1
+
+    def test_mavlink1_frames(self):
+        data = encode(make_mav(), attitude(7), force_mavlink1=True)
+        assert data[0] == mavlink.PROTOCOL_MARKER_V1
+        parser = LazyFrameParser(make_mav())
+        messages = parser.feed(data)
+        assert [m.time_boot_ms for m in messages] == [7]
+
+
+class TestLazyReader:
+    """Test-Suite für den Lazy-Modus des Reader-Threads."""
+
+    def test_reader_skips_unsubscribed(self, app):
+        sender = make_mav()
+        data = b"".join(encode(sender, raw_imu(i)) + encode(sender, attitude(i)) for i in range(20))
+        connection = ByteConnection(data)
+        dispatcher = MessageDispatcher()
+        dispatcher.subscribe("ATTITUDE", lambda msg: None)
+        reader = MAVLinkReader(connection, lazy_decoding=True, decode_filter=dispatcher.wants)
+        reader.start()
+        try:
+            assert wait_for(app, lambda: reader.messagesRead == 20)
+        finally:
+            reader.stop()
+        assert reader.skippedDecodes == 20
+        assert len(connection.posted) == 20
+        assert all(m.get_type() == "ATTITUDE" for m in connection.posted)
+
+    def test_lazy_needs_mav(self, app):
+        class NoMav:
+            pass
+        reader = MAVLinkReader(NoMav(), lazy_decoding=True)
+        errors = []
+        reader.errorOccurred.connect(errors.append)
+        assert not reader.start()
+        assert errors
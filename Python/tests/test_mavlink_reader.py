@@ -0,0 +1,165 @@
+"""
+Unit-Tests für den MAVLink-Reader-Thread und den Ringpuffer.
+"""
+import pytest
+import sys
+import os
+import threading
+import time
+from unittest.mock import MagicMock
+
+# Korrekte Pfadangaben für Import
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from backend.mavlink_reader import MessageRingBuffer, MAVLinkReader
+from backend.mavlink_transport import MAVLinkTransport
+from backend.message_handler import MessageHandler
+from backend.message_dispatcher import MessageDispatcher
+from backend.logger import Logger
+
+
+class FakeConnection:
+    """Liefert vorbereitete Nachrichten wie eine pymavlink-Verbindung."""
+
+    def __init__(self, messages):
+        self._messages = list(messages)
+        self._lock = threading.Lock()
+
+    def recv_match(self, blocking=False, timeout=None):
+        with self._lock:
+            if self._messages:
+                return self._messages.pop(0)
+        if blocking and timeout:
+            time.sleep(timeout)
+        return None
+
+
+class FakeMessage:
+    def __init__(self, msg_type, **fields):
+        self._type = msg_type
+        for key, value in fields.items():
+            setattr(self, key, value)
+
+    def get_type(self):
+        return self._type
+
+    def get_msgId(self):
+        return MessageDispatcher.resolve_msgid(self._type)
+
+
+def wait_for(app, condition, timeout=2.0):
+    """Event-Loop laufen lassen, bis die Bedingung erfüllt ist."""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        app.processEvents()
+        if condition():
+            return True
+        time.sleep(0.005)
+    return condition()
+
+
+class TestMessageRingBuffer:
+    """Test-Suite für den Ringpuffer."""
+
+    def test_fifo_order(self):
+        buffer = MessageRingBuffer(capacity=4)
+        for i in range(3):
+            assert buffer.put(i)
+        assert buffer.get_batch() == [0, 1, 2]
+        assert buffer.depth == 0
+
+    def test_drop_oldest(self):
+        buffer = MessageRingBuffer(capacity=3, overflow_policy=MessageRingBuffer.DROP_OLDEST)
+        for i in range(5):
+            buffer.put(i)
+        assert buffer.get_batch() == [2, 3, 4]
+        assert buffer.dropped == 2
+        assert buffer.high_water == 3
+
+    def test_drop_newest(self):
+        buffer = MessageRingBuffer(capacity=3, overflow_policy=MessageRingBuffer.DROP_NEWEST)
+        results = [buffer.put(i) for i in range(5)]
+        assert results == [True, True, True, False, False]
+        assert buffer.get_batch() == [0, 1, 2]
+        assert buffer.dropped == 2
+
+    def test_block_times_out(self):
+        buffer = MessageRingBuffer(capacity=1, overflow_policy=MessageRingBuffer.BLOCK, block_timeout=0.01)
+        assert buffer.put(1)
+        assert not buffer.put(2)
+        assert buffer.dropped == 1
+
+    def test_block_waits_for_consumer(self):
+        buffer = MessageRingBuffer(capacity=1, overflow_policy=MessageRingBuffer.BLOCK, block_timeout=1.0)
+        buffer.put(1)
+        consumer = threading.Timer(0.05, buffer.get_batch)
+        consumer.start()
+        assert buffer.put(2)
+        consumer.join()
+        assert buffer.get_batch() == [2]
+        assert buffer.dropped == 0
+
+    def test_batch_limit(self):
+        buffer = MessageRingBuffer(capacity=10)
+        for i in range(6):
+            buffer.put(i)
+        assert buffer.get_batch(4) == [0, 1, 2, 3]
+        assert buffer.depth == 2
+
+    def test_invalid_policy(self):
+        with pytest.raises(ValueError):
+            MessageRingBuffer(overflow_policy="invalid")
+
+
+class TestMAVLinkReader:
+    """Test-Suite für den Reader-Thread."""
+
+    def test_reader_delivers_messages(self, app):
+        messages = [FakeMessage("ATTITUDE", roll=0.0, pitch=0.0, yaw=0.0) for _ in range(50)]
+        reader = MAVLinkReader(FakeConnection(messages))
+        received = []
+        wakeups = []
+
+        def on_available():
+            wakeups.append(1)
+            received.extend(reader.take_messages(None))
+
+        reader.messagesAvailable.connect(on_available)
+        reader.start()
+        try:
+            assert wait_for(app, lambda: len(received) == 50)
+        finally:
+            reader.stop()
+        assert reader.messagesRead == 50
+        # Weniger Aufweck-Signale als Nachrichten
+        assert len(wakeups) <= 50
+
+    def test_reader_counts_drops(self, app):
+        messages = [FakeMessage("RAW_IMU") for _ in range(20)]
+        reader = MAVLinkReader(FakeConnection(messages), capacity=5)
+        reader.start()
+        try:
+            assert wait_for(app, lambda: reader.messagesRead == 20)
+        finally:
+            reader.stop()
+        assert reader.droppedMessages == 15
+        assert reader.highWaterMark == 5
+
+    def test_message_handler_drains_reader(self, app):
+        logger = MagicMock(spec=Logger)
+        handler = MessageHandler(logger)
+        messages = [FakeMessage("PARAM_VALUE", param_id="P", param_value=1.0) for _ in range(30)]
+        connection = FakeConnection(messages)
+        handler.set_connection(connection)
+        handler.start()
+        transport = MAVLinkTransport(connection, threaded=True)
+        handler.attach_transport(transport)
+        received = []
+        handler.parameter_received.connect(received.append)
+        transport.start()
+        try:
+            assert wait_for(app, lambda: len(received) == 30)
+        finally:
+            transport.stop()
+            handler.attach_transport(None)
+        assert transport.reader.queueDepth == 0
@@ -0,0 +1,166 @@
+"""
+Unit-Tests für den gemeinsamen MAVLink-Transport mit mehreren Konsumenten.
+"""
+import asyncio
+import pytest
+import sys
+import os
+import threading
+from types import SimpleNamespace
+
+# Korrekte Pfadangaben für Import
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from backend.mavlink_transport import MAVLinkTransport
+from backend.mavlink_protocol import MAVLinkProtocol
+from backend.message_handler import MessageHandler
+from backend.parameter_downloader import ParameterDownloader
+from backend.logger import Logger
+from test_mavlink_reader import FakeConnection, FakeMessage, wait_for
+
+
+def attitude(i):
+    return FakeMessage('ATTITUDE', roll=i, pitch=0.0, yaw=0.0)
+
+
+def param_value(index, count):
+    return FakeMessage('PARAM_VALUE', param_id=f"PARAM_{index}", param_value=float(index),
+                       param_index=index, param_count=count)
+
+
+class TestMAVLinkTransport:
+    """Test-Suite für den MAVLinkTransport."""
+
+    def test_every_consumer_sees_every_message(self, app):
+        messages = [attitude(i) for i in range(5)] + [FakeMessage('HEARTBEAT')]
+        transport = MAVLinkTransport(FakeConnection(messages), threaded=False)
+        callback, listener = [], []
+        transport.subscribe('ATTITUDE', callback.append)
+        transport.add_listener(listener.append)
+        everything = transport.subscription()
+        attitudes = transport.subscription(['ATTITUDE'])
+
+        assert transport.poll() == 6
+        assert callback == messages[:5]
+        assert listener == messages
+        assert everything.drain() == messages
+        assert list(attitudes) == messages[:5]
+        assert len(attitudes) == 0
+
+    def test_subscription_drops_oldest_when_full(self, app):
+        transport = MAVLinkTransport(FakeConnection([attitude(i) for i in range(10)]), threaded=False)
+        subscription = transport.subscription(['ATTITUDE'], maxlen=4)
+        transport.poll()
+        assert [msg.roll for msg in subscription.drain()] == [6, 7, 8, 9]
+        assert subscription.dropped == 6
+
+    def test_closed_subscription_stops_receiving(self, app):
+        transport = MAVLinkTransport(FakeConnection([attitude(0), attitude(1)]), threaded=False)
+        subscription = transport.subscription(['ATTITUDE'])
+        transport.poll(max_items=1)
+        subscription.close()
+        transport.poll()
+        assert [msg.roll for msg in subscription.drain()] == [0]
+
+    def test_parameter_download_and_telemetry_share_the_link(self, app):
+        """PARAM_VALUE und Telemetrie im selben Strom: kein Konsument verliert Nachrichten."""
+        count = 200
+        stream = []
+        for i in range(count):
+            stream.append(param_value(i, count))
+            stream.extend(attitude(i * 10 + k) for k in range(10))
+        transport = MAVLinkTransport(FakeConnection(stream))
+
+        fc = SimpleNamespace(param_fetch_all=lambda: None, target_system=1, target_component=1,
+                             mav=SimpleNamespace(param_request_read_send=lambda *args: None))
+        downloader = ParameterDownloader()
+        transport.subscribe('PARAM_VALUE', downloader.handle_param_value)
+        telemetry = []
+        transport.subscribe('ATTITUDE', telemetry.append)
+
+        downloader.start(fc)
+        transport.start()
+        try:
+            assert wait_for(app, lambda: transport.delivered == len(stream))
+        finally:
+            transport.stop()
+        assert downloader.state == ParameterDownloader.DONE
+        assert downloader.received_count == count
+        assert len(telemetry) == count * 10
+
+    def test_async_iteration_across_threads(self, app):
+        transport = MAVLinkTransport(FakeConnection([]), threaded=False)
+        subscription = transport.subscription(['ATTITUDE'])
+
+        def produce():
+            for i in range(3):
+                transport.deliver(attitude(i))
+            transport.deliver(FakeMessage('HEARTBEAT'))
+
+        async def consume():
+            received = []
+            threading.Timer(0.05, produce).start()
+            async for msg in subscription:
+                received.append(msg.roll)
+                if len(received) == 3:
+                    break
+            return received
+
+        assert asyncio.run(asyncio.wait_for(consume(), 2.0)) == [0, 1, 2]
+
+    def test_close_ends_async_iteration(self, app):
+        transport = MAVLinkTransport(FakeConnection([]), threaded=False)
+        subscription = transport.subscription()
+
+        async def consume():
+            threading.Timer(0.05, subscription.close).start()
+            return [msg async for msg in subscription]
+
+        assert asyncio.run(asyncio.wait_for(consume(), 2.0)) == []
+
+    def test_lazy_decode_filter_follows_consumers(self, app):
+        transport = MAVLinkTransport(FakeConnection([]), threaded=False)
+        attitude_id = FakeMessage('ATTITUDE').get_msgId()
+        assert not transport.wants(attitude_id)
+        subscription = transport.subscription(['ATTITUDE'])
+        assert transport.wants(attitude_id)
+        subscription.close()
+        assert not transport.wants(attitude_id)
+        transport.add_listener(lambda msg: None)
+        assert transport.wants(attitude_id)
+
+
+class TestTransportConsumers:
+    """Test-Suite für die Komponenten, die früher selbst von der Verbindung gelesen haben."""
+
+    def test_message_handler_polls_through_transport(self, app):
+        handler = MessageHandler(Logger())
+        connection = FakeConnection([attitude(1)])
+        handler.set_connection(connection)
+        handler.start()
+        received = []
+        handler.get_dispatcher().subscribe('ATTITUDE', received.append)
+        # Erste Abfrage legt den Transport an; weitere Konsumenten teilen ihn
+        handler.process_messages()
+        subscription = handler.get_transport().subscription(['ATTITUDE'])
+        connection._messages.append(attitude(2))
+        handler.process_messages()
+        assert [msg.roll for msg in received] == [1, 2]
+        assert [msg.roll for msg in subscription.drain()] == [2]
+
+    def test_protocol_receive_message_shares_transport(self, app):
+        protocol = MAVLinkProtocol()
+        connection = FakeConnection([attitude(1)])
+        protocol.connection = connection
+        received = []
+        protocol.message_received.connect(received.append)
+        assert protocol.receive_message().roll == 1
+        other = protocol.transport.subscription()
+        connection._messages.extend([FakeMessage('HEARTBEAT'), attitude(3)])
+        assert protocol.receive_message().get_type() == 'HEARTBEAT'
+        assert protocol.receive_message().roll == 3
+        assert protocol.receive_message() is None
+        # Der zweite Konsument bekommt dieselben Nachrichten
+        assert [msg.get_type() for msg in other.drain()] == ['HEARTBEAT', 'ATTITUDE']
+        assert len(received) == 3
+        protocol.close()
@@ -0,0 +1,111 @@
+"""
+Unit-Tests für die tabellengesteuerte Nachrichtenverteilung.
+"""
+import pytest
+import sys
+import os
+from unittest.mock import MagicMock
+
+# Korrekte Pfadangaben für Import
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pymavlink import mavutil
+from backend.message_dispatcher import MessageDispatcher
+from backend.message_handler import MessageHandler
+from backend.sensor_manager import SensorManager
+from backend.sensorviewmodel import SensorViewModel
+from backend.logger import Logger
+
+
+def attitude_message(roll=0.1, pitch=0.2, yaw=0.3):
+    return mavutil.mavlink.MAVLink_attitude_message(0, roll, pitch, yaw, 0, 0, 0)
+
+
+def raw_imu_message():
+    return mavutil.mavlink.MAVLink_raw_imu_message(0, 1, 2, 3, 4, 5, 6, 7, 8, 9)
+
+
+class TestMessageDispatcher:
+    """Test-Suite für den MessageDispatcher."""
+
+    @pytest.fixture
+    def dispatcher(self):
+        return MessageDispatcher()
+
+    def test_resolve_msgid(self):
+        assert MessageDispatcher.resolve_msgid('ATTITUDE') == mavutil.mavlink.MAVLINK_MSG_ID_ATTITUDE
+        assert MessageDispatcher.resolve_msgid(30) == 30
+        with pytest.raises(ValueError):
+            MessageDispatcher.resolve_msgid('NOT_A_MESSAGE')
+
+    def test_dispatch_to_subscriber(self, dispatcher):
+        received = []
+        dispatcher.subscribe('ATTITUDE', received.append)
+        msg = attitude_message()
+        assert dispatcher.dispatch(msg)
+        assert received == [msg]
+
+    def test_unsubscribed_type_is_ignored(self, dispatcher):
+        handler = MagicMock()
+        dispatcher.subscribe('ATTITUDE', handler)
+        assert not dispatcher.dispatch(raw_imu_message())
+        handler.assert_not_called()
+
+    def test_duplicate_subscribe_is_ignored(self, dispatcher):
+        handler = MagicMock()
+        dispatcher.subscribe('ATTITUDE', handler)
+        dispatcher.subscribe('ATTITUDE', handler)
+        dispatcher.dispatch(attitude_message())
+        assert handler.call_count == 1
+
+    def test_unsubscribe(self, dispatcher):
+        handler = MagicMock()
+        dispatcher.subscribe('ATTITUDE', handler)
+        assert dispatcher.unsubscribe('ATTITUDE', handler)
+        assert not dispatcher.has_subscribers('ATTITUDE')
+        assert not dispatcher.unsubscribe('ATTITUDE', handler)
+
+    def test_failing_handler_does_not_block_others(self, dispatcher):
+        errors = []
+        dispatcher.set_error_callback(lambda msg, error: errors.append(error))
+        received = []
+
+        def failing(msg):
+            raise RuntimeError("boom")
+
+        dispatcher.subscribe('ATTITUDE', failing)
+        dispatcher.subscribe('ATTITUDE', received.append)
+        dispatcher.dispatch(attitude_message())
+        assert len(received) == 1
+        assert len(errors) == 1
+
+    def test_subscribed_ids(self, dispatcher):
+        dispatcher.subscribe_many({'ATTITUDE': print, 'RAW_IMU': print})
+        assert dispatcher.subscribed_ids() == frozenset({
+            mavutil.mavlink.MAVLINK_MSG_ID_ATTITUDE,
+            mavutil.mavlink.MAVLINK_MSG_ID_RAW_IMU,
+        })
+
+
+class TestMessageHandlerDispatch:
+    """Test der Registrierung von Komponenten am MessageHandler."""
+
+    def test_sensor_manager_receives_attitude(self, app):
+        logger = MagicMock(spec=Logger)
+        handler = MessageHandler(logger)
+        model = SensorViewModel()
+        sensor_manager = SensorManager(model, logger)
+        sensor_manager.initialize_sensors()
+        sensor_manager.register(handler.get_dispatcher())
+
+        handler._handle_message(attitude_message(roll=0.5))
+
+        sensors = {s["id"]: s["value"] for s in model.get_all_sensors()}
+        assert sensors["roll"] == 0.5
+
+    def test_unhandled_message_does_not_log(self, app):
+        logger = MagicMock(spec=Logger)
+        handler = MessageHandler(logger)
+        logger.reset_mock()
+        handler._handle_message(mavutil.mavlink.MAVLink_system_time_message(0, 0))
+        logger.addLog.assert_not_called()
@@ -0,0 +1,155 @@
+"""
+Unit-Tests für die Priorisierung und Bandbreitenbegrenzung ausgehender MAVLink-Nachrichten.
+"""
+import pytest
+import sys
+import os
+from types import SimpleNamespace
+
+# Korrekte Pfadangaben für Import
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pymavlink import mavutil
+
+from backend.outgoing_scheduler import OutgoingScheduler
+from test_parameter_downloader import FakeClock
+
+MAV = mavutil.mavlink
+
+
+class Wire:
+    """Nimmt die geschriebenen Bytes mit Zeitstempel auf und dekodiert sie."""
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.writes = []  # (Zeit, Bytes)
+        self._parser = MAV.MAVLink(None)
+
+    def write(self, buf):
+        self.writes.append((self.clock.now, bytes(buf)))
+
+    def messages(self):
+        decoded = []
+        for _, buf in self.writes:
+            decoded.extend(self._parser.parse_buffer(buf) or [])
+        return decoded
+
+    def types(self):
+        return [msg.get_type() for msg in self.messages()]
+
+
+def make_connection(wire):
+    mav = MAV.MAVLink(wire, srcSystem=255, srcComponent=190)
+    return SimpleNamespace(
+        mav=mav, target_system=1, target_component=1,
+        param_set_send=lambda name, value: mav.param_set_send(1, 1, name.encode(), value, MAV.MAV_PARAM_TYPE_REAL32))
+
+
+def send_rtl(connection):
+    connection.mav.command_long_send(1, 1, MAV.MAV_CMD_NAV_RETURN_TO_LAUNCH, 0, 0, 0, 0, 0, 0, 0, 0)
+
+
+class TestOutgoingScheduler:
+    """Test-Suite für den OutgoingScheduler."""
+
+    @pytest.fixture
+    def clock(self):
+        return FakeClock()
+
+    @pytest.fixture
+    def wire(self, clock):
+        return Wire(clock)
+
+    @pytest.fixture
+    def connection(self, wire):
+        return make_connection(wire)
+
+    @pytest.fixture
+    def scheduler(self, app, clock):
+        scheduler = OutgoingScheduler(clock=clock)
+        yield scheduler
+        scheduler.detach()
+
+    def drain(self, scheduler, clock, step=0.01, limit=60.0):
+        end = clock.now + limit
+        while scheduler.queue_depth() and clock.now < end:
+            clock.now += step
+            scheduler.flush()
+
+    def test_without_budget_messages_pass_through(self, scheduler, connection, wire):
+        scheduler.attach(connection, None)
+        for i in range(50):
+            connection.param_set_send(f"PARAM_{i:04d}", float(i))
+        assert len(wire.writes) == 50
+        assert scheduler.queue_depth() == 0
+
+    def test_byte_rate_follows_baud_rate(self, scheduler, connection, wire, clock):
+        scheduler.attach(connection, 57600)
+        assert scheduler.byte_rate == 57600 / 10 * OutgoingScheduler.UPLINK_SHARE
+        start = clock.now
+        for i in range(200):
+            connection.param_set_send(f"PARAM_{i:04d}", float(i))
+        assert scheduler.queue_depth(OutgoingScheduler.BULK) > 150
+        self.drain(scheduler, clock)
+
+        # Zu keinem Zeitpunkt mehr als Burst + Rate * Zeit gesendet
+        sent = 0
+        burst = max(OutgoingScheduler.MIN_BURST_BYTES, scheduler.byte_rate * OutgoingScheduler.BURST_SECONDS)
+        for when, buf in wire.writes:
+            sent += len(buf)
+            assert sent <= burst + scheduler.byte_rate * (when - start) + 1e-6
+        total = sum(len(buf) for _, buf in wire.writes)
+        assert len(wire.writes) == 200
+        assert wire.writes[-1][0] - start == pytest.approx((total - burst) / scheduler.byte_rate, abs=0.05)
+
+    def test_emergency_command_overtakes_bulk_write(self, scheduler, connection, wire, clock):
+        scheduler.attach(connection, 57600)
+        for i in range(300):
+            connection.param_set_send(f"PARAM_{i:04d}", float(i))
+        clock.now += 0.5
+        scheduler.flush()
+        before = len(wire.writes)
+
+        send_rtl(connection)
+        # Sofort auf der Leitung, vor den restlichen ~250 PARAM_SET
+        assert wire.types()[before] == 'COMMAND_LONG'
+        assert wire.messages()[before].command == MAV.MAV_CMD_NAV_RETURN_TO_LAUNCH
+        assert scheduler.stats()[OutgoingScheduler.EMERGENCY]["latency"]["max_ms"] == 0.0
+        assert scheduler.queue_depth(OutgoingScheduler.BULK) > 200
+
+    def test_control_before_bulk(self, scheduler, connection, wire, clock):
+        scheduler.attach(connection, 57600)
+        for i in range(100):
+            connection.param_set_send(f"PARAM_{i:04d}", float(i))
+        connection.mav.command_long_send(1, 1, MAV.MAV_CMD_DO_MOTOR_TEST, 0, 1, 0, 5, 2, 0, 0, 0)
+        connection.mav.request_data_stream_send(1, 1, MAV.MAV_DATA_STREAM_ALL, 4, 1)
+        queued = len(wire.writes)
+        self.drain(scheduler, clock)
+        assert wire.types()[queued:queued + 2] == ['COMMAND_LONG', 'REQUEST_DATA_STREAM']
+        stats = scheduler.stats()
+        assert stats[OutgoingScheduler.CONTROL]["sent"] == 1
+        assert stats[OutgoingScheduler.NORMAL]["sent"] == 1
+        assert stats[OutgoingScheduler.BULK]["sent"] == 100
+        assert stats[OutgoingScheduler.BULK]["latency"]["max_ms"] > stats[OutgoingScheduler.CONTROL]["latency"]["max_ms"]
+
+    def test_sequence_numbers_follow_wire_order(self, scheduler, connection, wire, clock):
+        scheduler.attach(connection, 57600)
+        for i in range(30):
+            connection.param_set_send(f"PARAM_{i:04d}", float(i))
+        connection.mav.heartbeat_send(MAV.MAV_TYPE_GCS, MAV.MAV_AUTOPILOT_INVALID, 0, 0, 0)
+        send_rtl(connection)
+        self.drain(scheduler, clock)
+        seqs = [msg.get_seq() for msg in wire.messages()]
+        assert seqs == list(range(len(seqs)))
+
+    def test_detach_restores_direct_sending(self, scheduler, connection, wire):
+        scheduler.attach(connection, 57600)
+        for i in range(50):
+            connection.param_set_send(f"PARAM_{i:04d}", float(i))
+        scheduler.detach()
+        assert scheduler.queue_depth() == 0
+        sent = len(wire.writes)
+        connection.param_set_send("AFTER", 1.0)
+        assert len(wire.writes) == sent + 1
+        with pytest.raises(RuntimeError):
+            scheduler.send(MAV.MAVLink_heartbeat_message(0, 0, 0, 0, 0, 3))
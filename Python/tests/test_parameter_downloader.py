@@ -0,0 +1,454 @@
+"""
+Unit-Tests für den nicht blockierenden Parameter-Download und den Parameter-Cache.
+"""
+import pytest
+import random
+import struct
+import sys
+import os
+import zlib
+from collections import deque
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+# Korrekte Pfadangaben für Import
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pymavlink import mavutil
+
+from backend.parameter_downloader import ParameterDownloader
+from backend.parameter_manager import ParameterManager
+from backend.parameter_model import ParameterTableModel
+from backend.parameter_cache import (ParameterCache, compute_parameter_hash, crc32part,
+                                     hash_from_param_value, firmware_from_autopilot_version)
+
+# PARAM_VALUE (MAVLink 2): 25 Byte Nutzdaten + 12 Byte Rahmen, 10 Bit pro Byte
+PARAM_VALUE_SECONDS_57600 = 37 * 10 / 57600
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeFlightController:
+    """Simulierter FC: beantwortet PARAM_REQUEST_LIST/READ über eine verlustbehaftete Leitung."""
+
+    def __init__(self, count, loss=0.0, seed=1, supports_hash=False, firmware=0x04050100):
+        self.params = [(f"PARAM_{i:04d}", float(i)) for i in range(count)]
+        self.supports_hash = supports_hash
+        self.firmware = firmware  # flight_sw_version, None: kein AUTOPILOT_VERSION
+        self.link = deque()
+        self.loss = loss
+        self.random = random.Random(seed)
+        self.list_requests = 0
+        self.read_requests = []
+        self.target_system = 1
+        self.target_component = 1
+        self.mav = SimpleNamespace(param_request_read_send=self._read,
+                                   command_long_send=self._command)
+
+    def _message(self, index):
+        name, value = self.params[index]
+        return SimpleNamespace(param_id=name, param_value=value, param_index=index,
+                               param_count=len(self.params),
+                               get_type=lambda: "PARAM_VALUE")
+
+    def param_fetch_all(self):
+        self.list_requests += 1
+        for index in range(len(self.params)):
+            self.link.append(self._message(index))
+
+    def _read(self, target_system, target_component, param_id, param_index):
+        if param_id == b"_HASH_CHECK":
+            if self.supports_hash:
+                value = struct.unpack("<f", struct.pack("<I", self.param_hash()))[0]
+                self.link.append(SimpleNamespace(param_id="_HASH_CHECK", param_value=value,
+                                                 param_index=-1, param_count=len(self.params),
+                                                 get_type=lambda: "PARAM_VALUE"))
+            return
+        self.read_requests.append(param_index)
+        self.link.append(self._message(param_index))
+
+    def _command(self, target_system, target_component, command, confirmation, *params):
+        if (command == mavutil.mavlink.MAV_CMD_REQUEST_MESSAGE and self.firmware is not None
+                and params[0] == mavutil.mavlink.MAVLINK_MSG_ID_AUTOPILOT_VERSION):
+            self.link.append(SimpleNamespace(flight_sw_version=self.firmware,
+                                             get_type=lambda: "AUTOPILOT_VERSION"))
+
+    def receive(self, manager):
+        """Stellt alles Anstehende dem ParameterManager zu (wie der Dispatcher)."""
+        while self.link:
+            msg = self.link.popleft()
+            if msg.get_type() == "AUTOPILOT_VERSION":
+                manager.handle_autopilot_version(msg)
+            else:
+                manager.handle_parameter(msg)
+
+    def param_hash(self):
+        # Wie PX4 (NuttX crc32part), unabhängig von compute_parameter_hash gerechnet:
+        # zlib.crc32 invertiert vor und nach jedem Block, das wird hier aufgehoben
+        crc = 0
+        for name, value in self.params:
+            for data in (name.encode("ascii"), struct.pack("<f", value)):
+                crc = ~zlib.crc32(data, ~crc & 0xFFFFFFFF) & 0xFFFFFFFF
+        return crc
+
+    def deliver(self, downloader, clock, max_seconds=60.0):
+        """Überträgt die Nachrichten im Takt der Funkstrecke und ruft den Timer auf."""
+        next_poll = clock.now
+        end = clock.now + max_seconds
+        while downloader.is_active() and clock.now < end:
+            if self.link:
+                msg = self.link.popleft()
+                clock.now += PARAM_VALUE_SECONDS_57600
+                if self.random.random() >= self.loss:
+                    downloader.handle_param_value(msg)
+            else:
+                clock.now += 0.01
+            if clock.now >= next_poll:
+                downloader.poll()
+                next_poll = clock.now + ParameterDownloader.TICK_MS / 1000.0
+
+
+class TestParameterDownloader:
+    """Test-Suite für den ParameterDownloader."""
+
+    @pytest.fixture
+    def clock(self):
+        return FakeClock()
+
+    @pytest.fixture
+    def downloader(self, app, clock):
+        return ParameterDownloader(clock=clock)
+
+    def test_lossless_download(self, downloader, clock):
+        fc = FakeFlightController(50)
+        results = []
+        downloader.finished.connect(results.append)
+        downloader.start(fc)
+        fc.deliver(downloader, clock)
+        assert downloader.state == ParameterDownloader.DONE
+        assert [p["name"] for p in results[0]] == [name for name, _ in fc.params]
+        assert fc.read_requests == []
+
+    def test_progress_is_reported_incrementally(self, downloader, clock):
+        fc = FakeFlightController(20)
+        progress = []
+        downloader.progressChanged.connect(lambda received, total: progress.append((received, total)))
+        downloader.start(fc)
+        fc.deliver(downloader, clock)
+        assert progress[0] == (1, 20)
+        assert progress[-1] == (20, 20)
+        assert len(progress) == 20
+
+    def test_gaps_are_rerequested_by_index(self, downloader, clock):
+        fc = FakeFlightController(100)
+        downloader.start(fc)
+        # Liste mit fehlenden Indizes übertragen
+        lost = {3, 4, 50, 98}
+        while fc.link:
+            msg = fc.link.popleft()
+            if msg.param_index not in lost:
+                downloader.handle_param_value(msg)
+        assert downloader.state == ParameterDownloader.FILLING
+        assert sorted(fc.read_requests) == sorted(lost)
+        fc.deliver(downloader, clock)
+        assert downloader.state == ParameterDownloader.DONE
+        assert fc.list_requests == 1
+
+    def test_gap_detected_by_timeout(self, downloader, clock):
+        fc = FakeFlightController(10)
+        downloader.start(fc)
+        # Letzter Index geht verloren - Lücke erst nach GAP_TIMEOUT erkennbar
+        for _ in range(9):
+            downloader.handle_param_value(fc.link.popleft())
+        fc.link.clear()
+        downloader.poll()
+        assert fc.read_requests == []
+        clock.now += ParameterDownloader.GAP_TIMEOUT
+        downloader.poll()
+        assert fc.read_requests == [9]
+
+    def test_read_window_is_limited(self, downloader, clock):
+        fc = FakeFlightController(100)
+        downloader.start(fc)
+        fc.link.clear()
+        downloader.handle_param_value(fc._message(99))
+        assert len(fc.read_requests) == ParameterDownloader.WINDOW
+        # Jede Antwort gibt Platz für die nächste Anfrage
+        downloader.handle_param_value(fc.link.popleft())
+        assert len(fc.read_requests) == ParameterDownloader.WINDOW + 1
+
+    def test_list_request_is_retried_then_fails(self, downloader, clock):
+        fc = FakeFlightController(10)
+        failures = []
+        downloader.failed.connect(failures.append)
+        fc.param_fetch_all = MagicMock()
+        downloader.start(fc)
+        for _ in range(ParameterDownloader.LIST_RETRIES):
+            clock.now += ParameterDownloader.LIST_TIMEOUT
+            downloader.poll()
+        assert fc.param_fetch_all.call_count == ParameterDownloader.LIST_RETRIES
+        assert downloader.state == ParameterDownloader.FAILED
+        assert failures
+
+    def test_resume_requests_only_missing(self, downloader, clock):
+        fc = FakeFlightController(30)
+        downloader.start(fc)
+        while fc.link:
+            msg = fc.link.popleft()
+            if msg.param_index < 20:
+                downloader.handle_param_value(msg)
+        downloader.cancel()
+        assert downloader.received_count == 20
+
+        fc.read_requests.clear()
+        downloader.start(fc)
+        assert fc.list_requests == 1
+        assert fc.read_requests == list(range(20, 20 + ParameterDownloader.WINDOW))
+        fc.deliver(downloader, clock)
+        assert downloader.state == ParameterDownloader.DONE
+
+    def test_non_download_messages_are_ignored(self, downloader):
+        msg = SimpleNamespace(param_id="X", param_value=1.0, param_index=65535, param_count=10)
+        assert downloader.handle_param_value(msg) is None
+        fc = FakeFlightController(10)
+        downloader.start(fc)
+        assert downloader.handle_param_value(msg) is None
+
+    def test_lossy_radio_download_1000_parameters(self, downloader, clock):
+        """1000 Parameter über 57600 Baud mit 5 % Verlust."""
+        fc = FakeFlightController(1000, loss=0.05, seed=7)
+        downloader.start(fc)
+        fc.deliver(downloader, clock)
+        assert downloader.state == ParameterDownloader.DONE
+        assert downloader.received_count == 1000
+        # Nahe an der Leitungsgrenze: Liste + Nachforderungen + eine Lückenerkennung
+        ideal = (1000 + len(fc.read_requests)) * PARAM_VALUE_SECONDS_57600
+        assert downloader.duration < ideal + 2 * ParameterDownloader.GAP_TIMEOUT
+        assert len(fc.read_requests) < 100
+
+
+class TestParameterManagerDownload:
+    """Test-Suite für den Download über den ParameterManager."""
+
+    def test_load_parameters_does_not_block(self, app):
+        model = ParameterTableModel()
+        manager = ParameterManager(model, MagicMock())
+        fc = FakeFlightController(25)
+        manager.set_connection(fc)
+        loaded = []
+        manager.parametersLoaded.connect(loaded.append)
+
+        manager.load_parameters()
+        assert fc.list_requests == 1
+        assert model.rowCount() == 0
+
+        while fc.link:
+            manager.handle_parameter(fc.link.popleft())
+        assert len(loaded[0]) == 25
+        assert model.rowCount() == 25
+
+
+class TestParameterCache:
+    """Test-Suite für den Parameter-Cache auf der Festplatte."""
+
+    @pytest.fixture
+    def cache(self, tmp_path):
+        return ParameterCache(tmp_path / "parameters")
+
+    @pytest.fixture
+    def manager(self, app, cache):
+        return ParameterManager(ParameterTableModel(), MagicMock(), cache=cache)
+
+    def _connect(self, manager, fc):
+        manager.set_connection(fc)
+        fc.receive(manager)
+
+    def _download(self, manager, fc):
+        manager.load_parameters()
+        fc.receive(manager)
+
+    def test_save_and_load_roundtrip(self, cache):
+        params = [{"name": "A", "value": 1.0}, {"name": "B", "value": 2.5}]
+        cache.save(1, params, firmware="4.5.1")
+        entry = cache.load(1, "4.5.1")
+        assert entry["parameters"] == params
+        assert entry["hash"] == compute_parameter_hash(params)
+        assert cache.load(1, "4.6.0") is None  # andere Firmware
+        assert cache.load(1) is None  # Firmware unbekannt
+        assert cache.load(2) is None
+
+    def test_corrupt_file_is_ignored(self, cache):
+        cache.directory.mkdir(parents=True)
+        cache.path_for(1).write_text("{not json")
+        assert cache.load(1) is None
+
+    def test_crc32part_known_vectors(self):
+        # CRC-32 (0xEDB88320) mit Startwert 0 und ohne Endinvertierung
+        assert crc32part(b"123456789") == 0x2DFD2D88
+        assert crc32part(b"") == 0
+        assert crc32part(b"56789", crc32part(b"1234")) == 0x2DFD2D88
+        # Nicht zlib.crc32: das invertiert vor und nach jedem Block
+        assert crc32part(b"123456789") != zlib.crc32(b"123456789")
+        params = [{"name": "A", "value": 1.0}, {"name": "B", "value": 2.5}]
+        assert compute_parameter_hash(params) == 0xCD295D0F
+
+    def test_hash_helpers(self):
+        value = struct.unpack("<f", struct.pack("<I", 0x12345678))[0]
+        assert hash_from_param_value(value) == 0x12345678
+        assert firmware_from_autopilot_version(0x04050100) == "4.5.1"
+
+    def test_download_fills_cache(self, manager, cache):
+        fc = FakeFlightController(20)
+        self._connect(manager, fc)
+        self._download(manager, fc)
+        assert len(cache.load(fc.target_system, "4.5.1")["parameters"]) == 20
+
+    def test_matching_hash_uses_cache_without_download(self, manager, cache):
+        fc = FakeFlightController(20, supports_hash=True)
+        self._connect(manager, fc)
+        self._download(manager, fc)
+        assert fc.list_requests == 1
+
+        model = ParameterTableModel()
+        second = ParameterManager(model, MagicMock(), cache=cache)
+        verified = []
+        second.cacheVerified.connect(verified.append)
+        self._connect(second, fc)
+        second.load_parameters()
+        # Sofort aus dem Cache befüllt
+        assert model.rowCount() == 20
+        fc.receive(second)
+        assert verified == [True]
+        assert fc.list_requests == 1
+
+    def test_hash_mismatch_reloads(self, manager, cache):
+        fc = FakeFlightController(20, supports_hash=True)
+        self._connect(manager, fc)
+        self._download(manager, fc)
+        fc.params[5] = ("PARAM_0005", 99.0)
+
+        verified = []
+        manager.cacheVerified.connect(verified.append)
+        manager.set_connection(None)
+        self._connect(manager, fc)
+        self._download(manager, fc)
+        assert verified == [False]
+        assert fc.list_requests == 2
+        values = {p["name"]: p["value"] for p in cache.load(fc.target_system, "4.5.1")["parameters"]}
+        assert values["PARAM_0005"] == 99.0
+
+    def test_missing_hash_support_verifies_by_samples(self, manager, cache):
+        fc = FakeFlightController(20)
+        self._connect(manager, fc)
+        self._download(manager, fc)
+
+        verified = []
+        manager.cacheVerified.connect(verified.append)
+        manager.set_connection(None)
+        self._connect(manager, fc)
+        manager.load_parameters()
+        assert fc.list_requests == 1
+        # Keine Antwort auf _HASH_CHECK (ArduPilot): Stichproben statt Download
+        manager._on_verify_timeout()
+        assert fc.read_requests == [0, 3, 5, 8, 11, 14, 16, 19]
+        fc.receive(manager)
+        assert verified == [True]
+        assert fc.list_requests == 1
+
+    def test_changed_sample_reloads(self, manager, cache):
+        fc = FakeFlightController(20)
+        self._connect(manager, fc)
+        self._download(manager, fc)
+        fc.params[8] = ("PARAM_0008", 42.0)
+
+        verified = []
+        manager.cacheVerified.connect(verified.append)
+        manager.set_connection(None)
+        self._connect(manager, fc)
+        manager.load_parameters()
+        manager._on_verify_timeout()
+        fc.receive(manager)
+        assert verified == [False]
+        assert fc.list_requests == 2
+
+    def test_changed_parameter_count_reloads(self, manager, cache):
+        fc = FakeFlightController(20)
+        self._connect(manager, fc)
+        self._download(manager, fc)
+        fc.params.append(("PARAM_0020", 20.0))
+
+        verified = []
+        manager.cacheVerified.connect(verified.append)
+        manager.set_connection(None)
+        self._connect(manager, fc)
+        manager.load_parameters()
+        manager._on_verify_timeout()
+        fc.receive(manager)
+        assert verified == [False]
+        assert fc.list_requests == 2
+
+    def test_unanswered_samples_reload(self, manager, cache):
+        fc = FakeFlightController(20)
+        self._connect(manager, fc)
+        self._download(manager, fc)
+
+        manager.set_connection(None)
+        self._connect(manager, fc)
+        manager.load_parameters()
+        manager._on_verify_timeout()
+        fc.link.clear()
+        manager._on_verify_timeout()
+        assert fc.list_requests == 2
+
+    def test_load_waits_for_firmware_version(self, manager, cache):
+        fc = FakeFlightController(20)
+        self._connect(manager, fc)
+        self._download(manager, fc)
+
+        # Neue Firmware auf dem FC: der alte Satz darf nicht angezeigt werden
+        fc.firmware = 0x04060000
+        model = ParameterTableModel()
+        second = ParameterManager(model, MagicMock(), cache=cache)
+        verified = []
+        second.cacheVerified.connect(verified.append)
+        second.set_connection(fc)
+        second.load_parameters()
+        # AUTOPILOT_VERSION steht noch aus: weder Cache noch Download
+        assert model.rowCount() == 0
+        assert fc.list_requests == 1
+
+        fc.receive(second)
+        assert fc.list_requests == 2
+        assert model.rowCount() == 20
+        assert verified == []
+        assert cache.load(fc.target_system, "4.6.0") is not None
+        assert cache.load(fc.target_system, "4.5.1") is None
+
+    def test_unknown_firmware_skips_cache(self, manager, cache):
+        fc = FakeFlightController(20, supports_hash=True)
+        self._connect(manager, fc)
+        self._download(manager, fc)
+
+        saved = cache.load(fc.target_system, "4.5.1")["saved"]
+
+        # FC beantwortet die Versionsanfrage nicht
+        fc.firmware = None
+        model = ParameterTableModel()
+        second = ParameterManager(model, MagicMock(), cache=cache)
+        second.set_connection(fc)
+        second.load_parameters()
+        assert fc.list_requests == 1
+        second._version_timer.stop()
+        second._on_version_timeout()
+        assert fc.list_requests == 2
+        assert model.rowCount() == 0
+        fc.receive(second)
+        assert model.rowCount() == 20
+        # Ohne Firmware wird auch nichts gespeichert
+        assert cache.load(fc.target_system, "4.5.1")["saved"] == saved
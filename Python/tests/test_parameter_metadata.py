@@ -0,0 +1,218 @@
+"""
+Unit-Tests für die ArduPilot-Parameter-Metadaten und ihre Anbindung an das Parametermodell.
+"""
+import pytest
+import sys
+import os
+import time
+
+# Korrekte Pfadangaben für Import
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from backend.parameter_metadata import ParameterMetadata, parse_parameter_xml, compile_metadata
+from backend.parameter_model import ParameterTableModel, ParameterFilterProxyModel
+
+PDEF_XML = """<?xml version="1.0" encoding="utf-8"?>
+<paramfile>
+  <vehicles>
+    <parameters name="ArduCopter">
+      <param humanName="Frame Class" name="ArduCopter:FRAME_CLASS" documentation="Controls major frame class for multicopter component" user="Standard">
+        <field name="RebootRequired">True</field>
+        <values>
+          <value code="0">Undefined</value>
+          <value code="1">Quad</value>
+          <value code="2">Hexa</value>
+        </values>
+      </param>
+      <param humanName="Pilot maximum vertical speed" name="ArduCopter:PILOT_SPEED_UP" documentation="The maximum vertical ascending velocity the pilot may request in cm/s">
+        <field name="Units">cm/s</field>
+        <field name="Range">50 500</field>
+      </param>
+    </parameters>
+    <parameters name="ArduPlane">
+      <param humanName="Plane only" name="ArduPlane:TRIM_ARSPD_CM" documentation="Target airspeed">
+        <field name="Units">cm/s</field>
+      </param>
+    </parameters>
+  </vehicles>
+  <libraries>
+    <parameters name="COMPASS_">
+      <param humanName="Compass orientation" name="COMPASS_ORIENT" documentation="The orientation of a second external compass relative to the vehicle frame.">
+        <values>
+          <value code="0">None</value>
+          <value code="1">Yaw45</value>
+        </values>
+      </param>
+      <param humanName="Compass options" name="COMPASS_OPTIONS" documentation="This sets options to change the behaviour of the compass">
+        <field name="Bitmask">0:CalRequireGPS,1:AllowMissingDevices</field>
+        <field name="Default">0</field>
+      </param>
+    </parameters>
+  </libraries>
+</paramfile>
+"""
+
+
+@pytest.fixture
+def xml_path(tmp_path):
+    path = tmp_path / "apm.pdef.xml"
+    path.write_text(PDEF_XML, encoding="utf-8")
+    return path
+
+
+@pytest.fixture
+def metadata(xml_path, tmp_path):
+    metadata = ParameterMetadata.load(xml_path, tmp_path / "metadata.bin", vehicle="ArduCopter")
+    yield metadata
+    metadata.close()
+
+
+class CountingMetadata:
+    """Zählt die Nachschlagevorgänge eines Metadaten-Speichers."""
+
+    def __init__(self, metadata):
+        self._metadata = metadata
+        self.lookups = []
+
+    def get(self, name):
+        self.lookups.append(name)
+        return self._metadata.get(name)
+
+
+class TestParameterMetadata:
+    """Test-Suite für Parsen, Binär-Cache und Nachschlagen der Metadaten."""
+
+    def test_parse_fields(self, xml_path):
+        entries = parse_parameter_xml(xml_path, vehicle="ArduCopter")
+        assert set(entries) == {"FRAME_CLASS", "PILOT_SPEED_UP", "COMPASS_ORIENT", "COMPASS_OPTIONS"}
+        assert entries["FRAME_CLASS"]["options"] == "0:Undefined,1:Quad,2:Hexa"
+        assert entries["PILOT_SPEED_UP"]["unit"] == "cm/s"
+        assert entries["PILOT_SPEED_UP"]["range"] == "50 500"
+        assert entries["COMPASS_OPTIONS"]["options"] == "0:CalRequireGPS,1:AllowMissingDevices"
+        assert entries["COMPASS_OPTIONS"]["defaultValue"] == "0"
+
+    def test_parse_without_vehicle_keeps_all(self, xml_path):
+        assert "TRIM_ARSPD_CM" in parse_parameter_xml(xml_path)
+
+    def test_lookup(self, metadata):
+        assert len(metadata) == 4
+        assert metadata.get("COMPASS_ORIENT")["humanName"] == "Compass orientation"
+        assert metadata.get("FRAME_CLASS")["desc"] == "Controls major frame class for multicopter component"
+        assert "PILOT_SPEED_UP" in metadata
+        assert metadata.get("TRIM_ARSPD_CM") is None
+        assert metadata.get("UNKNOWN") is None
+        assert metadata.get("A_NAME_LONGER_THAN_16") is None
+        assert metadata.names() == sorted(metadata.names())
+
+    def test_cache_is_reused_until_xml_changes(self, xml_path, tmp_path, monkeypatch):
+        cache_path = tmp_path / "metadata.bin"
+        ParameterMetadata.load(xml_path, cache_path).close()
+
+        def fail(*args, **kwargs):
+            raise AssertionError("XML darf nicht erneut geparst werden")
+
+        monkeypatch.setattr("backend.parameter_metadata.parse_parameter_xml", fail)
+        reused = ParameterMetadata.load(xml_path, cache_path)
+        assert reused.get("FRAME_CLASS") is not None
+        reused.close()
+
+        monkeypatch.undo()
+        xml_path.write_text(PDEF_XML.replace("Frame Class", "Frame Type"), encoding="utf-8")
+        reloaded = ParameterMetadata.load(xml_path, cache_path)
+        assert reloaded.get("FRAME_CLASS")["humanName"] == "Frame Type"
+        reloaded.close()
+
+    def test_corrupt_cache_is_rebuilt(self, xml_path, tmp_path):
+        cache_path = tmp_path / "metadata.bin"
+        cache_path.write_bytes(b"garbage")
+        metadata = ParameterMetadata.load(xml_path, cache_path)
+        assert len(metadata) == 5
+        metadata.close()
+
+    def test_large_cache_opens_quickly(self, tmp_path):
+        """Öffnen und Nachschlagen bei 5000 Einträgen ohne Parsen des Inhalts."""
+        entries = {f"PARAM_{i:05d}": {"desc": f"Description of parameter {i} " * 5, "unit": "m"}
+                   for i in range(5000)}
+        cache_path = tmp_path / "large.bin"
+        compile_metadata(entries, cache_path)
+
+        start_time = time.perf_counter()
+        metadata = ParameterMetadata(cache_path)
+        entry = metadata.get("PARAM_04321")
+        elapsed = time.perf_counter() - start_time
+        assert entry["desc"].startswith("Description of parameter 4321")
+        assert elapsed < 0.05, f"Öffnen dauerte zu lange: {elapsed * 1000:.1f} ms"
+        metadata.close()
+
+
+class TestParameterModelMetadata:
+    """Test-Suite für die verzögerte Auflösung der Metadaten im Parametermodell."""
+
+    @pytest.fixture
+    def model(self, app, metadata):
+        model = ParameterTableModel()
+        model.set_parameters([
+            {'name': 'FRAME_CLASS', 'value': '1', 'defaultValue': '', 'unit': '', 'options': '', 'desc': ''},
+            {'name': 'PILOT_SPEED_UP', 'value': '250', 'defaultValue': '', 'unit': '', 'options': '', 'desc': ''},
+            {'name': 'COMPASS_ORIENT', 'value': '0', 'desc': 'Own description'},
+            {'name': 'CUSTOM_PARAM', 'value': '3'},
+        ])
+        return model
+
+    def test_fields_are_filled_from_metadata(self, model, metadata):
+        model.set_metadata(metadata)
+        assert model.data(model.index(0, 0), ParameterTableModel.OptionsRole) == "0:Undefined,1:Quad,2:Hexa"
+        assert model.data(model.index(1, 0), ParameterTableModel.UnitRole) == "cm/s"
+        # Eigene Werte haben Vorrang
+        assert model.data(model.index(2, 0), ParameterTableModel.DescRole) == "Own description"
+        assert model.data(model.index(3, 0), ParameterTableModel.DescRole) == ""
+        # Das Parameter-Dict selbst bleibt unverändert
+        assert model.get_parameter_by_name('FRAME_CLASS')['options'] == ''
+
+    def test_only_displayed_rows_are_resolved(self, model, metadata):
+        counting = CountingMetadata(metadata)
+        model.set_metadata(counting)
+        assert counting.lookups == []
+        for role in (ParameterTableModel.UnitRole, ParameterTableModel.DescRole, ParameterTableModel.OptionsRole):
+            model.data(model.index(1, 0), role)
+        assert counting.lookups == ['PILOT_SPEED_UP']
+
+    def test_set_metadata_notifies_view(self, model, metadata):
+        resets = []
+        model.modelReset.connect(lambda: resets.append(True))
+        model.set_metadata(metadata)
+        assert resets == [True]
+
+    def test_set_metadata_on_empty_model_does_not_reset(self, app, metadata):
+        model = ParameterTableModel()
+        resets = []
+        model.modelReset.connect(lambda: resets.append(True))
+        model.set_metadata(metadata)
+        assert resets == []
+
+    def test_set_metadata_keeps_search_index_lazy(self, model, metadata):
+        """Nach dem Aufbau des Suchindex löst set_metadata nicht alle Zeilen auf."""
+        proxy = ParameterFilterProxyModel(model)
+        proxy.setSearchText('quad')
+        proxy.setSearchText('')
+        counting = CountingMetadata(metadata)
+        model.set_metadata(counting)
+        assert counting.lookups == []
+        assert proxy.count == 4
+        # Der Index wird erst bei der nächsten Suche neu aufgebaut
+        proxy.setSearchText('multicopter')
+        assert proxy.count == 1
+        assert proxy.nameAt(0) == 'FRAME_CLASS'
+
+    def test_search_finds_metadata_text(self, model, metadata):
+        counting = CountingMetadata(metadata)
+        model.set_metadata(counting)
+        proxy = ParameterFilterProxyModel(model)
+        # Ohne Suche wird kein Index (und keine Beschreibung) aufgebaut
+        assert proxy.count == 4
+        assert counting.lookups == []
+        proxy.setSearchText('multicopter')
+        assert proxy.count == 1
+        assert proxy.nameAt(0) == 'FRAME_CLASS'
+        proxy.setSearchText('hexa')
+        assert proxy.nameAt(0) == 'FRAME_CLASS'
@@ -11,7 +11,8 @@ from PySide6.QtCore import Qt, QModelIndex
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 # Module importieren
-from backend.parameter_model import ParameterTableModel
+from backend.parameter_model import ParameterTableModel, ParameterFilterProxyModel
+from backend.parameter_search import ParameterSearchIndex
 
 class TestParameterTableModel:
     """Test-Suite für die ParameterTableModel-Klasse."""
@@ -162,3 +163,128 @@ class TestParameterTableModel:
         # Act & Assert
         assert model.get_parameter_value('RATE_RLL_P') == '0.15'
         assert model.get_parameter_value('NONEXISTENT') is None
+    
+    def test_add_parameter_upserts_existing_row(self, model, sample_params, app):
+        """Testet, dass ein erneut empfangener Parameter keine doppelte Zeile erzeugt."""
+        # Arrange
+        model.set_parameters(sample_params)
+        changed = []
+        model.dataChanged.connect(lambda first, last, roles: changed.append((first.row(), list(roles))))
+        
+        # Act
+        model.add_parameter({'name': 'RATE_PIT_P', 'value': '0.3'})
+        
+        # Assert
+        assert model.rowCount() == 3
+        assert model.get_parameter_by_name('RATE_PIT_P')['value'] == '0.3'
+        assert changed == [(1, [ParameterTableModel.ValueRole])]
+    
+    def test_add_parameter_batches_inserts(self, model, app):
+        """Testet, dass neue Parameter gesammelt mit einem rowsInserted eingefügt werden."""
+        # Arrange
+        inserts = []
+        loaded = []
+        model.rowsInserted.connect(lambda parent, first, last: inserts.append((first, last)))
+        model.parametersLoaded.connect(lambda: loaded.append(True))
+        
+        # Act
+        for i in range(5):
+            model.add_parameter({'name': f'P{i}', 'value': str(i)})
+        model.add_parameter({'name': 'P2', 'value': '22'})
+        
+        # Assert - noch nicht eingefügt, aber per Name auffindbar
+        assert model.rowCount() == 0
+        assert model.get_parameter_by_name('P2')['value'] == '22'
+        model.flush()
+        assert model.rowCount() == 5
+        assert inserts == [(0, 4)]
+        assert loaded == [True]
+        assert model.row_of('P4') == 4
+
+
+
+class TestParameterFilterProxyModel:
+    """Test-Suite für die indizierte Parametersuche."""
+    
+    @pytest.fixture
+    def source(self, app):
+        """Fixture für ein Quellmodell mit Beschreibungen und Optionen."""
+        model = ParameterTableModel()
+        model.set_parameters([
+            {'name': 'COMPASS_ORIENT', 'value': '0', 'desc': 'Compass orientation', 'options': '0:None,1:Yaw45'},
+            {'name': 'RATE_RLL_P', 'value': '0.15', 'desc': 'Roll rate control P gain'},
+            {'name': 'RATE_PIT_P', 'value': '0.15', 'desc': 'Pitch rate control P gain'},
+            {'name': 'BATT_MONITOR', 'value': '4', 'desc': 'Battery monitoring', 'options': ['0:Disabled', '4:Analog']},
+        ])
+        return model
+    
+    @pytest.fixture
+    def proxy(self, source):
+        return ParameterFilterProxyModel(source)
+    
+    def _names(self, proxy):
+        return [proxy.data(proxy.index(row, 0), ParameterTableModel.NameRole) for row in range(proxy.rowCount())]
+    
+    def test_empty_search_shows_all(self, proxy):
+        """Testet, dass ohne Suchtext alle Parameter sichtbar sind."""
+        assert proxy.count == 4
+        assert proxy.roleNames()[ParameterTableModel.NameRole] == b'name'
+    
+    def test_search_name_description_and_options(self, proxy):
+        """Testet die Suche in Name, Beschreibung und Optionen (ohne Groß-/Kleinschreibung)."""
+        proxy.setSearchText('rate')
+        assert self._names(proxy) == ['RATE_RLL_P', 'RATE_PIT_P']
+        proxy.setSearchText('ORIENTATION')
+        assert self._names(proxy) == ['COMPASS_ORIENT']
+        proxy.setSearchText('analog')
+        assert self._names(proxy) == ['BATT_MONITOR']
+    
+    def test_all_terms_must_match(self, proxy):
+        """Testet, dass mehrere Suchbegriffe UND-verknüpft werden."""
+        proxy.setSearchText('gain pitch')
+        assert self._names(proxy) == ['RATE_PIT_P']
+    
+    def test_refinement_narrows_result(self, proxy):
+        """Testet, dass Verfeinerungen und Korrekturen das richtige Ergebnis liefern."""
+        for text, expected in [('r', 4), ('ra', 2), ('rat', 2), ('rate_r', 1), ('rate_', 2), ('', 4)]:
+            proxy.setSearchText(text)
+            assert proxy.count == expected, text
+    
+    def test_source_inserts_follow_filter(self, source, proxy):
+        """Testet, dass neu eingefügte Parameter nur bei Treffer erscheinen."""
+        proxy.setSearchText('rate')
+        source.add_parameters([
+            {'name': 'RATE_YAW_P', 'value': '0.2', 'desc': 'Yaw rate control P gain'},
+            {'name': 'GPS_TYPE', 'value': '1', 'desc': 'GPS type'},
+        ])
+        assert self._names(proxy) == ['RATE_RLL_P', 'RATE_PIT_P', 'RATE_YAW_P']
+    
+    def test_source_value_change_updates_filter(self, source, proxy):
+        """Testet, dass Wertänderungen die Treffer aktualisieren."""
+        proxy.setSearchText('0.15')
+        assert proxy.count == 2
+        source.set_parameter_value('RATE_RLL_P', '0.3')
+        assert self._names(proxy) == ['RATE_PIT_P']
+        source.set_parameter_value('COMPASS_ORIENT', '0.15')
+        assert self._names(proxy) == ['COMPASS_ORIENT', 'RATE_PIT_P']
+    
+    def test_source_reset_rebuilds_index(self, source, proxy):
+        """Testet, dass set_parameters den Index neu aufbaut."""
+        proxy.setSearchText('gps')
+        assert proxy.count == 0
+        source.set_parameters([{'name': 'GPS_TYPE', 'value': '1', 'desc': 'GPS type'}])
+        assert self._names(proxy) == ['GPS_TYPE']
+    
+    def test_filter_parameters_reads_options(self, source):
+        """Testet, dass filter_parameters das Feld 'options' durchsucht."""
+        assert [p['name'] for p in source.filter_parameters('yaw45')] == ['COMPASS_ORIENT']
+    
+    def test_index_matches_brute_force(self):
+        """Testet den Token-Index gegen eine einfache Teilstring-Suche."""
+        params = [{'name': f'P_{i}', 'desc': f'word{i % 7} other{i % 3}', 'value': str(i)} for i in range(50)]
+        index = ParameterSearchIndex()
+        index.rebuild(params)
+        for query in ['word1', 'word', 'other2 word3', 'p_1', '1', 'r2 d3', 'zzz']:
+            expected = {i for i, p in enumerate(params)
+                        if all(t in f"{p['name']}\n{p['desc']}\n{p['value']}".lower() for t in query.split())}
+            assert index.search(query) == expected, query
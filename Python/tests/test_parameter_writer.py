@@ -0,0 +1,225 @@
+"""
+Unit-Tests für das Schreiben mehrerer Parameter mit Bestätigung.
+"""
+import pytest
+import random
+import sys
+import os
+from collections import deque
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+# Korrekte Pfadangaben für Import
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from backend.parameter_writer import ParameterWriter, parse_parameter_file, same_value
+from backend.parameter_manager import ParameterManager
+from backend.parameter_model import ParameterTableModel
+from test_parameter_downloader import FakeClock
+
+# PARAM_SET (MAVLink 2): 23 Byte Nutzdaten + 12 Byte Rahmen; PARAM_VALUE: 25 + 12 Byte
+PARAM_SET_SECONDS_57600 = 35 * 10 / 57600
+PARAM_VALUE_SECONDS_57600 = 37 * 10 / 57600
+
+
+class SimulatedFlightController:
+    """
+    Lokaler FC-Simulator für PARAM_SET: Vollduplex-Funkstrecke mit 57600 Baud,
+    fester Latenz und Verlust. Jeder angekommene PARAM_SET wird mit dem
+    tatsächlich übernommenen Wert als PARAM_VALUE beantwortet.
+    """
+
+    def __init__(self, clock, count, latency=0.05, loss=0.0, seed=1):
+        self.clock = clock
+        self.params = {f"PARAM_{i:04d}": float(i) for i in range(count)}
+        self.read_only = set()
+        self.limits = {}  # name -> Maximalwert
+        self.latency = latency
+        self.loss = loss
+        self.random = random.Random(seed)
+        self.set_requests = []
+        self.in_flight = deque()  # (Ankunftszeit, PARAM_VALUE)
+        self._uplink_free = clock.now
+        self._downlink_free = clock.now
+
+    def param_set_send(self, name, value, parm_type=None):
+        self.set_requests.append(name)
+        self._uplink_free = max(self._uplink_free, self.clock.now) + PARAM_SET_SECONDS_57600
+        if self.random.random() < self.loss or name not in self.params:
+            return
+        if name not in self.read_only:
+            self.params[name] = min(value, self.limits.get(name, value))
+        arrival = max(self._uplink_free + 2 * self.latency, self._downlink_free) + PARAM_VALUE_SECONDS_57600
+        self._downlink_free = arrival
+        if self.random.random() < self.loss:
+            return
+        self.in_flight.append((arrival, SimpleNamespace(
+            param_id=name, param_value=self.params[name], param_index=65535,
+            param_count=len(self.params), get_type=lambda: "PARAM_VALUE")))
+
+    def deliver(self, writer, max_seconds=120.0):
+        """Stellt die Antworten zu ihrer Ankunftszeit zu und ruft den Timer auf."""
+        clock = self.clock
+        next_poll = clock.now
+        end = clock.now + max_seconds
+        while writer.is_active() and clock.now < end:
+            if self.in_flight and self.in_flight[0][0] <= clock.now:
+                writer.handle_param_value(self.in_flight.popleft()[1])
+                continue
+            arrival = self.in_flight[0][0] if self.in_flight else end
+            clock.now = max(clock.now, min(arrival, next_poll))
+            if clock.now >= next_poll:
+                writer.poll()
+                next_poll = clock.now + writer.TICK_MS / 1000.0
+
+
+class TestParameterWriter:
+    """Test-Suite für den ParameterWriter."""
+
+    @pytest.fixture
+    def clock(self):
+        return FakeClock()
+
+    @pytest.fixture
+    def writer(self, app, clock):
+        return ParameterWriter(clock=clock)
+
+    def test_all_parameters_confirmed(self, writer, clock):
+        fc = SimulatedFlightController(clock, 20)
+        results = []
+        writer.finished.connect(results.append)
+        writer.start(fc, {name: value + 100 for name, value in fc.params.items()})
+        fc.deliver(writer)
+        assert writer.state == ParameterWriter.DONE
+        assert all(r["status"] == ParameterWriter.OK for r in results[0].values())
+        assert fc.params["PARAM_0005"] == 105.0
+        assert len(fc.set_requests) == 20
+
+    def test_window_limits_unconfirmed_writes(self, writer, clock):
+        fc = SimulatedFlightController(clock, 50)
+        writer.start(fc, {name: 1.0 for name in fc.params})
+        assert len(fc.set_requests) == ParameterWriter.WINDOW
+        # Jede Bestätigung gibt Platz für den nächsten PARAM_SET
+        clock.now = fc.in_flight[0][0]
+        writer.handle_param_value(fc.in_flight.popleft()[1])
+        assert len(fc.set_requests) == ParameterWriter.WINDOW + 1
+
+    def test_unchanged_values_are_not_sent(self, writer, clock):
+        fc = SimulatedFlightController(clock, 10)
+        writer.start(fc, {"PARAM_0001": 1.0, "PARAM_0002": 7.0}, current=dict(fc.params))
+        fc.deliver(writer)
+        results = writer.results()
+        assert results["PARAM_0001"]["status"] == ParameterWriter.UNCHANGED
+        assert results["PARAM_0002"]["status"] == ParameterWriter.OK
+        assert fc.set_requests == ["PARAM_0002"]
+
+    def test_rejected_and_clamped_values_are_reported(self, writer, clock):
+        fc = SimulatedFlightController(clock, 10)
+        fc.read_only.add("PARAM_0001")
+        fc.limits["PARAM_0002"] = 50.0
+        writer.start(fc, {"PARAM_0001": 9.0, "PARAM_0002": 80.0})
+        fc.deliver(writer)
+        results = writer.results()
+        assert results["PARAM_0001"]["status"] == ParameterWriter.MISMATCH
+        assert results["PARAM_0001"]["value"] == 1.0
+        assert results["PARAM_0002"]["status"] == ParameterWriter.MISMATCH
+        assert results["PARAM_0002"]["value"] == 50.0
+        assert writer.failed_names() == ["PARAM_0001", "PARAM_0002"]
+
+    def test_unanswered_write_is_retried_then_times_out(self, writer, clock):
+        fc = SimulatedFlightController(clock, 10)
+        writer.start(fc, {"UNKNOWN": 1.0, "PARAM_0003": 4.0})
+        fc.deliver(writer)
+        results = writer.results()
+        assert results["UNKNOWN"]["status"] == ParameterWriter.TIMEOUT
+        assert results["UNKNOWN"]["attempts"] == ParameterWriter.WRITE_RETRIES
+        assert fc.set_requests.count("UNKNOWN") == ParameterWriter.WRITE_RETRIES
+        assert results["PARAM_0003"]["status"] == ParameterWriter.OK
+
+    def test_float32_rounding_counts_as_confirmed(self, writer, clock):
+        fc = SimulatedFlightController(clock, 10)
+        writer.start(fc, {"PARAM_0001": 0.1})
+        fc.deliver(writer)
+        assert writer.results()["PARAM_0001"]["status"] == ParameterWriter.OK
+        assert same_value(0.1, 0.10000000149011612)
+        assert not same_value(0.1, 0.2)
+
+    def test_cancel_marks_remaining(self, writer, clock):
+        fc = SimulatedFlightController(clock, 30)
+        writer.start(fc, {name: 1.0 for name in fc.params})
+        writer.cancel()
+        assert writer.state == ParameterWriter.DONE
+        assert {r["status"] for r in writer.results().values()} == {ParameterWriter.CANCELLED}
+
+    def test_throughput_over_lossy_radio(self, writer, clock):
+        """500 Parameter über 57600 Baud mit 50 ms Latenz und 2 % Verlust je Richtung."""
+        fc = SimulatedFlightController(clock, 500, latency=0.05, loss=0.02, seed=3)
+        writer.start(fc, {name: value + 0.5 for name, value in fc.params.items()})
+        fc.deliver(writer)
+        assert writer.state == ParameterWriter.DONE
+        assert writer.failed_names() == []
+
+        # Stop-and-wait bräuchte pro Parameter eine volle Umlaufzeit
+        round_trip = PARAM_SET_SECONDS_57600 + 2 * fc.latency + PARAM_VALUE_SECONDS_57600
+        sequential = 500 * round_trip
+        line_limit = 500 * PARAM_VALUE_SECONDS_57600
+        print(f"500 Parameter geschrieben in {writer.duration:.2f} s "
+              f"({500 / writer.duration:.0f} Parameter/s, Leitungsgrenze {line_limit:.2f} s, "
+              f"Stop-and-wait {sequential:.1f} s)")
+        # Verlorene Bestätigungen kosten je einen WRITE_TIMEOUT, aber parallel im Fenster
+        assert writer.duration < sequential / 3
+        assert writer.duration < line_limit + 4 * ParameterWriter.WRITE_TIMEOUT
+
+
+class TestParameterFile:
+    """Test-Suite für das Einlesen von Parameterdateien."""
+
+    def test_mission_planner_format(self, tmp_path):
+        path = tmp_path / "copter.param"
+        path.write_text("# Kommentar\nFRAME_CLASS,1\nPILOT_SPEED_UP 250.5\n\nCOMPASS_ORIENT,0 # inline\n")
+        assert parse_parameter_file(path) == {"FRAME_CLASS": 1.0, "PILOT_SPEED_UP": 250.5, "COMPASS_ORIENT": 0.0}
+
+    def test_qgroundcontrol_format(self, tmp_path):
+        path = tmp_path / "copter.params"
+        path.write_text("# Vehicle-Id Component-Id Name Value Type\n1\t1\tFRAME_CLASS\t1\t2\n1\t1\tATC_RAT_RLL_P\t0.135\t9\n")
+        assert parse_parameter_file(path) == {"FRAME_CLASS": 1.0, "ATC_RAT_RLL_P": 0.135}
+
+    def test_invalid_line_raises(self, tmp_path):
+        path = tmp_path / "broken.param"
+        path.write_text("FRAME_CLASS,abc\n")
+        with pytest.raises(ValueError):
+            parse_parameter_file(path)
+
+
+class TestParameterManagerWrite:
+    """Test-Suite für das Schreiben über den ParameterManager."""
+
+    def test_write_file_updates_model_on_echo(self, app, tmp_path):
+        clock = FakeClock()
+        fc = SimulatedFlightController(clock, 5)
+        model = ParameterTableModel()
+        model.set_parameters([{"name": name, "value": value} for name, value in fc.params.items()])
+        manager = ParameterManager(model, MagicMock())
+        manager.set_connection(fc)
+        manager.get_writer()._clock = clock
+        finished = []
+        manager.writeFinished.connect(finished.append)
+
+        path = tmp_path / "copter.param"
+        path.write_text("PARAM_0001,1\nPARAM_0002,42\n")
+        assert manager.write_parameter_file(str(path))
+        while fc.in_flight:
+            clock.now, msg = fc.in_flight.popleft()
+            manager.handle_parameter(msg)
+
+        assert finished[0]["PARAM_0001"]["status"] == ParameterWriter.UNCHANGED
+        assert finished[0]["PARAM_0002"]["status"] == ParameterWriter.OK
+        assert fc.set_requests == ["PARAM_0002"]
+        assert model.get_parameter_by_name("PARAM_0002")["value"] == 42.0
+
+    def test_write_without_connection_fails(self, app):
+        manager = ParameterManager(ParameterTableModel(), MagicMock())
+        errors = []
+        manager.errorOccurred.connect(errors.append)
+        assert manager.write_parameters({"A": 1.0}) is False
+        assert errors
@@ -18,7 +18,7 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 from backend.mavlink_connector import MAVLinkConnector
 from backend.message_handler import MessageHandler
 from backend.mavlink_simulator import MAVLinkSimulator
-from backend.parameter_model import ParameterTableModel
+from backend.parameter_model import ParameterTableModel, ParameterFilterProxyModel
 from backend.logger import Logger
 
 class TestPerformance:
@@ -56,7 +56,7 @@ class TestPerformance:
         model = ParameterTableModel()
         # Viele Parameter generieren für Performance-Tests
         params = []
-        for i in range(1000):  # 1000 Parameter
+        for i in range(10000):  # 10 000 Parameter (vollständiger ArduPilot-Satz mit Reserve)
             params.append({
                 'name': f'PARAM_{i}',
                 'value': str(i / 10.0),
@@ -172,6 +172,62 @@ class TestPerformance:
         except Exception as e:
             pytest.skip(f"Konnte Performance-Test nicht ausführen: {str(e)}")
     
+    def test_parameter_model_upsert_performance(self, parameter_model, app):
+        """Testet Lookup, Upsert und gesammeltes Einfügen bei 10 000 Parametern."""
+        count = parameter_model.rowCount()
+        assert count == 10000
+
+        # 1. Lookup über den Namensindex
+        start_time = time.perf_counter()
+        for i in range(count):
+            parameter_model.get_parameter_by_name(f'PARAM_{i}')
+        lookup_time = time.perf_counter() - start_time
+        assert lookup_time < 0.5, f"get_parameter_by_name() dauerte zu lange: {lookup_time:.4f}s"
+
+        # 2. Erneut empfangene PARAM_VALUEs aktualisieren die vorhandenen Zeilen
+        changed = []
+        parameter_model.dataChanged.connect(lambda first, last, roles: changed.append(first.row()))
+        start_time = time.perf_counter()
+        for i in range(count):
+            parameter_model.add_parameter({'name': f'PARAM_{i}', 'value': str(i)})
+        upsert_time = time.perf_counter() - start_time
+        assert parameter_model.rowCount() == count
+        assert len(changed) == count
+        assert upsert_time < 1.0, f"Upsert dauerte zu lange: {upsert_time:.4f}s"
+
+        # 3. Neue Parameter werden mit einem rowsInserted eingefügt
+        inserts = []
+        loaded = []
+        parameter_model.rowsInserted.connect(lambda parent, first, last: inserts.append((first, last)))
+        parameter_model.parametersLoaded.connect(lambda: loaded.append(True))
+        start_time = time.perf_counter()
+        parameter_model.add_parameters([{'name': f'NEW_{i}', 'value': '0'} for i in range(count)])
+        insert_time = time.perf_counter() - start_time
+        assert inserts == [(count, 2 * count - 1)]
+        assert len(loaded) == 1
+        assert insert_time < 1.0, f"Einfügen dauerte zu lange: {insert_time:.4f}s"
+        print(f"10k Parameter: Lookup {lookup_time * 1000:.1f} ms, Upsert {upsert_time * 1000:.1f} ms, "
+              f"Einfügen {insert_time * 1000:.1f} ms")
+
+    def test_parameter_search_performance(self, parameter_model, app):
+        """Testet, dass jeder Tastendruck der Suche bei 10 000 Parametern unter einem Frame bleibt."""
+        start_time = time.perf_counter()
+        proxy = ParameterFilterProxyModel(parameter_model)
+        proxy.search_index  # Index wird sonst bei der ersten Suche aufgebaut
+        build_time = time.perf_counter() - start_time
+        assert build_time < 1.0, f"Indexaufbau dauerte zu lange: {build_time:.4f}s"
+
+        timings = []
+        for text in ['t', 'te', 'tes', 'test', 'test p', 'test pa', 'test param', 'test parameter 99', '', 'param_12']:
+            start_time = time.perf_counter()
+            proxy.setSearchText(text)
+            proxy.rowCount()
+            timings.append(time.perf_counter() - start_time)
+        assert proxy.count == 111  # PARAM_12, PARAM_120..129, PARAM_1200..1299
+        worst = max(timings)
+        print(f"10k Parameter: Indexaufbau {build_time * 1000:.1f} ms, Suche max. {worst * 1000:.2f} ms")
+        assert worst < 1.0 / 60, f"Suche dauerte zu lange: {worst * 1000:.2f} ms"
+
     def test_simulator_performance(self, simulator, mock_logger):
         """Testet die Performance des Simulators."""
         try:
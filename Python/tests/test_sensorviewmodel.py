@@ -63,4 +63,48 @@ def test_formatted_value_with_invalid_data(model):
     
     index = model.index(0)
     formatted = model.data(index, model.FormattedValueRole)
-    assert formatted == "—"  # Erwartetes Verhalten bei Formatierungsfehler 
\ No newline at end of file
+    assert formatted == "—"  # Erwartetes Verhalten bei Formatierungsfehler 
+
+@pytest.fixture
+def large_model(app):
+    """SensorViewModel mit vielen Sensoren (ohne vordefinierte Sensoren)."""
+    large = SensorViewModel()
+    for i in range(500):
+        large.add_sensor(f"sensor_{i}", f"Sensor {i}", "")
+    return large
+
+def _collect_ranges(model):
+    ranges = []
+    model.dataChanged.connect(lambda first, last, roles: ranges.append((first.row(), last.row())))
+    return ranges
+
+def test_row_index_lookup(large_model):
+    """Test, dass Sensoren über den ID-Index gefunden werden."""
+    assert large_model.row_of("sensor_0") == 0
+    assert large_model.row_of("sensor_499") == 499
+    assert large_model.row_of("unknown") == -1
+
+def test_update_sensor_uses_index(large_model):
+    """Test, dass update_sensor genau die betroffene Zeile meldet."""
+    ranges = _collect_ranges(large_model)
+    large_model.update_sensor("sensor_250", 1.5)
+    large_model.update_sensor("sensor_250", 1.5)  # unverändert, kein Signal
+    large_model.update_sensor("unknown", 2.0)
+    assert ranges == [(250, 250)]
+    assert large_model.data(large_model.index(250), large_model.ValueRole) == 1.5
+
+def test_update_many_merges_contiguous_ranges(large_model):
+    """Test, dass update_many geänderte Zeilen zu zusammenhängenden Bereichen zusammenfasst."""
+    ranges = _collect_ranges(large_model)
+    values = {f"sensor_{i}": 1.0 for i in (12, 10, 11, 40, 42, 41, 499)}
+    values["unknown"] = 3.0
+    values["sensor_100"] = 0.0  # unverändert
+    assert large_model.update_many(values) == 7
+    assert ranges == [(10, 12), (40, 42), (499, 499)]
+    assert large_model.data(large_model.index(41), large_model.ValueRole) == 1.0
+
+def test_update_many_without_changes(large_model):
+    """Test, dass ohne Änderungen kein dataChanged gesendet wird."""
+    ranges = _collect_ranges(large_model)
+    assert large_model.update_many({"sensor_1": 0.0}) == 0
+    assert ranges == []
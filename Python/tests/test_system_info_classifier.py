@@ -0,0 +1,153 @@
+"""
+Unit-Tests und Benchmark für den Systeminfo-Klassifizierer.
+"""
+import pytest
+import sys
+import os
+import json
+import re
+import time
+from unittest.mock import MagicMock
+
+# Korrekte Pfadangaben für Import
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from backend.system_info_classifier import SystemInfoClassifier
+from backend.message_handler import MessageHandler
+from backend.logger import Logger
+
+REPORT_PATH = os.environ.get(
+    "RZGCS_CLASSIFIER_BENCH_REPORT",
+    os.path.join(os.path.dirname(__file__), "reports", "system_info_classifier_benchmark.json"),
+)
+
+# Bisherige Implementierungen als Referenz für den Benchmark
+LEGACY_PATTERNS = [r"Frame:", r"RCOut:", r"MicoAir", r"ChibiOS:", r"ArduCopter", r"PreArm:"]
+
+
+def legacy_logger_match(message):
+    for pattern in LEGACY_PATTERNS:
+        if re.search(pattern, message):
+            return True
+    return False
+
+
+def legacy_statustext_match(text):
+    if any(pattern in text for pattern in ["Frame:", "RCOut:", "MicoAir", "ChibiOS:", "ArduCopter", "PreArm:"]):
+        return True
+    return text.startswith("EKF") or "ready to arm" in text.lower() or "armed" in text.lower()
+
+
+class FakeStatusText:
+    def __init__(self, text):
+        self.text = text
+        self.severity = 6
+
+
+class TestSystemInfoClassifier:
+    """Test-Suite für den SystemInfoClassifier."""
+
+    @pytest.mark.parametrize("text,category", [
+        ("Frame: QUAD/X", "frame"),
+        ("RCOut: PWM:1-12", "rcout"),
+        ("MicoAir743 004D0030", "board"),
+        ("ChibiOS: 6e3f5dd5", "board"),
+        ("ArduCopter V4.5.1 (8d1a2a5b)", "firmware"),
+        ("PreArm: Compass not calibrated", "prearm"),
+        ("ATTITUDE received", None),
+    ])
+    def test_default_categories(self, text, category):
+        assert SystemInfoClassifier().classify(text) == category
+
+    def test_status_text_categories(self):
+        classifier = SystemInfoClassifier.for_status_text()
+        assert classifier.classify("EKF3 IMU0 is using GPS") == "ekf"
+        assert classifier.classify("GPS: EKF ready") is None
+        assert classifier.classify("Vehicle ARMED") == "arming"
+        assert classifier.classify("Ready to arm") == "arming"
+
+    def test_matches_legacy_behaviour(self):
+        classifier = SystemInfoClassifier()
+        status_classifier = SystemInfoClassifier.for_status_text()
+        samples = ["Frame: HEXA", "PreArm: RC not calibrated", "EKF2 IMU1 initialised",
+                   "Throttle armed", "Mode STABILIZE", "random text", "ArduCopter V4", "ekf lowercase"]
+        for text in samples:
+            assert classifier.matches(text) == legacy_logger_match(text)
+            assert status_classifier.matches(text) == legacy_statustext_match(text)
+
+    def test_literal_patterns_are_escaped(self):
+        classifier = SystemInfoClassifier({"special": ["a.b (c)"]})
+        assert classifier.classify("x a.b (c) y") == "special"
+        assert classifier.classify("axb (c)") is None
+
+    def test_configurable_categories(self):
+        classifier = SystemInfoClassifier()
+        classifier.add_category("battery", ["Battery"], ignore_case=True)
+        assert classifier.classify("battery failsafe") == "battery"
+        classifier.remove_category("battery")
+        assert classifier.classify("battery failsafe") is None
+        with pytest.raises(ValueError):
+            classifier.set_categories({"bad name": ["x"]})
+
+    def test_cache(self):
+        classifier = SystemInfoClassifier(cache_size=2)
+        assert classifier.classify_cached("Frame: X") == "frame"
+        assert classifier.classify_cached("Frame: X") == "frame"
+        assert classifier.cache_size == 1
+        classifier.classify_cached("a")
+        classifier.classify_cached("b")
+        assert classifier.cache_size <= 2
+        classifier.add_category("x", ["a"])
+        assert classifier.cache_size == 0
+
+    def test_logger_and_handler_share_classifier_logic(self, app):
+        logger = Logger(console=False)
+        logger.addLog("PreArm: Gyros not calibrated")
+        assert logger.system_info_logs[-1].endswith("PreArm: Gyros not calibrated")
+
+        mock_logger = MagicMock(spec=Logger)
+        handler = MessageHandler(mock_logger)
+        handler._handle_statustext(FakeStatusText("EKF3 IMU0 origin set"))
+        handler._handle_statustext(FakeStatusText("Mode changed"))
+        mock_logger.addSystemInfoLog.assert_called_once_with("EKF3 IMU0 origin set")
+
+
+class TestClassifierBenchmark:
+    """Benchmark: Kosten pro Zeile, alt gegen neu."""
+
+    LINES = 20000
+
+    def _lines(self):
+        templates = [
+            "ATTITUDE roll={i} pitch=0.1 yaw=1.2",
+            "📊 Batterie: 12.{i}V, -0.0A, 80%",
+            "GPS: Lat 47.39, Lon 8.54, Alt {i} m",
+            "PreArm: Check failed {i}",
+            "Mode STABILIZE",
+        ]
+        return [templates[i % len(templates)].format(i=i % 7) for i in range(self.LINES)]
+
+    @staticmethod
+    def _ns_per_line(func, lines):
+        started = time.perf_counter()
+        for line in lines:
+            func(line)
+        return (time.perf_counter() - started) / len(lines) * 1e9
+
+    def test_cost_per_line(self):
+        lines = self._lines()
+        classifier = SystemInfoClassifier()
+        status_classifier = SystemInfoClassifier.for_status_text()
+        results = {
+            "lines": len(lines),
+            "legacy_logger_ns": round(self._ns_per_line(legacy_logger_match, lines), 1),
+            "classifier_ns": round(self._ns_per_line(classifier.classify, lines), 1),
+            "legacy_statustext_ns": round(self._ns_per_line(legacy_statustext_match, lines), 1),
+            "statustext_classifier_ns": round(self._ns_per_line(status_classifier.classify, lines), 1),
+            "statustext_cached_ns": round(self._ns_per_line(status_classifier.classify_cached, lines), 1),
+        }
+        print(json.dumps(results))
+        os.makedirs(os.path.dirname(REPORT_PATH), exist_ok=True)
+        with open(REPORT_PATH, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        assert all(value > 0 for value in results.values())
@@ -0,0 +1,83 @@
+"""
+Unit-Tests für die Telemetrie-Zusammenfassung im Frame-Takt.
+"""
+import pytest
+import sys
+import os
+import time
+from unittest.mock import MagicMock
+
+# Korrekte Pfadangaben für Import
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from backend.telemetry_coalescer import TelemetryCoalescer
+from backend.sensor_manager import SensorManager
+from backend.sensorviewmodel import SensorViewModel
+from backend.logger import Logger
+
+
+class TestTelemetryCoalescer:
+    """Test-Suite für den TelemetryCoalescer."""
+
+    @pytest.fixture
+    def coalescer(self, app):
+        return TelemetryCoalescer(rate_hz=100)
+
+    def test_latest_value_wins(self, coalescer):
+        batches = []
+        coalescer.flushed.connect(batches.append)
+        for i in range(50):
+            coalescer.publish("roll", float(i))
+        coalescer.flush()
+        assert batches == [{"roll": 49.0}]
+        assert coalescer.published_count == 50
+        assert coalescer.delivered_count == 1
+
+    def test_one_batch_for_all_topics(self, coalescer):
+        batches = []
+        coalescer.flushed.connect(batches.append)
+        coalescer.publish("roll", 1.0)
+        coalescer.publish("pitch", 2.0)
+        coalescer.flush()
+        coalescer.flush()  # Leerer Flush emittiert nichts
+        assert batches == [{"roll": 1.0, "pitch": 2.0}]
+
+    def test_full_rate_listener_sees_every_value(self, coalescer):
+        seen = []
+        coalescer.add_listener(lambda topic, value: seen.append(value))
+        for i in range(10):
+            coalescer.publish("roll", float(i))
+        assert len(seen) == 10
+
+    def test_timer_flushes_at_ui_rate(self, app, coalescer):
+        batches = []
+        coalescer.flushed.connect(batches.append)
+        coalescer.publish("yaw", 3.0)
+        deadline = time.time() + 1.0
+        while not batches and time.time() < deadline:
+            app.processEvents()
+            time.sleep(0.001)
+        assert batches == [{"yaw": 3.0}]
+
+    def test_rate_is_clamped(self, coalescer):
+        coalescer.setUpdateRate(10000)
+        assert coalescer.updateRate == TelemetryCoalescer.MAX_RATE_HZ
+        coalescer.setUpdateRate(0)
+        assert coalescer.updateRate == TelemetryCoalescer.MIN_RATE_HZ
+
+    def test_sensor_manager_updates_model_on_flush(self, coalescer):
+        model = SensorViewModel()
+        manager = SensorManager(model, MagicMock(spec=Logger))
+        manager.initialize_sensors()
+        manager.set_coalescer(coalescer)
+        coalescer.flushed.connect(
+            lambda batch: [model.update_sensor(k, v) for k, v in batch.items()])
+
+        msg = MagicMock(roll=0.25, pitch=0.0, yaw=0.0)
+        manager.handle_attitude(msg)
+        values = {s["id"]: s["value"] for s in model.get_all_sensors()}
+        assert values["roll"] == 0.0  # Noch nicht geflusht
+
+        coalescer.flush()
+        values = {s["id"]: s["value"] for s in model.get_all_sensors()}
+        assert values["roll"] == 0.25
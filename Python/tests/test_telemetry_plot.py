@@ -0,0 +1,161 @@
+"""
+Unit-Tests für die Ausdünnung langer Telemetrie-Verläufe zum Plotten.
+"""
+import pytest
+import sys
+import os
+
+import numpy as np
+
+# Korrekte Pfadangaben für Import
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from backend.telemetry_plot import TelemetryPlotter, lttb_indices, minmax_indices
+from backend.telemetry_store import TelemetryStore
+
+T0 = 1700000000.0
+FIELDS = {'ATTITUDE': (('roll', 1.0),)}
+
+
+def reference_lttb(x, y, n_out):
+    """Direkte Umsetzung von LTTB als Vergleich"""
+    n = len(x)
+    every = (n - 2) / (n_out - 2)
+    out = [0]
+    a = 0
+    for i in range(n_out - 2):
+        start = int(np.floor(i * every)) + 1
+        end = int(np.floor((i + 1) * every)) + 1
+        next_start = end
+        next_end = min(int(np.floor((i + 2) * every)) + 1, n - 1)
+        if i == n_out - 3:
+            avg_x, avg_y = x[-1], y[-1]
+        else:
+            avg_x, avg_y = x[next_start:next_end].mean(), y[next_start:next_end].mean()
+        best, best_area = start, -1.0
+        for j in range(start, end):
+            area = abs((x[a] - avg_x) * (y[j] - y[a]) - (x[a] - x[j]) * (avg_y - y[a]))
+            if area > best_area:
+                best, best_area = j, area
+        out.append(best)
+        a = best
+    out.append(n - 1)
+    return out
+
+
+class TestDownsamplingFunctions:
+    """Test-Suite für minmax_indices und lttb_indices."""
+
+    def test_minmax_matches_brute_force(self):
+        rng = np.random.default_rng(1)
+        times = np.sort(rng.uniform(0.0, 10.0, 5000))
+        values = rng.normal(size=5000).astype(np.float32)
+        indices = minmax_indices(times, values, 0.0, 0.5, 20)
+        assert (np.diff(indices) > 0).all()
+        for k in range(20):
+            in_bucket = np.flatnonzero((times >= k * 0.5) & (times < (k + 1) * 0.5))
+            chosen = [i for i in indices if k * 0.5 <= times[i] < (k + 1) * 0.5]
+            assert sorted(chosen) == sorted({in_bucket[values[in_bucket].argmin()],
+                                             in_bucket[values[in_bucket].argmax()]})
+
+    def test_minmax_keeps_single_spike(self):
+        times = np.arange(100000) * 0.001
+        values = np.zeros(100000, dtype=np.float32)
+        values[43210] = 9.0
+        indices = minmax_indices(times, values, 0.0, 1.0, 100)
+        assert 43210 in indices
+        assert len(indices) <= 200
+
+    def test_minmax_ignores_nan(self):
+        times = np.arange(6, dtype=np.float64)
+        values = np.array([1.0, np.nan, 3.0, -2.0, np.nan, 0.5], dtype=np.float32)
+        assert minmax_indices(times, values, 0.0, 3.0, 2).tolist() == [0, 2, 3, 5]
+
+    def test_lttb_matches_reference(self):
+        rng = np.random.default_rng(2)
+        x = np.cumsum(rng.uniform(0.01, 0.02, 3000))
+        y = np.cumsum(rng.normal(size=3000))
+        assert lttb_indices(x, y, 300).tolist() == reference_lttb(x, y, 300)
+
+    def test_lttb_short_series_unchanged(self):
+        assert lttb_indices(np.arange(5.0), np.arange(5.0), 10).tolist() == [0, 1, 2, 3, 4]
+
+
+class TestTelemetryPlotter:
+    """Test-Suite für den TelemetryPlotter."""
+
+    RATE = 100.0
+
+    @pytest.fixture
+    def store(self, app):
+        store = TelemetryStore(fields=FIELDS, memory_limit=64 * 1024 * 1024)
+        # Eine Stunde mit 100 Hz: Sinus plus ein Ausreißer
+        times = T0 + np.arange(int(3600 * self.RATE)) / self.RATE
+        values = np.sin(times / 60.0)
+        values[180000] = 5.0
+        for t, v in zip(times.tolist(), values.tolist()):
+            store.append('ATTITUDE', t, (v,))
+        return store
+
+    @pytest.fixture
+    def plotter(self, store):
+        return TelemetryPlotter(store)
+
+    def test_point_budget_and_spike(self, plotter):
+        times, values = plotter.series("ATTITUDE.roll", T0, T0 + 3600.0, 1000)
+        assert len(times) <= 2 * 1000 + 2
+        assert (np.diff(times) > 0).all()
+        assert values.max() == 5.0
+        assert times[0] == T0 and times[-1] == T0 + 3600.0 - 1 / self.RATE
+
+    @pytest.mark.parametrize("width", [2, 3, 10, 640, 1000, 1920])
+    def test_at_most_two_points_per_pixel(self, plotter, width):
+        # Auf das Ende der Daten gekürztes Fenster (712 s) und beliebige Ausschnitte
+        windows = [(T0 + 2888.0, T0 + 4000.0)]
+        rng = np.random.default_rng(width)
+        for start, length in zip(rng.uniform(0, 3500, 50), rng.uniform(0.05, 3600, 50)):
+            windows.append((T0 + start, T0 + start + length))
+        for t0, t1 in windows:
+            times, _ = plotter.series("ATTITUDE.roll", t0, t1, width)
+            assert len(times) <= 2 * width + 2, (t0 - T0, t1 - T0)
+
+    def test_lttb_one_point_per_bucket(self, plotter):
+        times, values = plotter.series("ATTITUDE.roll", T0, T0 + 3600.0, 1000, TelemetryPlotter.LTTB)
+        assert len(times) <= 2 * 1000 + 2 * TelemetryPlotter.TILE_BUCKETS
+        assert values.max() == 5.0
+
+    def test_pan_reuses_cached_tiles(self, plotter):
+        plotter.series("ATTITUDE.roll", T0 + 600.0, T0 + 1200.0, 800)
+        first = plotter.cache_info()
+        plotter.series("ATTITUDE.roll", T0 + 650.0, T0 + 1250.0, 800)
+        second = plotter.cache_info()
+        assert second["hits"] - first["hits"] >= first["misses"] - 2
+        assert second["misses"] - first["misses"] <= 2
+
+        # Zurück zur vorherigen Zoomstufe: alles aus dem Cache
+        plotter.series("ATTITUDE.roll", T0, T0 + 3600.0, 800)
+        before = plotter.cache_info()["misses"]
+        plotter.series("ATTITUDE.roll", T0 + 600.0, T0 + 1200.0, 800)
+        assert plotter.cache_info()["misses"] == before
+
+    def test_open_tile_shows_new_data(self, store, plotter):
+        end = T0 + 3600.0
+        plotter.series("ATTITUDE.roll", end - 10.0, end, 500)
+        store.append('ATTITUDE', end + 0.5, (-7.0,))
+        times, values = plotter.series("ATTITUDE.roll", end - 10.0, end + 1.0, 500)
+        assert times[-1] == end + 0.5 and values[-1] == -7.0
+
+    def test_new_timeline_invalidates_cache(self, store, plotter):
+        plotter.series("ATTITUDE.roll", T0, T0 + 3600.0, 500)
+        store.append('ATTITUDE', T0 + 10.0, (3.0,))  # Zurückgespult
+        times, values = plotter.series("ATTITUDE.roll", T0, T0 + 3600.0, 500)
+        assert times.tolist() == [T0 + 10.0] and values.tolist() == [3.0]
+
+    def test_qml_points(self, plotter):
+        points = plotter.downsample("ATTITUDE.roll", T0, T0 + 1.0, 100)
+        # Ein Punkt nach dem Fenster, damit die Linie bis zum Rand reicht
+        assert len(points) == 102
+        assert points[-1].x() == pytest.approx(T0 + 1.01)
+        assert points[0].x() == T0 and points[1].y() == pytest.approx(np.sin((T0 + 0.01) / 60.0), abs=1e-6)
+        assert plotter.downsample("ATTITUDE.pitch", T0, T0 + 1.0, 100) == []
+        assert plotter.downsample("ATTITUDE.roll", T0, T0 + 1.0, 100, "spline") == []
@@ -0,0 +1,129 @@
+"""
+Unit-Tests für den spaltenorientierten Telemetrie-Verlauf.
+"""
+import pytest
+import sys
+import os
+from unittest.mock import MagicMock
+
+import numpy as np
+
+# Korrekte Pfadangaben für Import
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pymavlink import mavutil
+
+from backend.logger import Logger
+from backend.message_dispatcher import MessageDispatcher
+from backend.parameter_model import ParameterTableModel
+from backend.sensorviewmodel import SensorViewModel
+from backend.serial_connector import SerialConnector
+from backend.telemetry_store import TelemetryStore, TimeSeriesTable
+from test_parameter_downloader import FakeClock
+from test_tlog_replay import RATE, SECONDS, T0, write_flight
+
+MAV = mavutil.mavlink
+
+
+class TestTimeSeriesTable:
+    """Test-Suite für die TimeSeriesTable."""
+
+    def test_window_is_zero_copy_view(self):
+        table = TimeSeriesTable(("roll", "pitch"), capacity=100)
+        for i in range(10):
+            table.append(float(i), (i * 0.1, -i * 0.1))
+        times, values = table.window("roll", 2.0, 5.0)
+        assert times.tolist() == [2.0, 3.0, 4.0, 5.0]
+        assert values == pytest.approx([0.2, 0.3, 0.4, 0.5])
+        assert values.dtype == np.float32
+        assert np.shares_memory(values, table._values)
+        assert np.shares_memory(times, table._times)
+        with pytest.raises(ValueError):
+            values[0] = 1.0
+
+    def test_ring_keeps_newest_rows_contiguous(self):
+        table = TimeSeriesTable(("value",), capacity=5)
+        for i in range(12):
+            table.append(float(i), (i,))
+        assert len(table) == 5
+        assert table.total == 12
+        assert table.times().tolist() == [7.0, 8.0, 9.0, 10.0, 11.0]
+        assert table.column("value").tolist() == [7.0, 8.0, 9.0, 10.0, 11.0]
+        assert table.times().flags.c_contiguous
+        assert table.time_range() == (7.0, 11.0)
+        assert table.latest("value") == (11.0, 11.0)
+        assert table.window("value", 9.5)[1].tolist() == [10.0, 11.0]
+
+    def test_older_timestamp_starts_new_timeline(self):
+        table = TimeSeriesTable(("value",), capacity=10)
+        for i in range(5):
+            table.append(100.0 + i, (i,))
+        table.append(50.0, (42,))
+        assert table.times().tolist() == [50.0]
+        assert table.latest("value") == (50.0, 42.0)
+
+
+class TestTelemetryStore:
+    """Test-Suite für den TelemetryStore."""
+
+    @pytest.fixture
+    def store(self, app):
+        return TelemetryStore(clock=FakeClock())
+
+    def test_memory_limit_bounds_all_tables(self, app):
+        limit = 1024 * 1024
+        store = TelemetryStore(memory_limit=limit)
+        for msg_type, spec in TelemetryStore.FIELDS.items():
+            store.append(msg_type, 1.0, [0.0] * len(spec))
+        assert store.memory_usage() <= limit
+        assert store.memory_usage() > 0.9 * limit
+        assert store.table('ATTITUDE').capacity == store.capacity
+
+    def test_dispatcher_scales_and_stamps(self, store):
+        dispatcher = MessageDispatcher()
+        store.register(dispatcher)
+        msg = MAV.MAVLink_global_position_int_message(1000, 473977420, 85455940, 500000, 12340, 150, -20, 5, 27000)
+        msg._timestamp = T0
+        dispatcher.dispatch(msg)
+        assert store.latest("GLOBAL_POSITION_INT.lat") == (T0, pytest.approx(47.397742, abs=1e-5))
+        assert store.latest("GLOBAL_POSITION_INT.relative_alt")[1] == pytest.approx(12.34)
+        assert store.latest("GLOBAL_POSITION_INT.hdg")[1] == pytest.approx(270.0)
+
+        # Ohne Empfangszeit die Uhr des Stores
+        dispatcher.dispatch(MAV.MAVLink_attitude_message(0, 0.5, 0.0, 0.0, 0.0, 0.0, 0.0))
+        assert store.latest("ATTITUDE.roll") == (100.0, 0.5)
+        assert "ATTITUDE.yawspeed" in store.seriesNames
+
+        store.unregister(dispatcher)
+        assert not dispatcher.has_subscribers('ATTITUDE')
+
+    def test_unknown_series(self, store):
+        assert store.latest("ATTITUDE.roll") is None
+        assert len(store.window("ATTITUDE.roll")[0]) == 0
+        with pytest.raises(KeyError):
+            store.window("ATTITUDE.altitude")
+        with pytest.raises(KeyError):
+            store.window("HEARTBEAT.type")
+
+    def test_replay_fills_history(self, app, monkeypatch, tmp_path):
+        monkeypatch.setattr("backend.parameter_cache.ParameterCache.default_directory",
+                            staticmethod(lambda: str(tmp_path)))
+        path = tmp_path / "flight.tlog"
+        write_flight(path)
+        connector = SerialConnector(SensorViewModel(), MagicMock(spec=Logger), ParameterTableModel())
+        try:
+            connector.startReplay(str(path))
+            connector.replay.run_to_end()
+            store = connector.telemetryStore
+            times, roll = store.window("ATTITUDE.roll", T0 + 2.0, T0 + 3.0)
+            assert len(times) == RATE + 1
+            assert roll[0] == pytest.approx(2.0) and roll[-1] == pytest.approx(3.0)
+            assert len(store.window("ATTITUDE.roll")[0]) == SECONDS * RATE
+
+            # Zurückspulen beginnt einen neuen Verlauf
+            connector.replay.seek(5.0)
+            connector.replay.step()
+            assert store.time_range("ATTITUDE.roll") == (pytest.approx(T0 + 5.0), pytest.approx(T0 + 5.0))
+            connector.disconnect()
+        finally:
+            connector._connection_worker.shutdown()
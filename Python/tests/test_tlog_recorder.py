@@ -0,0 +1,294 @@
+"""
+Unit-Tests für die tlog-Aufzeichnung des MAVLink-Verkehrs.
+"""
+import pytest
+import sys
+import os
+import mmap
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+# Korrekte Pfadangaben für Import
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pymavlink import mavutil
+
+from backend.logger import Logger
+from backend.mavlink_reader import MessageRingBuffer
+from backend.mavlink_transport import MAVLinkTransport
+from backend.parameter_model import ParameterTableModel
+from backend.sensorviewmodel import SensorViewModel
+from backend.serial_connector import SerialConnector
+from backend.simulator_connector import SimulatorConnector
+from backend.tlog_recorder import TlogRecorder, TlogWriter
+from test_mavlink_frame_parser import ByteConnection
+from test_mavlink_reader import wait_for
+from test_parameter_downloader import FakeClock
+
+MAV = mavutil.mavlink
+
+T0 = 1700000000.0  # Epochenzeit der ersten Nachricht
+
+
+class Sink:
+    def write(self, buf):
+        pass
+
+
+class Vehicle:
+    """Erzeugt empfangene Nachrichten mit Rohdaten wie der pymavlink-Parser."""
+
+    def __init__(self):
+        self._encoder = MAV.MAVLink(Sink(), srcSystem=1, srcComponent=1)
+        self._parser = MAV.MAVLink(None)
+
+    def receive(self, msg, timestamp):
+        (decoded,) = self._parser.parse_buffer(msg.pack(self._encoder))
+        decoded._timestamp = timestamp
+        return decoded
+
+    def attitude(self, timestamp, roll=0.1):
+        return self.receive(MAV.MAVLink_attitude_message(1000, roll, 0.2, 0.3, 0, 0, 0), timestamp)
+
+    def heartbeat(self, timestamp):
+        return self.receive(MAV.MAVLink_heartbeat_message(
+            MAV.MAV_TYPE_QUADROTOR, MAV.MAV_AUTOPILOT_ARDUPILOTMEGA, 0, 0, 0, 3), timestamp)
+
+
+def read_tlog(path):
+    """(Typ, Zeitstempel) aller Nachrichten einer tlog-Datei"""
+    log = mavutil.mavlink_connection(str(path))
+    messages = []
+    while True:
+        msg = log.recv_match()
+        if msg is None:
+            break
+        messages.append((msg.get_type(), msg._timestamp))
+    log.close()
+    return messages
+
+
+class TestTlogWriter:
+    """Test-Suite für den TlogWriter."""
+
+    def test_grows_and_truncates_to_recorded_length(self, tmp_path):
+        path = tmp_path / "flight.tlog"
+        writer = TlogWriter(path, chunk_size=mmap.ALLOCATIONGRANULARITY)
+        vehicle = Vehicle()
+        frame = vehicle.attitude(T0).get_msgbuf()
+        count = 3 * mmap.ALLOCATIONGRANULARITY // len(frame)
+        for i in range(count):
+            writer.append(int((T0 + i * 0.001) * 1e6), frame)
+            if i % 500 == 0:
+                writer.flush()
+        assert writer.frames == count
+        writer.close()
+
+        assert path.stat().st_size == count * (8 + len(frame))
+        messages = read_tlog(path)
+        assert len(messages) == count
+        assert messages[-1][1] == pytest.approx(T0 + (count - 1) * 0.001, abs=1e-6)
+
+    def test_preallocates_while_open(self, tmp_path):
+        path = tmp_path / "flight.tlog"
+        writer = TlogWriter(path, chunk_size=mmap.ALLOCATIONGRANULARITY)
+        writer.append(0, b"\xfe\x00")
+        assert path.stat().st_size == mmap.ALLOCATIONGRANULARITY
+        writer.close()
+        assert path.stat().st_size == 10
+        with pytest.raises(ValueError):
+            writer.append(0, b"\xfe\x00")
+
+
+class TestTlogRecorder:
+    """Test-Suite für den TlogRecorder."""
+
+    @pytest.fixture
+    def clock(self):
+        clock = FakeClock()
+        clock.now = T0 + 10.0
+        return clock
+
+    @pytest.fixture
+    def connection(self):
+        return SimpleNamespace(mav=MAV.MAVLink(Sink(), srcSystem=255, srcComponent=190))
+
+    @pytest.fixture
+    def transport(self, app, connection):
+        return MAVLinkTransport(connection, threaded=False)
+
+    @pytest.fixture
+    def recorder(self, app, clock):
+        recorder = TlogRecorder(clock=clock)
+        yield recorder
+        recorder.stop()
+
+    def test_records_received_and_sent_frames(self, recorder, transport, connection, clock, tmp_path):
+        path = tmp_path / "flight.tlog"
+        vehicle = Vehicle()
+        recorder.attach(transport)
+        assert recorder.start(path) == path
+        assert recorder.recording
+
+        transport.deliver(vehicle.heartbeat(T0))
+        transport.deliver(vehicle.attitude(T0 + 0.5))
+        connection.mav.param_request_list_send(1, 1)
+        recorder.stop()
+
+        assert read_tlog(path) == [
+            ('HEARTBEAT', T0),
+            ('ATTITUDE', T0 + 0.5),
+            ('PARAM_REQUEST_LIST', clock.now),
+        ]
+        stats = recorder.stats()
+        assert (stats["received"], stats["sent"]) == (2, 1)
+        assert stats["bytes"] == path.stat().st_size
+
+    def test_only_hooked_while_recording(self, recorder, transport, connection, tmp_path):
+        recorder.attach(transport)
+        assert transport._frame_tap is None
+        recorder.start(tmp_path / "flight.tlog")
+        assert transport._frame_tap is not None
+        assert connection.mav.send_callback is not None
+        # Rohe Frames statt Listener: Lazy Decoding bleibt wirksam
+        assert not transport.wants(MAV.MAVLINK_MSG_ID_ATTITUDE)
+        recorder.stop()
+        assert transport._frame_tap is None
+        assert connection.mav.send_callback is None
+
+    def test_records_undecoded_and_dropped_frames(self, app, recorder, tmp_path):
+        sender = MAV.MAVLink(Sink(), srcSystem=1, srcComponent=1)
+        frames = [bytes(MAV.MAVLink_raw_imu_message(i, 1, 2, 3, 4, 5, 6, 7, 8, 9).pack(sender))
+                  for i in range(20)]
+        frames.append(bytes(MAV.MAVLink_heartbeat_message(2, 3, 0, 0, 4, 3).pack(sender)))
+        # Lazy Decoding ohne Abonnenten, Ringpuffer für eine Nachricht, nichts wird abgeholt
+        transport = MAVLinkTransport(ByteConnection(b"".join(frames)), capacity=1,
+                                     overflow_policy=MessageRingBuffer.DROP_NEWEST, lazy_decoding=True)
+        path = tmp_path / "flight.tlog"
+        recorder.attach(transport)
+        recorder.start(path)
+        transport.start()
+        try:
+            assert wait_for(app, lambda: recorder.stats()["received"] == len(frames))
+        finally:
+            transport.stop()
+        recorder.stop()
+        assert transport.reader.parser.skipped_decodes == 20
+        assert transport.delivered <= 1
+        assert path.read_bytes()[8:8 + len(frames[0])] == frames[0]
+        assert [t for t, _ in read_tlog(path)] == ['RAW_IMU'] * 20 + ['HEARTBEAT']
+
+    def test_recording_spans_reconnect(self, app, recorder, transport, tmp_path):
+        path = tmp_path / "flight.tlog"
+        vehicle = Vehicle()
+        recorder.start(path)
+        recorder.attach(transport)
+        transport.deliver(vehicle.heartbeat(T0))
+        recorder.detach()
+        transport.deliver(vehicle.heartbeat(T0 + 1.0))  # Nicht mehr verbunden
+
+        second = MAVLinkTransport(SimpleNamespace(mav=None), threaded=False)
+        recorder.attach(second)
+        second.deliver(vehicle.attitude(T0 + 2.0))
+        recorder.stop()
+        assert read_tlog(path) == [('HEARTBEAT', T0), ('ATTITUDE', T0 + 2.0)]
+
+    def test_high_rate_append_is_cheap(self, recorder, transport, tmp_path):
+        path = tmp_path / "flight.tlog"
+        vehicle = Vehicle()
+        messages = [vehicle.attitude(T0 + i * 0.001, roll=i * 1e-4) for i in range(5000)]
+        recorder.attach(transport)
+        recorder.start(path)
+        for msg in messages:
+            transport.deliver(msg)
+        latency = recorder.stats()["write_latency"]
+        recorder.stop()
+
+        assert latency["count"] == 5000
+        # Ein Anhängen ist ein Speicherzugriff, kein Systemaufruf
+        assert latency["p50_ms"] < 0.1
+        assert len(read_tlog(path)) == 5000
+
+    def test_unwritable_path_reports_error(self, recorder, tmp_path):
+        errors = []
+        recorder.errorOccurred.connect(errors.append)
+        blocker = tmp_path / "file"
+        blocker.write_text("")
+        assert recorder.start(blocker / "flight.tlog") is None
+        assert not recorder.recording
+        assert len(errors) == 1
+
+
+class TestSerialConnectorRecording:
+    """Test-Suite für die Aufzeichnung über den SerialConnector."""
+
+    def test_start_and_stop_recording(self, app, monkeypatch, tmp_path):
+        monkeypatch.setattr("backend.parameter_cache.ParameterCache.default_directory",
+                            staticmethod(lambda: str(tmp_path)))
+        monkeypatch.setattr(TlogRecorder, "default_directory", staticmethod(lambda: tmp_path / "tlogs"))
+        connector = SerialConnector(SensorViewModel(), MagicMock(spec=Logger), ParameterTableModel())
+        try:
+            connector.startRecording()
+            assert connector.recorder.recording
+            path = connector.recorder.recordingPath
+            assert path.startswith(str(tmp_path / "tlogs")) and path.endswith(".tlog")
+            connector.stopRecording()
+            assert not connector.recorder.recording
+            assert os.path.getsize(path) == 0
+            logged = [call.args[0] for call in connector._logger.addLog.call_args_list]
+            assert any(line.startswith("⏹️ Recording saved to") for line in logged)
+        finally:
+            connector._connection_worker.shutdown()
+
+    def test_records_simulator_link(self, app, monkeypatch, tmp_path):
+        monkeypatch.setattr("backend.parameter_cache.ParameterCache.default_directory",
+                            staticmethod(lambda: str(tmp_path)))
+
+        def start_connection(simulator):
+            # Statt UDP und Simulatorprozess: Transport ohne Reader-Thread
+            simulator._mavlink_connection = SimpleNamespace(
+                mav=MAV.MAVLink(Sink(), srcSystem=255, srcComponent=190))
+            simulator._transport = MAVLinkTransport(simulator._mavlink_connection, threaded=False,
+                                                    parent=simulator)
+            simulator._transport.add_listener(simulator._on_message)
+            simulator._connected = True
+            simulator.connectionStatusChanged.emit(True)
+            return True
+
+        monkeypatch.setattr(SimulatorConnector, "start_connection", start_connection)
+        connector = SerialConnector(SensorViewModel(), MagicMock(spec=Logger), ParameterTableModel())
+        try:
+            assert connector._connect_to_simulator()
+            transport = connector._simulator_connector.transport
+            path = tmp_path / "simulator.tlog"
+            connector.startRecording(str(path))
+            assert connector.recorder.recording
+            vehicle = Vehicle()
+            for i in range(5):
+                transport.deliver(vehicle.heartbeat(T0 + i))
+                transport.deliver(vehicle.attitude(T0 + i + 0.5))
+            connector.linkStats.update()
+            assert connector.linkStats.framesReceived == 10
+
+            connector.disconnect()
+            assert connector.recorder.transport is None
+            connector.stopRecording()
+            assert [t for t, _ in read_tlog(path)] == ["HEARTBEAT", "ATTITUDE"] * 5
+        finally:
+            connector._connection_worker.shutdown()
+
+    def test_refuses_without_mavlink_link(self, app, monkeypatch, tmp_path):
+        monkeypatch.setattr("backend.parameter_cache.ParameterCache.default_directory",
+                            staticmethod(lambda: str(tmp_path)))
+        connector = SerialConnector(SensorViewModel(), MagicMock(spec=Logger), ParameterTableModel())
+        try:
+            # Wie der kompatible Simulator: verbunden, aber ohne MAVLink-Transport
+            connector._connected = True
+            connector._port = "Simulator"
+            connector.startRecording(str(tmp_path / "empty.tlog"))
+            assert not connector.recorder.recording
+            assert not (tmp_path / "empty.tlog").exists()
+            connector._logger.addLog.assert_any_call("[ERR] Cannot record Simulator: no MAVLink link")
+        finally:
+            connector._connected = False
+            connector._connection_worker.shutdown()
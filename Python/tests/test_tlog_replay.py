@@ -0,0 +1,331 @@
+"""
+Unit-Tests für Index und Wiedergabe aufgezeichneter tlog-Dateien.
+"""
+import pytest
+import sys
+import os
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+# Korrekte Pfadangaben für Import
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pymavlink import mavutil
+
+from backend.logger import Logger
+from backend.mavlink_transport import MAVLinkTransport
+from backend.parameter_model import ParameterTableModel
+from backend.sensorviewmodel import SensorViewModel
+from backend.serial_connector import SerialConnector
+from backend.tlog_recorder import TlogRecorder, TlogWriter
+from backend.tlog_replay import TlogIndex, TlogReplay
+from test_parameter_downloader import FakeClock
+from test_tlog_recorder import Sink, Vehicle
+
+MAV = mavutil.mavlink
+
+T0 = 1700000000.0
+RATE = 50  # ATTITUDE pro Sekunde
+SECONDS = 10
+
+
+def write_flight(path, garbage=False):
+    """10 s Flug: 1 Hz HEARTBEAT von System 7, 50 Hz ATTITUDE (roll = Sekunden seit Start)"""
+    encoder = MAV.MAVLink(Sink(), srcSystem=7, srcComponent=1)
+    writer = TlogWriter(path)
+    for i in range(SECONDS * RATE):
+        t = i / RATE
+        if i % RATE == 0:
+            heartbeat = MAV.MAVLink_heartbeat_message(
+                MAV.MAV_TYPE_QUADROTOR, MAV.MAV_AUTOPILOT_ARDUPILOTMEGA, 0, 0, 0, 3)
+            writer.append(int((T0 + t) * 1e6), heartbeat.pack(encoder))
+        attitude = MAV.MAVLink_attitude_message(int(t * 1000), t, 0.0, 0.0, 0.0, 0.0, 0.0)
+        writer.append(int((T0 + t) * 1e6), attitude.pack(encoder))
+    writer.close()
+    if garbage:
+        data = path.read_bytes()
+        path.write_bytes(data[:100] + b"\x00\x13garbage\xfe" + data[100:])
+    return SECONDS * RATE + SECONDS
+
+
+def record_session(path, seconds=5):
+    """Mitschnitt des TlogRecorders: Fahrzeug (System 1) und was die GCS (System 255) gesendet hat"""
+    clock = FakeClock()
+    connection = SimpleNamespace(mav=MAV.MAVLink(Sink(), srcSystem=255, srcComponent=190))
+    transport = MAVLinkTransport(connection, threaded=False)
+    recorder = TlogRecorder(clock=clock)
+    recorder.attach(transport)
+    recorder.start(path)
+    vehicle = Vehicle()
+    for t in range(seconds):
+        clock.now = T0 + t
+        transport.deliver(vehicle.heartbeat(T0 + t))
+        connection.mav.heartbeat_send(MAV.MAV_TYPE_GCS, MAV.MAV_AUTOPILOT_INVALID, 0, 0, 0)
+        connection.mav.command_long_send(1, 1, MAV.MAV_CMD_REQUEST_MESSAGE, 0, 1, 0, 0, 0, 0, 0, 0)
+        transport.deliver(vehicle.attitude(T0 + t + 0.5))
+    recorder.stop()
+
+
+class Collector:
+    def __init__(self):
+        self.messages = []
+
+    def deliver(self, msg):
+        self.messages.append(msg)
+
+    def types(self):
+        return [msg.get_type() for msg in self.messages]
+
+
+class TestTlogIndex:
+    """Test-Suite für den TlogIndex."""
+
+    def test_builds_and_reuses_sidecar(self, tmp_path, monkeypatch):
+        path = tmp_path / "flight.tlog"
+        frames = write_flight(path)
+        index = TlogIndex.load(path)
+        assert len(index) == frames
+        assert TlogIndex.sidecar_path(path).exists()
+
+        # Zweites Öffnen liest nur den Index
+        monkeypatch.setattr(TlogIndex, "build", classmethod(lambda cls, data: pytest.fail("rebuilt")))
+        again = TlogIndex.load(path)
+        assert (again.timestamps == index.timestamps).all()
+        assert (again.offsets == index.offsets).all()
+
+    def test_stale_sidecar_is_rebuilt(self, tmp_path):
+        path = tmp_path / "flight.tlog"
+        write_flight(path)
+        TlogIndex.load(path)
+        heartbeat = MAV.MAVLink_heartbeat_message(0, 0, 0, 0, 0, 3).pack(MAV.MAVLink(Sink()))
+        with open(path, "ab") as f:
+            f.write(int((T0 + SECONDS) * 1e6).to_bytes(8, "big") + heartbeat)
+        assert len(TlogIndex.load(path)) == SECONDS * RATE + SECONDS + 1
+
+    def test_find_first_frame_at_time(self, tmp_path):
+        path = tmp_path / "flight.tlog"
+        write_flight(path)
+        index = TlogIndex.load(path)
+        i = index.find(index.start_us + 2_010_000)
+        assert index.due_us(i) == index.start_us + 2_020_000
+        assert index.find(index.end_us + 1) == len(index)
+
+    def test_skips_garbage_between_records(self, tmp_path):
+        path = tmp_path / "flight.tlog"
+        frames = write_flight(path, garbage=True)
+        replay = TlogReplay(path)
+        try:
+            collector = Collector()
+            replay.attach(collector)
+            replay.run_to_end()
+            assert len(collector.messages) + replay.bad_frames >= frames - 1
+            assert collector.types().count('HEARTBEAT') == SECONDS
+        finally:
+            replay.close()
+
+
+class TestTlogReplay:
+    """Test-Suite für die TlogReplay."""
+
+    @pytest.fixture
+    def clock(self):
+        return FakeClock()
+
+    @pytest.fixture
+    def replay(self, app, tmp_path, clock):
+        path = tmp_path / "flight.tlog"
+        write_flight(path)
+        replay = TlogReplay(path, clock=clock)
+        yield replay
+        replay.close()
+
+    def test_link_targets_recorded_vehicle(self, replay):
+        assert (replay.link.target_system, replay.link.target_component) == (7, 1)
+        assert replay.duration == pytest.approx(SECONDS - 1 / RATE)
+        assert replay.startTime == pytest.approx(T0)
+        # Gesendetes wird verworfen
+        replay.link.mav.param_request_list_send(7, 1)
+
+    def test_real_time_pacing(self, replay, clock):
+        collector = Collector()
+        replay.attach(collector)
+        replay.play()
+        replay._tick()
+        assert collector.types() == ['HEARTBEAT', 'ATTITUDE']
+        clock.now += 1.0
+        replay._tick()
+        # Bis einschließlich t = 1.0 s
+        assert collector.messages[-1].roll == pytest.approx(1.0)
+        assert collector.types().count('ATTITUDE') == RATE + 1
+        assert replay.position == pytest.approx(1.0)
+
+    def test_speed_scales_log_time(self, replay, clock):
+        collector = Collector()
+        replay.attach(collector)
+        replay.setSpeed(5.0)
+        replay.play()
+        clock.now += 1.0
+        replay._tick()
+        assert collector.messages[-1].roll == pytest.approx(5.0)
+        replay.setSpeed(1000.0)
+        assert replay.speed == TlogReplay.MAX_SPEED
+        replay.setSpeed(0.01)
+        assert replay.speed == TlogReplay.MIN_SPEED
+
+    def test_as_fast_as_possible_in_batches(self, replay):
+        collector = Collector()
+        finished = []
+        replay.finished.connect(lambda: finished.append(True))
+        replay.attach(collector)
+        replay.setSpeed(TlogReplay.AS_FAST_AS_POSSIBLE)
+        replay.play()
+        replay._tick()
+        assert len(collector.messages) == TlogReplay.MAX_BATCH
+        while replay.playing:
+            replay._tick()
+        assert len(collector.messages) == replay.frameCount
+        assert finished == [True]
+        assert replay.atEnd
+
+    def test_pause_and_step(self, replay, clock):
+        collector = Collector()
+        replay.attach(collector)
+        replay.play()
+        replay._tick()
+        replay.pause()
+        clock.now += 5.0
+        replay._tick()
+        assert len(collector.messages) == 2
+        replay.step(3)
+        assert len(collector.messages) == 5
+        assert not replay.playing
+        # Fortsetzen ab der Pausenposition, nicht ab der Wanduhr
+        replay.play()
+        clock.now += 0.1
+        replay._tick()
+        assert collector.messages[-1].roll == pytest.approx(0.06 + 0.1)
+
+    def test_seek(self, replay, clock):
+        collector = Collector()
+        replay.attach(collector)
+        replay.seek(7.5)
+        assert replay.position == pytest.approx(7.5)
+        replay.step()
+        assert collector.messages[0].roll == pytest.approx(7.5)
+        assert collector.messages[0]._timestamp == pytest.approx(T0 + 7.5)
+        replay.seek(2.0)
+        replay.step()
+        assert collector.types()[-1] == 'HEARTBEAT'
+        assert collector.messages[-1]._timestamp == pytest.approx(T0 + 2.0)
+
+    def test_replay_is_deterministic(self, replay, app, tmp_path):
+        first = Collector()
+        replay.attach(first)
+        replay.run_to_end()
+        second = TlogReplay(replay.path)
+        try:
+            collector = Collector()
+            second.attach(collector)
+            second.run_to_end()
+        finally:
+            second.close()
+        assert [bytes(m.get_msgbuf()) for m in first.messages] == \
+            [bytes(m.get_msgbuf()) for m in collector.messages]
+
+    def test_skips_frames_sent_by_the_gcs(self, app, tmp_path):
+        path = tmp_path / "session.tlog"
+        record_session(path)
+        replay = TlogReplay(path)
+        try:
+            collector = Collector()
+            replay.attach(collector)
+            replay.run_to_end()
+            assert replay.frameCount == 20
+            assert {m.get_srcSystem() for m in collector.messages} == {1}
+            assert collector.types() == ['HEARTBEAT', 'ATTITUDE'] * 5
+            assert replay.skipped_frames == 10
+            assert (replay.link.target_system, replay.link.target_component) == (1, 1)
+
+            # Einzelschritte zählen nur zugestellte Frames
+            replay.seek(0.0)
+            replay.step(2)
+            assert collector.types()[-2:] == ['HEARTBEAT', 'ATTITUDE']
+        finally:
+            replay.close()
+
+    def test_delivers_into_transport(self, replay):
+        transport = MAVLinkTransport(replay.link, threaded=False)
+        seen = []
+        transport.subscribe('HEARTBEAT', seen.append)
+        replay.attach(transport)
+        replay.run_to_end()
+        assert transport.delivered == replay.frameCount
+        assert len(seen) == SECONDS
+
+
+class TestSerialConnectorReplay:
+    """Test-Suite für die Wiedergabe über den SerialConnector."""
+
+    def test_replay_as_live_link(self, app, monkeypatch, tmp_path):
+        monkeypatch.setattr("backend.parameter_cache.ParameterCache.default_directory",
+                            staticmethod(lambda: str(tmp_path)))
+        path = tmp_path / "flight.tlog"
+        frames = write_flight(path)
+        connector = SerialConnector(SensorViewModel(), MagicMock(spec=Logger), ParameterTableModel())
+        try:
+            assert connector.startReplay(str(path))
+            assert connector.connected
+            assert connector.port == "Replay: flight.tlog"
+            replay = connector.replay
+            assert replay.playing
+            replay.run_to_end()
+            assert connector.get_transport().delivered == frames
+            assert connector.get_transport().reader is None
+
+            connector.disconnect()
+            assert connector.replay is None
+            assert not connector.connected
+        finally:
+            connector._connection_worker.shutdown()
+
+    def test_gcs_frames_do_not_reach_the_connector(self, app, monkeypatch, tmp_path):
+        monkeypatch.setattr("backend.parameter_cache.ParameterCache.default_directory",
+                            staticmethod(lambda: str(tmp_path)))
+        path = tmp_path / "session.tlog"
+        record_session(path)
+        connector = SerialConnector(SensorViewModel(), MagicMock(spec=Logger), ParameterTableModel())
+        try:
+            assert connector.startReplay(str(path))
+            heartbeats = []
+            connector.get_transport().subscribe('HEARTBEAT', heartbeats.append)
+            connector.replay.run_to_end()
+            assert [m.type for m in heartbeats] == [MAV.MAV_TYPE_QUADROTOR] * 5
+            connector.linkStats.update()
+            assert [(s["sysid"], s["compid"]) for s in connector.linkStats.sources] == [(1, 1)]
+            connector.disconnect()
+        finally:
+            connector._connection_worker.shutdown()
+
+    def test_attach_failure_is_logged(self, app, monkeypatch, tmp_path):
+        monkeypatch.setattr("backend.parameter_cache.ParameterCache.default_directory",
+                            staticmethod(lambda: str(tmp_path)))
+        path = tmp_path / "flight.tlog"
+        write_flight(path)
+        logger = MagicMock(spec=Logger)
+        connector = SerialConnector(SensorViewModel(), logger, ParameterTableModel())
+        try:
+            monkeypatch.setattr(connector, "_attach_link", MagicMock(side_effect=RuntimeError("boom")))
+            assert not connector.startReplay(str(path))
+            logger.addLog.assert_any_call("[ERR] Replay failed: boom")
+        finally:
+            connector._connection_worker.shutdown()
+
+    def test_missing_file(self, app, monkeypatch, tmp_path):
+        monkeypatch.setattr("backend.parameter_cache.ParameterCache.default_directory",
+                            staticmethod(lambda: str(tmp_path)))
+        connector = SerialConnector(SensorViewModel(), MagicMock(spec=Logger), ParameterTableModel())
+        try:
+            assert not connector.startReplay(str(tmp_path / "missing.tlog"))
+            assert not connector.connected
+        finally:
+            connector._connection_worker.shutdown()
@@ -16,7 +16,7 @@ ListView {
     spacing: 0
 
     // Connect to the logger from Python backend - zeige nur Systeminformationen
-    model: logger ? logger.system_info_logs : []
+    model: logger ? logger.systemInfoModel : null
 
     // Background
     Rectangle {
@@ -38,9 +38,7 @@ ListView {
     Connections {
         target: logger
         function onSystemInfoLogsChanged() {
-            console.log("System info logs updated")
-            logsList.model = logger.system_info_logs
-            // Scroll to bottom
+            // Das Modell meldet neue Zeilen selbst - nur ans Ende scrollen
             logsList.positionViewAtEnd()
         }
     }
@@ -49,7 +47,6 @@ ListView {
     Component.onCompleted: {
         if (logger) {
             console.log("LogsList initialized with system info filter")
-            model = logger.system_info_logs
             positionViewAtEnd()
         } else {
             console.log("No logger available")
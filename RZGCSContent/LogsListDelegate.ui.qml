@@ -19,11 +19,11 @@ Item {
 
     Text {
         id: logText
-        text: modelData
+        text: entry
         color: "white"
         font.family: "Consolas, 'Courier New', monospace"
         font.pixelSize: 16
-        font.bold: modelData.includes("Frame:") || modelData.includes("RCOut:") || modelData.includes("MicoAir") || modelData.includes("ChibiOS:") || modelData.includes("ArduCopter") || modelData.includes("PreArm:")
+        font.bold: systemInfo
         wrapMode: Text.WordWrap
         width: parent.width - 10
         anchors {
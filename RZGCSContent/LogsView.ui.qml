@@ -45,7 +45,7 @@ Rectangle {
             Layout.fillHeight: true
             clip: true
             spacing: Math.max(2, parent.height * 0.003)
-            model: logger ? logger.logs : []
+            model: logger ? logger.logModel : null
 
             // Background with proper scaling
             Rectangle {
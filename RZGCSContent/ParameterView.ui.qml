@@ -45,13 +45,8 @@ Item {
                 }
                 onTextChanged: {
                     logMessage("Such-Text geändert: " + text)
-                    if (text.length > 0) {
-                        // Beim Tippen filtern
-                        root.filterParameters(text)
-                    } else {
-                        // Wenn leer, alle anzeigen
-                        paramTable.model = parameterModel
-                    }
+                    // Beim Tippen filtern, leerer Text zeigt alle Parameter
+                    root.filterParameters(text)
                 }
             }
 
@@ -95,22 +90,12 @@ Item {
             }
         }
 
-        // Funktion zum Filtern der Parameter
+        // Funktion zum Filtern der Parameter (indizierte Suche im Proxy-Modell)
         function filterParameters(searchString) {
             logMessage("Filtere nach: " + searchString)
-            if (parameterModel) {
-                try {
-                    var filtered = parameterModel.filter_parameters(searchString)
-                    if (filtered && filtered.length !== undefined) {
-                        logMessage("Gefiltert: " + filtered.length + " Ergebnisse")
-                        // Modell direkt aktualisieren
-                        paramTable.model = filtered
-                    } else {
-                        logMessage("Filter-Ergebnis ungültig")
-                    }
-                } catch (e) {
-                    logMessage("Fehler beim Filtern: " + e)
-                }
+            if (parameterSearchModel) {
+                parameterSearchModel.setSearchText(searchString)
+                logMessage("Gefiltert: " + parameterSearchModel.count + " Ergebnisse")
             } else {
                 logMessage("Parameter-Modell nicht verfügbar")
             }
@@ -121,7 +106,7 @@ Item {
             Layout.fillWidth: true
             Layout.fillHeight: true
             clip: true
-            model: parameterModel
+            model: parameterSearchModel
             
             // Header für die Tabelle
             header: Rectangle {
@@ -165,17 +150,9 @@ Item {
                 }
             }
             
-            // Modell aktualisieren, wenn neue Parameter geladen wurden
+            // Das Proxy-Modell folgt neuen Parametern selbst (Suchtext bleibt aktiv)
             function resetModel() {
                 logMessage("Parameter-Liste zurücksetzen")
-                // Aktuelles Model festlegen
-                if (searchField.text === "") {
-                    // Alle Parameter anzeigen wenn kein Suchtext
-                    paramTable.model = parameterModel
-                } else {
-                    // Suche erneut ausführen
-                    root.filterParameters(searchField.text)  
-                }
             }
             
             // Element Template
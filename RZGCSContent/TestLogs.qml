@@ -39,8 +39,8 @@ Window {
             clip: true
             spacing: 5
             
-            // Hier verwenden wir logger.system_info_logs direkt
-            model: logger ? logger.system_info_logs : []
+            // Inkrementelles Modell der Systeminfo-Logs
+            model: logger ? logger.systemInfoModel : null
             
             delegate: Rectangle {
                 width: logsList.width
@@ -49,7 +49,7 @@ Window {
                 
                 Text {
                     id: logText
-                    text: modelData
+                    text: entry
                     color: "white"
                     font.family: "Consolas, 'Courier New', monospace"
                     font.pixelSize: 16
@@ -95,8 +95,8 @@ Window {
                 }
                 
                 Text {
-                    text: logger && logger.system_info_logs ? 
-                          "System-Info-Logs: " + logger.system_info_logs.length : 
+                    text: logger && logger.systemInfoModel ? 
+                          "System-Info-Logs: " + logger.systemInfoModel.count : 
                           "Keine System-Info-Logs verfügbar"
                     color: "white"
                 }
@@ -117,7 +117,7 @@ Window {
     Component.onCompleted: {
         if (logger) {
             console.log("Logger ist verfügbar")
-            console.log("Anzahl der System-Info-Logs: " + logger.system_info_logs.length)
+            console.log("Anzahl der System-Info-Logs: " + logger.systemInfoModel.count)
         } else {
             console.log("Logger ist NICHT verfügbar")
         }